@@ -0,0 +1,288 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from itertools import count
+
+import six
+
+# ============= local library imports  ==========================
+SEPARATOR_REGEX = re.compile(r'[\s\-_]+')
+
+EXACT, PREFIX, SUBSTRING, SUBSEQUENCE, EDIT = range(5)
+
+UID_BITS = 32
+UID_MASK = (1 << UID_BITS) - 1
+SCORE_BITS = 16
+
+
+def normalize(text):
+    """
+        lower case and drop separators so that "FC-2", "fc 2" and "FC2" are equivalent
+    """
+    return SEPARATOR_REGEX.sub('', six.text_type(text).lower())
+
+
+def rank(tier, score, uid):
+    return (((tier << SCORE_BITS) | min(score, 0xffff)) << UID_BITS) | uid
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def edit_distance(a, b, max_distance):
+    """
+        Levenshtein distance between a and b. returns max_distance + 1 as soon as the distance is known to exceed
+        max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev = cur
+    return prev[-1]
+
+
+class FuzzyIndex(object):
+    """
+        in memory search index for name like strings. results are ranked exact, prefix, substring, subsequence then
+        by edit distance.
+
+        prefix matches use a sorted key list, substring and subsequence candidates come from per character postings
+        and edit distance candidates from trigram postings so a search only inspects items that can match.
+        items can be added and removed individually so the index does not need to be rebuilt when its source
+        collection changes.
+    """
+
+    def __init__(self, items=None, attr=None, key=None, max_distance=2):
+        """
+            :param attr: attribute of an item to index, like ``fuzzyfinder``
+            :param key: callable returning the text to index for an item. overrides ``attr``
+            :param max_distance: largest edit distance included in results. 0 disables edit distance matching
+        """
+        if key is None:
+            if attr:
+                def key(item):
+                    return getattr(item, attr)
+            else:
+                key = six.text_type
+
+        self._key = key
+        self.max_distance = max_distance
+
+        self._uid = count()
+        self._uids = {}
+        self._items = {}
+        self._keys = {}
+        self._sorted = []
+        self._chars = defaultdict(set)
+        self._grams = defaultdict(set)
+
+        if items:
+            self.extend(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._uids
+
+    def add(self, item, text=None):
+        """
+            add ``item``. ``text`` defaults to the key of ``item``. adding an item already in the index updates its
+            text
+        """
+        if text is None:
+            text = self._key(item)
+        if text is None:
+            text = ''
+
+        if item in self._uids:
+            self.remove(item)
+
+        uid = next(self._uid)
+        k = normalize(text)
+
+        self._uids[item] = uid
+        self._items[uid] = item
+        self._keys[uid] = k
+        insort(self._sorted, (k, uid))
+
+        for c in set(k):
+            self._chars[c].add(uid)
+        for g in trigrams(k):
+            self._grams[g].add(uid)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def update(self, item, text=None):
+        self.add(item, text)
+
+    def remove(self, item):
+        uid = self._uids.pop(item, None)
+        if uid is None:
+            return
+
+        del self._items[uid]
+        k = self._keys.pop(uid)
+
+        idx = bisect_left(self._sorted, (k, uid))
+        del self._sorted[idx]
+
+        for c in set(k):
+            self._discard(self._chars, c, uid)
+        for g in trigrams(k):
+            self._discard(self._grams, g, uid)
+
+    def clear(self):
+        self._uids.clear()
+        self._items.clear()
+        self._keys.clear()
+        del self._sorted[:]
+        self._chars.clear()
+        self._grams.clear()
+
+    def prefix(self, text, limit=None):
+        """
+            items whose key starts with ``text``, shortest first
+        """
+        q = normalize(text)
+        ms = sorted(self._prefix(q), key=lambda m: (len(m[0]), m[1]))
+        if limit:
+            ms = ms[:limit]
+        return [self._items[uid] for _, uid in ms]
+
+    def search(self, text, limit=None):
+        """
+            ranked items matching ``text``.
+
+            :param limit: maximum number of results. less ranked tiers are not searched once ``limit`` matches
+                are found
+        """
+        q = normalize(text)
+        if not q:
+            return []
+
+        # matches are encoded as tier, score, uid packed into one int so sorting ranks them. ties keep insertion
+        # order
+        seen = set()
+        matches = []
+        for k, uid in self._prefix(q):
+            seen.add(uid)
+            matches.append(rank(EXACT if k == q else PREFIX, len(k), uid))
+
+        if not limit or len(matches) < limit:
+            self._match_subsequence(q, matches, seen)
+
+        if self.max_distance and len(q) > 2 and (not limit or len(matches) < limit):
+            self._match_edit_distance(q, matches, seen)
+
+        matches.sort()
+        if limit:
+            matches = matches[:limit]
+
+        items = self._items
+        return [items[m & UID_MASK] for m in matches]
+
+    # private
+    def _prefix(self, q):
+        srt = self._sorted
+        i = bisect_left(srt, (q,))
+        n = len(srt)
+        while i < n:
+            k, uid = srt[i]
+            if not k.startswith(q):
+                break
+            yield k, uid
+            i += 1
+
+    def _match_subsequence(self, q, matches, seen):
+        cands = self._intersect(self._chars, set(q))
+        if not cands:
+            return
+
+        cands.difference_update(seen)
+
+        regex = re.compile('.*?'.join(re.escape(c) for c in q))
+        keys = self._keys
+        append = matches.append
+        add = seen.add
+        for uid in cands:
+            k = keys[uid]
+            idx = k.find(q)
+            if idx >= 0:
+                append(rank(SUBSTRING, idx, uid))
+                add(uid)
+            else:
+                m = regex.search(k)
+                if m:
+                    # shortest span first then earliest start
+                    append(rank(SUBSEQUENCE, ((m.end() - m.start()) << 8) | min(m.start(), 0xff), uid))
+                    add(uid)
+
+    def _match_edit_distance(self, q, matches, seen):
+        md = self.max_distance if len(q) > 5 else 1
+        grams = trigrams(q)
+
+        # strings within distance d of q share at least len(grams) - 3d trigrams
+        counts = defaultdict(int)
+        for g in grams:
+            for uid in self._grams.get(g, ()):
+                counts[uid] += 1
+
+        threshold = max(1, len(grams) - 3 * md)
+        keys = self._keys
+        n = len(q)
+        for uid, c in six.iteritems(counts):
+            if c < threshold or uid in seen:
+                continue
+
+            k = keys[uid]
+            # compare against the start of longer keys so partially typed names still match
+            d = min(edit_distance(q, k, md), edit_distance(q, k[:n], md))
+            if d <= md:
+                matches.append(rank(EDIT, d, uid))
+
+    def _intersect(self, postings, keys):
+        sets = []
+        for k in keys:
+            s = postings.get(k)
+            if not s:
+                return
+            sets.append(s)
+
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def _discard(self, postings, key, uid):
+        s = postings.get(key)
+        if s is not None:
+            s.discard(uid)
+            if not s:
+                del postings[key]
+
+# ============= EOF =============================================
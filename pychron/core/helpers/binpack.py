@@ -20,6 +20,12 @@
 import base64
 import struct
 
+from numpy import asarray, frombuffer, float64, dtype
+
+BYTE_ORDERS = {'@': '=', '=': '=', '<': '<', '>': '>', '!': '>'}
+FLOAT_CODES = {'f': 'f4', 'd': 'f8'}
+_DTYPES = {}
+
 
 def format_blob(blob):
     return base64.b64decode(blob)
@@ -33,38 +39,87 @@ def encode_blob(blob):
         return base64.b64encode(blob).decode('utf-8')
 
 
+def get_dtype(fmt):
+    """
+    return the numpy dtype and number of fields for a struct format made of a single float code e.g. ">ff", "<ff",
+    "ddd".  (None, 0) is returned for any other format
+    """
+    try:
+        return _DTYPES[fmt]
+    except KeyError:
+        pass
+
+    ret = None, 0
+    order, codes = '=', fmt
+    if codes and codes[0] in BYTE_ORDERS:
+        order, codes = BYTE_ORDERS[codes[0]], codes[1:]
+
+    if codes and len(set(codes)) == 1 and codes[0] in FLOAT_CODES:
+        ret = dtype('{}{}'.format(order, FLOAT_CODES[codes[0]])), len(codes)
+
+    _DTYPES[fmt] = ret
+    return ret
+
+
 def pack(fmt, data):
     """
-    data should be something like [(x0,y0),(x1,y1), (xN,yN)]
+    data should be something like [(x0,y0),(x1,y1), (xN,yN)] or a (N,2) array
     @param fmt:
     @param data:
     @return:
     """
-    # if len(args) > 1:
-    #     args = zip(args)
-    # b = b''
+    dt, nfields = get_dtype(fmt)
+    if dt is not None:
+        a = asarray(data, dtype=float64)
+        if a.ndim == 2 and a.shape[1] == nfields:
+            return a.astype(dt).tobytes()
 
-    return b''.join([struct.pack(fmt, *datum) for datum in data])
+    return _struct_pack(fmt, data)
 
 
-def unpack(blob, fmt='>ff', step=8, decode=False):
+def unpack(blob, fmt='>ff', step=8, decode=False, as_array=False):
+    """
+    return a list of columns. e.g. [(x0,x1,...xN), (y0,y1,...yN)]
+
+    if as_array the columns are float arrays instead of tuples. only applies to formats supported by get_dtype
+    """
     if decode:
         blob = format_blob(blob)
 
     if blob:
-        try:
-            return list(zip(*[struct.unpack(fmt, blob[i:i + step]) for i in range(0, len(blob), step)]))
-        except struct.error:
-            ret = []
-            for i in range(0, len(blob), step):
-                try:
-                    args = struct.unpack(fmt, blob[i:i+step])
-                except struct.error:
-                    break
-                ret.append(args)
-            return list(zip(*ret))
+        dt, nfields = get_dtype(fmt)
+        if dt is None or dt.itemsize * nfields != step:
+            return _struct_unpack(blob, fmt, step)
 
+        # a truncated trailing record is ignored
+        n = len(blob) // step
+        if not n:
+            return []
+
+        a = frombuffer(blob, dtype=dt, count=n * nfields).reshape(n, nfields).T
+        if as_array:
+            return list(a.astype(float64))
+        else:
+            return [tuple(c) for c in a.tolist()]
     else:
-        return [[] for _ in fmt.count('f')]
+        return [[] for _ in range(fmt.count('f'))]
+
+
+def _struct_pack(fmt, data):
+    return b''.join([struct.pack(fmt, *datum) for datum in data])
+
+
+def _struct_unpack(blob, fmt, step):
+    try:
+        return list(zip(*[struct.unpack(fmt, blob[i:i + step]) for i in range(0, len(blob), step)]))
+    except struct.error:
+        ret = []
+        for i in range(0, len(blob), step):
+            try:
+                args = struct.unpack(fmt, blob[i:i + step])
+            except struct.error:
+                break
+            ret.append(args)
+        return list(zip(*ret))
 
 # ============= EOF =============================================
@@ -0,0 +1,153 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+from numpy import asarray, empty, float64, inf, nanmin, nanmax
+
+MIN_CAPACITY = 16
+
+
+class GrowableArray(object):
+    """
+        append only 1D array with amortized O(1) appends.
+
+        ``view`` is a zero-copy slice of the filled part of the buffer. The same view object is returned until
+        the next append so it can be used as a cache key. Appending never changes an existing view.
+
+        an array passed to the constructor is used as the buffer without copying. the first append copies it
+        into a larger buffer.
+
+        ``min`` and ``max`` are calculated the first time they are requested then updated on every append
+    """
+    __slots__ = ('_data', '_n', '_view', '_min', '_max', '_owned')
+
+    def __init__(self, data=None, capacity=0, dtype=None):
+        if data is None:
+            data = empty(max(capacity, MIN_CAPACITY), dtype=dtype or float64)
+            n = 0
+            owned = True
+        else:
+            data = asarray(data, dtype=dtype).ravel()
+            n = data.shape[0]
+            owned = False
+            if capacity > n:
+                buf = empty(capacity, dtype=data.dtype)
+                buf[:n] = data
+                data = buf
+                owned = True
+
+        self._data = data
+        self._owned = owned
+        self._n = n
+        self._view = None
+        self._min = None
+        self._max = None
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def capacity(self):
+        return self._data.shape[0]
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def view(self):
+        v = self._view
+        if v is None:
+            v = self._data[:self._n]
+            self._view = v
+        return v
+
+    @property
+    def min(self):
+        if self._min is None:
+            self._calculate_limits()
+        return self._min
+
+    @property
+    def max(self):
+        if self._max is None:
+            self._calculate_limits()
+        return self._max
+
+    def append(self, v):
+        n = self._n
+        if n == self._data.shape[0] or not self._owned:
+            self._resize(max(n + 1, 2 * n, MIN_CAPACITY))
+
+        self._data[n] = v
+        self._n = n + 1
+        self._view = None
+
+        if self._min is not None:
+            v = self._data[n]
+            if v < self._min:
+                self._min = v
+            if v > self._max:
+                self._max = v
+
+    def extend(self, vs):
+        vs = asarray(vs, dtype=self._data.dtype)
+        m = vs.shape[0]
+        if not m:
+            return
+
+        n = self._n
+        if n + m > self._data.shape[0] or not self._owned:
+            self._resize(max(n + m, 2 * n, MIN_CAPACITY))
+
+        self._data[n:n + m] = vs
+        self._n = n + m
+        self._view = None
+        if self._min is not None:
+            self._min = min(self._min, nanmin(vs))
+            self._max = max(self._max, nanmax(vs))
+
+    def reserve(self, n):
+        """
+            make sure there is room for n values without reallocating
+        """
+        if n > self._data.shape[0] or not self._owned:
+            self._resize(max(n, self._n))
+
+    def clear(self):
+        if not self._owned:
+            self._data = empty(MIN_CAPACITY, dtype=self._data.dtype)
+            self._owned = True
+
+        self._n = 0
+        self._view = None
+        self._min = None
+        self._max = None
+
+    # private
+    def _calculate_limits(self):
+        if self._n:
+            v = self.view
+            self._min, self._max = nanmin(v), nanmax(v)
+        else:
+            self._min, self._max = inf, -inf
+
+    def _resize(self, n):
+        data = empty(n, dtype=self._data.dtype)
+        data[:self._n] = self._data[:self._n]
+        self._data = data
+        self._owned = True
+
+# ============= EOF =============================================
@@ -0,0 +1,83 @@
+import struct
+import unittest
+
+from numpy import linspace, array
+
+from pychron.core.helpers.binpack import pack, unpack, encode_blob, _struct_pack, _struct_unpack
+from pychron.processing.isotope import Isotope
+
+
+class BinpackTestCase(unittest.TestCase):
+    def setUp(self):
+        xs = linspace(0, 100, 257)
+        ys = xs ** 1.5 - 3.3
+        self.data = list(zip(xs, ys))
+
+    def test_pack_big_endian(self):
+        self.assertEqual(pack('>ff', self.data), _struct_pack('>ff', self.data))
+
+    def test_pack_little_endian(self):
+        self.assertEqual(pack('<ff', self.data), _struct_pack('<ff', self.data))
+
+    def test_pack_native(self):
+        self.assertEqual(pack('ff', self.data), _struct_pack('ff', self.data))
+
+    def test_pack_double(self):
+        self.assertEqual(pack('>dd', self.data), _struct_pack('>dd', self.data))
+
+    def test_pack_array(self):
+        self.assertEqual(pack('>ff', array(self.data)), _struct_pack('>ff', self.data))
+
+    def test_pack_empty(self):
+        self.assertEqual(pack('>ff', []), b'')
+
+    def test_pack_unsupported(self):
+        self.assertEqual(pack('HH', [(1, 2), (3, 4)]), struct.pack('HHHH', 1, 2, 3, 4))
+
+    def test_unpack(self):
+        blob = _struct_pack('>ff', self.data)
+        self.assertListEqual(unpack(blob), _struct_unpack(blob, '>ff', 8))
+
+    def test_unpack_little_endian(self):
+        blob = _struct_pack('<ff', self.data)
+        self.assertListEqual(unpack(blob, fmt='<ff'), _struct_unpack(blob, '<ff', 8))
+
+    def test_unpack_as_array(self):
+        blob = _struct_pack('>ff', self.data)
+        xs, ys = unpack(blob, as_array=True)
+        exs, eys = _struct_unpack(blob, '>ff', 8)
+        self.assertListEqual(list(xs), list(exs))
+        self.assertListEqual(list(ys), list(eys))
+
+    def test_unpack_decode(self):
+        blob = _struct_pack('>ff', self.data)
+        self.assertListEqual(unpack(encode_blob(blob), decode=True), _struct_unpack(blob, '>ff', 8))
+
+    def test_unpack_truncated(self):
+        blob = _struct_pack('>ff', self.data)[:-3]
+        self.assertListEqual(unpack(blob), _struct_unpack(blob, '>ff', 8))
+
+    def test_unpack_too_short(self):
+        blob = _struct_pack('>ff', self.data)[:5]
+        self.assertListEqual(unpack(blob), [])
+
+    def test_unpack_empty(self):
+        self.assertListEqual(unpack(b''), [[], []])
+
+    def test_isotope_pack(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = array(self.data).T
+        self.assertEqual(iso.pack(as_hex=False), _struct_pack('>ff', self.data))
+
+    def test_isotope_round_trip(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.unpack_data(_struct_pack('>ff', self.data))
+
+        iso2 = Isotope('Ar40', 'H1')
+        iso2.unpack_data(iso.pack(as_hex=False))
+        self.assertListEqual(list(iso.xs), list(iso2.xs))
+        self.assertListEqual(list(iso.ys), list(iso2.ys))
+
+
+if __name__ == '__main__':
+    unittest.main()
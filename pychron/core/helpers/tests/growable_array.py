@@ -0,0 +1,115 @@
+import pickle
+import unittest
+
+from numpy import arange, array, linspace, nan
+
+from pychron.core.helpers.growable_array import GrowableArray
+from pychron.processing.isotope import Isotope
+from pychron.processing.isotope_group import IsotopeGroup
+
+
+class GrowableArrayTestCase(unittest.TestCase):
+    def test_append(self):
+        a = GrowableArray()
+        for i in range(100):
+            a.append(i)
+        self.assertEqual(len(a), 100)
+        self.assertListEqual(list(a.view), list(range(100)))
+        self.assertGreaterEqual(a.capacity, 100)
+
+    def test_view_cached(self):
+        a = GrowableArray([1, 2, 3])
+        v = a.view
+        self.assertIs(a.view, v)
+        a.append(4)
+        self.assertIsNot(a.view, v)
+        self.assertListEqual(list(v), [1, 2, 3])
+
+    def test_no_copy(self):
+        d = array([1., 2., 3.])
+        a = GrowableArray(d)
+        self.assertIs(a.view.base, d)
+
+        # appending or clearing never writes into the array the buffer was created from
+        a.append(4)
+        a.clear()
+        a.append(10)
+        self.assertListEqual(list(d), [1, 2, 3])
+
+    def test_reserve(self):
+        a = GrowableArray()
+        a.reserve(400)
+        c = a.capacity
+        for i in range(400):
+            a.append(i)
+        self.assertEqual(a.capacity, c)
+
+    def test_extend(self):
+        a = GrowableArray([1, 2])
+        a.extend(arange(3, 50))
+        self.assertListEqual(list(a.view), list(range(1, 50)))
+
+    def test_limits(self):
+        a = GrowableArray([3., nan, 1.])
+        self.assertEqual(a.min, 1)
+        self.assertEqual(a.max, 3)
+        a.append(-1)
+        a.append(10)
+        a.extend([5, 20])
+        self.assertEqual(a.min, -1)
+        self.assertEqual(a.max, 20)
+        a.clear()
+        a.append(2)
+        self.assertEqual(a.min, 2)
+        self.assertEqual(a.max, 2)
+
+    def test_dtype(self):
+        a = GrowableArray(arange(3), dtype=float)
+        a.append(0.5)
+        self.assertEqual(a.view[-1], 0.5)
+
+
+class MeasurementBufferTestCase(unittest.TestCase):
+    def test_append_data(self):
+        g = IsotopeGroup()
+        g.isotopes['Ar40'] = Isotope('Ar40', 'H1')
+        g.reserve_data(50)
+        g.reserve_data(20, 'baseline')
+        xs = linspace(0, 100, 50)
+        for x in xs:
+            g.append_data('Ar40', 'H1', x, 2 * x + 1, 'signal')
+            g.append_data('Ar40', 'H1', x, 0.1, 'baseline')
+
+        iso = g.isotopes['Ar40']
+        self.assertListEqual(list(iso.xs), list(xs))
+        self.assertAlmostEqual(iso.value, 1)
+        self.assertEqual(iso.baseline.xs.shape[0], 50)
+        self.assertEqual(iso.ymax, 201)
+
+    def test_set(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = [1, 2, 3], [4, 5, 6]
+        iso.append(4, 7.5)
+        self.assertListEqual(list(iso.ys), [4, 5, 6, 7.5])
+        self.assertIs(iso.xs, iso.xs)
+
+    def test_pickle(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = [1, 2, 3], [4, 5, 6]
+        iso = pickle.loads(pickle.dumps(iso))
+        iso.append(4, 7)
+        self.assertListEqual(list(iso.ys), [4, 5, 6, 7])
+
+    def test_unpickle_unbuffered(self):
+        iso = Isotope('Ar40', 'H1')
+        state = iso.__dict__.copy()
+        del state['_xs'], state['_ys']
+        state['xs'], state['ys'] = array([1., 2.]), array([3., 4.])
+
+        new = Isotope.__new__(Isotope)
+        new.__setstate__(state)
+        self.assertListEqual(list(new.ys), [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
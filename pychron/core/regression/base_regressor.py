@@ -18,7 +18,7 @@ import logging
 import math
 import re
 
-from numpy import where, delete, polyfit, percentile
+from numpy import where, delete, polyfit, percentile, array
 # ============= enthought library imports =======================
 from traits.api import Array, List, Event, Property, Any, \
     Dict, Str, Bool, cached_property, HasTraits
@@ -406,6 +406,17 @@ class BaseRegressor(HasTraits):
     def get_exog(self, x):
         return x
 
+    def fast_predict_batch(self, endogs, exog, stacked=False):
+        """
+            fast_predict2 for each row of ``endogs``.
+
+            if ``stacked`` exog is a sequence of exogs, one per endog
+        """
+        if stacked:
+            return array([self.fast_predict2(e, x) for e, x in zip(endogs, exog)])
+        else:
+            return array([self.fast_predict2(e, exog) for e in endogs])
+
     def format_mswd(self, mean=False):
         m, v = (self.mean_mswd, self.valid_mean_mswd) if mean else (self.mswd, self.valid_mswd)
         return format_mswd(m, v)
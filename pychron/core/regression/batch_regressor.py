@@ -0,0 +1,222 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+"""
+    fit many small polynomial regressions at once.
+
+    ``OLSRegressor`` builds a statsmodels OLS model for every isotope. ``BatchOLSRegressor`` groups fits with the same
+    degree and number of points and solves each group with stacked numpy linear algebra. Outlier filtering and the
+    SEM/SD intercept errors follow ``BaseRegressor.calculate_filtered_data`` and
+    ``OLSRegressor.predict_error_matrix``.
+
+    Fits the batch engine cannot reproduce exactly (too few points, IQR filtering, CI/MC/MSEM errors) are marked
+    ``valid=False`` so the caller can use a regular regressor instead.
+"""
+# ============= standard library imports ========================
+from collections import defaultdict
+
+from numpy import asarray, arange, zeros, ones, sqrt, linalg, matmul, abs as nabs, float64, full, nan
+
+# ============= local library imports  ==========================
+from pychron.pychron_constants import SEM, SD
+
+MAX_DEGREE = 3
+ERROR_TYPES = (SEM.lower(), SD.lower())
+
+
+def is_batchable(degree, error_calc_type='SEM', filter_outliers_dict=None):
+    if degree not in range(1, MAX_DEGREE + 1):
+        return False
+
+    if (error_calc_type or SEM).lower() not in ERROR_TYPES:
+        return False
+
+    if filter_outliers_dict and filter_outliers_dict.get('filter_outliers') and \
+            filter_outliers_dict.get('use_iqr_filtering'):
+        return False
+
+    return True
+
+
+class BatchResult(object):
+    __slots__ = ('value', 'error', 'coefficients', 'n', 'npoints', 'outlier_excluded', 'valid')
+
+    def __init__(self, npoints):
+        self.npoints = npoints
+        self.value = 0
+        self.error = 0
+        self.coefficients = None
+        self.n = 0
+        self.outlier_excluded = []
+        self.valid = False
+
+
+class BatchFit(object):
+    __slots__ = ('xs', 'ys', 'degree', 'mask', 'filter_outliers', 'iterations', 'nsigma', 'use_std',
+                 'error_calc_type')
+
+    def __init__(self, xs, ys, degree, excluded=None, filter_outliers_dict=None, error_calc_type='SEM'):
+        self.xs = asarray(xs, dtype=float64)
+        self.ys = asarray(ys, dtype=float64)
+        self.degree = degree
+
+        mask = ones(self.xs.shape[0], dtype=bool)
+        if excluded:
+            mask[[i for i in excluded if 0 <= i < mask.shape[0]]] = False
+        self.mask = mask
+
+        fod = filter_outliers_dict or {}
+        self.filter_outliers = bool(fod.get('filter_outliers', False))
+        self.iterations = int(fod.get('iterations', 1)) if self.filter_outliers else 0
+        self.nsigma = fod.get('std_devs', 2)
+        self.use_std = bool(fod.get('use_standard_deviation_filtering'))
+        self.error_calc_type = (error_calc_type or SEM).lower()
+
+
+class BatchOLSRegressor(object):
+    """
+        usage::
+
+            reg = BatchOLSRegressor()
+            for iso in isotopes:
+                reg.add(xs, ys, 'linear', filter_outliers_dict=fod)
+            results = reg.calculate()
+    """
+
+    def __init__(self):
+        self._fits = []
+
+    def __len__(self):
+        return len(self._fits)
+
+    def add(self, xs, ys, degree, excluded=None, filter_outliers_dict=None, error_calc_type='SEM'):
+        """
+            add a fit. returns its index into the list returned by ``calculate``
+        """
+        if isinstance(degree, str):
+            degree = ('linear', 'parabolic', 'cubic').index(degree.lower()) + 1
+
+        self._fits.append(BatchFit(xs, ys, degree, excluded, filter_outliers_dict, error_calc_type))
+        return len(self._fits) - 1
+
+    def calculate(self, x=0):
+        """
+            fit everything and evaluate value and error at ``x``
+
+            returns a list of BatchResult in the order the fits were added
+        """
+        results = [BatchResult(f.xs.shape[0]) for f in self._fits]
+
+        groups = defaultdict(list)
+        for i, f in enumerate(self._fits):
+            if f.xs.shape[0] > 1 and f.xs.shape == f.ys.shape:
+                groups[(f.degree, f.xs.shape[0])].append(i)
+
+        for (degree, npts), idxs in groups.items():
+            self._calculate_group(degree, [self._fits[i] for i in idxs], [results[i] for i in idxs], x)
+
+        return results
+
+    # private
+    def _calculate_group(self, degree, fits, results, x):
+        xs = asarray([f.xs for f in fits])
+        ys = asarray([f.ys for f in fits])
+        mask = asarray([f.mask for f in fits])
+
+        X = xs[:, :, None] ** arange(degree + 1)
+        q = degree + 1
+        valid = ones(len(fits), dtype=bool)
+
+        outliers = zeros(mask.shape, dtype=bool)
+        iterations = asarray([f.iterations for f in fits])
+        nsigma = asarray([f.nsigma for f in fits], dtype=float64)
+        use_std = asarray([f.use_std for f in fits])
+
+        for it in range(iterations.max() if iterations.shape[0] else 0):
+            active = iterations > it
+            w = mask[active] & ~outliers[active]
+            beta, _, sef, n = self._fit(X[active], ys[active], w, q)
+            valid[active] &= n > q
+
+            s = sef
+            stds = use_std[active]
+            if stds.any():
+                s = s.copy()
+                s[stds] = self._std(ys[active][stds], w[stds])
+
+            residuals = nabs(ys[active] - matmul(X[active], beta[:, :, None])[:, :, 0])
+            outliers[active] |= residuals >= (s * nsigma[active])[:, None]
+
+        w = mask & ~outliers
+        beta, cov, sef, n = self._fit(X, ys, w, q)
+        valid &= n > q
+
+        Xk = asarray([float(x) ** i for i in range(q)])
+        h = Xk.dot(cov).dot(Xk)
+        values = beta.dot(Xk)
+
+        for i, (f, r) in enumerate(zip(fits, results)):
+            r.valid = bool(valid[i]) and f.error_calc_type in ERROR_TYPES
+            if not r.valid:
+                continue
+
+            if f.error_calc_type == SD.lower():
+                e = sqrt(sef[i] ** 2 + sef[i] ** 2 * h[i])
+            else:
+                e = sef[i] * sqrt(h[i])
+
+            r.value = values[i]
+            r.error = e
+            r.coefficients = beta[i]
+            r.n = int(n[i])
+            r.outlier_excluded = [int(j) for j in outliers[i].nonzero()[0]]
+
+    def _fit(self, X, ys, w, q):
+        """
+            solve every masked fit. excluded points are zeroed so they do not contribute to the solution,
+            the same as deleting them before calling OLS
+        """
+        n = w.sum(axis=1)
+        if not X.shape[0]:
+            return zeros((0, q)), zeros((0, q, q)), zeros(0), n
+
+        wf = w.astype(float64)
+        pX = linalg.pinv(X * wf[:, :, None])
+        beta = matmul(pX, (ys * wf)[:, :, None])[:, :, 0]
+        cov = matmul(pX, pX.transpose(0, 2, 1))
+
+        resid = (ys - matmul(X, beta[:, :, None])[:, :, 0]) * wf
+        ss_res = (resid ** 2).sum(axis=1)
+
+        dof = n - q
+        sef = full(n.shape, nan)
+        ok = dof > 0
+        sef[ok] = sqrt(ss_res[ok] / dof[ok])
+        return beta, cov, sef, n
+
+    def _std(self, ys, w):
+        """
+            ddof=1 standard deviation of the unmasked points, 0 if there are fewer than two
+        """
+        n = w.sum(axis=1)
+        s = zeros(n.shape)
+        ok = n > 1
+        if ok.any():
+            wf = w[ok].astype(float64)
+            m = (ys[ok] * wf).sum(axis=1) / n[ok]
+            s[ok] = sqrt((((ys[ok] - m[:, None]) * wf) ** 2).sum(axis=1) / (n[ok] - 1))
+        return s
+
+# ============= EOF =============================================
@@ -17,7 +17,7 @@
 # ============= enthought library imports =======================
 # ============= standard library imports ========================
 
-from numpy import average, where, full
+from numpy import average, where, full, repeat, asarray
 
 from pychron.core.helpers.formatting import floatfmt
 from pychron.pychron_constants import SEM, MSEM
@@ -34,6 +34,13 @@ class MeanRegressor(BaseRegressor):
     def fast_predict2(self, endog, exog):
         return full(exog.shape[0], endog.mean())
 
+    def fast_predict_batch(self, endogs, exog, stacked=False):
+        npts = exog.shape[1] if stacked else exog.shape[0]
+        return repeat(self._batch_mean(asarray(endogs))[:, None], npts, axis=1)
+
+    def _batch_mean(self, endogs):
+        return endogs.mean(axis=1)
+
     def calculate(self, filtering=False, **kw):
         # cxs, cys = self.pre_clean_ys, self.pre_clean_ys
         if not filtering:
@@ -161,6 +168,9 @@ class WeightedMeanRegressor(MeanRegressor):
         mean = average(endog, weights=ws)
         return full(exog.shape[0], mean)
 
+    def _batch_mean(self, endogs):
+        return average(endogs, axis=1, weights=self._get_weights())
+
     @property
     def se(self):
         """
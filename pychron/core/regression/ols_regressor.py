@@ -16,7 +16,7 @@
 # ============= enthought library imports =======================
 import logging
 
-from numpy import asarray, column_stack, sqrt, dot, linalg, zeros_like, hstack, ones_like, array
+from numpy import asarray, column_stack, sqrt, dot, linalg, zeros_like, hstack, ones_like, array, identity, einsum
 from statsmodels.api import OLS
 from traits.api import Int, Property
 
@@ -79,6 +79,23 @@ class OLSRegressor(BaseRegressor):
 
         return dot(exog, beta)
 
+    def fast_predict_batch(self, endogs, exog, stacked=False):
+        """
+            vectorized fast_predict for many endogs, e.g. the trials of a monte carlo estimate.
+
+            the model's exog is fixed so its whitened pseudo-inverse is calculated once and applied to every row of
+            ``endogs`` (ntrials, n). exog is (npts, p) or, if ``stacked``, (ntrials, npts, p)
+        """
+        ols = self._ols
+        wexog = ols.wexog
+        pinv_wexog = dot(linalg.pinv(wexog), ols.whiten(identity(wexog.shape[0])))
+
+        betas = dot(asarray(endogs), pinv_wexog.T)
+        if stacked:
+            return einsum('ijk,ik->ij', exog, betas)
+        else:
+            return dot(betas, asarray(exog).T)
+
     def calculate(self, filtering=False):
         cxs = self.clean_xs
         cys = self.clean_ys
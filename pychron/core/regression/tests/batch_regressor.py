@@ -0,0 +1,150 @@
+import pickle
+import unittest
+
+from numpy import linspace, random
+
+from pychron.core.regression.batch_regressor import BatchOLSRegressor
+from pychron.core.regression.ols_regressor import OLSRegressor
+from pychron.processing.isotope import Isotope
+from pychron.processing.isotope_group import IsotopeGroup
+
+
+def make_data(seed, n=50, degree=1):
+    rng = random.RandomState(seed)
+    xs = linspace(5, 200, n)
+    coeffs = rng.uniform(-0.01, 0.01, degree + 1)
+    coeffs[0] = rng.uniform(1, 100)
+    ys = sum(c * xs ** i for i, c in enumerate(coeffs)) + rng.normal(0, 0.05, n)
+    # a few obvious outliers
+    ys[rng.randint(0, n, 3)] += 2
+    return xs, ys
+
+
+def fit_ols(xs, ys, degree, fod, error_type, excluded=None):
+    reg = OLSRegressor(xs=xs, ys=ys, filter_outliers_dict=fod, error_calc_type=error_type)
+    reg.set_degree(degree, refresh=False)
+    if excluded:
+        reg.user_excluded = excluded
+    reg.calculate()
+    return reg
+
+
+class BatchRegressionTestCase(unittest.TestCase):
+    def _compare(self, degree, fod, error_type='SEM', excluded=None, n=50):
+        batch = BatchOLSRegressor()
+        regs = []
+        for seed in range(10):
+            xs, ys = make_data(seed, n, degree)
+            regs.append(fit_ols(xs, ys, degree, fod, error_type, excluded))
+            batch.add(xs, ys, degree, excluded=excluded, filter_outliers_dict=fod, error_calc_type=error_type)
+
+        for reg, r in zip(regs, batch.calculate()):
+            self.assertTrue(r.valid)
+            self.assertAlmostEqual(r.value, reg.predict(0), places=9)
+            self.assertAlmostEqual(r.error, reg.predict_error(0), places=9)
+            self.assertEqual(r.n, reg.clean_xs.shape[0])
+            self.assertListEqual(sorted(r.outlier_excluded), sorted(reg.outlier_excluded))
+
+    def test_linear(self):
+        self._compare(1, {})
+
+    def test_parabolic(self):
+        self._compare(2, {})
+
+    def test_cubic(self):
+        self._compare(3, {})
+
+    def test_sd(self):
+        self._compare(2, {}, error_type='SD')
+
+    def test_excluded(self):
+        self._compare(1, {}, excluded=[0, 1, 10])
+
+    def test_filter(self):
+        self._compare(1, {'filter_outliers': True, 'iterations': 1, 'std_devs': 2})
+
+    def test_filter_iterations(self):
+        self._compare(2, {'filter_outliers': True, 'iterations': 3, 'std_devs': 2})
+
+    def test_filter_std(self):
+        self._compare(1, {'filter_outliers': True, 'iterations': 2, 'std_devs': 2,
+                          'use_standard_deviation_filtering': True})
+
+    def test_mixed(self):
+        fod = {'filter_outliers': True, 'iterations': 2, 'std_devs': 2}
+        batch = BatchOLSRegressor()
+        regs = []
+        for seed, (degree, n) in enumerate(((1, 20), (2, 30), (1, 30), (3, 20))):
+            xs, ys = make_data(seed, n, degree)
+            regs.append(fit_ols(xs, ys, degree, fod, 'SEM'))
+            batch.add(xs, ys, degree, filter_outliers_dict=fod)
+
+        for reg, r in zip(regs, batch.calculate()):
+            self.assertAlmostEqual(r.value, reg.predict(0), places=9)
+            self.assertAlmostEqual(r.error, reg.predict_error(0), places=9)
+
+    def test_too_few_points(self):
+        batch = BatchOLSRegressor()
+        batch.add([1, 2, 3], [1, 2, 3], 'parabolic')
+        self.assertFalse(batch.calculate()[0].valid)
+
+    def test_unsupported_error(self):
+        batch = BatchOLSRegressor()
+        xs, ys = make_data(0)
+        batch.add(xs, ys, 1, error_calc_type='CI')
+        self.assertFalse(batch.calculate()[0].valid)
+
+    def test_isotope_group(self):
+        g = IsotopeGroup()
+        for seed, (k, fit) in enumerate((('Ar40', 'linear'), ('Ar39', 'parabolic'), ('Ar36', 'average'))):
+            iso = Isotope(k, 'H1')
+            iso.xs, iso.ys = make_data(seed, 40, 2)
+            iso.set_fit(fit, notify=False)
+            iso.set_filter_outliers_dict(iterations=2)
+            iso.error_type = 'SEM'
+            g.isotopes[k] = iso
+
+        expected = {k: (iso.value, iso.error, iso.noutliers()) for k, iso in g.isotopes.items()}
+
+        g.batch_fit()
+        self.assertIsNotNone(g.isotopes['Ar40']._get_batch_result())
+        self.assertIsNone(g.isotopes['Ar36']._get_batch_result())
+        for k, iso in g.isotopes.items():
+            v, e, no = expected[k]
+            self.assertAlmostEqual(iso.value, v, places=9)
+            self.assertAlmostEqual(iso.error, e, places=9)
+            self.assertEqual(iso.noutliers(), no)
+
+    def test_isotope_invalidate(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = make_data(0, 40)
+        iso.set_fit('linear', notify=False)
+        g = IsotopeGroup()
+        g.isotopes['Ar40'] = iso
+        g.batch_fit()
+        self.assertIsNotNone(iso._get_batch_result())
+
+        iso.set_fit('parabolic', notify=False)
+        self.assertIsNone(iso._get_batch_result())
+
+    def test_isotope_invalidate_data(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = make_data(0, 40)
+        iso.set_fit('linear', notify=False)
+        g = IsotopeGroup()
+        g.isotopes['Ar40'] = iso
+        g.batch_fit()
+
+        # the key does not depend on the transient array views
+        xs, ys = iso.xs, iso.ys
+        self.assertIsNotNone(iso._get_batch_result())
+
+        # data ids are not valid in another process
+        self.assertIsNone(pickle.loads(pickle.dumps(iso))._get_batch_result())
+
+        iso.xs, iso.ys = xs.copy(), ys.copy()
+        self.assertIsNone(iso._get_batch_result())
+
+
+if __name__ == '__main__':
+    unittest.main()
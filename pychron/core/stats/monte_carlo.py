@@ -17,39 +17,52 @@
 # ============= enthought library imports =======================
 # ============= standard library imports ========================
 
-from numpy import zeros, percentile, array, random, abs as nabs, column_stack
+from numpy import percentile, random, abs as nabs, column_stack, vstack
 from scipy.stats import norm
 
-
 # ============= local library imports  ==========================
 
+# number of trials solved at once. bounds the memory used by very large trial counts
+CHUNK_SIZE = 10000
+
+
 class MonteCarloEstimator(object):
 
-    def __init__(self, ntrials, regressor, seed=None):
+    def __init__(self, ntrials, regressor, seed=None, chunk_size=CHUNK_SIZE):
         self.regressor = regressor
         self.ntrials = ntrials
         self.seed = seed
+        self.chunk_size = chunk_size
 
     def _calculate(self, nominal_ys, ps):
         res = nominal_ys - ps
         pct = (15.87, 84.13)
 
-        a, b = array([percentile(ri, pct) for ri in res.T]).T
-        a, b = nabs(a), nabs(b)
+        a, b = nabs(percentile(res, pct, axis=0))
         return (a + b) * 0.5
 
-    def _get_dist(self, n, npts):
+    def _get_dist(self):
         if self.seed:
             random.seed(self.seed)
 
-        ndist = norm()
+        return norm()
+
+    def _iter_chunks(self):
         ntrials = self.ntrials
+        step = max(1, self.chunk_size or ntrials)
+        for i in range(0, ntrials, step):
+            yield min(step, ntrials - i)
+
+    def _estimate(self, pts, pexog, ys=None, yserr=None, get_pexog=None):
+        """
+            solve all the trials of a chunk with one call to the regressor's fast_predict_batch.
 
-        ga = ndist.rvs((ntrials, n))
-        ps = zeros((ntrials, npts))
-        return ndist, ga, ps
+            if ``get_pexog`` is set it is called with (dist, ntrials) after the y deviates are drawn and returns a
+            (ntrials, npts, p) stack of exogs, one per trial.
 
-    def _estimate(self, pts, pexog, ys=None, yserr=None):
+            random deviates are drawn chunk by chunk. the results of a seeded estimate are identical to drawing
+            every deviate up front as long as ntrials <= chunk_size
+        """
         reg = self.regressor
         nominal_ys = reg.predict(pts)
 
@@ -58,21 +71,20 @@ class MonteCarloEstimator(object):
         if yserr is None:
             yserr = reg.yserr
 
-        n, npts = len(ys), len(pts)
+        n = len(ys)
 
-        ntrials = self.ntrials
-        ndist, ga, ps = self._get_dist(n, npts)
-        pred = reg.fast_predict2
-        yp = ys + yserr * ga
+        ndist = self._get_dist()
+        pred = reg.fast_predict_batch
 
-        if hasattr(pexog, '__call__'):
-            for i in range(ntrials):
-                ps[i] = pred(yp[i], pexog(i))
-        else:
-            for i in range(ntrials):
-                ps[i] = pred(yp[i], pexog)
+        ps = []
+        for ntrials in self._iter_chunks():
+            yp = ys + yserr * ndist.rvs((ntrials, n))
+            if get_pexog is None:
+                ps.append(pred(yp, pexog))
+            else:
+                ps.append(pred(yp, get_pexog(ndist, ntrials), stacked=True))
 
-        return nominal_ys, self._calculate(nominal_ys, ps)
+        return nominal_ys, self._calculate(nominal_ys, vstack(ps))
 
 
 class RegressionEstimator(MonteCarloEstimator):
@@ -87,22 +99,19 @@ class FluxEstimator(MonteCarloEstimator):
     def estimate_position_err(self, pts, error):
         reg = self.regressor
         ox, oy = pts.T
+        npts = len(pts)
 
-        n, npts = len(reg.ys), len(pts)
-
-        ntrials = self.ntrials
-        ndist, ga, ps = self._get_dist(n, npts)
-
-        pgax = ndist.rvs((ntrials, npts))
-        pgay = ndist.rvs((ntrials, npts))
+        def get_pexog(ndist, ntrials):
+            pgax = ndist.rvs((ntrials, npts))
+            pgay = ndist.rvs((ntrials, npts))
 
-        pgax *= error
-        pgay *= error
+            pgax *= error
+            pgay *= error
 
-        def get_pexog(i):
-            return reg.get_exog(column_stack((ox + pgax[i], oy + pgay[i])))
+            pexog = reg.get_exog(column_stack(((ox + pgax).ravel(), (oy + pgay).ravel())))
+            return pexog.reshape(ntrials, npts, -1)
 
-        return self._estimate(pts, get_pexog, yserr=0)
+        return self._estimate(pts, None, yserr=0, get_pexog=get_pexog)
 
     def estimate(self, pts):
 
@@ -17,33 +17,101 @@
 # ============= enthought library imports =======================
 
 # ============= standard library imports ========================
-from numpy import linspace, zeros, exp, pi, full
-
+from numpy import linspace, zeros, exp, pi, asarray, abs as nabs, interp, searchsorted, cumsum, arange, repeat, \
+    bincount
+from scipy.special import ndtr
 
 # ============= local library imports  ==========================
 
-def cumulative_probability(ages, errors, xmi, xma, n=100):
-    x = linspace(xmi, xma, n)
-    probs = zeros(n)
+# maximum number of ages*points evaluated at once
+MAX_CHUNK_ELEMENTS = 1000000
+
+# exp(-z**2/2) is 0 in double precision for z>38.6
+TAIL_NSIGMA = 40
+
+# use the windowed evaluation if less than this fraction of ages*points are inside the tails
+SPARSE_FRACTION = 0.5
+
+# fraction of the adaptive grid spread uniformly so the tails are still sampled
+ADAPTIVE_UNIFORM_FRACTION = 0.25
 
-    for ai, ei in zip(ages, errors):
-        if abs(ai) < 1e-10 or abs(ei) < 1e-10:
-            continue
 
-        # calculate probability curve for ai+/-ei
-        # p=1/(2*pi*sigma2) *exp (-(x-u)**2)/(2*sigma2)
-        # see http://en.wikipedia.org/wiki/Normal_distribution
-        ds = (x-full(n, ai)) ** 2
-        es2 = full(n, 2 * ei * ei)
-        gs = (es2 * pi) ** -0.5 * exp(-ds / es2)
+def cumulative_probability(ages, errors, xmi, xma, n=100, adaptive=False):
+    """
+        sum of the gaussian probability curves of ``ages`` +/- ``errors``
 
-        # cumulate probabilities
-        # numpy element_wise addition
-        probs += gs
+        if ``adaptive`` the n points are concentrated around the peaks instead of evenly spaced between xmi and xma
+    """
+    ages, errors = _valid(ages, errors)
+    if adaptive and len(ages):
+        x = adaptive_grid(ages, errors, xmi, xma, n)
+    else:
+        x = linspace(xmi, xma, n)
+
+    probs = zeros(n)
+
+    for a, e in _chunks(ages, errors, n):
+        # only points within TAIL_NSIGMA of an age contribute. beyond that exp underflows to 0
+        lo = searchsorted(x, a - TAIL_NSIGMA * nabs(e))
+        hi = searchsorted(x, a + TAIL_NSIGMA * nabs(e), side='right')
+        counts = hi - lo
+        total = counts.sum()
+        if total < SPARSE_FRACTION * a.shape[0] * n:
+            # evaluate each curve only on its window of x
+            offsets = cumsum(counts) - counts
+            idx = arange(total) - repeat(offsets - lo, counts)
+            probs += bincount(idx, weights=_gaussian(x[idx], repeat(a, counts), repeat(e, counts)), minlength=n)
+        else:
+            probs += _gaussian(x, a[:, None], e[:, None]).sum(axis=0)
 
     return x, probs
 
 
+def adaptive_grid(ages, errors, xmi, xma, n=100):
+    """
+        return n points between xmi and xma spaced by the cumulative distribution of ``ages`` +/- ``errors``.
+
+        a fraction of the points are spread uniformly. the cdf is calculated exactly at the coarse grid points so
+        narrow peaks falling between them still attract points
+    """
+    ages, errors = _valid(ages, errors)
+
+    xc = linspace(xmi, xma, n)
+    cdf = zeros(n)
+    for a, e in _chunks(ages, errors, n):
+        cdf += ndtr((xc - a[:, None]) / nabs(e[:, None])).sum(axis=0)
+
+    span = cdf[-1] - cdf[0]
+    if not span or xma == xmi:
+        return xc
+
+    f = ADAPTIVE_UNIFORM_FRACTION
+    cdf = (1 - f) * (cdf - cdf[0]) / span + f * (xc - xmi) / (xma - xmi)
+    return interp(linspace(0, 1, n), cdf, xc)
+
+
+def _gaussian(x, a, e):
+    # calculate probability curve for ai+/-ei
+    # p=1/(2*pi*sigma2) *exp (-(x-u)**2)/(2*sigma2)
+    # see http://en.wikipedia.org/wiki/Normal_distribution
+    ds = (x - a) ** 2
+    es2 = 2 * e * e
+    return (es2 * pi) ** -0.5 * exp(-ds / es2)
+
+
+def _valid(ages, errors):
+    ages, errors = asarray(ages, dtype=float), asarray(errors, dtype=float)
+    # written as not(<) so nans are kept as in the scalar implementation
+    mask = ~((nabs(ages) < 1e-10) | (nabs(errors) < 1e-10))
+    return ages[mask], errors[mask]
+
+
+def _chunks(ages, errors, n):
+    step = max(1, MAX_CHUNK_ELEMENTS // max(n, 1))
+    for i in range(0, len(ages), step):
+        yield ages[i:i + step], errors[i:i + step]
+
+
 def kernel_density(ages, errors, xmi, xma, n=100):
     from scipy.stats.kde import gaussian_kde
 
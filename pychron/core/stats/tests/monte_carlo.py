@@ -0,0 +1,107 @@
+import unittest
+
+from numpy import linspace, random, zeros, array, percentile, abs as nabs, column_stack, allclose
+from scipy.stats import norm
+
+from pychron.core.regression.flux_regressor import PlaneFluxRegressor
+from pychron.core.regression.mean_regressor import MeanRegressor, WeightedMeanRegressor
+from pychron.core.regression.ols_regressor import PolynomialRegressor
+from pychron.core.stats.monte_carlo import RegressionEstimator, FluxEstimator
+
+
+def legacy_estimate(reg, ntrials, seed, pts, pexog, ys, yserr, position_error=None):
+    """
+        the per trial implementation the vectorized estimators replaced
+    """
+    random.seed(seed)
+    ndist = norm()
+    n, npts = len(ys), len(pts)
+    ga = ndist.rvs((ntrials, n))
+    ps = zeros((ntrials, npts))
+
+    if position_error is not None:
+        ox, oy = pts.T
+        pgax = ndist.rvs((ntrials, npts)) * position_error
+        pgay = ndist.rvs((ntrials, npts)) * position_error
+
+        def pexog(i):
+            return reg.get_exog(column_stack((ox + pgax[i], oy + pgay[i])))
+
+    yp = ys + yserr * ga
+    for i in range(ntrials):
+        ex = pexog(i) if callable(pexog) else pexog
+        ps[i] = reg.fast_predict2(yp[i], ex)
+
+    nominal_ys = reg.predict(pts)
+    res = nominal_ys - ps
+    a, b = array([percentile(ri, (15.87, 84.13)) for ri in res.T]).T
+    return (nabs(a) + nabs(b)) * 0.5
+
+
+class MonteCarloTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.RandomState(1)
+        xs = linspace(0, 100, 25)
+        ys = 10 + 0.1 * xs + rng.normal(0, 0.5, 25)
+        self.reg = PolynomialRegressor(xs=xs, ys=ys, yserr=rng.uniform(0.2, 0.6, 25), fit='linear')
+        self.reg.calculate()
+        self.pts = linspace(-10, 110, 7)
+
+        pxs = rng.uniform(-1, 1, (12, 2))
+        pys = 1 + 0.05 * pxs[:, 0] - 0.02 * pxs[:, 1] + rng.normal(0, 0.001, 12)
+        self.freg = PlaneFluxRegressor(xs=pxs, ys=pys, yserr=rng.uniform(0.001, 0.002, 12))
+        self.freg.calculate()
+        self.fpts = rng.uniform(-1, 1, (5, 2))
+
+    def test_regression_seeded(self):
+        reg = self.reg
+        _, es = RegressionEstimator(2000, reg, seed=123).estimate(self.pts)
+        les = legacy_estimate(reg, 2000, 123, self.pts, reg.get_exog(self.pts), reg.clean_ys, reg.clean_yserr)
+        self.assertTrue(allclose(es, les, rtol=1e-10, atol=0))
+
+    def test_regression_chunked(self):
+        _, es = RegressionEstimator(2000, self.reg, seed=123).estimate(self.pts)
+        _, ces = RegressionEstimator(2000, self.reg, seed=123, chunk_size=300).estimate(self.pts)
+        self.assertTrue(allclose(es, ces, rtol=1e-10, atol=0))
+
+    def test_regression_reproducible(self):
+        _, a = RegressionEstimator(500, self.reg, seed=7).estimate(self.pts)
+        _, b = RegressionEstimator(500, self.reg, seed=7).estimate(self.pts)
+        self.assertListEqual(list(a), list(b))
+
+    def test_flux_seeded(self):
+        reg = self.freg
+        _, es = FluxEstimator(1000, reg, seed=5).estimate(self.fpts)
+        les = legacy_estimate(reg, 1000, 5, self.fpts, reg.get_exog(self.fpts), reg.ys, reg.yserr)
+        self.assertTrue(allclose(es, les, rtol=1e-8, atol=0))
+
+    def test_flux_weighted_seeded(self):
+        reg = self.freg
+        reg.use_weighted_fit = True
+        reg.calculate()
+        _, es = FluxEstimator(1000, reg, seed=5).estimate(self.fpts)
+        les = legacy_estimate(reg, 1000, 5, self.fpts, reg.get_exog(self.fpts), reg.ys, reg.yserr)
+        self.assertTrue(allclose(es, les, rtol=1e-8, atol=0))
+
+    def test_flux_position_seeded(self):
+        reg = self.freg
+        _, es = FluxEstimator(1000, reg, seed=5).estimate_position_err(self.fpts, 0.01)
+        les = legacy_estimate(reg, 1000, 5, self.fpts, None, reg.ys, 0, position_error=0.01)
+        self.assertTrue(allclose(es, les, rtol=1e-8, atol=0))
+
+    def test_flux_position_chunked(self):
+        _, es = FluxEstimator(4000, self.freg, seed=5).estimate_position_err(self.fpts, 0.01)
+        _, ces = FluxEstimator(4000, self.freg, seed=5, chunk_size=1000).estimate_position_err(self.fpts, 0.01)
+        self.assertTrue(allclose(es, ces, rtol=0.1))
+
+    def test_mean(self):
+        for klass in (MeanRegressor, WeightedMeanRegressor):
+            reg = klass(xs=self.reg.xs, ys=self.reg.ys, yserr=self.reg.yserr)
+            reg.calculate()
+            endogs = random.RandomState(0).normal(10, 1, (20, 25))
+            ps = reg.fast_predict_batch(endogs, self.pts)
+            self.assertTrue(allclose(ps, [reg.fast_predict2(e, self.pts) for e in endogs]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from numpy import linspace, zeros, full, exp, pi, random, allclose, diff, argmax
+
+from pychron.core.stats import probability_curves
+from pychron.core.stats.probability_curves import cumulative_probability, adaptive_grid
+
+
+def scalar_cumulative_probability(ages, errors, xmi, xma, n=100):
+    x = linspace(xmi, xma, n)
+    probs = zeros(n)
+
+    for ai, ei in zip(ages, errors):
+        if abs(ai) < 1e-10 or abs(ei) < 1e-10:
+            continue
+
+        ds = (x - full(n, ai)) ** 2
+        es2 = full(n, 2 * ei * ei)
+        probs += (es2 * pi) ** -0.5 * exp(-ds / es2)
+
+    return x, probs
+
+
+class CumulativeProbabilityTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.RandomState(0)
+        self.ages = rng.normal(28, 2, 500)
+        self.errors = rng.uniform(0.05, 0.5, 500)
+        self.errors[3] = 0
+        self.ages[5] = 0
+
+    def _compare(self, errors):
+        x, p = cumulative_probability(self.ages, errors, 20, 36, 200)
+        ex, ep = scalar_cumulative_probability(self.ages, errors, 20, 36, 200)
+        self.assertTrue(allclose(x, ex))
+        self.assertTrue(allclose(p, ep, rtol=1e-12, atol=1e-12))
+
+    def test_narrow(self):
+        self._compare(self.errors * 0.1)
+
+    def test_wide(self):
+        self._compare(self.errors * 10)
+
+    def test_chunked(self):
+        o = probability_curves.MAX_CHUNK_ELEMENTS
+        probability_curves.MAX_CHUNK_ELEMENTS = 1000
+        try:
+            self._compare(self.errors)
+        finally:
+            probability_curves.MAX_CHUNK_ELEMENTS = o
+
+    def test_empty(self):
+        x, p = cumulative_probability([], [], 0, 1, 5)
+        self.assertListEqual(list(p), [0] * 5)
+
+    def test_adaptive_endpoints(self):
+        x = adaptive_grid(self.ages, self.errors, 20, 36, 100)
+        self.assertEqual(x.shape[0], 100)
+        self.assertAlmostEqual(x[0], 20)
+        self.assertAlmostEqual(x[-1], 36)
+        self.assertTrue((diff(x) >= 0).all())
+
+    def test_adaptive_concentrates(self):
+        x = adaptive_grid([10, 20], [0.01, 0.5], 0, 30, 50)
+        self.assertGreater(((x > 9.9) & (x < 10.1)).sum(), 5)
+
+    def test_adaptive_peak(self):
+        x, p = cumulative_probability([10], [0.01], 0, 30, 50, adaptive=True)
+        self.assertAlmostEqual(x[argmax(p)], 10, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+    micro-benchmark for pychron.core.helpers.binpack
+
+    compares the numpy implementations of pack/unpack with the per point struct implementations
+
+    usage: python binpack_benchmark.py
+"""
+from __future__ import print_function
+
+import timeit
+
+from numpy import linspace, column_stack
+
+from pychron.core.helpers.binpack import pack, unpack, _struct_pack, _struct_unpack
+
+SIZES = (10000, 100000, 1000000)
+
+
+def make_data(n):
+    xs = linspace(0, 1000, n)
+    return column_stack((xs, xs ** 0.5))
+
+
+def run(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def benchmark(n, number=3):
+    data = make_data(n)
+    rows = [tuple(r) for r in data]
+    blob = pack('>ff', data)
+    results = (('pack', run(lambda: _struct_pack('>ff', rows), number), run(lambda: pack('>ff', data), number)),
+               ('unpack', run(lambda: _struct_unpack(blob, '>ff', 8), number), run(lambda: unpack(blob), number)),
+               ('unpack(as_array)', run(lambda: _struct_unpack(blob, '>ff', 8), number),
+                run(lambda: unpack(blob, as_array=True), number)))
+
+    for name, old, new in results:
+        print('{:>8d} {:<18s} struct={:0.5f}s numpy={:0.5f}s x{:0.1f}'.format(n, name, old, new, old / new))
+
+
+if __name__ == '__main__':
+    for ni in SIZES:
+        benchmark(ni)
@@ -0,0 +1,62 @@
+import unittest
+
+from pychron.core.fuzzy_index import FuzzyIndex, edit_distance
+
+
+class Item(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class FuzzyIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.idx = FuzzyIndex(['FC-2', 'FC-2b', 'xfc2', 'fish-canyon-2', 'bar', 'sanidine', 'FCs', 'sandine-A'])
+
+    def test_rank(self):
+        self.assertListEqual(self.idx.search('fc2'), ['FC-2', 'FC-2b', 'xfc2', 'fish-canyon-2'])
+
+    def test_separators(self):
+        self.assertListEqual(self.idx.search('fc 2'), self.idx.search('FC_2'))
+
+    def test_edit_distance(self):
+        self.assertListEqual(self.idx.search('sanidne'), ['sanidine', 'sandine-A'])
+        self.assertListEqual(FuzzyIndex(['sanidine'], max_distance=0).search('sanidjne'), [])
+
+    def test_limit(self):
+        self.assertListEqual(self.idx.search('fc', limit=2), ['FC-2', 'FCs'])
+
+    def test_prefix(self):
+        self.assertListEqual(self.idx.prefix('fc'), ['FC-2', 'FCs', 'FC-2b'])
+
+    def test_incremental(self):
+        idx = self.idx
+        idx.remove('FC-2')
+        idx.add('fc-2a')
+        self.assertNotIn('FC-2', idx)
+        self.assertListEqual(idx.search('fc2')[:2], ['FC-2b', 'fc-2a'])
+        self.assertEqual(len(idx), 8)
+
+        idx.clear()
+        self.assertListEqual(idx.search('fc'), [])
+
+    def test_update(self):
+        items = [Item('bar'), Item('baz')]
+        idx = FuzzyIndex(items, attr='name')
+        items[0].name = 'qux'
+        idx.update(items[0])
+        self.assertListEqual(idx.search('ba'), [items[1]])
+        self.assertListEqual(idx.search('qux'), [items[0]])
+
+    def test_explicit_text(self):
+        idx = FuzzyIndex()
+        idx.add(1, 'bart')
+        idx.add(2, 'barz')
+        self.assertListEqual(idx.search('barz'), [2, 1])
+
+    def test_edit_distance_func(self):
+        self.assertEqual(edit_distance('kitten', 'sitting', 3), 3)
+        self.assertEqual(edit_distance('kitten', 'sitting', 1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
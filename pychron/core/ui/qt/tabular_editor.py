@@ -51,6 +51,8 @@ class myTabularEditor(TabularEditor):
     autoscroll = Bool(False)
     scroll_to_bottom = Str
     scroll_to_top = Str
+    # fired when the table is scrolled to, or near, the last row
+    scrolled_to_end = Str
 
     def _get_klass(self):
         return _TabularEditor
@@ -494,6 +496,7 @@ class _TabularEditor(qtTabularEditor):
 
     scroll_to_bottom = Event
     scroll_to_top = Event
+    scrolled_to_end = Event
 
     def init(self, layout):
         factory = self.factory
@@ -577,6 +580,10 @@ class _TabularEditor(qtTabularEditor):
         self.header_event_filter = HeaderEventFilter(self)
         control.horizontalHeader().installEventFilter(self.header_event_filter)
 
+        if factory.scrolled_to_end:
+            self.sync_value(factory.scrolled_to_end, 'scrolled_to_end', 'to')
+            control.verticalScrollBar().valueChanged.connect(self._on_vertical_scroll)
+
         # Make sure we listen for 'items' changes as well as complete list
         # replacements:
         try:
@@ -681,6 +688,11 @@ class _TabularEditor(qtTabularEditor):
                 row = self.value.index(row)
             self.scroll_to_row = row
 
+    def _on_vertical_scroll(self, v):
+        sb = self.control.verticalScrollBar()
+        if v >= sb.maximum() - sb.pageStep() * 0.25:
+            self.scrolled_to_end = True
+
     def _scroll_to_row_changed(self, row):
         super(_TabularEditor, self)._scroll_to_row_changed(0)
         super(_TabularEditor, self)._scroll_to_row_changed(row)
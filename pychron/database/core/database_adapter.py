@@ -17,10 +17,11 @@
 # =============enthought library imports=======================
 import os
 from datetime import datetime, timedelta
+from itertools import chain
 from threading import Lock
 
 import six
-from sqlalchemy import create_engine, distinct, MetaData
+from sqlalchemy import create_engine, distinct, MetaData, event
 from sqlalchemy.exc import SQLAlchemyError, InvalidRequestError, StatementError, \
     DBAPIError, OperationalError
 from sqlalchemy.orm import sessionmaker
@@ -29,6 +30,7 @@ from traits.api import Password, Bool, Str, on_trait_change, Any, Property, cach
 
 from pychron.database.core.base_orm import AlembicVersionTable
 from pychron.database.core.query import compile_query
+from pychron.database.core.query_cache import QueryCache
 from pychron.loggable import Loggable
 from pychron.regex import IPREGEX
 
@@ -160,6 +162,10 @@ class DatabaseAdapter(Loggable):
     _trying_to_add = False
     _test_connection_enabled = True
 
+    # cache results of methods decorated with ``cached_query``
+    use_query_cache = True
+    _query_cache = None
+
     # def __init__(self, *args, **kw):
     #     super(DatabaseAdapter, self).__init__(*args, **kw)
 
@@ -237,6 +243,7 @@ class DatabaseAdapter(Loggable):
         self.connection_parameters_changed = True
         self.session_factory = None
         self.session = None
+        self.invalidate_query_cache()
 
     # @caller
     def connect(self, test=True, force=False, warn=True, version_warn=True, attribute_warn=False):
@@ -285,6 +292,7 @@ class DatabaseAdapter(Loggable):
                     self.session_factory = sessionmaker(bind=engine, autoflush=self.autoflush,
                                                         expire_on_commit=False,
                                                         autocommit=self.autocommit)
+                    event.listen(self.session_factory, 'after_flush', self._handle_after_flush)
                     # self.session_factory = scoped_session(sessionmaker(bind=engine, autoflush=self.autoflush))
                     if test:
                         if not self._test_connection_enabled:
@@ -357,6 +365,27 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
     def add_item(self, *args, **kw):
         return self._add_item(*args, **kw)
 
+    @property
+    def query_cache(self):
+        if self.use_query_cache:
+            if self._query_cache is None:
+                self._query_cache = QueryCache()
+            return self._query_cache
+
+    def invalidate_query_cache(self, *tables):
+        """
+        Remove cached query results read from ``tables``. Remove all results if no tables are given
+
+        :param tables: table names
+        :return: number of results removed
+        """
+        if self._query_cache is not None:
+            return self._query_cache.invalidate(*tables)
+
+    def get_query_cache_stats(self):
+        if self._query_cache is not None:
+            return self._query_cache.stats()
+
     # def get_session(self):
     #     """
     #     return the current session or make a new one
@@ -528,6 +557,17 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
     #     if ver != aver:
     #         return 'Database is out of data. Pychron ver={}, Database ver={}'.format(aver, ver)
 
+    def _handle_after_flush(self, sess, flush_context):
+        """
+        evict cached query results that read a table written by this flush. covers the ``add_*`` methods as well as
+        updates and deletes
+        """
+        if self._query_cache is not None:
+            tables = {getattr(obj, '__tablename__', None) for obj in chain(sess.new, sess.dirty, sess.deleted)}
+            tables.discard(None)
+            if tables:
+                self._query_cache.invalidate(*tables)
+
     def _add_item(self, obj):
         sess = self.session
         if sess:
@@ -0,0 +1,176 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from threading import Lock
+
+import six
+
+# ============= local library imports  ==========================
+KEY_TYPES = six.string_types + six.integer_types + (float, bool, type(None), date)
+
+
+def freeze(v):
+    """
+        convert a query argument to a hashable cache key component. raises TypeError for arguments that can not be
+        compared by value, e.g. sqlalchemy expressions or callables
+    """
+    if isinstance(v, KEY_TYPES):
+        return v
+    elif isinstance(v, (list, tuple)):
+        return tuple(freeze(vi) for vi in v)
+    elif isinstance(v, (set, frozenset)):
+        return frozenset(freeze(vi) for vi in v)
+    elif isinstance(v, dict):
+        return tuple(sorted((k, freeze(vi)) for k, vi in v.items()))
+
+    raise TypeError('{} can not be used as a query cache key'.format(type(v)))
+
+
+def make_key(name, args, kw):
+    try:
+        return name, freeze(args), freeze(kw)
+    except TypeError:
+        return
+
+
+class QueryCache(object):
+    """
+        time limited cache of query results. each entry records the tables it was read from so that a write to any
+        of those tables evicts it
+    """
+
+    def __init__(self, max_entries=256, clock=None):
+        self.max_entries = max_entries
+        self._clock = clock or time.time
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._query_stats = {}
+
+    def get(self, key):
+        """
+            return (hit, value)
+        """
+        name = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, tables, value = entry
+                if expires is None or expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self._count(name, 0)
+                    return True, value
+
+                self._entries.pop(key)
+
+            self._count(name, 1)
+            return False, None
+
+    def put(self, key, value, ttl=None, tables=None):
+        expires = self._clock() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires, frozenset(tables or ()), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tables):
+        """
+            remove entries read from any of ``tables``. remove all entries if no tables are given
+        """
+        with self._lock:
+            if tables:
+                tables = set(tables)
+                keys = [k for k, (_, ts, _) in self._entries.items() if not ts or ts & tables]
+            else:
+                keys = list(self._entries)
+
+            for k in keys:
+                self._entries.pop(k)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    @property
+    def hit_rate(self):
+        n = self.hits + self.misses
+        return self.hits / float(n) if n else 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hit_rate,
+                    'invalidations': self.invalidations,
+                    'size': len(self._entries),
+                    'queries': {k: tuple(v) for k, v in self._query_stats.items()}}
+
+    def _count(self, name, idx):
+        if idx:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        try:
+            qs = self._query_stats[name]
+        except KeyError:
+            qs = self._query_stats[name] = [0, 0]
+        qs[idx] += 1
+
+
+def cached_query(ttl=300, tables=None):
+    """
+        cache the result of a DatabaseAdapter query method.
+
+        :param ttl: seconds a result stays valid. None keeps it until one of ``tables`` is written
+        :param tables: names of the tables the query reads. an entry without tables is evicted by any write
+    """
+
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(self, *args, **kw):
+            cache = self.query_cache
+            key = make_key(name, args, kw) if cache is not None else None
+            if key is None:
+                return func(self, *args, **kw)
+
+            hit, value = cache.get(key)
+            if not hit:
+                value = func(self, *args, **kw)
+                cache.put(key, value, ttl, tables)
+
+            # hand out copies so callers can not modify the cached result
+            if isinstance(value, list):
+                value = list(value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+# ============= EOF =============================================
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pychron.database.core.query_cache import QueryCache, make_key
+from pychron.dvc.dvc_database import DVCDatabase
+from pychron.dvc.dvc_orm import Base, LoadTbl
+
+
+class Clock(object):
+    t = 0
+
+    def __call__(self):
+        return self.t
+
+
+class QueryCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = QueryCache(max_entries=3, clock=self.clock)
+
+    def test_ttl(self):
+        key = make_key('get_names', (), {})
+        self.cache.put(key, ['a'], ttl=10)
+        self.assertEqual(self.cache.get(key), (True, ['a']))
+
+        self.clock.t = 11
+        self.assertEqual(self.cache.get(key), (False, None))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.stats()['queries']['get_names'], (1, 1))
+
+    def test_invalidate(self):
+        a = make_key('a', (), {})
+        b = make_key('b', (), {})
+        c = make_key('c', (), {})
+        self.cache.put(a, 1, tables=('LoadTbl',))
+        self.cache.put(b, 2, tables=('ProjectTbl',))
+        self.cache.put(c, 3)
+
+        # c has no tables so any write evicts it
+        self.assertEqual(self.cache.invalidate('LoadTbl'), 2)
+        self.assertTrue(self.cache.get(b)[0])
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_max_entries(self):
+        keys = [make_key('q', (i,), {}) for i in range(4)]
+        for i, k in enumerate(keys):
+            self.cache.put(k, i)
+
+        self.assertFalse(self.cache.get(keys[0])[0])
+        self.assertTrue(self.cache.get(keys[3])[0])
+
+    def test_make_key(self):
+        self.assertEqual(make_key('q', (['a', 'b'],), {'order': 'asc'}),
+                         make_key('q', (('a', 'b'),), {'order': 'asc'}))
+        self.assertIsNone(make_key('q', (), {'order': object()}))
+
+
+class DatabaseQueryCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        db = self.db = DVCDatabase(kind='sqlite', path=os.path.join(self.root, 'test.sqlite'))
+        db.connect()
+        with db.session_ctx():
+            db.create_all(Base.metadata)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_add_invalidates(self):
+        db = self.db
+        with db.session_ctx():
+            db.add_mass_spectrometer('jan')
+        self.assertListEqual(db.get_mass_spectrometer_names(), ['jan'])
+
+        names = db.get_mass_spectrometer_names()
+        names.append('modified')
+        self.assertListEqual(db.get_mass_spectrometer_names(), ['jan'])
+        self.assertEqual(db.get_query_cache_stats()['queries']['get_mass_spectrometer_names'], (2, 1))
+
+        with db.session_ctx():
+            db.add_mass_spectrometer('obama')
+        self.assertListEqual(sorted(db.get_mass_spectrometer_names()), ['jan', 'obama'])
+
+    def test_update_invalidates(self):
+        db = self.db
+        with db.session_ctx():
+            db.add_load('L1', 'H', 'bob')
+            db.add_load('L2', 'H', 'bob')
+        self.assertListEqual(sorted(db.get_load_names()), ['L1', 'L2'])
+
+        with db.session_ctx() as sess:
+            load = sess.query(LoadTbl).filter(LoadTbl.name == 'L1').one()
+            load.archived = True
+            sess.commit()
+
+        self.assertListEqual(db.get_load_names(), ['L2'])
+
+    def test_other_tables(self):
+        db = self.db
+        db.get_mass_spectrometer_names()
+        with db.session_ctx():
+            db.add_load('L1', 'H', 'bob')
+        db.get_mass_spectrometer_names()
+        self.assertEqual(db.get_query_cache_stats()['hits'], 1)
+
+    def test_disabled(self):
+        db = self.db
+        db.use_query_cache = False
+        db.get_mass_spectrometer_names()
+        db.get_mass_spectrometer_names()
+        self.assertIsNone(db.get_query_cache_stats())
+
+    def test_unhashable_arguments(self):
+        db = self.db
+        db.get_load_names(order=LoadTbl.name.asc())
+        self.assertEqual(db.get_query_cache_stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,52 +13,227 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ===============================================================================
-from datetime import datetime
+import os
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import RLock
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS analyses (uuid TEXT PRIMARY KEY,
+                                                 repository TEXT,
+                                                 head TEXT,
+                                                 meta_head TEXT,
+                                                 stamp BLOB,
+                                                 accessed REAL,
+                                                 value BLOB);
+            CREATE INDEX IF NOT EXISTS accessed_idx ON analyses (accessed);
+            CREATE INDEX IF NOT EXISTS repository_idx ON analyses (repository);'''
+
+
+def file_stamp(paths):
+    """
+        return (path, mtime, size) of each file in ``paths`` that exists. None paths are skipped
+    """
+    stamp = []
+    for p in paths:
+        if p:
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            stamp.append((p, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+class CacheEntry(object):
+    __slots__ = ('repository', 'head', 'meta_head', 'stamp', 'value')
+
+    def __init__(self, repository, head, meta_head, value, stamp=None):
+        self.repository = repository
+        self.head = head
+        self.meta_head = meta_head
+        self.stamp = stamp
+        self.value = value
+
+    def is_valid(self, head, meta_head, stamp=None):
+        return head is not None and self.head == head and self.meta_head == meta_head and self.stamp == stamp
 
 
 class DVCCache(object):
-    def __init__(self, max_size=1000):
-        self._cache = {}
+    """
+        LRU cache of fully built analyses keyed by uuid.
+
+        Each entry records the HEAD of its repository and of the meta repository when it was built, and optionally
+        a ``file_stamp`` of the files it was built from. ``get`` only returns an entry if all of these still match,
+        so files changed without a commit are also detected.
+
+        Entries are kept in memory (``max_size`` entries) and, if ``path`` is set, in a sqlite database
+        (``max_disk_size`` entries) so the cache survives restarts.
+    """
+
+    def __init__(self, max_size=1000, path=None, max_disk_size=20000):
+        self._cache = OrderedDict()
         self.max_size = max_size
+        self.max_disk_size = max_disk_size
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+        self._lock = RLock()
+        self._db = None
+        self._disk_size = 0
+        if path:
+            self._open(path)
 
     def clear(self):
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            if self._db:
+                self._db.execute('DELETE FROM analyses')
+                self._db.commit()
+                self._disk_size = 0
 
     def clean(self):
-        t = 60 * 15  # 15 minutes
-        now = datetime.now()
-        remove = (k for k, v in self._cache.items()
-                  if (now - v['date_accessed']).total_seconds() > t)
-
-        for k in remove:
-            del self._cache[k]
+        """
+            flush pending writes to disk
+        """
+        with self._lock:
+            if self._db:
+                self._db.commit()
 
     def report(self):
-        return len(self._cache)
+        n = self.hits + self.misses
+        rate = self.hits / float(n) * 100 if n else 0
+        return 'size={} disk_size={} hits={} (disk={}) misses={} stale={} evictions={} ' \
+               'hit_rate={:0.1f}%'.format(len(self._cache), self._disk_size, self.hits, self.disk_hits, self.misses,
+                                          self.stale, self.evictions, rate)
 
-    def get(self, item):
-        obj = self._cache.get(item)
-        if obj:
-            obj['date_accessed'] = datetime.now()
-            return obj['value']
+    def get(self, item, head=None, meta_head=None, stamp=None):
+        with self._lock:
+            entry = self._cache.get(item)
+            from_disk = False
+            if entry is None:
+                entry = self._load(item)
+                from_disk = entry is not None
 
-    def update(self, key, value):
-        if key not in self._cache and len(self._cache) > self.max_size:
-            self.remove_oldest()
+            if entry is None:
+                self.misses += 1
+                return
 
-        self._cache[key] = {'date_accessed': datetime.now(),
-                            'value': value}
+            if not entry.is_valid(head, meta_head, stamp):
+                self.stale += 1
+                self.misses += 1
+                self.remove(item)
+                return
 
-    def remove_oldest(self):
+            self.hits += 1
+            if from_disk:
+                self.disk_hits += 1
+                self._add(item, entry)
+            else:
+                self._cache.move_to_end(item)
+
+            if self._db:
+                self._db.execute('UPDATE analyses SET accessed=? WHERE uuid=?', (time.time(), item))
+
+            return entry.value
+
+    def update(self, key, value, repository=None, head=None, meta_head=None, stamp=None):
+        with self._lock:
+            entry = CacheEntry(repository, head, meta_head, value, stamp)
+            self._add(key, entry)
+            self._dump(key, entry)
+
+    def remove(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+            if self._db:
+                cur = self._db.execute('DELETE FROM analyses WHERE uuid=?', (key,))
+                self._disk_size -= max(0, cur.rowcount)
+
+    def invalidate_repository(self, repository, head=None):
         """
-                Remove the entry that has the oldest accessed date
+            remove all entries for ``repository`` that were not built from ``head``.
+            if head is None remove all entries for ``repository``
         """
-        oldest_entry = None
-        for key in self._cache:
-            if oldest_entry is None:
-                oldest_entry = key
-            elif self._cache[key]['date_accessed'] < self._cache[oldest_entry]['date_accessed']:
-                oldest_entry = key
-
-        self._cache.pop(oldest_entry)
+        with self._lock:
+            keys = [k for k, v in self._cache.items() if v.repository == repository and
+                    (head is None or v.head != head)]
+            for k in keys:
+                del self._cache[k]
+
+            if self._db:
+                if head is None:
+                    cur = self._db.execute('DELETE FROM analyses WHERE repository=?', (repository,))
+                else:
+                    cur = self._db.execute('DELETE FROM analyses WHERE repository=? AND head!=?', (repository, head))
+                self._disk_size -= max(0, cur.rowcount)
+                self._db.commit()
+
+    # private
+    def _add(self, key, entry):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def _open(self, path):
+        root = os.path.dirname(path)
+        if root and not os.path.isdir(root):
+            os.makedirs(root)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        columns = [r[1] for r in self._db.execute('PRAGMA table_info(analyses)')]
+        if columns and 'stamp' not in columns:
+            # written by an older version. rebuild
+            self._db.execute('DROP TABLE analyses')
+        self._db.executescript(SCHEMA)
+        self._disk_size = self._db.execute('SELECT COUNT(*) FROM analyses').fetchone()[0]
+
+    def _load(self, key):
+        if self._db:
+            row = self._db.execute('SELECT repository, head, meta_head, stamp, value FROM analyses WHERE uuid=?',
+                                   (key,)).fetchone()
+            if row:
+                repository, head, meta_head, stamp, blob = row
+                try:
+                    value = pickle.loads(blob)
+                    if stamp is not None:
+                        stamp = pickle.loads(stamp)
+                except BaseException:
+                    self.remove(key)
+                    return
+
+                return CacheEntry(repository, head, meta_head, value, stamp)
+
+    def _dump(self, key, entry):
+        if self._db and entry.head is not None:
+            try:
+                blob = pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                return
+
+            stamp = None
+            if entry.stamp is not None:
+                stamp = sqlite3.Binary(pickle.dumps(entry.stamp, pickle.HIGHEST_PROTOCOL))
+
+            cur = self._db.execute('INSERT OR REPLACE INTO analyses VALUES (?,?,?,?,?,?,?)',
+                                   (key, entry.repository, entry.head, entry.meta_head, stamp, time.time(),
+                                    sqlite3.Binary(blob)))
+            # rowcount is 1 for both insert and replace. use a count only when the bound is exceeded
+            self._disk_size += max(0, cur.rowcount)
+            if self._disk_size > self.max_disk_size:
+                self._disk_size = self._db.execute('SELECT COUNT(*) FROM analyses').fetchone()[0]
+                n = self._disk_size - self.max_disk_size
+                if n > 0:
+                    self._db.execute('DELETE FROM analyses WHERE uuid IN '
+                                     '(SELECT uuid FROM analyses ORDER BY accessed LIMIT ?)', (n,))
+                    self._disk_size -= n
+                    self.evictions += n
+
 # ============= EOF =============================================
@@ -0,0 +1,476 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+"""
+    commit and push analyses without making the experiment wait on git.
+
+    ``DVCPersister.post_measurement_save`` writes the analysis files then ``submit`` s them. a worker thread makes
+    the local commits of each submitted analysis and pushes the repositories, followed by a meta repo sync, once
+    ``push_count`` analyses are waiting or the oldest has waited ``push_period`` seconds.
+
+    every submit, commit and push is appended to a journal before it is acted on. work that was pending when
+    pychron exited is committed and pushed the next time the pipeline starts.
+"""
+# ============= standard library imports ========================
+import json
+import os
+import time
+import uuid
+from queue import Queue, Empty
+from threading import Thread, RLock, Lock, Event
+
+from git import Repo, GitCommandError
+
+# ============= local library imports  ==========================
+from pychron.loggable import Loggable
+
+_STOP = object()
+_FLUSH = object()
+
+
+def commit_paths(root, paths, message):
+    """
+        stage ``paths`` in the repository at ``root`` and commit them. paths that do not exist are skipped.
+
+        returns the new commit's hexsha or None if there was nothing to commit, e.g. if the files were already
+        committed before a crash
+    """
+    repo = Repo(root)
+    ps = [os.path.relpath(p, root) for p in paths if os.path.isfile(p)]
+    if ps:
+        repo.index.add(ps)
+
+    if repo.head.is_valid():
+        if not repo.index.diff('HEAD'):
+            return
+    elif not ps:
+        return
+
+    return repo.index.commit(message).hexsha
+
+
+def pull_path(root, remote='origin'):
+    """
+        rebase the local commits of the repository at ``root`` onto ``remote``. never asks the user anything so it
+        is safe to call from the pipeline's worker. uncommitted files are stashed for the rebase.
+
+        returns False if the rebase failed. the repository is left as it was
+    """
+    repo = Repo(root)
+    if remote not in [r.name for r in repo.remotes]:
+        return True
+
+    repo.git.fetch(remote)
+    upstream = '{}/{}'.format(remote, repo.active_branch.name)
+    if upstream not in [r.name for r in repo.remote(remote).refs]:
+        return True
+
+    try:
+        repo.git.rebase('--autostash', upstream)
+    except GitCommandError:
+        try:
+            repo.git.rebase('--abort')
+        except GitCommandError:
+            pass
+        return False
+    return True
+
+
+def push_path(root, remote='origin'):
+    repo = Repo(root)
+    if remote in [r.name for r in repo.remotes]:
+        repo.git.push(remote, 'HEAD')
+    return True
+
+
+class CommitJournal(object):
+    """
+        append only json lines file. each line is flushed and synced to disk before returning
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+
+    def record(self, op, **kw):
+        if not self.path:
+            return
+
+        kw['op'] = op
+        line = '{}\n'.format(json.dumps(kw))
+        with self._lock:
+            with open(self.path, 'a') as wfile:
+                wfile.write(line)
+                wfile.flush()
+                os.fsync(wfile.fileno())
+
+    def load(self):
+        """
+            replay the journal. returns (uncommitted jobs, committed but not pushed jobs)
+        """
+        jobs = {}
+        committed = set()
+        if self.path and os.path.isfile(self.path):
+            with open(self.path, 'r') as rfile:
+                for line in rfile:
+                    try:
+                        r = json.loads(line)
+                    except ValueError:
+                        # partially written line
+                        continue
+
+                    op = r.get('op')
+                    if op == 'submit':
+                        job = r['job']
+                        jobs[job['id']] = job
+                    elif op == 'commit':
+                        committed.add(r['id'])
+                    elif op == 'push':
+                        for i in r['ids']:
+                            jobs.pop(i, None)
+
+        pending = sorted(jobs.values(), key=lambda j: j['created'])
+        return [j for j in pending if j['id'] not in committed], [j for j in pending if j['id'] in committed]
+
+    def compact(self, uncommitted, unpushed):
+        """
+            rewrite the journal with only the outstanding work
+        """
+        if not self.path:
+            return
+
+        with self._lock:
+            tmp = '{}.tmp'.format(self.path)
+            with open(tmp, 'w') as wfile:
+                for job in sorted(uncommitted + unpushed, key=lambda j: j['created']):
+                    wfile.write('{}\n'.format(json.dumps({'op': 'submit', 'job': job})))
+                for job in unpushed:
+                    wfile.write('{}\n'.format(json.dumps({'op': 'commit', 'id': job['id']})))
+                wfile.flush()
+                os.fsync(wfile.fileno())
+            os.replace(tmp, self.path)
+
+
+class PipelineStats(object):
+    __slots__ = ('ncommits', 'npushed', 'npushes', 'nfailures', 'total_time_to_push', 'max_time_to_push',
+                 'last_push_duration')
+
+    def __init__(self):
+        self.ncommits = 0
+        self.npushed = 0
+        self.npushes = 0
+        self.nfailures = 0
+        self.total_time_to_push = 0
+        self.max_time_to_push = 0
+        self.last_push_duration = 0
+
+    @property
+    def mean_time_to_push(self):
+        return self.total_time_to_push / self.npushed if self.npushed else 0
+
+    def __str__(self):
+        return 'commits={} pushed={} pushes={} failures={} time to push mean={:0.1f}s max={:0.1f}s ' \
+               'last push={:0.1f}s'.format(self.ncommits, self.npushed, self.npushes, self.nfailures,
+                                           self.mean_time_to_push, self.max_time_to_push, self.last_push_duration)
+
+
+class CommitPipeline(Loggable):
+    """
+        usage::
+
+            cp = CommitPipeline(journal_path, push_func=push, meta_func=meta_sync)
+            cp.start()
+            cp.submit(repo.path, paths, '<COLLECTION> 12345-01A', runid='12345-01A')
+            ...
+            cp.flush(block=True)
+
+        ``push_func(root)`` pushes the repository at root and returns True on success. ``meta_func(runids)`` is
+        called after every successful push cycle. any git work done outside the pipeline on the same
+        repositories should hold ``lock``.
+
+        a push that fails is retried after ``retry_period`` seconds
+    """
+
+    def __init__(self, journal_path=None, commit_func=None, push_func=None, meta_func=None,
+                 push_count=5, push_period=300, retry_period=60, lock=None, *args, **kw):
+        super(CommitPipeline, self).__init__(*args, **kw)
+        self.journal = CommitJournal(journal_path)
+        self.commit_func = commit_func or commit_paths
+        self.push_func = push_func or push_path
+        self.meta_func = meta_func
+        self.push_count = push_count
+        self.push_period = push_period
+        self.retry_period = retry_period
+        self.stats = PipelineStats()
+        self.lock = lock or RLock()
+
+        self._queue = Queue()
+        self._uncommitted = []
+        self._unpushed = []
+        self._jobs_lock = Lock()
+        self._next_retry = 0
+        self._failed = set()
+        self._thread = None
+
+    @property
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def backlog(self):
+        """
+            number of analyses that have not been pushed
+        """
+        with self._jobs_lock:
+            return self._queue.qsize() + len(self._uncommitted) + len(self._unpushed)
+
+    @property
+    def oldest(self):
+        """
+            seconds the oldest unpushed analysis has been waiting
+        """
+        with self._jobs_lock:
+            jobs = self._uncommitted + self._unpushed
+        if jobs:
+            return time.time() - min(j['created'] for j in jobs)
+        return 0
+
+    def report(self):
+        return 'backlog={} oldest={:0.0f}s {}'.format(self.backlog, self.oldest, self.stats)
+
+    def start(self):
+        if self.is_alive:
+            return
+
+        uncommitted, unpushed = self.journal.load()
+        if uncommitted or unpushed:
+            self.info('recovered {} uncommitted and {} unpushed analyses from journal'.format(len(uncommitted),
+                                                                                            len(unpushed)))
+        with self._jobs_lock:
+            self._uncommitted = uncommitted
+            self._unpushed = unpushed
+        self.journal.compact(uncommitted, unpushed)
+
+        self._thread = Thread(target=self._run, name='CommitPipeline')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, root, paths, message, runid=None, push=True):
+        """
+            journal and queue a commit of ``paths``. the files must already be written.
+            if ``push`` is False the commit is only pushed by ``flush``
+        """
+        return self.submit_commits(root, [(paths, message)], runid=runid, push=push)
+
+    def submit_commits(self, root, commits, runid=None, push=True):
+        """
+            journal and queue the commits of one analysis. ``commits`` is a list of (paths, message). each is
+            committed separately, in order, so the history views see every tag
+        """
+        job = {'id': uuid.uuid4().hex,
+               'root': root,
+               'commits': [(list(ps), msg) for ps, msg in commits],
+               'runid': runid,
+               'push': push,
+               'created': time.time()}
+
+        alive = self.is_alive
+        with self._jobs_lock:
+            self.journal.record('submit', job=job)
+            if alive:
+                self._queue.put(job)
+            else:
+                self._uncommitted.append(job)
+
+        if not alive:
+            self._commit_pending()
+        return job['id']
+
+    def flush(self, block=False, timeout=None):
+        """
+            commit and push everything now. returns True if nothing is left unpushed
+        """
+        if self.is_alive:
+            evt = Event()
+            self._queue.put((_FLUSH, evt))
+            if not block:
+                return
+            evt.wait(timeout)
+        else:
+            self._commit_pending(retry=True)
+            self._push()
+
+        return not self.backlog
+
+    def stop(self, timeout=None):
+        """
+            commit what is queued and stop the worker. unpushed commits stay in the journal
+        """
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self.warning('commit pipeline did not finish in {}s'.format(timeout))
+            else:
+                self._thread = None
+
+    # private
+    def _run(self):
+        q = self._queue
+        while 1:
+            try:
+                item = q.get(timeout=self._get_timeout())
+            except Empty:
+                item = None
+
+            flushes = []
+            stop = False
+            while item is not None:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, tuple) and item[0] is _FLUSH:
+                    flushes.append(item[1])
+                else:
+                    with self._jobs_lock:
+                        self._uncommitted.append(item)
+                try:
+                    item = q.get_nowait()
+                except Empty:
+                    item = None
+
+            self._commit_pending(retry=bool(flushes) or time.time() >= self._next_retry)
+            if stop:
+                break
+
+            if flushes or self._push_due():
+                self._push()
+
+            for evt in flushes:
+                evt.set()
+
+    def _get_timeout(self):
+        with self._jobs_lock:
+            jobs = [j for j in self._uncommitted + self._unpushed if j['push']]
+        if not jobs:
+            return None
+
+        now = time.time()
+        t = max(self.push_period - (now - min(j['created'] for j in jobs)), 0)
+        if self._failed and not self._unpushed:
+            t = self._next_retry - now
+        else:
+            t = max(t, self._next_retry - now)
+        return max(t, 0.05)
+
+    def _push_due(self):
+        if time.time() < self._next_retry:
+            return
+
+        with self._jobs_lock:
+            jobs = [j for j in self._unpushed if j['push']]
+        if jobs:
+            return len(jobs) >= self.push_count or time.time() - min(j['created'] for j in jobs) >= self.push_period
+
+    def _commit_pending(self, retry=True):
+        """
+            commit new jobs. jobs that failed to commit before are only tried again if ``retry``
+        """
+        with self._jobs_lock:
+            jobs = list(self._uncommitted)
+
+        for job in jobs:
+            if not retry and job['id'] in self._failed:
+                continue
+
+            try:
+                with self.lock:
+                    for ps, msg in job['commits']:
+                        self.commit_func(job['root'], ps, msg)
+            except BaseException as e:
+                self.warning('failed committing {} to {}. {}'.format(job['runid'], job['root'], e))
+                self._failed.add(job['id'])
+                self._next_retry = time.time() + self.retry_period
+                continue
+
+            self._failed.discard(job['id'])
+            self.journal.record('commit', id=job['id'])
+            self.stats.ncommits += 1
+            with self._jobs_lock:
+                self._uncommitted.remove(job)
+                self._unpushed.append(job)
+
+    def _push(self):
+        with self._jobs_lock:
+            jobs = list(self._unpushed)
+        if not jobs:
+            return
+
+        st = time.time()
+        roots = []
+        for j in jobs:
+            if j['root'] not in roots:
+                roots.append(j['root'])
+
+        failed = []
+        for root in roots:
+            try:
+                with self.lock:
+                    ok = self.push_func(root)
+            except BaseException as e:
+                self.warning('failed pushing {}. {}'.format(root, e))
+                ok = False
+
+            if not ok:
+                failed.append(root)
+
+        pushed = [j for j in jobs if j['root'] not in failed]
+        if pushed:
+            if self.meta_func:
+                try:
+                    with self.lock:
+                        self.meta_func([j['runid'] for j in pushed if j['runid']])
+                except BaseException as e:
+                    self.warning('failed syncing meta repo. {}'.format(e))
+
+            self.journal.record('push', ids=[j['id'] for j in pushed])
+
+        now = time.time()
+        s = self.stats
+        s.npushes += 1
+        s.last_push_duration = now - st
+        for j in pushed:
+            dt = now - j['created']
+            s.npushed += 1
+            s.total_time_to_push += dt
+            if dt > s.max_time_to_push:
+                s.max_time_to_push = dt
+
+        with self._jobs_lock:
+            for j in pushed:
+                self._unpushed.remove(j)
+
+            if not self._uncommitted and not self._unpushed and self._queue.empty():
+                self.journal.compact([], [])
+
+        if failed:
+            s.nfailures += 1
+            self._next_retry = now + self.retry_period
+        elif not self._failed:
+            self._next_retry = 0
+
+        self.info('pushed {} analyses to {} repositories. {}'.format(len(pushed), len(roots) - len(failed),
+                                                                    self.report()))
+
+# ============= EOF =============================================
@@ -0,0 +1,126 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+"""
+    binary sidecar for the <runid>.dat.json signal files.
+
+    The json file is canonical. The sidecar (<runid>.dat.npz) stores the same points as (n,2) float arrays
+    so they can be read without base64 decoding and unpacking one point at a time.
+
+    A sidecar is only used if the size and mtime of the json file match the values recorded when the sidecar was
+    written. Sidecars are local files and are excluded from git via .git/info/exclude
+"""
+# ============= standard library imports ========================
+import os
+import zipfile
+
+from numpy import frombuffer, savez, load, array, float64
+
+# ============= local library imports  ==========================
+from pychron.core.helpers.binpack import format_blob
+
+SIDECAR_EXTENSION = '.npz'
+SIDECAR_EXCLUDE = '*.dat{}'.format(SIDECAR_EXTENSION)
+
+SIGNAL = 'signal'
+BASELINE = 'baseline'
+SNIFF = 'sniff'
+
+
+def sidecar_path(path):
+    return '{}{}'.format(os.path.splitext(path)[0], SIDECAR_EXTENSION)
+
+
+def exclude_sidecars(root):
+    """
+        add the sidecar pattern to the local exclude file of the repository at ``root``
+    """
+    d = os.path.join(root, '.git', 'info')
+    if not os.path.isdir(os.path.join(root, '.git')):
+        return
+
+    if not os.path.isdir(d):
+        os.mkdir(d)
+
+    p = os.path.join(d, 'exclude')
+    if os.path.isfile(p):
+        with open(p, 'r') as rfile:
+            if any(line.strip() == SIDECAR_EXCLUDE for line in rfile):
+                return
+
+    with open(p, 'a') as afile:
+        afile.write('{}\n'.format(SIDECAR_EXCLUDE))
+
+
+def blob_to_array(blob, fmt='>ff'):
+    """
+        convert a packed blob of (x,y) pairs to a (n,2) array.
+
+        a truncated trailing point is dropped, same as ``binpack.unpack``
+    """
+    n = len(blob) // 8
+    return frombuffer(blob, dtype='{}f4'.format(fmt[0]), count=n * 2).reshape(n, 2)
+
+
+def make_key(kind, detector, isotope=None):
+    if isotope is None:
+        return '{}:{}'.format(kind, detector)
+    return '{}:{}:{}'.format(kind, isotope, detector)
+
+
+def dump_data_sidecar(path, jd):
+    """
+        write the sidecar for the json data file ``path``. ``jd`` is the json data dictionary
+
+        must be called after ``path`` is written
+    """
+    fmt = jd.get('format', '>ff')
+    arrays = {}
+    for tag, kind in (('signals', SIGNAL), ('sniffs', SNIFF), ('baselines', BASELINE)):
+        for sd in jd.get(tag, []):
+            det = sd.get('detector')
+            blob = sd.get('blob')
+            if det is None or not blob:
+                continue
+
+            key = make_key(kind, det, sd.get('isotope'))
+            arrays[key] = blob_to_array(format_blob(blob), fmt)
+
+    st = os.stat(path)
+    arrays['source'] = array([st.st_size, st.st_mtime])
+
+    savez(sidecar_path(path), **arrays)
+
+
+def load_data_sidecar(path):
+    """
+        return a dictionary of key: (n,2) float arrays or None if the sidecar is missing or stale
+    """
+    sp = sidecar_path(path)
+    if not os.path.isfile(sp) or not os.path.isfile(path):
+        return
+
+    try:
+        with load(sp) as npz:
+            st = os.stat(path)
+            size, mtime = npz['source']
+            if size != st.st_size or mtime != st.st_mtime:
+                return
+
+            return {k: npz[k].astype(float64) for k in npz.files if k != 'source'}
+    except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile):
+        return
+
+# ============= EOF =============================================
@@ -16,6 +16,7 @@
 
 import os
 import shutil
+import sqlite3
 import time
 from datetime import datetime
 from itertools import groupby
@@ -23,7 +24,7 @@ from operator import itemgetter
 
 # ============= enthought library imports =======================
 from apptools.preferences.preference_binding import bind_preference
-from git import Repo, GitCommandError, NoSuchPathError
+from git import Repo, GitCommandError, NoSuchPathError, InvalidGitRepositoryError
 from traits.api import Instance, Str, Set, List, provides, Bool, Int
 from uncertainties import ufloat, std_dev, nominal_value
 
@@ -34,28 +35,33 @@ from pychron.core.i_datastore import IDatastore
 from pychron.core.progress import progress_loader, progress_iterator, open_progress
 from pychron.dvc import dvc_dump, dvc_load, analysis_path, repository_path, AnalysisNotAnvailableError, PATH_MODIFIERS, \
     USE_GIT_TAGGING
-from pychron.dvc.cache import DVCCache
+from pychron.dvc.cache import DVCCache, file_stamp
 from pychron.dvc.defaults import TRIGA, HOLDER_24_SPOKES, LASER221, LASER65
 from pychron.dvc.dvc_analysis import DVCAnalysis
 from pychron.dvc.dvc_database import DVCDatabase
 from pychron.dvc.func import find_interpreted_age_path, GitSessionCTX, push_repositories, make_interpreted_age_dict
 from pychron.dvc.meta_repo import MetaRepo, get_frozen_flux, get_frozen_productions
+from pychron.dvc.offline_index import BROWSER_QUERIES, OfflineIndexer, index_factory, offline_index_path
+from pychron.dvc.parallel_loader import make_analyses_parallel
+from pychron.dvc.sync_manager import RepositorySyncManager
 from pychron.dvc.tasks.dvc_preferences import DVCConnectionItem
 from pychron.dvc.util import Tag, DVCInterpretedAge
 from pychron.envisage.browser.record_views import InterpretedAgeRecordView
 from pychron.experiment.utilities.identifier import make_increment
 from pychron.git.hosts import IGitHost
 from pychron.git.hosts.local import LocalGitHostService
-from pychron.git_archive.repo_manager import GitRepoManager, format_date, get_repository_branch
+from pychron.git_archive.repo_manager import GitRepoManager, format_date, get_repository_branch, \
+    get_repository_head
 from pychron.git_archive.views import StatusView
 from pychron.globals import globalv
 from pychron.loggable import Loggable
 from pychron.paths import paths, r_mkdir
+from pychron.processing.arar_age import calculate_ages
 from pychron.processing.interpreted_age import InterpretedAge
 from pychron.pychron_constants import RATIO_KEYS, INTERFERENCE_KEYS, STARTUP_MESSAGE_POSITION
 
 HOST_WARNING_MESSAGE = 'GitLab or GitHub or LocalGit plugin is required'
-
+PARALLEL_LOADING_THRESHOLD = 100
 
 
 @provides(IDatastore)
@@ -75,6 +81,7 @@ class DVC(Loggable):
     current_repository = Instance(GitRepoManager)
     auto_add = True
     use_auto_pull = Bool(True)
+    use_offline_index = Bool
     pulled_repositories = Set
     selected_repositories = List
 
@@ -86,9 +93,18 @@ class DVC(Loggable):
     use_cocktail_irradiation = Str
     use_cache = Bool
     max_cache_size = Int
+    use_parallel_loading = Bool
+    parallel_loading_workers = Int(4)
+    use_data_sidecar = Bool
+    use_batch_age_calculation = Bool
+    repository_sync_window = Int(300)
+    repository_sync_workers = Int(4)
     irradiation_prefix = Str
 
+    sync_manager = Instance(RepositorySyncManager)
+
     _cache = None
+    _offline_index = None
     _uuid_runid_cache = {}
 
     def __init__(self, bind=True, *args, **kw):
@@ -113,6 +129,9 @@ class DVC(Loggable):
         # update meta repo.
         self.meta_pull()
 
+        if self.use_offline_index:
+            self.update_offline_index()
+
         if self.db.connect():
             return True
 
@@ -603,7 +622,7 @@ class DVC(Loggable):
             self.info('Delete existing icfactors for {}'.format(ai))
             ai.delete_icfactors(dets)
             if self._cache:
-                self._cache.remove(ai.uiid)
+                self._cache.remove(ai.uuid)
 
             self._update_current_age(ai)
 
@@ -612,7 +631,7 @@ class DVC(Loggable):
             self.info('Saving icfactors for {}'.format(ai))
             ai.dump_icfactors(dets, fits, refs, reviewed=True)
             if self._cache:
-                self._cache.remove(ai.uiid)
+                self._cache.remove(ai.uuid)
 
             self._update_current_age(ai)
 
@@ -621,7 +640,7 @@ class DVC(Loggable):
             self.info('Saving blanks for {}'.format(ai))
             ai.dump_blanks(keys, refs, reviewed=True)
             if self._cache:
-                self._cache.remove(ai.uiid)
+                self._cache.remove(ai.uuid)
 
             self._update_current_blanks(ai, keys)
 
@@ -629,7 +648,7 @@ class DVC(Loggable):
         if keys:
             self.info('Saving equilibration for {}'.format(ai))
             if self._cache:
-                self._cache.remove(ai.uiid)
+                self._cache.remove(ai.uuid)
 
             self._update_current(ai, keys)
             return ai.dump_equilibration(keys, reviewed=True)
@@ -639,7 +658,7 @@ class DVC(Loggable):
             self.info('Saving fits for {}'.format(ai))
             ai.dump_fits(keys, reviewed=True)
             if self._cache:
-                self._cache.remove(ai.uiid)
+                self._cache.remove(ai.uuid)
 
             self._update_current(ai, keys)
 
@@ -811,29 +830,6 @@ class DVC(Loggable):
         # load repositories
         st = time.time()
 
-        if self.use_cache:
-            cached_records = []
-            nrecords = []
-            cache = self._cache
-
-            # get items from the cache
-            for ri in records:
-                r = cache.get(ri.uuid)
-                if r is not None:
-                    cached_records.append(r)
-                else:
-                    nrecords.append(ri)
-
-            records = nrecords
-
-        def func(xi, prog, i, n):
-            if prog:
-                prog.change_message('Syncing repository= {}'.format(xi))
-            try:
-                self.sync_repo(xi, use_progress=False)
-            except BaseException:
-                pass
-
         bad_records = [r for r in records if r.repository_identifier is None]
         if bad_records:
             self.warning_dialog('Missing Repository Associations. Contact an expert!'
@@ -842,24 +838,43 @@ class DVC(Loggable):
             records = [r for r in records if r.repository_identifier is not None]
 
         if not records:
-            if self.use_cache:
-                cache.clean()
-                return cached_records
-            else:
-                return []
+            return []
 
         exps = {r.repository_identifier for r in records}
 
-        if use_progress:
-            progress_iterator(exps, func, threshold=1)
-        else:
-            for ei in exps:
-                self.sync_repo(ei, use_progress=False)
+        sync_results = self.sync_manager.sync(exps, lambda xi: self.sync_repo(xi, use_progress=False),
+                                              use_progress=use_progress)
         try:
-            branches = {ei: get_repository_branch(repository_path(ei)) for ei in exps}
-        except NoSuchPathError:
+            branches = {ei: sync_results[ei].branch or get_repository_branch(repository_path(ei)) for ei in exps}
+        except (NoSuchPathError, InvalidGitRepositoryError):
             return []
 
+        # only fully loaded analyses are cached
+        use_cache = self.use_cache and self._cache is not None and not (quick or calculate_f_only)
+        cached_records = []
+        if use_cache:
+            cache = self._cache
+            heads = {ei: get_repository_head(repository_path(ei)) for ei in exps}
+            meta_head = get_repository_head(paths.meta_root)
+
+            if not reload:
+                nrecords = []
+                # get items from the cache
+                for ri in records:
+                    rid = ri.repository_identifier
+                    r = cache.get(ri.uuid, heads.get(rid), meta_head,
+                                  stamp=self._get_analysis_stamp(ri.uuid, ri.record_id, rid))
+                    if r is not None:
+                        cached_records.append(r)
+                    else:
+                        nrecords.append(ri)
+
+                records = nrecords
+                if not records:
+                    cache.clean()
+                    self.debug('Analysis cache {}'.format(cache.report()))
+                    return cached_records
+
         fluxes = {}
         productions = {}
         chronos = {}
@@ -905,32 +920,48 @@ class DVC(Loggable):
 
             sens = meta_repo.get_sensitivities()
 
+        batch_age = self.use_batch_age_calculation and not calculate_f_only and not quick
+        kw = dict(branches=branches, chronos=chronos, productions=productions,
+                  fluxes=fluxes, calculate_f_only=calculate_f_only, sens=sens,
+                  frozen_fluxes=frozen_fluxes, frozen_productions=frozen_productions,
+                  quick=quick,
+                  batch_age=batch_age,
+                  reload=reload)
+
         def func(*args):
             try:
-                return self._make_record(branches=branches, chronos=chronos, productions=productions,
-                                         fluxes=fluxes, calculate_f_only=calculate_f_only, sens=sens,
-                                         frozen_fluxes=frozen_fluxes, frozen_productions=frozen_productions,
-                                         quick=quick,
-                                         reload=reload, *args)
+                return self._make_record(*args, **kw)
             except BaseException:
                 record = args[0]
                 self.debug('make analysis exception: repo={}, record_id={}'.format(record.repository_identifier,
                                                                                    record.record_id))
                 self.debug_exception()
 
-        if use_progress:
+        if self._use_parallel_loading(records, reload):
+            ret = self._make_records_parallel(records, kw, func, use_progress)
+        elif use_progress:
             ret = progress_loader(records, func, threshold=1, step=25)
         else:
             ret = [func(r, None, 0, 0) for r in records]
 
+        if batch_age:
+            ret = self._calculate_ages(ret)
+
         et = time.time() - st
 
         n = len(ret)
         if n:
             self.debug('Make analysis time, total: {}, n: {}, average: {}'.format(et, n, et / float(n)))
 
-        if self.use_cache:
+        if use_cache:
+            for a in ret:
+                if a is not None:
+                    rid = a.repository_identifier
+                    cache.update(a.uuid, a, repository=rid, head=heads.get(rid), meta_head=meta_head,
+                                 stamp=self._get_analysis_stamp(a.uuid, a.record_id, rid))
+
             cache.clean()
+            self.debug('Analysis cache {}'.format(cache.report()))
             ret = cached_records + ret
 
         return ret
@@ -1029,6 +1060,7 @@ class DVC(Loggable):
         if exists:
             repo = self._get_repository(name)
             repo.pull(use_progress=use_progress, use_auto_pull=self.use_auto_pull)
+            self._invalidate_cache(repo)
             return True
         else:
             self.debug('getting repository from remote')
@@ -1080,6 +1112,27 @@ class DVC(Loggable):
         for gi in self.application.get_services(IGitHost):
             self.debug('pull to remote={}, url={}'.format(gi.default_remote_name, gi.remote_url))
             repo.smart_pull(remote=gi.default_remote_name)
+        self._invalidate_cache(repo)
+
+    def update_offline_index(self, repositories=None, meta=True, reraise=False):
+        """
+        bring the local analysis index up to date with the local repositories.
+        only files changed since the last update are read
+
+        returns the number of analyses indexed or None if the update failed. reraise: raise the error instead
+        """
+        try:
+            if self._offline_index is None:
+                self._offline_index = index_factory(offline_index_path())
+
+            indexer = OfflineIndexer(db=self._offline_index,
+                                     root=paths.repository_dataset_dir or '',
+                                     meta_root=paths.meta_root or '')
+            return indexer.update(repositories, meta=meta)
+        except BaseException as e:
+            self.warning('Failed updating offline index. error={}'.format(e))
+            if reraise:
+                raise
 
     def push_repository(self, repo, **kw):
         repo = self._get_repository(repo)
@@ -1615,9 +1668,61 @@ class DVC(Loggable):
             prog.change_message('Loading repository {}. {}/{}'.format(expid, i, n))
         self.sync_repo(expid)
 
+    def _use_parallel_loading(self, records, reload):
+        if not self.use_parallel_loading or len(records) < PARALLEL_LOADING_THRESHOLD:
+            return
+
+        # analyses that are already loaded are returned as is by _make_record
+        return reload or not any(isinstance(r, DVCAnalysis) for r in records)
+
+    def _calculate_ages(self, ans):
+        try:
+            calculate_ages([a for a in ans if a is not None])
+        except BaseException:
+            self.debug('batch age calculation failed. calculating ages individually')
+            self.debug_exception()
+
+            # analyses whose age failed are dropped the same as a failed _make_record
+            def func(a):
+                try:
+                    a.calculate_age()
+                    return a
+                except BaseException:
+                    self.debug('calculate age exception: repo={}, record_id={}'.format(a.repository_identifier,
+                                                                                       a.record_id))
+                    self.debug_exception()
+
+            ans = [a if a is None else func(a) for a in ans]
+        return ans
+
+    def _get_analysis_stamp(self, uuid, record_id, repository_identifier):
+        # catches analysis files changed without a commit
+        ps = [analysis_path((uuid, record_id), repository_identifier, modifier=m) for m in PATH_MODIFIERS]
+        return file_stamp(ps)
+
+    def _make_records_parallel(self, records, kw, func, use_progress):
+        # make_analyses drops records without a repository_identifier so the workers never need to ask the user to
+        # select a repository
+        nworkers = max(1, self.parallel_loading_workers)
+        self.debug('Make analyses parallel. n={}, workers={}'.format(len(records), nworkers))
+        failed = []
+        try:
+            ret = make_analyses_parallel(records, kw, nworkers=nworkers, use_progress=use_progress, failed=failed)
+        except BaseException as e:
+            self.warning('Parallel loading failed. Falling back to serial loading. error={}'.format(e))
+            self.debug_exception()
+            # returns an empty list if canceled
+            return progress_loader(records, func, threshold=1, step=25, use_progress=use_progress)
+
+        if failed:
+            self.warning('Failed loading {} analyses. {}'.format(len(failed),
+                                                                 ', '.join('{} ({})'.format(*f) for f in failed)))
+
+        return [a for a in ret if a is not None]
+
     def _make_record(self, record, prog, i, n, productions=None, chronos=None, branches=None, fluxes=None, sens=None,
                      frozen_fluxes=None, frozen_productions=None,
-                     calculate_f_only=False, reload=False, quick=False):
+                     calculate_f_only=False, reload=False, quick=False, batch_age=False):
         meta_repo = self.meta_repo
         if prog:
             # this accounts for ~85% of the time!!!
@@ -1750,11 +1855,9 @@ class DVC(Loggable):
 
                 if calculate_f_only:
                     a.calculate_f()
-                else:
+                elif not batch_age:
                     a.calculate_age()
 
-        if self._cache:
-            self._cache.update(record.uuid, a)
         return a
 
     def _get_repository(self, repository_identifier, as_current=True):
@@ -1787,8 +1890,15 @@ class DVC(Loggable):
         bind_preference(self, 'use_cocktail_irradiation', '{}.use_cocktail_irradiation'.format(prefid))
         bind_preference(self, 'use_cache', '{}.use_cache'.format(prefid))
         bind_preference(self, 'max_cache_size', '{}.max_cache_size'.format(prefid))
+        bind_preference(self, 'use_parallel_loading', '{}.use_parallel_loading'.format(prefid))
+        bind_preference(self, 'parallel_loading_workers', '{}.parallel_loading_workers'.format(prefid))
+        bind_preference(self, 'use_data_sidecar', '{}.use_data_sidecar'.format(prefid))
+        bind_preference(self, 'use_batch_age_calculation', '{}.use_batch_age_calculation'.format(prefid))
+        bind_preference(self, 'repository_sync_window', '{}.repository_sync_window'.format(prefid))
+        bind_preference(self, 'repository_sync_workers', '{}.repository_sync_workers'.format(prefid))
         bind_preference(self, 'update_currents_enabled', '{}.update_currents_enabled'.format(prefid))
         bind_preference(self, 'use_auto_pull', '{}.use_auto_pull'.format(prefid))
+        bind_preference(self, 'use_offline_index', '{}.use_offline_index'.format(prefid))
 
         prefid = 'pychron.entry'
         bind_preference(self, 'irradiation_prefix', '{}.irradiation_prefix'.format(prefid))
@@ -1806,10 +1916,37 @@ class DVC(Loggable):
 
     def _use_cache_changed(self):
         if self.use_cache:
-            self._cache = DVCCache(max_size=self.max_cache_size)
+            p = os.path.join(paths.dvc_dir, 'analysis_cache.sqlite') if paths.dvc_dir else None
+            try:
+                self._cache = DVCCache(max_size=self.max_cache_size, path=p)
+            except sqlite3.Error as e:
+                self.warning('Failed opening persistent analysis cache {}. error={}'.format(p, e))
+                self._cache = DVCCache(max_size=self.max_cache_size)
         else:
             self._cache = None
 
+    def _invalidate_cache(self, repo):
+        if self._cache:
+            self._cache.invalidate_repository(os.path.basename(repo.path), get_repository_head(repo.path))
+        if self._offline_index:
+            self.update_offline_index([os.path.basename(repo.path)], meta=False)
+
+    def _use_offline_index_changed(self, new):
+        if new:
+            self.update_offline_index()
+
+    def _repository_sync_window_changed(self, new):
+        self.sync_manager.window = new
+
+    def _repository_sync_workers_changed(self, new):
+        self.sync_manager.nworkers = new
+
+    def _sync_manager_default(self):
+        return RepositorySyncManager(window=self.repository_sync_window, nworkers=self.repository_sync_workers)
+
+    def _use_data_sidecar_changed(self, new):
+        DVCAnalysis.use_data_sidecar = new
+
     def _favorites_changed(self, items):
         try:
             ds = [DVCConnectionItem(attrs=f, load_names=False) for f in items]
@@ -1896,6 +2033,9 @@ class DVC(Loggable):
             repo.commit('added default {}'.format(root.replace('_', ' ')))
 
     def __getattr__(self, item):
+        if self.use_offline_index and self._offline_index and item in BROWSER_QUERIES:
+            return getattr(self._offline_index, item)
+
         try:
             return getattr(self.db, item)
         except AttributeError:
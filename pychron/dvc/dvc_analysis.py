@@ -31,6 +31,7 @@ from pychron.core.helpers.strtools import to_csv_str
 from pychron.dvc import USE_GIT_TAGGING
 from pychron.dvc import dvc_dump, dvc_load, analysis_path, make_ref_list, get_spec_sha, get_masses, repository_path, \
     AnalysisNotAnvailableError
+from pychron.dvc.data_sidecar import load_data_sidecar, dump_data_sidecar, exclude_sidecars, BASELINE, SIGNAL
 from pychron.experiment.utilities.environmentals import set_environmentals
 from pychron.experiment.utilities.identifier import make_aliquot_step, make_step
 from pychron.processing.analyses.analysis import Analysis
@@ -65,6 +66,7 @@ class DVCAnalysis(Analysis):
     production_obj = None
     chronology_obj = None
     use_repository_suffix = False
+    use_data_sidecar = False
 
     def __init__(self, uuid, record_id, repository_identifier, *args, **kw):
         super(DVCAnalysis, self).__init__(*args, **kw)
@@ -226,11 +228,7 @@ class DVCAnalysis(Analysis):
     def load_raw_data(self, keys=None, n_only=False, use_name_pairs=True):
         path = self._analysis_path(modifier='.data')
 
-        jd = dvc_load(path)
-
-        signals = jd.get('signals', [])
-        baselines = jd.get('baselines', [])
-        sniffs = jd.get('sniffs', [])
+        signals, baselines, sniffs = self._get_raw_data(path)
 
         for sd in signals:
             isok = sd.get('isotope')
@@ -250,16 +248,12 @@ class DVCAnalysis(Analysis):
             if not iso:
                 continue
 
-            blob = sd.get('blob')
-            if blob:
-                iso.unpack_data(format_blob(blob), n_only)
+            iso.unpack_data(sd.get('blob'), n_only)
 
             # det = sd['detector']
             bd = next((b for b in baselines if b.get('detector') == det), None)
             if bd:
-                blob = bd.get('blob')
-                if blob:
-                    iso.baseline.unpack_data(format_blob(blob), n_only)
+                iso.baseline.unpack_data(bd.get('blob'), n_only)
 
         # loop thru keys to make sure none were missed this can happen when only loading baseline
         if keys:
@@ -268,9 +262,7 @@ class DVCAnalysis(Analysis):
                 if bd:
                     for iso in self.itervalues():
                         if iso.detector == k:
-                            blob = bd.get('blob')
-                            if blob:
-                                iso.baseline.unpack_data(format_blob(blob), n_only)
+                            iso.baseline.unpack_data(bd.get('blob'), n_only)
 
         for sn in sniffs:
             isok = sn.get('isotope')
@@ -285,11 +277,7 @@ class DVCAnalysis(Analysis):
             if keys and key not in keys and isok not in keys:
                 continue
 
-            data = None
-            blob = sn.get('blob')
-            if blob:
-                data = format_blob(blob)
-
+            data = sn.get('blob')
             for iso in self.itervalues():
                 if iso.detector == det:
                     iso.sniff.unpack_data(data, n_only)
@@ -634,6 +622,46 @@ class DVCAnalysis(Analysis):
 
         dvc_dump(obj, path)
 
+    def _get_raw_data(self, path):
+        """
+            return signals, baselines, sniffs. each is a list of dicts with the blob already decoded.
+
+            use the binary sidecar if available otherwise read the json file. if use_data_sidecar write the sidecar
+            so the next read is fast
+        """
+        if self.use_data_sidecar:
+            sd = load_data_sidecar(path)
+            if sd is not None:
+                signals, baselines, sniffs = [], [], []
+                for k, v in sd.items():
+                    args = k.split(':')
+                    kind = args[0]
+                    if kind == BASELINE:
+                        baselines.append({'detector': args[1], 'blob': v})
+                    else:
+                        d = {'isotope': args[1], 'detector': args[2], 'blob': v}
+                        (signals if kind == SIGNAL else sniffs).append(d)
+                return signals, baselines, sniffs
+
+        jd = dvc_load(path)
+        if jd and self.use_data_sidecar:
+            try:
+                exclude_sidecars(repository_path(self.repository_identifier))
+                dump_data_sidecar(path, jd)
+            except BaseException as e:
+                self.debug('Failed writing data sidecar. path={}, error={}'.format(path, e))
+
+        ret = []
+        for tag in ('signals', 'baselines', 'sniffs'):
+            items = []
+            for sd in jd.get(tag, []):
+                sd = dict(sd)
+                blob = sd.get('blob')
+                sd['blob'] = format_blob(blob) if blob else None
+                items.append(sd)
+            ret.append(items)
+        return ret
+
     def _analysis_path(self, repository_identifier=None, **kw):
         if repository_identifier is None:
             repository_identifier = self.repository_identifier
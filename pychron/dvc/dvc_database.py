@@ -14,8 +14,10 @@
 # limitations under the License.
 # ===============================================================================
 import sys
+import time
 from datetime import timedelta, datetime
-from string import digits, ascii_letters
+from itertools import chain
+from threading import Lock
 
 from sqlalchemy import not_, func, distinct, or_, and_
 from sqlalchemy.orm.exc import NoResultFound
@@ -27,11 +29,13 @@ from traitsui.api import Item
 
 from pychron import version
 from pychron.core.helpers.datetime_tools import bin_datetimes
+from pychron.core.fuzzy_index import FuzzyIndex
 from pychron.core.helpers.traitsui_shortcuts import okcancel_view
 from pychron.core.spell_correct import correct
 from pychron.core.utils import alpha_to_int
 from pychron.database.core.database_adapter import DatabaseAdapter, binfunc
 from pychron.database.core.query import compile_query, in_func
+from pychron.database.core.query_cache import cached_query
 from pychron.dvc.dvc_orm import AnalysisTbl, ProjectTbl, MassSpectrometerTbl, \
     IrradiationTbl, LevelTbl, SampleTbl, \
     MaterialTbl, IrradiationPositionTbl, UserTbl, ExtractDeviceTbl, \
@@ -41,11 +45,20 @@ from pychron.dvc.dvc_orm import AnalysisTbl, ProjectTbl, MassSpectrometerTbl, \
     PrincipalInvestigatorTbl, SamplePrepWorkerTbl, SamplePrepSessionTbl, \
     SamplePrepStepTbl, SamplePrepImageTbl, RestrictedNameTbl, AnalysisGroupTbl, AnalysisGroupSetTbl, \
     SimpleIdentifierTbl, SamplePrepChoicesTbl, CurrentTbl, ParameterTbl, UnitsTbl
+from pychron.dvc.paging import AnalysisRow
 from pychron.experiment.utilities.identifier import strip_runid
 from pychron.globals import globalv
 from pychron.pychron_constants import NULL_STR, EXTRACT_DEVICE, NO_EXTRACT_DEVICE, \
     SAMPLE_PREP_STEPS, SAMPLE_METADATA, STARTUP_MESSAGE_POSITION
 
+# table and column indexed for each kind of fuzzy search
+FUZZY_INDEX_COLUMNS = {'projects': (ProjectTbl, 'name'),
+                       'samples': (SampleTbl, 'name'),
+                       'identifiers': (IrradiationPositionTbl, 'identifier')}
+
+# maximum number of primary keys a fuzzy search passes to the database
+FUZZY_LIMIT = 500
+
 
 def listify(obj):
     if obj:
@@ -197,6 +210,11 @@ class DVCDatabase(DatabaseAdapter):
     level = Str
     levels = List
 
+    # seconds before a fuzzy search index is rebuilt to pick up rows added by other clients
+    fuzzy_index_ttl = 600
+    _fuzzy_indices = None
+    _fuzzy_index_lock = Lock()
+
     def __init__(self, clear=False, auto_add=False, *args, **kw):
         super(DVCDatabase, self).__init__(*args, **kw)
 
@@ -699,54 +717,51 @@ class DVCDatabase(DatabaseAdapter):
             return self._add_item(a)
 
     # fuzzy getters
+    def get_fuzzy_index(self, kind):
+        """
+        In memory index of primary keys by name used by the fuzzy getters. Built on first use, updated as rows are
+        flushed by this adapter and rebuilt after ``fuzzy_index_ttl`` seconds
+
+        :param kind: projects, samples or identifiers
+        :return: ``FuzzyIndex``
+        """
+        with self._fuzzy_index_lock:
+            if self._fuzzy_indices is None:
+                self._fuzzy_indices = {}
+
+            idx, built = self._fuzzy_indices.get(kind, (None, 0))
+            if idx is None or time.time() - built > self.fuzzy_index_ttl:
+                table, attr = FUZZY_INDEX_COLUMNS[kind]
+                idx = FuzzyIndex()
+                with self.session_ctx() as sess:
+                    q = sess.query(table.id, getattr(table, attr))
+                    for pid, name in self._query_all(q, verbose_query=False):
+                        idx.add(pid, name or '')
+
+                self.debug('built {} fuzzy index n={}'.format(kind, len(idx)))
+                self._fuzzy_indices[kind] = idx, time.time()
+            return idx
+
     def get_fuzzy_projects(self, search_str):
+        ids = self.get_fuzzy_index('projects').search(search_str, limit=FUZZY_LIMIT)
         with self.session_ctx() as sess:
             q = sess.query(ProjectTbl)
 
-            f = or_(ProjectTbl.name.like('{}%'.format(search_str)), ProjectTbl.id.like('{}%'.format(search_str)))
+            f = or_(ProjectTbl.id.in_(ids), ProjectTbl.id.like('{}%'.format(search_str)))
             q = q.filter(f)
-            return self._query_all(q)
-
-    def _fuzzy_sample_comps(self, name):
-        oname = name
-        likes = ['{}%'.format(oname)]
-
-        regexp = ''
-        was_letter = False
-        for c in oname:
-            if c in digits:
-                if was_letter:
-                    c = '[-_ ]*{}'.format(c)
-                    was_letter = False
-            elif c in ascii_letters:
-                was_letter = True
-            else:
-                was_letter = False
-
-            regexp += c
-
-        # %FC-2%
-        for r in '_- ':
-            name = name.replace(r, '%')
-
-        # FC%2
-        likes.append(name)
-
-        # %FC%2%
-        likes.append('{}%'.format(name))
-
-        comps = [func.lower(SampleTbl.name.like(like)) for like in likes]
-        comps.append(func.lower(SampleTbl.name.op('regexp')(regexp)))
-        return comps
+            return self._rank_fuzzy(self._query_all(q), ids)
 
     def get_fuzzy_samples(self, name):
+        ids = self.get_fuzzy_index('samples').search(name, limit=FUZZY_LIMIT)
         with self.session_ctx() as sess:
             q = sess.query(SampleTbl)
-            comps = self._fuzzy_sample_comps(name)
-            q = q.filter(or_(*comps))
-            return self._query_all(q, verbose_query=True)
+            q = q.filter(SampleTbl.id.in_(ids))
+            return self._rank_fuzzy(self._query_all(q), ids)
 
     def get_fuzzy_labnumbers(self, search_str):
+        ip_ids = self.get_fuzzy_index('identifiers').prefix(search_str, limit=FUZZY_LIMIT)
+        sidx = self.get_fuzzy_index('samples')
+        sample_ids = sidx.search(search_str, limit=FUZZY_LIMIT)
         with self.session_ctx() as sess:
             q = sess.query(IrradiationPositionTbl)
             q = q.join(SampleTbl)
@@ -754,9 +769,10 @@ class DVCDatabase(DatabaseAdapter):
 
             q = q.distinct(IrradiationPositionTbl.id)
 
-            comps = [IrradiationPositionTbl.identifier.like('{}%'.format(search_str)),
+            comps = [IrradiationPositionTbl.id.in_(ip_ids),
+                     SampleTbl.id.in_(sample_ids),
                      ProjectTbl.name == search_str,
-                     ProjectTbl.id == search_str] + self._fuzzy_sample_comps(search_str)
+                     ProjectTbl.id == search_str]
 
             f = or_(*comps)
             q = q.filter(f)
@@ -765,8 +781,8 @@ class DVCDatabase(DatabaseAdapter):
             q = sess.query(ProjectTbl)
             q = q.join(SampleTbl)
             q = q.join(IrradiationPositionTbl)
-            f = or_(IrradiationPositionTbl.identifier.like('{}%'.format(search_str)),
-                    SampleTbl.name.like('{}%'.format(search_str)), )
+            f = or_(IrradiationPositionTbl.id.in_(ip_ids),
+                    SampleTbl.id.in_(sidx.prefix(search_str, limit=FUZZY_LIMIT)))
             q = q.filter(f)
             ps = self._query_all(q)
             return ips, ps
@@ -977,6 +993,7 @@ class DVCDatabase(DatabaseAdapter):
             q = q.filter(ParameterTbl.name == name)
             return self._query_one(q)
 
+    @cached_query(ttl=600, tables=('ParameterTbl',))
     def get_search_attributes(self):
         with self.session_ctx() as sess:
             q = sess.query(ParameterTbl.name)
@@ -1407,6 +1424,64 @@ class DVCDatabase(DatabaseAdapter):
             tc = q.count()
             return self._query_all(q, verbose_query=verbose_query), tc
 
+    def get_labnumber_analyses_page(self, lns, after=None, page_size=200, order='asc', verbose_query=False, **kw):
+        """
+        one page of the analyses of ``lns`` as lightweight AnalysisRows.
+
+        pages are keyed on (timestamp, id) so fetching the next page is an index range scan instead of an OFFSET.
+        pass the ``key`` of the last row of the previous page as ``after``.
+
+        :return: rows, has_more
+        """
+        with self.session_ctx() as sess:
+            cols = (AnalysisTbl.id, AnalysisTbl.uuid, AnalysisTbl.timestamp, AnalysisTbl.aliquot,
+                    AnalysisTbl.increment, AnalysisTbl.analysis_type, AnalysisTbl.mass_spectrometer,
+                    AnalysisTbl.extract_device, AnalysisTbl.extract_value, AnalysisTbl.extract_units,
+                    AnalysisTbl.cleanup, AnalysisTbl.pre_cleanup, AnalysisTbl.post_cleanup, AnalysisTbl.duration,
+                    AnalysisTbl.weight, AnalysisTbl.comment, AnalysisTbl.measurementName, AnalysisTbl.extractionName,
+                    IrradiationPositionTbl.identifier, IrradiationPositionTbl.position, IrradiationPositionTbl.packet,
+                    LevelTbl.name, IrradiationTbl.name, SampleTbl.name, MaterialTbl.name, ProjectTbl.name,
+                    AnalysisChangeTbl.tag)
+
+            q = sess.query(*cols)
+            q = q.select_from(AnalysisTbl)
+            q = q.join(IrradiationPositionTbl, AnalysisTbl.irradiation_positionID == IrradiationPositionTbl.id)
+            q = q.outerjoin(LevelTbl, IrradiationPositionTbl.levelID == LevelTbl.id)
+            q = q.outerjoin(IrradiationTbl, LevelTbl.irradiationID == IrradiationTbl.id)
+            q = q.outerjoin(SampleTbl, IrradiationPositionTbl.sampleID == SampleTbl.id)
+            q = q.outerjoin(MaterialTbl, SampleTbl.materialID == MaterialTbl.id)
+            q = q.outerjoin(ProjectTbl, SampleTbl.projectID == ProjectTbl.id)
+            q = q.outerjoin(AnalysisChangeTbl, AnalysisChangeTbl.analysisID == AnalysisTbl.id)
+            q = self._labnumber_analyses_filter(q, lns, **kw)
+
+            ts, aid = AnalysisTbl.timestamp, AnalysisTbl.id
+            if after is not None:
+                t, i = after
+                if order == 'desc':
+                    q = q.filter(or_(ts < t, and_(ts == t, aid < i)))
+                else:
+                    q = q.filter(or_(ts > t, and_(ts == t, aid > i)))
+
+            q = q.order_by(getattr(ts, order)(), getattr(aid, order)())
+            # one extra row tells us if there is another page without a count
+            q = q.limit(page_size + 1)
+
+            rows = [AnalysisRow(r) for r in self._query_all(q, verbose_query=verbose_query)]
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            if rows:
+                self._bind_analysis_rows(sess, rows)
+            return rows, has_more
+
+    def count_labnumber_analyses(self, lns, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(func.count(AnalysisTbl.id))
+            q = q.join(IrradiationPositionTbl, AnalysisTbl.irradiation_positionID == IrradiationPositionTbl.id)
+            if kw.get('omit_key') or not kw.get('include_invalid'):
+                q = q.outerjoin(AnalysisChangeTbl, AnalysisChangeTbl.analysisID == AnalysisTbl.id)
+            q = self._labnumber_analyses_filter(q, lns, **kw)
+            return q.scalar()
+
     def get_repository_date_range(self, names):
         with self.session_ctx() as sess:
             q = sess.query(AnalysisTbl.timestamp)
@@ -1414,6 +1489,7 @@ class DVCDatabase(DatabaseAdapter):
             q = q.filter(RepositoryAssociationTbl.repository.in_(names))
             return self._get_date_range(q)
 
+    @cached_query(ttl=60, tables=('AnalysisTbl', 'IrradiationPositionTbl', 'SampleTbl', 'ProjectTbl'))
     def get_project_date_range(self, names):
         with self.session_ctx() as sess:
             q = sess.query(AnalysisTbl.timestamp)
@@ -1917,6 +1993,7 @@ class DVCDatabase(DatabaseAdapter):
     def get_loads(self):
         return self._retrieve_items(LoadTbl, order=LoadTbl.create_date.desc())
 
+    @cached_query(ttl=300, tables=('LoadTbl',))
     def get_load_names(self, names=None, exclude_archived=True, **kw):
         with self.session_ctx():
             if 'order' not in kw:
@@ -1973,6 +2050,7 @@ class DVCDatabase(DatabaseAdapter):
         order = PrincipalInvestigatorTbl.last_name.asc()
         return self._get_table_names(PrincipalInvestigatorTbl, order=order)
 
+    @cached_query(ttl=300, tables=('PrincipalInvestigatorTbl',))
     def get_principal_investigators(self, order=None, **kw):
         if order:
             order = getattr(PrincipalInvestigatorTbl.last_name, order)()
@@ -2093,6 +2171,8 @@ class DVCDatabase(DatabaseAdapter):
                 lns = sorted(lns)
         return lns
 
+    @cached_query(ttl=300, tables=('IrradiationTbl', 'LevelTbl', 'IrradiationPositionTbl', 'SampleTbl', 'ProjectTbl',
+                                   'AnalysisTbl'))
     def get_irradiation_names(self, **kw):
         names = []
         with self.session_ctx():
@@ -2201,6 +2281,7 @@ class DVCDatabase(DatabaseAdapter):
     def get_extract_devices(self):
         return self._retrieve_items(ExtractDeviceTbl)
 
+    @cached_query(ttl=600, tables=('MassSpectrometerTbl',))
     def get_mass_spectrometer_names(self):
         with self.session_ctx():
             ms = self.get_mass_spectrometers()
@@ -2323,7 +2404,103 @@ class DVCDatabase(DatabaseAdapter):
                     units = self.add_units(name)
             c.units = units
 
+    def invalidate_query_cache(self, *tables):
+        if not tables:
+            self._fuzzy_indices = None
+        return super(DVCDatabase, self).invalidate_query_cache(*tables)
+
     # private
+    def _handle_after_flush(self, sess, flush_context):
+        super(DVCDatabase, self)._handle_after_flush(sess, flush_context)
+
+        if self._fuzzy_indices:
+            kinds = {t.__tablename__: (k, attr) for k, (t, attr) in FUZZY_INDEX_COLUMNS.items()}
+            deleted = sess.deleted
+            for obj in chain(sess.new, sess.dirty, deleted):
+                try:
+                    kind, attr = kinds[obj.__tablename__]
+                    idx, _ = self._fuzzy_indices[kind]
+                except (AttributeError, KeyError):
+                    continue
+
+                if obj in deleted:
+                    idx.remove(obj.id)
+                else:
+                    idx.add(obj.id, getattr(obj, attr) or '')
+
+    def _rank_fuzzy(self, objs, ids):
+        """
+            order ``objs`` by the rank of their primary key in ``ids``
+        """
+        ranks = {pid: i for i, pid in enumerate(ids)}
+        n = len(ranks)
+        return sorted(objs, key=lambda o: ranks.get(o.id, n))
+
+    def _labnumber_analyses_filter(self, q, lns, low_post=None, high_post=None,
+                                   omit_key=None, exclude_uuids=None,
+                                   include_invalid=False,
+                                   mass_spectrometers=None,
+                                   repositories=None,
+                                   loads=None):
+        """
+        filters shared by the paged and count queries. repositories and loads are filtered with subqueries so the
+        analysis rows are not multiplied by the associations
+        """
+        q = in_func(q, AnalysisTbl.mass_spectrometer, mass_spectrometers)
+        q = in_func(q, IrradiationPositionTbl.identifier, lns)
+
+        if repositories:
+            sq = q.session.query(RepositoryAssociationTbl.analysisID)
+            sq = in_func(sq, RepositoryAssociationTbl.repository, repositories)
+            q = q.filter(AnalysisTbl.id.in_(sq.statement))
+
+        if loads:
+            sq = q.session.query(MeasuredPositionTbl.analysisID)
+            sq = in_func(sq, MeasuredPositionTbl.loadName, loads)
+            q = q.filter(AnalysisTbl.id.in_(sq.statement))
+
+        if low_post:
+            q = q.filter(AnalysisTbl.timestamp >= low_post)
+
+        if high_post:
+            q = q.filter(AnalysisTbl.timestamp <= high_post)
+
+        if exclude_uuids:
+            q = q.filter(not_(AnalysisTbl.uuid.in_(exclude_uuids)))
+
+        if not include_invalid:
+            q = q.filter(AnalysisChangeTbl.tag != 'invalid')
+
+        if omit_key:
+            q = q.filter(AnalysisChangeTbl.tag != omit_key)
+
+        return q
+
+    def _bind_analysis_rows(self, sess, rows):
+        """
+        fill in the repositories and measured positions of a page of AnalysisRows with one query each
+        """
+        rd = {r.id: r for r in rows}
+        ids = list(rd)
+
+        q = sess.query(RepositoryAssociationTbl.analysisID, RepositoryAssociationTbl.repository)
+        q = q.filter(RepositoryAssociationTbl.analysisID.in_(ids))
+        for aid, repo in self._query_all(q):
+            rd[aid].repository_ids.append(repo)
+
+        q = sess.query(MeasuredPositionTbl.analysisID, MeasuredPositionTbl.position,
+                       MeasuredPositionTbl.loadName, LoadTbl.holderName)
+        q = q.outerjoin(LoadTbl, MeasuredPositionTbl.loadName == LoadTbl.name)
+        q = q.filter(MeasuredPositionTbl.analysisID.in_(ids))
+        q = q.order_by(MeasuredPositionTbl.id.asc())
+        for aid, pos, load_name, holder in self._query_all(q):
+            r = rd[aid]
+            if pos:
+                r.position = '{},{}'.format(r.position, pos) if r.position else '{}'.format(pos)
+            if not r.load_name:
+                r.load_name = load_name or ''
+                r.load_holder = holder or ''
+
     def _get_date_range(self, q, asc=None, desc=None, hours=0):
         if asc is None:
             asc = AnalysisTbl.timestamp.asc()
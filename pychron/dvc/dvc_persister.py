@@ -18,17 +18,20 @@ import hashlib
 import os
 import shutil
 from datetime import datetime
+from threading import RLock
 
 from apptools.preferences.preference_binding import bind_preference
 from git.exc import GitCommandError
 # ============= enthought library imports =======================
-from traits.api import Instance, Bool, Str
+from traits.api import Instance, Bool, Str, Int
 from uncertainties import std_dev, nominal_value
 from yaml import YAMLError
 
 from pychron.core.helpers.binpack import encode_blob, pack
 from pychron.core.yaml import yload
 from pychron.dvc import dvc_dump, analysis_path, repository_path, NPATH_MODIFIERS
+from pychron.dvc.commit_pipeline import CommitPipeline, pull_path
+from pychron.dvc.data_sidecar import dump_data_sidecar, exclude_sidecars
 from pychron.experiment.automated_run.persistence import BasePersister
 from pychron.git_archive.repo_manager import GitRepoManager
 from pychron.paths import paths
@@ -55,6 +58,7 @@ class DVCPersister(BasePersister):
     dvc = Instance(DVC_PROTOCOL)
     use_isotope_classifier = Bool(False)
     use_uuid_path_name = Bool(True)
+    use_data_sidecar = Bool(False)
     # isotope_classifier = Instance(IsotopeClassifier, ())
     stage_files = Bool(True)
     default_principal_investigator = Str
@@ -63,10 +67,21 @@ class DVCPersister(BasePersister):
     save_log_enabled = Bool(False)
     arar_mapping = None
 
+    # commit and push on a background thread
+    use_deferred_commit = Bool(False)
+    commit_push_count = Int(5)
+    commit_push_period = Int(300)
+    commit_pipeline = Instance(CommitPipeline)
+
     def __init__(self, bind=True, *args, **kw):
         super(DVCPersister, self).__init__(*args, **kw)
+        self._lock = RLock()
         if bind:
             bind_preference(self, 'use_uuid_path_name', 'pychron.experiment.use_uuid_path_name')
+            bind_preference(self, 'use_data_sidecar', 'pychron.dvc.use_data_sidecar')
+            bind_preference(self, 'use_deferred_commit', 'pychron.dvc.experiment.use_deferred_commit')
+            bind_preference(self, 'commit_push_count', 'pychron.dvc.experiment.commit_push_count')
+            bind_preference(self, 'commit_push_period', 'pychron.dvc.experiment.commit_push_period')
 
         self._load_arar_mapping()
 
@@ -82,11 +97,23 @@ class DVCPersister(BasePersister):
         self.post_measurement_save(commit=commit, commit_tag=commit_tag, push=push)
 
     def push(self):
+        if self.commit_pipeline:
+            self.commit_pipeline.flush(block=True)
+            return
+
         # push changes
         self.dvc.push_repository(self.active_repository)
         # push commit
         self.dvc.meta_push()
 
+    def flush_commits(self, block=False, timeout=None):
+        """
+            push all analyses waiting in the commit pipeline
+        """
+        if self.commit_pipeline:
+            self.debug('flush commits. {}'.format(self.commit_pipeline.report()))
+            return self.commit_pipeline.flush(block=block, timeout=timeout)
+
     def initialize(self, repository, pull=True):
         """
         setup git repos.
@@ -98,18 +125,26 @@ class DVCPersister(BasePersister):
         """
         self.debug('^^^^^^^^^^^^^ Initialize DVCPersister {} pull={}'.format(repository, pull))
 
-        self.dvc.initialize()
+        if self.use_deferred_commit and self.stage_files:
+            # recovers any work left in the journal
+            self._get_commit_pipeline()
 
-        repository = format_repository_identifier(repository)
-        self.active_repository = repo = GitRepoManager()
+        # wait for the commit pipeline if it is using the repositories
+        with self._lock:
+            self.dvc.initialize()
 
-        root = repository_path(repository)
-        repo.open_repo(root)
+            repository = format_repository_identifier(repository)
+            self.active_repository = repo = GitRepoManager()
+
+            root = repository_path(repository)
+            repo.open_repo(root)
+            if self.use_data_sidecar:
+                exclude_sidecars(root)
 
-        remote = 'origin'
-        if repo.has_remote(remote) and pull:
-            self.info('pulling changes from repo: {}'.format(repository))
-            self.active_repository.pull(remote=remote, use_progress=False)
+            remote = 'origin'
+            if repo.has_remote(remote) and pull:
+                self.info('pulling changes from repo: {}'.format(repository))
+                self.active_repository.pull(remote=remote, use_progress=False)
 
     def pre_extraction_save(self):
         pass
@@ -178,7 +213,8 @@ class DVCPersister(BasePersister):
         obj['commit'] = str(hexsha)
 
         path = self._make_path(modifier='extraction')
-        dvc_dump(obj, path)
+        with self._lock:
+            dvc_dump(obj, path)
         self.info('================= post extraction save finished =================')
 
     def pre_measurement_save(self):
@@ -199,96 +235,77 @@ class DVCPersister(BasePersister):
         ret = True
 
         ar = self.active_repository
+        dvc = self.dvc
 
-        # save spectrometer
-        spec_sha = self._get_spectrometer_sha()
-        spec_path = os.path.join(ar.path, '{}.json'.format(spec_sha))
-        if not os.path.isfile(spec_path):
-            self._save_spectrometer_file(spec_path)
+        # the commit pipeline pulls and commits these repositories on its worker. hold the lock while writing
+        with self._lock:
+            # save spectrometer
+            spec_sha = self._get_spectrometer_sha()
+            spec_path = os.path.join(ar.path, '{}.json'.format(spec_sha))
+            if not os.path.isfile(spec_path):
+                self._save_spectrometer_file(spec_path)
 
-        # self.dvc.meta_repo.save_gains(self.per_spec.run_spec.mass_spectrometer,
-        #                               self.per_spec.gains)
+            # self.dvc.meta_repo.save_gains(self.per_spec.run_spec.mass_spectrometer,
+            #                               self.per_spec.gains)
 
-        # save analysis
+            # save analysis
 
-        if not self.per_spec.timestamp:
-            timestamp = datetime.now()
-        else:
-            timestamp = self.per_spec.timestamp
+            if not self.per_spec.timestamp:
+                timestamp = datetime.now()
+            else:
+                timestamp = self.per_spec.timestamp
 
-        # check repository identifier before saving
-        # will modify repository to NoRepo if repository_identifier does not exist
-        self._check_repository_identifier()
+            # check repository identifier before saving
+            # will modify repository to NoRepo if repository_identifier does not exist
+            self._check_repository_identifier()
 
-        self._save_analysis(timestamp)
+            self._save_analysis(timestamp)
 
-        # save monitor
-        self._save_monitor()
+            # save monitor
+            self._save_monitor()
 
-        # save peak center
-        self._save_peak_center(self.per_spec.peak_center)
+            # save peak center
+            self._save_peak_center(self.per_spec.peak_center)
 
-        # stage files
-        dvc = self.dvc
+            # stage files
+            if self.stage_files and commit:
+                commits = self._get_commits(spec_path, commit_tag)
+                if self.use_deferred_commit:
+                    # one commit per tag. the history views read only the subject of each commit
+                    self._get_commit_pipeline().submit_commits(ar.path, commits,
+                                                               runid=self.per_spec.run_spec.runid,
+                                                               push=push)
+                    commit = False
 
-        if self.stage_files:
-            if commit:
-                try:
-                    ar.smart_pull(accept_their=True)
+        if self.stage_files and commit:
+            try:
+                ar.smart_pull(accept_their=True)
 
-                    paths = [spec_path, ] + [self._make_path(modifier=m) for m in NPATH_MODIFIERS]
+                for ps, msg in commits:
+                    for p in ps:
+                        ar.add(p, commit=False)
+                    ar.commit(msg)
 
-                    for p in paths:
-                        if os.path.isfile(p):
-                            ar.add(p, commit=False)
-                        else:
-                            self.debug('not at valid file {}'.format(p))
+                if push:
+                    # push changes
+                    dvc.push_repository(ar)
 
-                    # commit files
-                    ar.commit('<{}>'.format(commit_tag))
+                # update meta
+                dvc.meta_pull(accept_our=True)
 
-                    # commit default data reduction
-                    add = False
-                    p = self._make_path('intercepts')
-                    if os.path.isfile(p):
-                        ar.add(p, commit=False)
-                        add = True
+                dvc.meta_commit('repo updated for analysis {}'.format(self.per_spec.run_spec.runid))
 
-                    p = self._make_path('baselines')
-                    if os.path.isfile(p):
-                        ar.add(p, commit=False)
-                        add = True
-
-                    if add:
-                        ar.commit('<ISOEVO> default collection fits')
-
-                    for pp, tag, msg in (('blanks', 'BLANKS',
-                                          'preceding {}'.format(self.per_spec.previous_blank_runid)),
-                                         ('icfactors', 'ICFactor', 'default')):
-                        p = self._make_path(pp)
-                        if os.path.isfile(p):
-                            ar.add(p, commit=False)
-                            ar.commit('<{}> {}'.format(tag, msg))
-                    if push:
-                        # push changes
-                        dvc.push_repository(ar)
-
-                    # update meta
-                    dvc.meta_pull(accept_our=True)
-
-                    dvc.meta_commit('repo updated for analysis {}'.format(self.per_spec.run_spec.runid))
-
-                    if push:
-                        # push commit
-                        dvc.meta_push()
-                except GitCommandError as e:
-                    self.warning(e)
-                    if self.confirmation_dialog('NON FATAL\n\n'
-                                                'DVC/Git upload of analysis not successful.'
-                                                'Do you want to CANCEL the experiment?\n',
-                                                timeout_ret=False,
-                                                timeout=30):
-                        ret = False
+                if push:
+                    # push commit
+                    dvc.meta_push()
+            except GitCommandError as e:
+                self.warning(e)
+                if self.confirmation_dialog('NON FATAL\n\n'
+                                            'DVC/Git upload of analysis not successful.'
+                                            'Do you want to CANCEL the experiment?\n',
+                                            timeout_ret=False,
+                                            timeout=30):
+                    ret = False
 
         with dvc.session_ctx():
             ret = self._save_analysis_db(timestamp)
@@ -301,14 +318,91 @@ class DVCPersister(BasePersister):
             self.debug('saving run log file')
 
             npath = self._make_path('logs', '.log')
-            shutil.copyfile(path, npath)
             ar = self.active_repository
+            with self._lock:
+                shutil.copyfile(path, npath)
+                if self.commit_pipeline:
+                    self.commit_pipeline.submit(ar.path, [npath], '<COLLECTION> log',
+                                                runid=self.per_spec.run_spec.runid)
+                    return
+
             ar.smart_pull(accept_their=True)
             ar.add(npath, commit=False)
             ar.commit('<COLLECTION> log')
             self.dvc.push_repository(ar)
 
     # private
+    def _get_commits(self, spec_path, commit_tag):
+        """
+            return a list of (paths, message). one item per commit
+        """
+        ps = []
+        for p in [spec_path, ] + [self._make_path(modifier=m) for m in NPATH_MODIFIERS]:
+            if os.path.isfile(p):
+                ps.append(p)
+            else:
+                self.debug('not at valid file {}'.format(p))
+
+        # commit files
+        commits = [(ps, '<{}>'.format(commit_tag))]
+
+        # commit default data reduction
+        ps = [p for p in (self._make_path('intercepts'), self._make_path('baselines')) if os.path.isfile(p)]
+        if ps:
+            commits.append((ps, '<ISOEVO> default collection fits'))
+
+        for pp, tag, msg in (('blanks', 'BLANKS',
+                              'preceding {}'.format(self.per_spec.previous_blank_runid)),
+                             ('icfactors', 'ICFactor', 'default')):
+            p = self._make_path(pp)
+            if os.path.isfile(p):
+                commits.append(([p], '<{}> {}'.format(tag, msg)))
+        return commits
+
+    def _get_commit_pipeline(self):
+        cp = self.commit_pipeline
+        if cp is None:
+            cp = CommitPipeline(os.path.join(paths.dvc_dir, 'commit_journal.jsonl'),
+                                push_func=self._push_repository_path,
+                                meta_func=self._sync_meta,
+                                push_count=self.commit_push_count,
+                                push_period=self.commit_push_period,
+                                lock=self._lock)
+            cp.start()
+            self.commit_pipeline = cp
+        return cp
+
+    # called on the commit pipeline's worker. no dialogs
+    def _push_repository_path(self, root):
+        repo = GitRepoManager()
+        repo.open_repo(root)
+        if not repo.has_remote():
+            return True
+
+        if not pull_path(root):
+            self.warning('failed rebasing {} onto its remote. will retry'.format(root))
+            return False
+
+        self.dvc.push_repository(repo)
+        return not repo.has_unpushed_commits()
+
+    def _sync_meta(self, runids):
+        dvc = self.dvc
+        if not pull_path(dvc.meta_repo.path):
+            self.warning('failed rebasing the meta repo onto its remote. will retry')
+            return
+
+        dvc.meta_commit('repo updated for analysis {}'.format(', '.join(runids)))
+        dvc.meta_push()
+
+    def _commit_push_count_changed(self, new):
+        if self.commit_pipeline:
+            self.commit_pipeline.push_count = new
+
+    def _commit_push_period_changed(self, new):
+        if self.commit_pipeline:
+            self.commit_pipeline.push_period = new
+
     def _load_arar_mapping(self):
         """
         Isotope: IsotopeKey
@@ -567,6 +661,7 @@ class DVCPersister(BasePersister):
         obj['isotopes'] = isos
         obj['spec_sha'] = self._get_spectrometer_sha()
         obj['intensity_scalar'] = per_spec.intensity_scalar
+        obj['measurement_timing'] = per_spec.measurement_timing
         obj['source'] = source
         # save the conditionals
         obj['conditionals'] = [c.to_dict() for c in per_spec.conditionals] if \
@@ -576,12 +671,13 @@ class DVCPersister(BasePersister):
 
         # save the scripts
         ms = per_spec.run_spec.mass_spectrometer
-        for si in ('measurement', 'extraction', 'post_measurement', 'post_equilibration', 'hops'):
-            name = getattr(per_spec, '{}_name'.format(si))
-            blob = getattr(per_spec, '{}_blob'.format(si))
-            if name:
-                self.dvc.meta_repo.update_script(ms, name, blob)
-            obj[si] = name
+        with self._lock:
+            for si in ('measurement', 'extraction', 'post_measurement', 'post_equilibration', 'hops'):
+                name = getattr(per_spec, '{}_name'.format(si))
+                blob = getattr(per_spec, '{}_blob'.format(si))
+                if name:
+                    self.dvc.meta_repo.update_script(ms, name, blob)
+                obj[si] = name
 
         # save keys for the arar isotopes
         akeys = self.arar_mapping
@@ -624,6 +720,8 @@ class DVCPersister(BasePersister):
                 'format': '{}ff'.format(endianness),
                 'signals': signals, 'baselines': baselines, 'sniffs': sniffs}
         dvc_dump(data, p)
+        if self.use_data_sidecar:
+            dump_data_sidecar(p, data)
 
     def _save_macrochron(self, obj):
         pass
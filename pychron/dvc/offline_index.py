@@ -1,268 +1,832 @@
-# # ===============================================================================
-# # Copyright 2015 Jake Ross
-# #
-# # Licensed under the Apache License, Version 2.0 (the "License");
-# # you may not use this file except in compliance with the License.
-# # You may obtain a copy of the License at
-# #
-# # http://www.apache.org/licenses/LICENSE-2.0
-# #
-# # Unless required by applicable law or agreed to in writing, software
-# # distributed under the License is distributed on an "AS IS" BASIS,
-# # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
-# # See the License for the specific language governing permissions and
-# # limitations under the License.
-# # ===============================================================================
-#
-# # ============= enthought library imports =======================
-# import os
-#
-# from traits.api import provides
-#
-# # ============= standard library imports ========================
-# from sqlalchemy import Column, String, Integer, Float, distinct, DateTime
-# from sqlalchemy.ext.declarative import declarative_base, declared_attr
-# # ============= local library imports  ==========================
-# from pychron.database.core.database_adapter import DatabaseAdapter
-# from pychron.database.i_browser import IBrowser
-# from pychron.experiment.utilities.identifier import make_step
-#
-# Base = declarative_base()
-#
-#
-# class NoSchemaError(BaseException):
-#     pass
-#
-#
-# class DVCIndex(object):
-#     @declared_attr
-#     def __tablename__(self):
-#         return self.__name__
-#
-#     id = Column(Integer, primary_key=True)
-#     repo = Column(String(200))
-#
-#
-# class AnalysisIndex(DVCIndex, Base):
-#     identifier = Column(String(80))
-#     aliquot = Column(Integer)
-#     increment = Column(Integer)
-#     cleanup = Column(Float)
-#     duration = Column(Float)
-#     extract_value = Column(Float)
-#     uuid = Column(String(36))
-#     analysis_type = Column(String(40))
-#     position = Column(String(120))
-#
-#     measurement_script = Column(String(80))
-#     extraction_script = Column(String(80))
-#
-#     mass_spectrometer = Column(String(80))
-#     extract_device = Column(String(80))
-#
-#     sample = Column(String(80))
-#     project = Column(String(80))
-#     material = Column(String(80))
-#
-#     irradiation = Column(String(80))
-#     irradiation_level = Column(String(80))
-#     irradiation_position = Column(String(80))
-#
-#     tag = Column(String(80))
-#     analysis_timestamp = Column(DateTime)
-#
-#     measurement = None
-#     extraction = None
-#
-#     @property
-#     def labnumber(self):
-#         return LabnumberRecord(self)
-#
-#     @property
-#     def step(self):
-#         return make_step(self.increment)
-#
-#
-# class MassSpecRecord(object):
-#     __slots__ = ['name']
-#
-#     def __init__(self, name):
-#         self.name = name
-#
-#
-# class ProjectRecord(object):
-#     __slots__ = ['name']
-#
-#     def __init__(self, name):
-#         self.name = name
-#
-#
-# class SampleObject(object):
-#     def __init__(self, sample, project, material):
-#         self.material = material
-#         self.project = project
-#         self.name = sample
-#
-#
-# class IrradiationPosObject(object):
-#     def __init__(self, pos, level):
-#         self.position = pos
-#         self.level = level
-#
-#
-# class LevelObject(object):
-#     def __init__(self, name, irrad):
-#         self.name = name
-#         self.irradiation = irrad
-#
-#
-# class IrradiationObject(object):
-#     def __init__(self, name):
-#         self.name = name
-#
-#
-# class LabnumberRecord(object):
-#     def __init__(self, r):
-#         self.name = r.identifier
-#         self.labnumber = r.identifier
-#         self.identifier = r.identifier
-#         self.sample = SampleObject(r.sample, r.project, r.material)
-#
-#         irrad = IrradiationObject(r.irradiation)
-#         level = LevelObject(r.irradiation_level, irrad)
-#         self.irradiation_position = IrradiationPosObject(r.irradiation_position, level)
-#
-#
-# def index_factory(path, overwrite=False):
-#     """
-#     create a new sqlite db.
-#     if path not a file or overwrite create all tables
-#     :param path:
-#     :param overwrite:
-#     :return:
-#     """
-#
-#     if os.path.isfile(path):
-#         if overwrite:
-#             os.remove(path)
-#     else:
-#         overwrite = True
-#
-#     db = IndexAdapter(path=path)
-#     db.connect()
-#     if overwrite:
-#         db.create_all(Base.metadata)
-#     return db
-#
-#
-# @provides(IBrowser)
-# class IndexAdapter(DatabaseAdapter):
-#     schema = AnalysisIndex
-#     kind = 'sqlite'
-#
-#     # irradiations = Property
-#     # levels = Property(depends_on='irradiation')
-#     # irradiation = Str
-#     # level = ''
-#
-#     # @cached_property
-#     def get_irradiations(self):
-#         with self.session_ctx() as sess:
-#             q = sess.query(distinct(AnalysisIndex.irradiation))
-#             q = q.order_by(AnalysisIndex.irradiation.asc())
-#             irs = [v[0] for v in self._query_all(q)]
-#             return irs
-#
-#     # @cached_property
-#     def get_levels(self):
-#         with self.session_ctx() as sess:
-#             q = sess.query(distinct(AnalysisIndex.irradiation_level))
-#             q = q.filter(AnalysisIndex.irradiation == self.irradiation)
-#             return [v[0] for v in self._query_all(q)]
-#
-#     # browswer protocol
-#     def get_analysis_groups(self, *args, **kw):
-#         return []
-#
-#     def get_project_labnumbers(self, project_names, filter_non_run, low_post=None, high_post=None,
-#                                analysis_types=None, mass_spectrometers=None):
-#         with self.session_ctx() as sess:
-#             q = sess.query(AnalysisIndex)
-#             q = q.filter(AnalysisIndex.project.in_(project_names))
-#             q = q.group_by(AnalysisIndex.identifier)
-#             qs = self._query_all(q)
-#
-#             return [LabnumberRecord(qi) for qi in qs]
-#
-#     def get_labnumber_analyses(self, lns, low_post=None, high_post=None,
-#                                omit_key=None, exclude_uuids=None, mass_spectrometers=None, **kw):
-#         with self.session_ctx() as sess:
-#             q = sess.query(AnalysisIndex)
-#             q = q.filter(AnalysisIndex.identifier.in_(lns))
-#             return self._query_all(q), int(q.count())
-#
-#     def get_projects(self, **kw):
-#         with self.session_ctx() as sess:
-#             q = sess.query(distinct(AnalysisIndex.project))
-#             q = q.order_by(AnalysisIndex.project.asc())
-#
-#             qs = self._query_all(q)
-#             return [ProjectRecord(v[0]) for v in qs]
-#
-#     def get_mass_spectrometers(self):
-#         with self.session_ctx() as sess:
-#             q = sess.query(distinct(AnalysisIndex.mass_spectrometer))
-#             qs = self._query_all(q)
-#             return [MassSpecRecord(v[0]) for v in qs]
-#
-#     def get_analysis_types(self):
-#         return []
-#
-#     def get_extraction_devices(self):
-#         return []
-#
-#     def get_analysis_exists(self, uuid):
-#         with self.session_ctx() as sess:
-#             q = sess.query(AnalysisIndex.uuid)
-#             q = q.filter(AnalysisIndex.uuid == uuid)
-#
-#             return self._query_one(q) is not None
-#
-#     def add_analysis_to_index(self, repopath, ai):
-#         if self.get_analysis_exists(ai.uuid):
-#             self.info('Analysis already in index: {}'.format(ai.record_id))
-#             return
-#
-#         # add to sqlite index
-#         self.add(repo=repopath,
-#                  identifier=ai.identifier,
-#                  aliquot=ai.aliquot,
-#                  increment=ai.increment,
-#                  cleanup=ai.cleanup_duration,
-#                  duration=ai.extract_duration,
-#                  extract_value=ai.extract_value,
-#                  uuid=ai.uuid,
-#                  measurement_script=ai.measurement_script_name,
-#                  extraction_script=ai.extraction_script_name,
-#                  mass_spectrometer=ai.mass_spectrometer,
-#                  extract_device=ai.extract_device,
-#                  material=ai.material,
-#                  sample=ai.sample,
-#                  project=ai.project,
-#                  irradiation=ai.irradiation,
-#                  irradiation_level=ai.irradiation_level,
-#                  irradiation_position=ai.irradiation_position,
-#                  tag=ai.tag,
-#                  position=ai.position,
-#                  analysis_timestamp=ai.rundate,
-#                  analysis_type=ai.analysis_type)
-#
-#     def add(self, **kw):
-#         if self.schema is None:
-#             raise NoSchemaError()
-#
-#         with self.session_ctx():
-#             obj = self.schema(**kw)
-#             self._add_item(obj)
-#
-# # ============= EOF =============================================
+# ===============================================================================
+# Copyright 2015 Jake Ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from traits.api import Str, Instance
+
+# ============= standard library imports ========================
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+
+from git import Repo, GitCommandError
+from sqlalchemy import Column, String, Integer, Float, DateTime, distinct, not_, or_, and_
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
+from sqlalchemy.orm import relationship
+# ============= local library imports  ==========================
+from pychron.core.helpers.datetime_tools import make_timef
+from pychron.core.utils import alphas
+from pychron.database.core.database_adapter import DatabaseAdapter
+from pychron.database.core.query import in_func
+from pychron.experiment.utilities.identifier import make_runid
+from pychron.git_archive.repo_manager import get_repository_head
+from pychron.loggable import Loggable
+from pychron.paths import paths
+
+Base = declarative_base()
+
+EXTRACTION_SUFFIX = '.extr.json'
+TAG_SUFFIX = '.tags.json'
+
+# DVCDatabase queries the IndexAdapter can answer
+BROWSER_QUERIES = ('get_labnumber_analyses', 'get_labnumber_analyses_page', 'count_labnumber_analyses',
+                   'get_analyses_by_date_range', 'get_labnumbers',
+                   'get_project_labnumbers', 'get_labnumbers_startswith', 'get_samples', 'get_projects',
+                   'get_principal_investigators', 'get_analysis_types', 'get_repository_identifiers',
+                   'get_mass_spectrometers', 'get_mass_spectrometer_names', 'get_extract_devices',
+                   'get_analysis_groups')
+
+
+class DVCIndex(object):
+    @declared_attr
+    def __tablename__(self):
+        return self.__name__
+
+    id = Column(Integer, primary_key=True)
+
+
+class IndexStateTbl(DVCIndex, Base):
+    """
+        the commit each repository was last indexed at
+    """
+    name = Column(String(140), unique=True)
+    kind = Column(String(20))
+    hexsha = Column(String(40))
+    timestamp = Column(DateTime)
+
+
+class IrradiationPositionIndex(DVCIndex, Base):
+    identifier = Column(String(80), index=True)
+    irradiation = Column(String(80))
+    level = Column(String(80))
+    position = Column(Integer)
+    packet = Column(String(40))
+
+
+class AnalysisIndex(DVCIndex, Base):
+    repository = Column(String(140), index=True)
+    path = Column(String(200))
+
+    uuid = Column(String(36), index=True)
+    identifier = Column(String(80), index=True)
+    aliquot = Column(Integer)
+    increment = Column(Integer)
+    analysis_type = Column(String(40))
+    mass_spectrometer = Column(String(80))
+    timestamp = Column(DateTime, index=True)
+    comment = Column(String(200))
+
+    extract_device = Column(String(80))
+    extract_value = Column(Float)
+    extract_units = Column(String(45))
+    cleanup = Column(Float)
+    pre_cleanup = Column(Float)
+    post_cleanup = Column(Float)
+    duration = Column(Float)
+    weight = Column(Float)
+    position = Column(String(120))
+    load_name = Column(String(80))
+    load_holder = Column(String(80))
+
+    sample = Column(String(80))
+    project = Column(String(80))
+    material = Column(String(80))
+    grainsize = Column(String(80))
+    principal_investigator = Column(String(140))
+
+    tag_name = Column(String(80))
+
+    irradiation_position = relationship(IrradiationPositionIndex,
+                                        primaryjoin='foreign(AnalysisIndex.identifier)=='
+                                                    'IrradiationPositionIndex.identifier',
+                                        uselist=False, viewonly=True, lazy='joined')
+
+    # mirror the AnalysisTbl interface used by the browser and DVC.make_analyses
+    group_id = 0
+    frozen = False
+    delta_time = 0
+    review_status = None
+    is_plateau_step = None
+    use_repository_suffix = False
+    meas_script_name = ''
+    extract_script_name = ''
+    _temporary_tag = None
+
+    @property
+    def key(self):
+        return self.timestamp, self.id
+
+    @property
+    def repository_identifier(self):
+        return self.repository
+
+    @property
+    def repository_ids(self):
+        return [self.repository]
+
+    @property
+    def record_id(self):
+        return make_runid(self.identifier, self.aliquot, self.increment)
+
+    @property
+    def step(self):
+        return alphas(self.increment)
+
+    @property
+    def tag(self):
+        return self._temporary_tag or self.tag_name or 'ok'
+
+    def set_tag(self, t):
+        self._temporary_tag = t
+
+    @property
+    def rundate(self):
+        return self.timestamp
+
+    @property
+    def analysis_timestamp(self):
+        return self.timestamp
+
+    @property
+    def timestampf(self):
+        return make_timef(self.timestamp)
+
+    @property
+    def display_uuid(self):
+        return (self.uuid or '')[:8]
+
+    @property
+    def irradiation(self):
+        ip = self.irradiation_position
+        return ip.irradiation if ip else ''
+
+    @property
+    def irradiation_level(self):
+        ip = self.irradiation_position
+        return ip.level if ip else ''
+
+    @property
+    def irradiation_position_position(self):
+        ip = self.irradiation_position
+        return ip.position if ip else ''
+
+    @property
+    def packet(self):
+        ip = self.irradiation_position
+        return ip.packet or '' if ip else ''
+
+    @property
+    def irradiation_info(self):
+        return '{}{} {}'.format(self.irradiation, self.irradiation_level, self.irradiation_position_position)
+
+    @property
+    def labnumber(self):
+        return LabnumberRecord(self)
+
+    def get_load_name(self):
+        return self.load_name or ''
+
+    def get_load_holder(self):
+        return self.load_holder or ''
+
+    def bind(self):
+        pass
+
+
+class NameRecord(object):
+    def __init__(self, name, **kw):
+        self.name = name
+        for k, v in kw.items():
+            setattr(self, k, v)
+
+
+def project_id(name):
+    """
+        stable id for a project name. the index has no project table
+    """
+    return zlib.crc32(name.encode('utf-8'))
+
+
+class ProjectRecord(NameRecord):
+    """
+        duck types ProjectTbl for ProjectRecordView
+    """
+
+    def __init__(self, name, principal_investigator=None):
+        super(ProjectRecord, self).__init__(name, principal_investigator=principal_investigator)
+        self.id = project_id(name)
+        self.checkin_date = None
+        self.comment = ''
+        self.lab_contact = ''
+        self.institution = ''
+
+
+class SampleRecord(object):
+    def __init__(self, r):
+        self.name = r.sample
+        self.material = NameRecord(r.material, grainsize=r.grainsize)
+        pi = NameRecord(r.principal_investigator) if r.principal_investigator else None
+        self.project = ProjectRecord(r.project, principal_investigator=pi) if r.project else None
+
+
+class LabnumberRecord(object):
+    """
+        duck types IrradiationPositionTbl for LabnumberRecordView
+    """
+
+    def __init__(self, r):
+        self.identifier = r.identifier
+        self.sample = SampleRecord(r)
+
+        self.position = r.irradiation_position_position
+        self.packet = r.packet
+        self.level = None
+        if r.irradiation_level:
+            self.level = NameRecord(r.irradiation_level, irradiation=NameRecord(r.irradiation))
+
+
+def index_factory(path, overwrite=False):
+    """
+    open the sqlite index at path. missing tables are created
+    :param path:
+    :param overwrite: remove an existing index first
+    :return:
+    """
+
+    if overwrite and os.path.isfile(path):
+        os.remove(path)
+
+    db = IndexAdapter(path=path)
+    db.connect()
+    with db.session_ctx():
+        db.create_all(Base.metadata)
+    return db
+
+
+class IndexAdapter(DatabaseAdapter):
+    """
+        sqlite index of the analyses in the local repositories. provides the subset of the DVCDatabase query
+        interface used by the browser so browsing does not require the central database
+    """
+    kind = 'sqlite'
+
+    # browser queries
+    def get_labnumber_analyses(self, lns,
+                               low_post=None, high_post=None,
+                               omit_key=None, exclude_uuids=None,
+                               include_invalid=False,
+                               mass_spectrometers=None,
+                               repositories=None,
+                               loads=None,
+                               order='asc',
+                               limit=None,
+                               verbose_query=False):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = self._labnumber_analyses_filter(q, lns, low_post, high_post, omit_key, exclude_uuids,
+                                                include_invalid, mass_spectrometers, repositories, loads)
+            tc = q.count()
+            q = self._order_limit(q, order, limit)
+            return self._query_all(q, verbose_query=verbose_query), tc
+
+    def get_labnumber_analyses_page(self, lns, after=None, page_size=200, order='asc', verbose_query=False, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = self._labnumber_analyses_filter(q, lns, **kw)
+
+            ts, aid = AnalysisIndex.timestamp, AnalysisIndex.id
+            if after is not None:
+                t, i = after
+                if order == 'desc':
+                    q = q.filter(or_(ts < t, and_(ts == t, aid < i)))
+                else:
+                    q = q.filter(or_(ts > t, and_(ts == t, aid > i)))
+
+            q = q.order_by(getattr(ts, order)(), getattr(aid, order)())
+            q = q.limit(page_size + 1)
+            rows = self._query_all(q, verbose_query=verbose_query)
+            return rows[:page_size], len(rows) > page_size
+
+    def count_labnumber_analyses(self, lns, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = self._labnumber_analyses_filter(q, lns, **kw)
+            return q.count()
+
+    def get_analyses_by_date_range(self, lpost, hpost,
+                                   labnumber=None,
+                                   limit=None,
+                                   analysis_types=None,
+                                   mass_spectrometers=None,
+                                   extract_devices=None,
+                                   project=None,
+                                   repositories=None,
+                                   loads=None,
+                                   order='asc',
+                                   exclude=None,
+                                   exclude_uuids=None,
+                                   exclude_invalid=True,
+                                   verbose=True):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            if labnumber:
+                q = q.filter(AnalysisIndex.identifier == labnumber)
+            if project:
+                q = q.filter(AnalysisIndex.project == project)
+            if analysis_types:
+                q = self._analysis_type_filter(q, analysis_types)
+            if extract_devices:
+                q = in_func(q, AnalysisIndex.extract_device, extract_devices)
+            if exclude:
+                q = q.filter(not_(AnalysisIndex.id.in_(exclude)))
+
+            q = self._analysis_filter(q, lpost, hpost, mass_spectrometers, repositories, loads,
+                                      exclude_uuids=exclude_uuids, include_invalid=not exclude_invalid)
+            q = self._order_limit(q, order, limit)
+            return self._query_all(q, verbose_query=verbose)
+
+    def get_analyses_uuid(self, uuids, verbose_query=False):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = q.filter(AnalysisIndex.uuid.in_(uuids))
+            q = q.order_by(AnalysisIndex.uuid.asc())
+            return self._query_all(q, verbose_query=verbose_query)
+
+    def get_analysis_uuid(self, uuid):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = q.filter(AnalysisIndex.uuid == uuid)
+            return self._query_first(q)
+
+    def get_analysis_exists(self, uuid):
+        return self.get_analysis_uuid(uuid) is not None
+
+    def get_labnumbers(self, principal_investigators=None,
+                       samples=None,
+                       project_ids=None,
+                       projects=None, repositories=None,
+                       mass_spectrometers=None,
+                       irradiation=None, level=None,
+                       analysis_types=None,
+                       high_post=None,
+                       low_post=None,
+                       loads=None,
+                       filter_non_run=False):
+        if not projects and project_ids:
+            # the browser selects projects by id
+            projects = self._get_project_names(project_ids)
+            if not projects:
+                return []
+
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            if irradiation or level:
+                q = q.join(AnalysisIndex.irradiation_position)
+                if irradiation:
+                    q = q.filter(IrradiationPositionIndex.irradiation == irradiation)
+                if level:
+                    q = q.filter(IrradiationPositionIndex.level == level)
+
+            q = in_func(q, AnalysisIndex.principal_investigator, principal_investigators)
+            q = in_func(q, AnalysisIndex.sample, samples)
+            q = in_func(q, AnalysisIndex.project, projects)
+            if analysis_types:
+                q = self._analysis_type_filter(q, analysis_types)
+            q = self._analysis_filter(q, low_post, high_post, mass_spectrometers, repositories, loads,
+                                      include_invalid=True)
+            return self._labnumbers(q)
+
+    def get_project_labnumbers(self, project_names, filter_non_run,
+                               low_post=None, high_post=None,
+                               analysis_types=None, mass_spectrometers=None):
+        return self.get_labnumbers(projects=project_names, low_post=low_post, high_post=high_post,
+                                   analysis_types=analysis_types, mass_spectrometers=mass_spectrometers)
+
+    def get_labnumbers_startswith(self, partial_id, mass_spectrometers=None, filter_non_run=True,
+                                  analysis_types=None, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = q.filter(AnalysisIndex.identifier.like('{}%'.format(partial_id)))
+            q = in_func(q, AnalysisIndex.mass_spectrometer, mass_spectrometers)
+            if analysis_types:
+                q = self._analysis_type_filter(q, analysis_types)
+            return self._labnumbers(q)
+
+    def get_samples(self, projects=None, principal_investigators=None, project_like=None, name_like=None, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex)
+            q = in_func(q, AnalysisIndex.project, projects)
+            q = in_func(q, AnalysisIndex.principal_investigator, principal_investigators)
+            if project_like:
+                q = q.filter(AnalysisIndex.project.like('{}%'.format(project_like)))
+            if name_like:
+                q = q.filter(AnalysisIndex.sample.like('{}%'.format(name_like)))
+            q = q.filter(AnalysisIndex.sample.isnot(None))
+            q = q.group_by(AnalysisIndex.sample, AnalysisIndex.project, AnalysisIndex.material)
+            q = q.order_by(AnalysisIndex.sample.asc())
+            return [SampleRecord(r) for r in self._query_all(q)]
+
+    def get_projects(self, principal_investigators=None, irradiation=None, level=None, mass_spectrometers=None,
+                     order=None, **kw):
+        with self.session_ctx() as sess:
+            q = sess.query(distinct(AnalysisIndex.project))
+            if irradiation or level:
+                q = q.join(AnalysisIndex.irradiation_position)
+                if irradiation:
+                    q = q.filter(IrradiationPositionIndex.irradiation == irradiation)
+                if level:
+                    q = q.filter(IrradiationPositionIndex.level == level)
+
+            q = in_func(q, AnalysisIndex.principal_investigator, principal_investigators)
+            q = in_func(q, AnalysisIndex.mass_spectrometer, mass_spectrometers)
+            q = q.filter(AnalysisIndex.project.isnot(None))
+            q = q.order_by(getattr(AnalysisIndex.project, order or 'asc')())
+            return [ProjectRecord(v[0]) for v in self._query_all(q)]
+
+    def get_principal_investigators(self, order=None, **kw):
+        return [NameRecord(n, email='', affiliation='') for n in self._distinct(AnalysisIndex.principal_investigator,
+                                                                               order)]
+
+    def get_mass_spectrometers(self):
+        return [NameRecord(n, active=True) for n in self._distinct(AnalysisIndex.mass_spectrometer)]
+
+    def get_mass_spectrometer_names(self):
+        return self._distinct(AnalysisIndex.mass_spectrometer)
+
+    def get_extract_devices(self):
+        return [NameRecord(n) for n in self._distinct(AnalysisIndex.extract_device)]
+
+    def get_analysis_types(self):
+        return self._distinct(AnalysisIndex.analysis_type)
+
+    def get_repository_identifiers(self):
+        return self._distinct(AnalysisIndex.repository)
+
+    def get_irradiations(self, order_func='desc', **kw):
+        return [NameRecord(n) for n in self._distinct(IrradiationPositionIndex.irradiation, order_func)]
+
+    def get_irradiation_names(self, **kw):
+        return self._distinct(IrradiationPositionIndex.irradiation, 'desc')
+
+    def get_level_names(self, irrad):
+        with self.session_ctx() as sess:
+            q = sess.query(distinct(IrradiationPositionIndex.level))
+            q = q.filter(IrradiationPositionIndex.irradiation == irrad)
+            q = q.order_by(IrradiationPositionIndex.level.asc())
+            return [v[0] for v in self._query_all(q)]
+
+    def get_analysis_groups(self, *args, **kw):
+        return []
+
+    # index state
+    def get_index_hexsha(self, name):
+        with self.session_ctx() as sess:
+            q = sess.query(IndexStateTbl.hexsha)
+            q = q.filter(IndexStateTbl.name == name)
+            r = self._query_first(q)
+            return r[0] if r else None
+
+    def set_index_hexsha(self, name, hexsha, kind='repository'):
+        with self.session_ctx() as sess:
+            s = sess.query(IndexStateTbl).filter(IndexStateTbl.name == name).first()
+            if s is None:
+                s = IndexStateTbl(name=name, kind=kind)
+                sess.add(s)
+            s.hexsha = hexsha
+            s.timestamp = datetime.now()
+            sess.commit()
+
+    def get_index_states(self):
+        with self.session_ctx() as sess:
+            q = sess.query(IndexStateTbl)
+            return {s.name: s.hexsha for s in self._query_all(q)}
+
+    # index updates
+    def replace_analyses(self, repository, relpaths, records):
+        """
+            remove the analyses at ``relpaths`` and add ``records``. ``relpaths=None`` replaces the whole repository
+        """
+        with self.session_ctx() as sess:
+            q = sess.query(AnalysisIndex).filter(AnalysisIndex.repository == repository)
+            if relpaths is None:
+                q.delete(synchronize_session=False)
+            else:
+                relpaths = list(relpaths)
+                # keep well below the sqlite variable limit
+                for i in range(0, len(relpaths), 500):
+                    q.filter(AnalysisIndex.path.in_(relpaths[i:i + 500])).delete(synchronize_session=False)
+
+            sess.add_all([AnalysisIndex(repository=repository, **r) for r in records])
+            sess.commit()
+
+    def replace_levels(self, levels, records):
+        """
+            remove the positions of the (irradiation, level) pairs in ``levels`` and add ``records``
+        """
+        with self.session_ctx() as sess:
+            for irrad, level in levels:
+                q = sess.query(IrradiationPositionIndex)
+                q = q.filter(IrradiationPositionIndex.irradiation == irrad)
+                q = q.filter(IrradiationPositionIndex.level == level)
+                q.delete(synchronize_session=False)
+
+            sess.add_all([IrradiationPositionIndex(**r) for r in records])
+            sess.commit()
+
+    def clear_levels(self):
+        with self.session_ctx() as sess:
+            sess.query(IrradiationPositionIndex).delete(synchronize_session=False)
+            sess.commit()
+
+    # private
+    def _labnumber_analyses_filter(self, q, lns, low_post=None, high_post=None,
+                                   omit_key=None, exclude_uuids=None,
+                                   include_invalid=False,
+                                   mass_spectrometers=None,
+                                   repositories=None,
+                                   loads=None):
+        q = in_func(q, AnalysisIndex.identifier, lns)
+        return self._analysis_filter(q, low_post, high_post, mass_spectrometers, repositories, loads,
+                                     exclude_uuids=exclude_uuids, include_invalid=include_invalid,
+                                     omit_key=omit_key)
+
+    def _analysis_filter(self, q, low_post, high_post, mass_spectrometers, repositories, loads,
+                         exclude_uuids=None, include_invalid=False, omit_key=None):
+        q = in_func(q, AnalysisIndex.mass_spectrometer, mass_spectrometers)
+        q = in_func(q, AnalysisIndex.repository, repositories)
+        q = in_func(q, AnalysisIndex.load_name, loads)
+        if low_post:
+            q = q.filter(AnalysisIndex.timestamp >= low_post)
+        if high_post:
+            q = q.filter(AnalysisIndex.timestamp <= high_post)
+        if exclude_uuids:
+            q = q.filter(not_(AnalysisIndex.uuid.in_(exclude_uuids)))
+
+        tag = AnalysisIndex.tag_name
+        if not include_invalid:
+            q = q.filter(or_(tag.is_(None), tag != 'invalid'))
+        if omit_key:
+            q = q.filter(or_(tag.is_(None), tag != omit_key))
+        return q
+
+    def _analysis_type_filter(self, q, analysis_types):
+        if isinstance(analysis_types, str):
+            analysis_types = (analysis_types,)
+
+        ats = []
+        for a in analysis_types:
+            a = a.lower().replace(' ', '_')
+            ats.append('detector_ic' if a == 'ic' else a)
+
+        f = AnalysisIndex.analysis_type.in_(ats)
+        if 'blank' in ats:
+            f = or_(AnalysisIndex.analysis_type.startswith('blank'), f)
+        return q.filter(f)
+
+    def _order_limit(self, q, order, limit):
+        if order:
+            q = q.order_by(getattr(AnalysisIndex.timestamp, order)())
+        if limit:
+            q = q.limit(limit)
+        return q
+
+    def _labnumbers(self, q):
+        q = q.group_by(AnalysisIndex.identifier)
+        q = q.order_by(AnalysisIndex.identifier.asc())
+        return [LabnumberRecord(r) for r in self._query_all(q)]
+
+    def _get_project_names(self, project_ids):
+        ids = set(project_ids)
+        return [p for p in self._distinct(AnalysisIndex.project) if project_id(p) in ids]
+
+    def _distinct(self, attr, order='asc'):
+        with self.session_ctx() as sess:
+            q = sess.query(distinct(attr))
+            q = q.filter(attr.isnot(None))
+            q = q.order_by(getattr(attr, order or 'asc')())
+            return [v[0] for v in self._query_all(q)]
+
+
+def _parse_timestamp(t):
+    if t:
+        try:
+            return datetime.fromisoformat(t)
+        except (TypeError, ValueError):
+            pass
+
+
+def _load(path):
+    try:
+        with open(path, 'r') as rfile:
+            return json.load(rfile)
+    except (IOError, ValueError):
+        pass
+
+
+class OfflineIndexer(Loggable):
+    """
+        keeps an IndexAdapter in sync with the repositories in ``root`` and the irradiation levels in ``meta_root``.
+
+        each repository is indexed at a commit. when the repository's HEAD moves only the files that changed
+        between the indexed commit and HEAD, according to ``git diff``, are read again. a repository is walked
+        completely the first time it is indexed or if the indexed commit is no longer in its history
+    """
+    root = Str
+    meta_root = Str
+    db = Instance(IndexAdapter)
+
+    def update(self, repositories=None, meta=True):
+        """
+            update the index. returns the number of changed analyses
+        """
+        st = time.time()
+        if meta:
+            self.update_meta()
+
+        if repositories is None:
+            repositories = self.local_repositories()
+
+        n = sum(self.update_repository(r) for r in repositories)
+        self.debug('index updated. changed analyses={} et={:0.3f}'.format(n, time.time() - st))
+        return n
+
+    def local_repositories(self):
+        root = self.root
+        if not root or not os.path.isdir(root):
+            return []
+
+        metaname = os.path.basename(self.meta_root)
+        return sorted([n for n in os.listdir(root) if n != metaname and
+                       os.path.isdir(os.path.join(root, n, '.git'))])
+
+    def update_repository(self, name):
+        path = os.path.join(self.root, name)
+        head = get_repository_head(path)
+        if head is None:
+            self.debug('{} is not a git repository'.format(path))
+            return 0
+
+        old = self.db.get_index_hexsha(name)
+        if old == head:
+            return 0
+
+        changed = self._diff(path, old, head)
+        if changed is None:
+            self.debug('full index of {}'.format(name))
+            mains = self._walk(path, 2)
+            records = [r for r in (self._make_record(path, m) for m in mains) if r]
+            self.db.replace_analyses(name, None, records)
+            n = len(records)
+        else:
+            mains = {m for m in (self._main_path(p) for p in changed) if m}
+            records = [r for r in (self._make_record(path, m) for m in mains) if r]
+            self.db.replace_analyses(name, mains, records)
+            n = len(mains)
+            self.debug('incremental index of {} {}..{} changed={}'.format(name, old[:7], head[:7], n))
+
+        self.db.set_index_hexsha(name, head)
+        return n
+
+    def update_meta(self):
+        root = self.meta_root
+        if not root or not os.path.isdir(root):
+            return
+
+        name = os.path.basename(root)
+        head = get_repository_head(root)
+        if head is None:
+            return
+
+        old = self.db.get_index_hexsha(name)
+        if old == head:
+            return
+
+        changed = self._diff(root, old, head)
+        if changed is None:
+            self.db.clear_levels()
+            changed = self._walk(root, 2)
+
+        levels = set()
+        records = []
+        for p in changed:
+            head_, tail = os.path.split(p)
+            if not head_ or os.path.dirname(head_) or not tail.endswith('.json'):
+                continue
+
+            irrad, level = head_, tail[:-5]
+            levels.add((irrad, level))
+            records.extend(self._make_positions(os.path.join(root, p), irrad, level))
+
+        self.db.replace_levels(levels, records)
+        self.db.set_index_hexsha(name, head, kind='meta')
+
+    # private
+    def _diff(self, path, old, head):
+        """
+            return the paths changed between ``old`` and ``head`` or None if a full walk is required
+        """
+        if not old:
+            return
+
+        try:
+            txt = Repo(path).git.diff('--name-only', '--no-renames', old, head)
+        except GitCommandError as e:
+            self.debug('diff {} failed. {}'.format(path, e))
+            return
+
+        return [l for l in txt.splitlines() if l]
+
+    def _walk(self, root, depth):
+        """
+            relative paths of the json files ``depth`` levels below ``root``
+        """
+        ps = []
+        for d in os.listdir(root):
+            if d.startswith('.'):
+                continue
+
+            dd = os.path.join(root, d)
+            if os.path.isdir(dd):
+                if depth == 2:
+                    ps.extend(os.path.join(d, p) for p in self._walk(dd, 1))
+            elif depth == 1 and d.endswith('.json'):
+                ps.append(d)
+        return ps
+
+    def _main_path(self, p):
+        """
+            map any analysis file to the relative path of the analysis' main json file
+        """
+        parts = p.replace('\\', '/').split('/')
+        if len(parts) == 2 and parts[1].endswith('.json'):
+            return p
+        elif len(parts) == 3:
+            sub, modifier, tail = parts
+            for m, suffix in (('extraction', EXTRACTION_SUFFIX), ('tags', TAG_SUFFIX)):
+                if modifier == m and tail.endswith(suffix):
+                    return os.path.join(sub, '{}.json'.format(tail[:-len(suffix)]))
+
+    def _make_record(self, root, p):
+        path = os.path.join(root, p)
+        obj = _load(path)
+        if not isinstance(obj, dict) or not obj.get('uuid') or not obj.get('identifier'):
+            return
+
+        r = dict(path=p,
+                 timestamp=_parse_timestamp(obj.get('timestamp')))
+        for k in ('uuid', 'identifier', 'aliquot', 'increment', 'analysis_type', 'mass_spectrometer',
+                  'comment', 'sample', 'project', 'material', 'grainsize', 'principal_investigator'):
+            r[k] = obj.get(k)
+
+        sub, tail = os.path.split(p)
+        base = tail[:-5]
+        ext = _load(os.path.join(root, sub, 'extraction', '{}{}'.format(base, EXTRACTION_SUFFIX)))
+        if ext:
+            for k in ('extract_device', 'extract_value', 'extract_units', 'weight', 'load_name', 'load_holder'):
+                r[k] = ext.get(k)
+            for k, ek in (('cleanup', 'cleanup_duration'), ('pre_cleanup', 'pre_cleanup_duration'),
+                          ('post_cleanup', 'post_cleanup_duration'), ('duration', 'extract_duration')):
+                r[k] = ext.get(ek)
+
+            ps = [str(pi['position']) for pi in ext.get('positions') or [] if pi and pi.get('position')]
+            r['position'] = ','.join(ps)
+
+        tag = _load(os.path.join(root, sub, 'tags', '{}{}'.format(base, TAG_SUFFIX)))
+        if tag:
+            r['tag_name'] = tag.get('name')
+        return r
+
+    def _make_positions(self, path, irrad, level):
+        obj = _load(path)
+        if isinstance(obj, dict):
+            positions = obj.get('positions')
+        else:
+            positions = obj
+
+        if not isinstance(positions, list):
+            return []
+
+        return [dict(identifier=p['identifier'], irradiation=irrad, level=level,
+                     position=p.get('position'), packet=p.get('packet'))
+                for p in positions if isinstance(p, dict) and p.get('identifier')]
+
+
+def offline_index_path():
+    return os.path.join(paths.offline_db_dir, 'analysis_index.sqlite3')
+
+# ============= EOF =============================================
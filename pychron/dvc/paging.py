@@ -0,0 +1,160 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= local library imports  ==========================
+from pychron.core.helpers.datetime_tools import make_timef
+from pychron.core.utils import alphas
+from pychron.experiment.utilities.identifier import make_runid
+
+# attribute names of the columns selected by DVCDatabase.get_labnumber_analyses_page, in order
+ROW_ATTRS = ('id', 'uuid', 'timestamp', 'aliquot', 'increment', 'analysis_type', 'mass_spectrometer',
+             'extract_device', 'extract_value', 'extract_units', 'cleanup', 'pre_cleanup', 'post_cleanup',
+             'duration', 'weight', 'comment', 'meas_script_name', 'extract_script_name',
+             'identifier', 'irradiation_position_position', '_packet', 'irradiation_level', 'irradiation',
+             'sample', 'material', 'project', '_tag')
+
+
+class AnalysisRow(object):
+    """
+        read only stand in for AnalysisTbl built from a column projected query. provides the attributes used by
+        the browser tables and DVC.make_analyses without loading the ORM object graph
+    """
+    __slots__ = ROW_ATTRS + ('repository_ids', 'position', 'load_name', 'load_holder',
+                             'group_id', 'frozen', 'delta_time', 'review_status', 'is_plateau_step',
+                             '_temporary_tag')
+
+    use_repository_suffix = False
+
+    def __init__(self, row):
+        for a, v in zip(ROW_ATTRS, row):
+            setattr(self, a, v)
+
+        self.repository_ids = []
+        self.position = ''
+        self.load_name = ''
+        self.load_holder = ''
+        self.group_id = 0
+        self.frozen = False
+        self.delta_time = 0
+        self.review_status = None
+        self.is_plateau_step = None
+        self._temporary_tag = None
+
+    @property
+    def key(self):
+        """
+            the keyset pagination key
+        """
+        return self.timestamp, self.id
+
+    @property
+    def repository_identifier(self):
+        if len(self.repository_ids) == 1:
+            return self.repository_ids[0]
+
+    @property
+    def record_id(self):
+        return make_runid(self.identifier, self.aliquot, self.increment)
+
+    @property
+    def step(self):
+        return alphas(self.increment)
+
+    @property
+    def tag(self):
+        return self._temporary_tag or self._tag
+
+    def set_tag(self, t):
+        self._temporary_tag = t
+
+    @property
+    def packet(self):
+        return self._packet or ''
+
+    @property
+    def rundate(self):
+        return self.timestamp
+
+    @property
+    def analysis_timestamp(self):
+        return self.timestamp
+
+    @property
+    def timestampf(self):
+        return make_timef(self.timestamp)
+
+    @property
+    def display_uuid(self):
+        return (self.uuid or '')[:8]
+
+    @property
+    def irradiation_info(self):
+        return '{}{} {}'.format(self.irradiation, self.irradiation_level, self.irradiation_position_position)
+
+    def get_load_name(self):
+        return self.load_name
+
+    def get_load_holder(self):
+        return self.load_holder
+
+    def bind(self):
+        pass
+
+
+class AnalysisPager(object):
+    """
+        iterate the pages of a get_labnumber_analyses_page query. the total count is only queried if ``count`` is
+        used
+    """
+
+    def __init__(self, db, lns, page_size=200, **kw):
+        self.db = db
+        self.lns = lns
+        self.page_size = page_size
+        self.kw = kw
+
+        self.has_more = True
+        self.nloaded = 0
+        self._key = None
+        self._count = None
+
+    def next_page(self):
+        if not self.has_more:
+            return []
+
+        rows, self.has_more = self.db.get_labnumber_analyses_page(self.lns, after=self._key,
+                                                                   page_size=self.page_size, **self.kw)
+        if rows:
+            self._key = rows[-1].key
+            self.nloaded += len(rows)
+        return rows
+
+    @property
+    def count(self):
+        if self._count is None:
+            kw = {k: v for k, v in self.kw.items() if k != 'order'}
+            self._count = self.db.count_labnumber_analyses(self.lns, **kw)
+        return self._count
+
+    @property
+    def estimated_count(self):
+        """
+            a lower bound that does not require a query
+        """
+        if self._count is not None:
+            return self._count
+        return self.nloaded + (self.page_size if self.has_more else 0)
+
+# ============= EOF =============================================
@@ -0,0 +1,136 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= standard library imports ========================
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ============= local library imports  ==========================
+from pychron.core.progress import open_progress, CancelLoadingError
+from pychron.paths import paths
+
+RECORD_ATTRS = ('uuid', 'record_id', 'repository_identifier', 'group_id', 'tag', 'load_name', 'load_holder')
+
+_worker_dvc = None
+_worker_kw = None
+
+
+class RecordStub(object):
+    """
+        picklable stand-in for a database analysis record.
+
+        only carries the attributes ``DVC._make_record`` reads from a record
+    """
+    __slots__ = RECORD_ATTRS + ('repository_ids',)
+
+    def __init__(self, record):
+        for attr in RECORD_ATTRS:
+            setattr(self, attr, getattr(record, attr, None))
+        self.repository_ids = tuple(getattr(record, 'repository_ids', None) or (self.repository_identifier,))
+
+
+def _initialize_worker(repository_dataset_dir, meta_root, kw):
+    global _worker_dvc, _worker_kw
+
+    # required for spawned (not forked) workers
+    paths.repository_dataset_dir = repository_dataset_dir
+    paths.meta_root = meta_root
+
+    from pychron.dvc.dvc import DVC
+    _worker_dvc = DVC(bind=False)
+    # workers cannot open dialogs. log the message instead
+    _worker_dvc.warning_dialog = _worker_dvc.warning
+    _worker_kw = kw
+
+
+def _make_record(stub):
+    """
+        return the analysis and None, or None and the reason it failed to load
+    """
+    try:
+        a = _worker_dvc._make_record(stub, None, 0, 0, **_worker_kw)
+        if a is None:
+            return None, 'not available'
+        return a, None
+    except BaseException as e:
+        _worker_dvc.debug('make analysis exception: repo={}, record_id={}'.format(stub.repository_identifier,
+                                                                                  stub.record_id))
+        _worker_dvc.debug_exception()
+        return None, repr(e)
+
+
+def _make_records(chunk):
+    return [(i,) + _make_record(stub) for i, stub in chunk]
+
+
+def chunk_records(records, chunksize):
+    indexed = list(enumerate(records))
+    return [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+
+
+def make_analyses_parallel(records, kw, nworkers=4, chunksize=25, use_progress=True, failed=None):
+    """
+        build DVCAnalysis objects for ``records`` using a pool of worker processes
+
+        records: list of database analysis records. All records must have a repository_identifier
+        kw: keyword arguments passed to ``DVC._make_record``. i.e. the prefetched branches, fluxes, productions etc.
+        nworkers: number of worker processes
+        chunksize: number of records sent to a worker at a time. The progress dialog is updated once per chunk
+        failed: optional list. (record_id, reason) is appended for each analysis that failed to load
+
+        return: list of analyses in the same order as ``records``. Analyses that failed to load are None
+
+        if the user clicks "Cancel" an empty list is returned
+        if the user clicks "Accept" a partial list is returned
+    """
+    chunks = chunk_records([RecordStub(r) for r in records], chunksize)
+    n = len(records)
+
+    prog = None
+    if use_progress:
+        prog = open_progress(len(chunks))
+
+    results = [None] * n
+    initargs = (paths.repository_dataset_dir, paths.meta_root, kw)
+    with ProcessPoolExecutor(max_workers=nworkers, initializer=_initialize_worker, initargs=initargs) as executor:
+        futures = [executor.submit(_make_records, c) for c in chunks]
+        try:
+            nloaded = 0
+            for fut in as_completed(futures):
+                for i, a, err in fut.result():
+                    results[i] = a
+                    nloaded += 1
+                    if err and failed is not None:
+                        failed.append((records[i].record_id, err))
+
+                if prog:
+                    if prog.canceled:
+                        raise CancelLoadingError
+                    elif prog.accepted:
+                        break
+
+                    prog.change_message('Loaded {}/{} analyses'.format(nloaded, n))
+        except CancelLoadingError:
+            results = []
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+            if prog:
+                prog.close()
+
+    return results
+
+# ============= EOF =============================================
@@ -0,0 +1,239 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+"""
+    sync many repositories without serializing on git.
+
+    ``DVC.make_analyses`` used to call ``sync_repo`` (fetch + merge) and ``get_repository_branch`` for every
+    repository in a selection one after the other. ``RepositorySyncManager`` instead
+
+    1. skips repositories synced within ``window`` seconds
+    2. checks the rest concurrently with ``git ls-remote``. if the remote branch head is already in the local
+       history nothing needs to be done. otherwise the repository is fetched in the worker thread
+    3. calls the (interactive) sync function serially only for the repositories that are missing or out of date.
+       the sync function should return True on success
+"""
+# ============= standard library imports ========================
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from git import Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+# ============= local library imports  ==========================
+from pychron.core.progress import progress_iterator
+from pychron.dvc import repository_path
+from pychron.loggable import Loggable
+
+RECENT = 'recent'
+UP_TO_DATE = 'up-to-date'
+STALE = 'stale'
+MISSING = 'missing'
+FAILED = 'failed'
+
+
+class SyncResult(object):
+    __slots__ = ('name', 'status', 'branch', 'check_time', 'sync_time')
+
+    def __init__(self, name, status, branch=None, check_time=0):
+        self.name = name
+        self.status = status
+        self.branch = branch
+        self.check_time = check_time
+        self.sync_time = 0
+
+    @property
+    def needs_sync(self):
+        return self.status in (STALE, MISSING, FAILED)
+
+    @property
+    def elapsed(self):
+        return self.check_time + self.sync_time
+
+
+def is_ancestor(repo, sha, ref='HEAD'):
+    try:
+        repo.git.merge_base('--is-ancestor', sha, ref)
+        return True
+    except GitCommandError:
+        # not an ancestor or sha is not in the local object database
+        return False
+
+
+def get_branch(root):
+    try:
+        return Repo(root).active_branch.name
+    except (InvalidGitRepositoryError, NoSuchPathError, TypeError, ValueError):
+        pass
+
+
+def check_repository(name, root, remote='origin', fetch=True):
+    """
+        compare the local repository at ``root`` with its remote. safe to call from a worker thread.
+
+        up-to-date if the remote head of the active branch is in the local history. if not, and fetch is True,
+        fetch the remote so the merge done by ``sync_repo`` does not have to wait on the network
+    """
+    st = time.time()
+    if not os.path.isdir(os.path.join(root, '.git')):
+        return SyncResult(name, MISSING)
+
+    branch = None
+    try:
+        repo = Repo(root)
+        branch = repo.active_branch.name
+        if remote not in [r.name for r in repo.remotes]:
+            status = UP_TO_DATE
+        else:
+            out = repo.git.ls_remote(remote, 'refs/heads/{}'.format(branch))
+            if not out or is_ancestor(repo, out.split()[0]):
+                status = UP_TO_DATE
+            else:
+                if fetch:
+                    repo.git.fetch(remote)
+                status = STALE
+    except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError, TypeError, ValueError):
+        # TypeError is raised by active_branch if HEAD is detached
+        status = FAILED
+
+    return SyncResult(name, status, branch, time.time() - st)
+
+
+class RepositorySyncManager(Loggable):
+    """
+        usage::
+
+            sm = RepositorySyncManager(window=300, nworkers=4)
+            results = sm.sync(names, dvc.sync_repo)
+            branches = {k: r.branch for k, r in results.items()}
+    """
+
+    def __init__(self, window=300, nworkers=4, remote='origin', *args, **kw):
+        super(RepositorySyncManager, self).__init__(*args, **kw)
+        self.window = window
+        self.nworkers = nworkers
+        self.remote = remote
+        self.results = {}
+
+        self._synced = {}
+        self._lock = Lock()
+
+    def invalidate(self, name=None):
+        """
+            force ``name``, or all repositories if name is None, to be checked on the next sync
+        """
+        with self._lock:
+            if name is None:
+                self._synced.clear()
+            else:
+                self._synced.pop(name, None)
+
+    def set_synced(self, name, branch=None):
+        with self._lock:
+            self._synced[name] = (time.time(), branch)
+
+    def get_recent_branch(self, name):
+        """
+            return the branch of ``name`` if it was synced within ``window`` seconds
+        """
+        with self._lock:
+            st = self._synced.get(name)
+
+        if st is not None and time.time() - st[0] < self.window:
+            return st[1]
+
+    def check(self, names):
+        """
+            check the freshness of ``names`` concurrently. returns a dict of name: SyncResult
+        """
+        results = {}
+        names = list(names)
+        todo = []
+        for n in names:
+            branch = self.get_recent_branch(n)
+            if branch:
+                results[n] = SyncResult(n, RECENT, branch)
+            else:
+                todo.append(n)
+
+        if todo:
+            nworkers = max(1, min(self.nworkers, len(todo)))
+            with ThreadPoolExecutor(nworkers) as executor:
+                rs = executor.map(lambda n: check_repository(n, repository_path(n), self.remote), todo)
+                results.update(zip(todo, rs))
+
+        for r in results.values():
+            if r.status == UP_TO_DATE:
+                self.set_synced(r.name, r.branch)
+
+        return results
+
+    def sync(self, names, func, use_progress=True):
+        """
+            check ``names`` then call ``func(name)`` serially for each repository that is missing or out of date.
+            returns a dict of name: SyncResult
+        """
+        st = time.time()
+        results = self.check(names)
+
+        def sync(r, prog, i, n):
+            if prog:
+                prog.change_message('Syncing repository= {}'.format(r.name))
+
+            t = time.time()
+            try:
+                ok = func(r.name)
+            except BaseException as e:
+                self.debug('failed syncing {}. {}'.format(r.name, e))
+                ok = False
+
+            r.branch = get_branch(repository_path(r.name))
+            if ok and r.branch:
+                self.set_synced(r.name, r.branch)
+            else:
+                self.invalidate(r.name)
+            r.sync_time = time.time() - t
+
+        todo = sorted((r for r in results.values() if r.needs_sync), key=lambda r: r.name)
+        if use_progress:
+            progress_iterator(todo, sync, threshold=1)
+        else:
+            for r in todo:
+                sync(r, None, 0, 0)
+
+        self.results = results
+        self._report(results, time.time() - st)
+        return results
+
+    def report(self):
+        return '\n'.join('{:<30s} {:<10s} check={:0.3f}s sync={:0.3f}s'.format(r.name, r.status,
+                                                                              r.check_time, r.sync_time)
+                         for r in sorted(self.results.values(), key=lambda r: r.name))
+
+    # private
+    def _report(self, results, et):
+        counts = {}
+        for r in results.values():
+            counts[r.status] = counts.get(r.status, 0) + 1
+            self.debug('sync {} status={} check={:0.3f}s sync={:0.3f}s'.format(r.name, r.status,
+                                                                              r.check_time, r.sync_time))
+
+        self.debug('synced {} repositories in {:0.3f}s. {}'.format(len(results), et,
+                                                                  ', '.join('{}={}'.format(*c) for c in
+                                                                            sorted(counts.items()))))
+
+# ============= EOF =============================================
@@ -86,8 +86,15 @@ class DVCPreferences(BasePreferencesHelper):
     use_cocktail_irradiation = Bool
     use_cache = Bool
     max_cache_size = Int
+    use_parallel_loading = Bool
+    parallel_loading_workers = Int(4)
+    use_data_sidecar = Bool
+    use_batch_age_calculation = Bool
+    repository_sync_window = Int(300)
+    repository_sync_workers = Int(4)
     update_currents_enabled = Bool
     use_auto_pull = Bool(True)
+    use_offline_index = Bool
 
 
 class DVCPreferencesPane(PreferencesPane):
@@ -104,17 +111,44 @@ class DVCPreferencesPane(PreferencesPane):
                                                                                       'latest version. Deselect if '
                                                                                       'you want to be asked to pull '
                                                                                       'the official version.')),
+                        BorderVGroup(HGroup(Item('repository_sync_window', label='Window (s)',
+                                                 tooltip='Do not check repositories synced within this many '
+                                                         'seconds when loading analyses'),
+                                            Item('repository_sync_workers', label='Workers',
+                                                 tooltip='Number of repositories checked concurrently')),
+                                     label='Repository Sync'),
                         BorderVGroup(Item('update_currents_enabled', label='Enabled'),
                                      label='Current Values'),
                         BorderVGroup(HGroup(Item('use_cache', label='Enabled'),
                                             Item('max_cache_size', label='Max Size')),
-                                     label='Cache')))
+                                     label='Cache'),
+                        BorderVGroup(HGroup(Item('use_parallel_loading', label='Enabled',
+                                                 tooltip='Load large analysis selections using a pool of '
+                                                         'worker processes'),
+                                            Item('parallel_loading_workers', label='Workers',
+                                                 enabled_when='use_parallel_loading')),
+                                     label='Parallel Loading'),
+                        BorderVGroup(Item('use_data_sidecar', label='Enabled',
+                                          tooltip='Keep a local binary copy of the raw signal data next to each '
+                                                  '.dat.json file. Speeds up loading isotope evolutions'),
+                                     label='Binary Data Sidecar'),
+                        BorderVGroup(Item('use_batch_age_calculation', label='Enabled',
+                                          tooltip='Calculate the ages of all loaded analyses at once. Error '
+                                                  'components are calculated when an analysis is viewed'),
+                                     label='Batch Age Calculation'),
+                        BorderVGroup(Item('use_offline_index', label='Enabled',
+                                          tooltip='Browse analyses using an index of the local repositories '
+                                                  'instead of the central database'),
+                                     label='Local Analysis Index')))
         return v
 
 
 class DVCExperimentPreferences(BasePreferencesHelper):
     preferences_path = 'pychron.dvc.experiment'
     use_dvc_persistence = Bool
+    use_deferred_commit = Bool(False)
+    commit_push_count = Int(5)
+    commit_push_period = Int(300)
 
 
 class DVCExperimentPreferencesPane(PreferencesPane):
@@ -122,8 +156,15 @@ class DVCExperimentPreferencesPane(PreferencesPane):
     category = 'Experiment'
 
     def traits_view(self):
-        v = View(BorderVGroup(Item('use_dvc_persistence', label='Use DVC Persistence'),
-                              label='DVC'))
+        v = View(VGroup(BorderVGroup(Item('use_dvc_persistence', label='Use DVC Persistence'),
+                                     label='DVC'),
+                        BorderVGroup(Item('use_deferred_commit', label='Enabled',
+                                          tooltip='Commit and push analyses in the background so the next run '
+                                                  'does not wait on git'),
+                                     HGroup(Item('commit_push_count', label='Push Every N Analyses'),
+                                            Item('commit_push_period', label='or Every (s)'),
+                                            enabled_when='use_deferred_commit'),
+                                     label='Background Commit')))
         return v
 
 
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pychron.dvc import analysis_path, PATH_MODIFIERS
+from pychron.dvc.cache import DVCCache, file_stamp
+from pychron.dvc.tests.parallel_loader import write_analysis
+from pychron.paths import paths
+
+
+class DVCCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cache.sqlite')
+        self.cache = DVCCache(max_size=3, path=self.path, max_disk_size=5)
+
+    def tearDown(self):
+        self.cache.clean()
+        shutil.rmtree(self.root)
+
+    def _add(self, key, head='a', meta_head='m'):
+        self.cache.update(key, {'uuid': key}, repository='repo', head=head, meta_head=meta_head)
+
+    def test_get(self):
+        self._add('1')
+        self.assertEqual(self.cache.get('1', 'a', 'm'), {'uuid': '1'})
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get('1', 'a', 'm'))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_stale_head(self):
+        self._add('1')
+        self.assertIsNone(self.cache.get('1', 'b', 'm'))
+        self.assertEqual(self.cache.stale, 1)
+
+    def test_stale_meta_head(self):
+        self._add('1')
+        self.assertIsNone(self.cache.get('1', 'a', 'n'))
+
+    def test_lru_eviction(self):
+        for k in '1234':
+            self._add(k)
+        self.assertEqual(len(self.cache._cache), 3)
+        self.assertNotIn('1', self.cache._cache)
+
+    def test_lru_access_order(self):
+        for k in '123':
+            self._add(k)
+        self.cache.get('1', 'a', 'm')
+        self._add('4')
+        self.assertIn('1', self.cache._cache)
+        self.assertNotIn('2', self.cache._cache)
+
+    def test_persistent(self):
+        self._add('1')
+        self.cache.clean()
+
+        cache = DVCCache(max_size=3, path=self.path)
+        self.assertEqual(cache.get('1', 'a', 'm'), {'uuid': '1'})
+        self.assertEqual(cache.disk_hits, 1)
+
+    def test_disk_eviction(self):
+        for k in '1234567':
+            self._add(k)
+        self.cache.clean()
+
+        cache = DVCCache(max_size=3, path=self.path)
+        self.assertEqual(cache._disk_size, 5)
+        self.assertIsNone(cache.get('1', 'a', 'm'))
+        self.assertIsNotNone(cache.get('7', 'a', 'm'))
+
+    def test_invalidate_repository(self):
+        self._add('1', head='a')
+        self._add('2', head='b')
+        self.cache.invalidate_repository('repo', 'b')
+        self.assertIsNone(self.cache.get('1', 'a', 'm'))
+        self.assertIsNotNone(self.cache.get('2', 'b', 'm'))
+
+    def test_remove(self):
+        self._add('1')
+        self.cache.remove('1')
+        self.assertIsNone(self.cache.get('1', 'a', 'm'))
+
+    def test_stale_stamp(self):
+        p = os.path.join(self.root, 'a.json')
+        with open(p, 'w') as wfile:
+            wfile.write('{}')
+
+        stamp = file_stamp([p, None, os.path.join(self.root, 'missing.json')])
+        self.assertEqual(len(stamp), 1)
+        self.cache.update('1', 1, repository='repo', head='a', meta_head='m', stamp=stamp)
+        self.cache.clean()
+
+        cache = DVCCache(max_size=3, path=self.path)
+        self.assertEqual(cache.get('1', 'a', 'm', stamp), 1)
+
+        # changed without a commit
+        with open(p, 'w') as wfile:
+            wfile.write('{"a": 1}')
+        self.assertIsNone(cache.get('1', 'a', 'm', file_stamp([p])))
+        self.assertEqual(cache.stale, 1)
+
+    def test_memory_only(self):
+        cache = DVCCache(max_size=3)
+        cache.update('1', 1, repository='repo', head='a', meta_head='m')
+        self.assertEqual(cache.get('1', 'a', 'm'), 1)
+
+
+class DVCAnalysisCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        paths.build(os.path.join(self.root, 'pychron'))
+        self.path = os.path.join(self.root, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        from pychron.dvc.dvc_analysis import DVCAnalysis
+
+        write_analysis('Repo1', '12345-01A')
+        a = DVCAnalysis('12345-01A', '12345-01A', 'Repo1')
+        stamp = file_stamp([analysis_path(a, 'Repo1', modifier=m) for m in PATH_MODIFIERS])
+
+        cache = DVCCache(path=self.path)
+        cache.update(a.uuid, a, repository='Repo1', head='a', meta_head='m', stamp=stamp)
+        cache.clean()
+
+        b = DVCCache(path=self.path).get(a.uuid, 'a', 'm', stamp)
+        self.assertIsInstance(b, DVCAnalysis)
+        self.assertEqual(b.record_id, a.record_id)
+        self.assertEqual(b.repository_identifier, 'Repo1')
+        self.assertListEqual(sorted(b.isotopes), ['Ar39', 'Ar40'])
+        self.assertEqual(b.isotopes['Ar40'].detector, 'H1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from git import Repo
+
+from pychron.dvc.commit_pipeline import CommitPipeline, CommitJournal
+
+
+class CommitPipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        bare = os.path.join(self.root, 'remote')
+        self.remote = Repo.init(bare, bare=True)
+        self.local = Repo.clone_from(bare, os.path.join(self.root, 'local'))
+        self.journal = os.path.join(self.root, 'journal.jsonl')
+        self.pipelines = []
+        self.meta = []
+
+    def tearDown(self):
+        for p in self.pipelines:
+            p.stop()
+        shutil.rmtree(self.root)
+
+    def _pipeline(self, **kw):
+        p = CommitPipeline(self.journal, meta_func=self.meta.extend, **kw)
+        self.pipelines.append(p)
+        return p
+
+    def _write(self, name):
+        p = os.path.join(self.local.working_dir, name)
+        with open(p, 'w') as wfile:
+            wfile.write(name)
+        return p
+
+    def _submit(self, p, runid, push=True):
+        a, b = self._write('{}.json'.format(runid)), self._write('{}.intercepts.json'.format(runid))
+        return p.submit(self.local.working_dir, [a, b], '<COLLECTION>', runid=runid, push=push)
+
+    def _remote_commits(self):
+        try:
+            return list(self.remote.iter_commits('master'))
+        except BaseException:
+            return []
+
+    def test_flush(self):
+        p = self._pipeline(push_period=1000)
+        p.start()
+        for i in range(3):
+            self._submit(p, 'a-{}'.format(i))
+
+        self.assertTrue(p.flush(block=True, timeout=10))
+
+        commits = self._remote_commits()
+        self.assertEqual(len(commits), 3)
+        self.assertEqual(len(commits[0].stats.files), 2)
+        self.assertTrue(commits[0].message.startswith('<COLLECTION>'))
+        self.assertListEqual(self.meta, ['a-0', 'a-1', 'a-2'])
+        self.assertEqual(p.backlog, 0)
+        self.assertEqual(p.stats.npushed, 3)
+
+    def test_tagged_commits(self):
+        p = self._pipeline(push_period=1000)
+        p.start()
+        a, b = self._write('a.json'), self._write('a.intercepts.json')
+        p.submit_commits(self.local.working_dir, [([a], '<COLLECTION>'),
+                                                  ([b], '<ISOEVO> default collection fits')], runid='a')
+        p.flush(block=True, timeout=10)
+
+        # one commit per tag so the history views, which read the subject, see each tag
+        commits = self._remote_commits()
+        self.assertListEqual([c.summary for c in commits], ['<ISOEVO> default collection fits', '<COLLECTION>'])
+        self.assertListEqual(self.meta, ['a'])
+        self.assertEqual(p.stats.npushed, 1)
+
+    def test_push_count(self):
+        p = self._pipeline(push_count=2, push_period=1000)
+        p.start()
+        self._submit(p, 'a')
+        time.sleep(0.2)
+        self.assertEqual(len(self._remote_commits()), 0)
+        self.assertEqual(p.backlog, 1)
+
+        self._submit(p, 'b')
+        st = time.time()
+        while len(self._remote_commits()) < 2 and time.time() - st < 10:
+            time.sleep(0.05)
+        self.assertEqual(len(self._remote_commits()), 2)
+
+    def test_push_period(self):
+        p = self._pipeline(push_period=0.2)
+        p.start()
+        self._submit(p, 'a')
+        st = time.time()
+        while not self._remote_commits() and time.time() - st < 10:
+            time.sleep(0.05)
+        self.assertEqual(len(self._remote_commits()), 1)
+
+    def test_no_push(self):
+        p = self._pipeline(push_count=1)
+        p.start()
+        self._submit(p, 'a', push=False)
+        time.sleep(0.2)
+        self.assertEqual(len(self._remote_commits()), 0)
+        p.flush(block=True)
+        self.assertEqual(len(self._remote_commits()), 1)
+
+    def test_recover_uncommitted(self):
+        # not started. simulate a crash after the files were written and journaled
+        j = CommitJournal(self.journal)
+        j.record('submit', job={'id': 'x', 'root': self.local.working_dir,
+                                'commits': [([self._write('x.json')], '<COLLECTION>')],
+                                'runid': 'x', 'push': True, 'created': time.time()})
+        with open(self.journal, 'a') as wfile:
+            wfile.write('{"op": "comm')
+
+        p = self._pipeline(push_period=1000)
+        p.start()
+        self.assertEqual(p.backlog, 1)
+        p.flush(block=True)
+        self.assertEqual(len(self._remote_commits()), 1)
+        self.assertEqual(CommitJournal(self.journal).load(), ([], []))
+
+    def test_recover_unpushed(self):
+        p = self._pipeline(push_period=1000, retry_period=1000, push_func=lambda root: False)
+        p.start()
+        self._submit(p, 'a')
+        self._submit(p, 'b')
+        p.flush(block=True)
+        self.assertEqual(p.stats.nfailures, 1)
+        self.assertEqual(p.backlog, 2)
+        p.stop()
+
+        uncommitted, unpushed = CommitJournal(self.journal).load()
+        self.assertEqual(len(uncommitted), 0)
+        self.assertListEqual([j['runid'] for j in unpushed], ['a', 'b'])
+
+        p = self._pipeline(push_period=1000)
+        p.start()
+        p.flush(block=True)
+        # committed once, not again on recovery
+        self.assertEqual(len(self._remote_commits()), 2)
+        self.assertEqual(p.backlog, 0)
+
+    def test_not_started(self):
+        p = self._pipeline()
+        self._submit(p, 'a')
+        self.assertEqual(len(list(self.local.iter_commits())), 1)
+        self.assertTrue(p.flush())
+        self.assertEqual(len(self._remote_commits()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from pychron.core.helpers.binpack import encode_blob, unpack
+from pychron.dvc import dvc_dump
+from pychron.dvc.data_sidecar import dump_data_sidecar, load_data_sidecar, sidecar_path, exclude_sidecars, \
+    SIDECAR_EXCLUDE
+from pychron.processing.isotope import Isotope
+
+
+def make_blob(n, offset=0):
+    return b''.join(struct.pack('>ff', i + offset, (i + offset) * 0.1) for i in range(n))
+
+
+class DataSidecarTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'a.dat.json')
+        self.blob = make_blob(20)
+        self.jd = {'format': '>ff',
+                   'signals': [{'isotope': 'Ar40', 'detector': 'H1', 'blob': encode_blob(self.blob)}],
+                   'sniffs': [{'isotope': 'Ar40', 'detector': 'H1', 'blob': encode_blob(make_blob(3))}],
+                   'baselines': [{'detector': 'H1', 'blob': encode_blob(make_blob(5, 100))}]}
+        dvc_dump(self.jd, self.path)
+        dump_data_sidecar(self.path, self.jd)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_path(self):
+        self.assertEqual(sidecar_path(self.path), os.path.join(self.root, 'a.dat.npz'))
+
+    def test_keys(self):
+        sd = load_data_sidecar(self.path)
+        self.assertSetEqual(set(sd.keys()), {'signal:Ar40:H1', 'sniff:Ar40:H1', 'baseline:H1'})
+
+    def test_values(self):
+        sd = load_data_sidecar(self.path)
+        xs, ys = unpack(self.blob)
+        a = sd['signal:Ar40:H1']
+        self.assertListEqual(list(a[:, 0]), list(xs))
+        self.assertListEqual(list(a[:, 1]), list(ys))
+
+    def test_isotope(self):
+        sd = load_data_sidecar(self.path)
+        a = Isotope('Ar40', 'H1')
+        a.unpack_data(sd['signal:Ar40:H1'])
+
+        b = Isotope('Ar40', 'H1')
+        b.unpack_data(self.blob)
+        self.assertListEqual(list(a.xs), list(b.xs))
+        self.assertListEqual(list(a.ys), list(b.ys))
+
+    def test_stale(self):
+        self.jd['signals'] = []
+        dvc_dump(self.jd, self.path)
+        self.assertIsNone(load_data_sidecar(self.path))
+
+    def test_missing(self):
+        os.remove(sidecar_path(self.path))
+        self.assertIsNone(load_data_sidecar(self.path))
+
+    def test_exclude(self):
+        os.makedirs(os.path.join(self.root, '.git'))
+        exclude_sidecars(self.root)
+        exclude_sidecars(self.root)
+        with open(os.path.join(self.root, '.git', 'info', 'exclude')) as rfile:
+            self.assertListEqual([line.strip() for line in rfile], [SIDECAR_EXCLUDE])
+
+
+if __name__ == '__main__':
+    unittest.main()
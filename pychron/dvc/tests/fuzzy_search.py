@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pychron.dvc.dvc_database import DVCDatabase
+from pychron.dvc.dvc_orm import Base, IrradiationTbl, LevelTbl, IrradiationPositionTbl, ProjectTbl, SampleTbl
+
+
+class FuzzySearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        db = self.db = DVCDatabase(kind='sqlite', path=os.path.join(self.root, 'test.sqlite'))
+        db.connect()
+        with db.session_ctx() as sess:
+            db.create_all(Base.metadata)
+
+            level = LevelTbl(name='A', irradiation=IrradiationTbl(name='NM-100'))
+            p1 = ProjectTbl(name='Canyon')
+            p2 = ProjectTbl(name='Monitor')
+            for i, (name, project) in enumerate((('FC-2', p2), ('FC-2b', p2), ('bar', p1), ('Fish Canyon', p1))):
+                s = SampleTbl(name=name, project=project)
+                sess.add(IrradiationPositionTbl(identifier='6{:04d}'.format(i), position=i, sample=s, level=level))
+            sess.commit()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_samples(self):
+        db = self.db
+        self.assertListEqual([s.name for s in db.get_fuzzy_samples('fc2')], ['FC-2', 'FC-2b'])
+        self.assertListEqual(db.get_fuzzy_samples('zzz'), [])
+
+    def test_projects(self):
+        self.assertListEqual([p.name for p in self.db.get_fuzzy_projects('mon')], ['Monitor'])
+
+    def test_labnumbers(self):
+        db = self.db
+        with db.session_ctx():
+            ips, ps = db.get_fuzzy_labnumbers('60002')
+            self.assertListEqual([ip.sample.name for ip in ips], ['bar'])
+            self.assertListEqual([p.name for p in ps], ['Canyon'])
+
+            ips, ps = db.get_fuzzy_labnumbers('Monitor')
+            self.assertListEqual(sorted(ip.identifier for ip in ips), ['60000', '60001'])
+
+    def test_incremental(self):
+        db = self.db
+        idx = db.get_fuzzy_index('samples')
+        with db.session_ctx() as sess:
+            s = sess.query(SampleTbl).filter(SampleTbl.name == 'bar').one()
+            s.name = 'FC-3'
+            sess.add(SampleTbl(name='FC-4'))
+            sess.commit()
+
+        self.assertIs(db.get_fuzzy_index('samples'), idx)
+        names = [s.name for s in db.get_fuzzy_samples('fc')]
+        self.assertListEqual(sorted(names[:3]), ['FC-2', 'FC-3', 'FC-4'])
+        self.assertListEqual(names[3:], ['FC-2b', 'Fish Canyon'])
+        self.assertListEqual(db.get_fuzzy_samples('bar'), [])
+
+    def test_rebuild(self):
+        db = self.db
+        idx = db.get_fuzzy_index('samples')
+        db.fuzzy_index_ttl = 0
+        self.assertIsNot(db.get_fuzzy_index('samples'), idx)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+"""
+    compare serial and parallel DVC.make_analyses.
+
+    requires a configured DVC database and local repositories
+
+    usage: python make_analyses_benchmark.py <identifier> [<identifier>...]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import sys
+import time
+
+from pychron.core.ui import set_qt
+
+set_qt()
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+# ============= local library imports  ==========================
+from pychron.dvc.dvc import DVC
+from pychron.paths import paths
+
+
+def benchmark(dvc, records, use_parallel_loading, nworkers=4):
+    dvc.use_parallel_loading = use_parallel_loading
+    dvc.parallel_loading_workers = nworkers
+
+    st = time.time()
+    ans = dvc.make_analyses(records, use_progress=False)
+    et = time.time() - st
+    return len(ans), et
+
+
+def main(identifiers):
+    paths.build('_dev')
+    dvc = DVC(bind=False)
+    dvc.db.connect()
+
+    with dvc.session_ctx():
+        records = dvc.get_labnumber_analyses(identifiers)[0]
+        print('loading {} analyses'.format(len(records)))
+
+        for tag, parallel, nworkers in (('serial', False, 1),
+                                        ('parallel-2', True, 2),
+                                        ('parallel-4', True, 4),
+                                        ('parallel-8', True, 8)):
+            n, et = benchmark(dvc, records, parallel, nworkers)
+            print('{:<12s} n={:<6d} {:0.2f}s {:0.1f} analyses/s'.format(tag, n, et, n / et if et else 0))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
+# ============= EOF =============================================
@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from git import Repo
+
+from pychron.dvc.offline_index import index_factory, OfflineIndexer
+from pychron.envisage.browser.record_views import ProjectRecordView
+
+
+def dump(root, p, obj):
+    p = os.path.join(root, p)
+    d = os.path.dirname(p)
+    if not os.path.isdir(d):
+        os.makedirs(d)
+    with open(p, 'w') as wfile:
+        json.dump(obj, wfile)
+    return p
+
+
+def commit(repo, msg='update'):
+    repo.git.add('-A')
+    repo.git.commit('-m', msg, '--allow-empty')
+
+
+def make_repo(root):
+    os.makedirs(root)
+    repo = Repo.init(root)
+    with repo.config_writer() as cw:
+        cw.set_value('user', 'name', 'test')
+        cw.set_value('user', 'email', 'test@example.com')
+    return repo
+
+
+class OfflineIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data = os.path.join(self.root, 'data')
+        self.meta = os.path.join(self.data, 'meta')
+
+        self.repo_root = os.path.join(self.data, 'Proj1')
+        self.repo = make_repo(self.repo_root)
+        self._add_analysis('12345', 1, '2017-01-01T10:00:00', sample='S1', project='P1',
+                           extract_device='Laser', position=3)
+        self._add_analysis('12345', 2, '2017-01-02T10:00:00', sample='S1', project='P1')
+        self._add_analysis('20000', 1, '2017-02-01T10:00:00', sample='S2', project='P2')
+        self._add_analysis('bu-01', 1, '2017-03-01T10:00:00', analysis_type='blank_unknown')
+        dump(self.repo_root, 'repository.json', {'name': 'Proj1'})
+        commit(self.repo)
+
+        self.meta_repo = make_repo(self.meta)
+        dump(self.meta, 'NM-100/A.json', {'z': 0, 'positions': [{'position': 1, 'identifier': '12345',
+                                                                 'packet': 'p1'},
+                                                                {'position': 2, 'identifier': '20000'},
+                                                                {'position': 3}]})
+        dump(self.meta, 'NM-100/productions.json', {'A': 'prod'})
+        commit(self.meta_repo)
+
+        self.db = index_factory(os.path.join(self.root, 'index.sqlite3'))
+        self.indexer = OfflineIndexer(db=self.db, root=self.data, meta_root=self.meta)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _add_analysis(self, identifier, aliquot, timestamp, analysis_type='unknown', extract_device=None,
+                      position=None, **kw):
+        runid = '{}-{:02d}'.format(identifier, aliquot)
+        sub = identifier[:3]
+        obj = dict(uuid='uuid-{}'.format(runid), identifier=identifier, aliquot=aliquot, increment=None,
+                   analysis_type=analysis_type, mass_spectrometer='jan', timestamp=timestamp,
+                   repository_identifier='Proj1')
+        obj.update(kw)
+        dump(self.repo_root, os.path.join(sub, '{}.json'.format(identifier[3:] + '-{:02d}'.format(aliquot))), obj)
+        if extract_device:
+            dump(self.repo_root, os.path.join(sub, 'extraction',
+                                              '{}-{:02d}.extr.json'.format(identifier[3:], aliquot)),
+                 {'extract_device': extract_device, 'extract_value': 5, 'positions': [{'position': position}]})
+
+    def test_full(self):
+        self.assertEqual(self.indexer.update(), 4)
+
+        ans, tc = self.db.get_labnumber_analyses(['12345'])
+        self.assertEqual(tc, 2)
+        a = ans[0]
+        self.assertEqual(a.record_id, '12345-01')
+        self.assertEqual(a.repository_identifier, 'Proj1')
+        self.assertEqual(a.extract_device, 'Laser')
+        self.assertEqual(a.position, '3')
+        self.assertEqual(a.timestamp, datetime(2017, 1, 1, 10))
+        self.assertEqual(a.irradiation_info, 'NM-100A 1')
+        self.assertEqual(a.packet, 'p1')
+
+    def test_queries(self):
+        self.indexer.update()
+        db = self.db
+        self.assertListEqual([p.name for p in db.get_projects()], ['P1', 'P2'])
+        self.assertListEqual([p.name for p in db.get_projects(irradiation='NM-100', level='A')], ['P1', 'P2'])
+        self.assertListEqual(db.get_projects(irradiation='NM-100', level='B'), [])
+        self.assertListEqual(db.get_projects(irradiation='NM-200'), [])
+        self.assertListEqual([l.identifier for l in db.get_project_labnumbers(['P1'], True)], ['12345'])
+        self.assertListEqual([s.name for s in db.get_samples(projects=['P2'])], ['S2'])
+        self.assertListEqual([l.identifier for l in db.get_labnumbers(irradiation='NM-100', level='A')],
+                             ['12345', '20000'])
+
+        ans = db.get_analyses_by_date_range(datetime(2017, 1, 2), datetime(2017, 3, 2), verbose=False)
+        self.assertListEqual([a.record_id for a in ans], ['12345-02', '20000-01', 'bu-01-01'])
+
+        ans = db.get_analyses_by_date_range(None, None, analysis_types=['blank'], verbose=False)
+        self.assertListEqual([a.record_id for a in ans], ['bu-01-01'])
+
+        ans, tc = db.get_labnumber_analyses(['12345'], order='desc', limit=1)
+        self.assertEqual(tc, 2)
+        self.assertListEqual([a.record_id for a in ans], ['12345-02'])
+
+        self.assertListEqual([m.name for m in db.get_mass_spectrometers()], ['jan'])
+        self.assertListEqual(db.get_level_names('NM-100'), ['A'])
+        self.assertTrue(db.get_analysis_exists('uuid-20000-01'))
+
+    def test_project_ids(self):
+        self.indexer.update()
+        db = self.db
+
+        # the browser selects projects by the unique_id of their record views
+        ps = [ProjectRecordView(p) for p in db.get_projects()]
+        ids = [p.unique_id for p in ps if p.name == 'P1']
+        self.assertNotEqual(ids, [0])
+        self.assertListEqual([l.identifier for l in db.get_labnumbers(project_ids=ids)], ['12345'])
+        self.assertListEqual(db.get_labnumbers(project_ids=[1]), [])
+
+    def test_incremental(self):
+        self.indexer.update()
+        self.assertEqual(self.indexer.update(), 0)
+
+        # modify, tag, add and delete
+        self._add_analysis('20000', 1, '2017-02-01T10:00:00', sample='S3', project='P2')
+        dump(self.repo_root, '200/tags/00-01.tags.json', {'name': 'invalid'})
+        self._add_analysis('12345', 3, '2017-01-03T10:00:00', sample='S1', project='P1')
+        os.remove(os.path.join(self.repo_root, 'bu-', '01-01.json'))
+        commit(self.repo)
+
+        self.assertEqual(self.indexer.update(), 3)
+        db = self.db
+        ans, tc = db.get_labnumber_analyses(['12345'])
+        self.assertEqual(tc, 3)
+        self.assertListEqual(db.get_labnumber_analyses(['20000'])[0], [])
+        a = db.get_labnumber_analyses(['20000'], include_invalid=True)[0][0]
+        self.assertEqual(a.sample, 'S3')
+        self.assertEqual(a.tag, 'invalid')
+        self.assertFalse(db.get_analysis_exists('uuid-bu-01-01'))
+
+    def test_unknown_commit(self):
+        self.indexer.update()
+        self.db.set_index_hexsha('Proj1', '0' * 40)
+        self.assertEqual(self.indexer.update(), 4)
+        self.assertEqual(self.db.get_labnumber_analyses(['12345'])[1], 2)
+
+    def test_meta_incremental(self):
+        self.indexer.update()
+        dump(self.meta, 'NM-100/A.json', {'z': 0, 'positions': [{'position': 5, 'identifier': '12345'}]})
+        commit(self.meta_repo)
+        self.indexer.update()
+
+        a = self.db.get_labnumber_analyses(['12345'])[0][0]
+        self.assertEqual(a.irradiation_position_position, 5)
+        self.assertEqual(self.db.get_labnumber_analyses(['20000'])[0][0].irradiation, '')
+
+    def test_page(self):
+        self.indexer.update()
+        rows, has_more = self.db.get_labnumber_analyses_page(['12345', '20000'], page_size=2)
+        self.assertTrue(has_more)
+        self.assertListEqual([a.record_id for a in rows], ['12345-01', '12345-02'])
+
+        rows, has_more = self.db.get_labnumber_analyses_page(['12345', '20000'], after=rows[-1].key, page_size=2)
+        self.assertFalse(has_more)
+        self.assertListEqual([a.record_id for a in rows], ['20000-01'])
+        self.assertEqual(self.db.count_labnumber_analyses(['12345', '20000']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
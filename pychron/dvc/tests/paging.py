@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from pychron.dvc.dvc_database import DVCDatabase
+from pychron.dvc.dvc_orm import Base, AnalysisTbl, AnalysisChangeTbl, IrradiationPositionTbl, IrradiationTbl, \
+    LevelTbl, SampleTbl, ProjectTbl, MaterialTbl, RepositoryAssociationTbl, MeasuredPositionTbl, LoadTbl
+from pychron.dvc.paging import AnalysisPager
+from pychron.paths import paths
+
+
+def make_database(root):
+    db = DVCDatabase(kind='sqlite', path=os.path.join(root, 'test.sqlite'))
+    db.connect()
+    with db.session_ctx() as sess:
+        db.create_all(Base.metadata)
+
+        irrad = IrradiationTbl(name='NM-100')
+        level = LevelTbl(name='A', irradiation=irrad)
+        project = ProjectTbl(name='P1')
+        material = MaterialTbl(name='sanidine')
+        sample = SampleTbl(name='S1', project=project, material=material)
+        ip = IrradiationPositionTbl(identifier='12345', position=1, packet='p1', sample=sample, level=level)
+        other = IrradiationPositionTbl(identifier='20000', position=2, level=level)
+        sess.add_all((irrad, level, project, material, sample, ip, other, LoadTbl(name='L1', holderName='H')))
+        sess.flush()
+
+        st = datetime(2017, 1, 1)
+        for i in range(25):
+            # pairs of analyses share a timestamp to exercise the id tie break
+            a = AnalysisTbl(uuid='u{:02d}'.format(i), aliquot=i + 1, increment=None,
+                            timestamp=st + timedelta(hours=i // 2),
+                            analysis_type='unknown', mass_spectrometer='jan',
+                            irradiation_positionID=ip.id)
+            sess.add(a)
+            sess.flush()
+            sess.add(AnalysisChangeTbl(analysisID=a.id, tag='invalid' if i == 3 else 'ok'))
+            sess.add(RepositoryAssociationTbl(analysisID=a.id, repository='Repo{}'.format(i % 2)))
+            sess.add(MeasuredPositionTbl(analysisID=a.id, position=i, loadName='L1'))
+
+        a = AnalysisTbl(uuid='x', aliquot=1, timestamp=st, irradiation_positionID=other.id)
+        sess.add(a)
+        sess.flush()
+        sess.add(AnalysisChangeTbl(analysisID=a.id, tag='ok'))
+        sess.commit()
+    return db
+
+
+class AnalysisPagingTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.db = make_database(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_page(self):
+        rows, has_more = self.db.get_labnumber_analyses_page(['12345'], page_size=10)
+        self.assertTrue(has_more)
+        self.assertEqual(len(rows), 10)
+        r = rows[0]
+        self.assertEqual(r.record_id, '12345-01')
+        self.assertEqual(r.sample, 'S1')
+        self.assertEqual(r.project, 'P1')
+        self.assertEqual(r.material, 'sanidine')
+        self.assertEqual(r.irradiation_info, 'NM-100A 1')
+        self.assertEqual(r.repository_identifier, 'Repo0')
+        self.assertEqual(r.load_name, 'L1')
+        self.assertEqual(r.load_holder, 'H')
+        self.assertEqual(r.tag, 'ok')
+
+    def test_pager_matches_full_query(self):
+        for order in ('asc', 'desc'):
+            full, tc = self.db.get_labnumber_analyses(['12345'], order=order, verbose_query=False)
+            pager = AnalysisPager(self.db, ['12345'], page_size=7, order=order)
+            uuids = []
+            while pager.has_more:
+                uuids.extend(r.uuid for r in pager.next_page())
+
+            # the full query does not break timestamp ties so compare against the keyset ordering
+            full = sorted(full, key=lambda a: (a.timestamp, a.id), reverse=order == 'desc')
+            self.assertListEqual(uuids, [a.uuid for a in full])
+            self.assertEqual(pager.count, tc)
+            self.assertEqual(pager.nloaded, 24)
+
+    def test_filters(self):
+        rows, _ = self.db.get_labnumber_analyses_page(['12345'], include_invalid=True, repositories=['Repo1'],
+                                                      page_size=100)
+        self.assertEqual(len(rows), 12)
+        self.assertTrue(all(r.repository_identifier == 'Repo1' for r in rows))
+        self.assertEqual(self.db.count_labnumber_analyses(['12345'], include_invalid=True, repositories=['Repo1']),
+                         12)
+
+        rows, has_more = self.db.get_labnumber_analyses_page(['12345'], loads=['L1'], exclude_uuids=['u00'],
+                                                             high_post=datetime(2017, 1, 1, 1), page_size=100)
+        self.assertFalse(has_more)
+        self.assertListEqual([r.uuid for r in rows], ['u01', 'u02'])
+
+    def test_estimated_count(self):
+        pager = AnalysisPager(self.db, ['12345'], page_size=10)
+        pager.next_page()
+        self.assertEqual(pager.estimated_count, 20)
+        self.assertIsNone(pager._count)
+
+
+class Sample(object):
+    def __init__(self, labnumber):
+        self.labnumber = self.identifier = labnumber
+
+
+class BrowserPagingTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.db = make_database(cls.root)
+
+        from apptools.preferences.api import get_default_preferences, set_default_preferences, Preferences
+        cls.preferences = get_default_preferences()
+        if cls.preferences is None:
+            set_default_preferences(Preferences())
+        paths.build(os.path.join(cls.root, 'pychron'))
+
+    @classmethod
+    def tearDownClass(cls):
+        from apptools.preferences.api import set_default_preferences
+        set_default_preferences(cls.preferences)
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        from pychron.envisage.browser.sample_browser_model import SampleBrowserModel
+
+        db = self.db
+
+        class Model(SampleBrowserModel):
+            def _get_db(self):
+                return db
+
+            def _make_records(self, ans):
+                return ans
+
+        self.model = Model()
+        self.model.analysis_table.limit = 10
+
+    def test_scroll(self):
+        model = self.model
+        model.selected_samples = [Sample('12345')]
+        self.assertEqual(len(model.analysis_table.analyses), 10)
+        model._handle_analyses_scrolled_to_end()
+        self.assertEqual(len(model.analysis_table.analyses), 20)
+
+    def test_reset_on_date_range(self):
+        model = self.model
+        model.selected_samples = [Sample('12345')]
+        model._get_analysis_series(datetime(2017, 1, 1), datetime(2017, 1, 2), None)
+        self.assertIsNone(model._analysis_pager)
+        self.assertListEqual(model.load_next_analyses_page(), [])
+
+    def test_reset_on_selection(self):
+        model = self.model
+        model.selected_samples = [Sample('12345')]
+        self.assertIsNotNone(model._analysis_pager)
+
+        model.selected_samples = []
+        self.assertIsNone(model._analysis_pager)
+        self.assertListEqual(model.load_next_analyses_page(), [])
+
+        model.selected_samples = [Sample('12345')]
+        model._clear_selection_button_fired()
+        self.assertIsNone(model._analysis_pager)
+
+    def test_fuzzy_sample_filter(self):
+        model = self.model
+        ss = [Sample(n) for n in ('xfc2', 'sanidine', 'FC-2', 'sanidne', 'FC-2b')]
+        for si in ss:
+            si.name = si.labnumber
+        model.osamples = ss
+
+        # matches keep the order of the samples and misspellings are not included
+        model.sample_filter = 'fc2'
+        self.assertListEqual([si.name for si in model.samples], ['xfc2', 'FC-2', 'FC-2b'])
+        model.sample_filter = 'sanidine'
+        self.assertListEqual([si.name for si in model.samples], ['sanidine'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from pychron.dvc import parallel_loader, analysis_path, dvc_dump
+from pychron.dvc.parallel_loader import RecordStub, chunk_records, make_analyses_parallel
+from pychron.paths import paths
+
+
+def write_analysis(repository, record_id):
+    """
+        write the meta and extraction files of a minimal analysis to the repository_dataset_dir
+    """
+    root = os.path.join(paths.repository_dataset_dir, repository)
+    if not os.path.isdir(root):
+        os.makedirs(root)
+
+    path = analysis_path(record_id, repository, mode='w')
+    dvc_dump({'uuid': record_id,
+              'timestamp': '2026-01-01T12:00:00',
+              'analysis_type': 'unknown',
+              'isotopes': {'Ar40': {'name': 'Ar40', 'detector': 'H1'},
+                           'Ar39': {'name': 'Ar39', 'detector': 'AX'}}}, path)
+    dvc_dump({'extract_device': 'Laser'}, analysis_path(record_id, repository, modifier='extraction', mode='w'))
+    return path
+
+
+class Record(object):
+    def __init__(self, record_id, repository_identifier=None, repository_ids=None):
+        self.uuid = record_id
+        self.record_id = record_id
+        self.repository_identifier = repository_identifier
+        self.group_id = 0
+        self.tag = 'ok'
+        if repository_ids is not None:
+            self.repository_ids = repository_ids
+
+
+class WorkerDVC(object):
+    def _make_record(self, record, prog, i, n, **kw):
+        if record.record_id == 'missing':
+            return
+        elif record.record_id == 'error':
+            raise ValueError('bad')
+        return record.record_id, record.repository_ids
+
+    def debug(self, *args):
+        pass
+
+    def debug_exception(self):
+        pass
+
+
+class ParallelLoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        parallel_loader._worker_dvc = WorkerDVC()
+        parallel_loader._worker_kw = {}
+
+    def tearDown(self):
+        parallel_loader._worker_dvc = None
+        parallel_loader._worker_kw = None
+
+    def test_repository_ids(self):
+        self.assertEqual(RecordStub(Record('a', 'Repo1')).repository_ids, ('Repo1',))
+        self.assertEqual(RecordStub(Record('a', repository_ids=['Repo1', 'Repo2'])).repository_ids,
+                         ('Repo1', 'Repo2'))
+
+    def test_failed(self):
+        records = [RecordStub(Record(r, 'Repo1')) for r in ('a', 'missing', 'error')]
+        ret = [r for c in chunk_records(records, 2) for r in parallel_loader._make_records(c)]
+        self.assertEqual(ret[0], (0, ('a', ('Repo1',)), None))
+        self.assertEqual(ret[1], (1, None, 'not available'))
+        self.assertEqual(ret[2][:2], (2, None))
+        self.assertIn('bad', ret[2][2])
+
+
+class ParallelLoaderPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        paths.build(os.path.join(self.root, 'pychron'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_pool(self):
+        from pychron.dvc.dvc_analysis import DVCAnalysis
+
+        rids = ['12345-01A', '12345-01B', '12345-01C']
+        for r in rids:
+            write_analysis('Repo1', r)
+
+        records = [Record(r, 'Repo1') for r in rids + ['12345-02A']]
+        failed = []
+        ret = make_analyses_parallel(records, {'quick': True}, nworkers=2, chunksize=2, use_progress=False,
+                                     failed=failed)
+
+        self.assertListEqual([a.record_id for a in ret[:3]], rids)
+        self.assertIsNone(ret[3])
+        self.assertListEqual(failed, [('12345-02A', 'not available')])
+
+        for a in ret[:3]:
+            self.assertIsInstance(a, DVCAnalysis)
+            self.assertListEqual(sorted(a.isotopes), ['Ar39', 'Ar40'])
+
+            b = pickle.loads(pickle.dumps(a))
+            self.assertEqual(b.record_id, a.record_id)
+            self.assertEqual(b.repository_identifier, 'Repo1')
+            self.assertEqual(b.isotopes['Ar40'].detector, 'H1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Repo
+
+from pychron.dvc import sync_manager
+from pychron.dvc.sync_manager import RepositorySyncManager, check_repository, UP_TO_DATE, STALE, MISSING, \
+    RECENT
+
+
+def commit(repo, name, text='a'):
+    p = os.path.join(repo.working_dir, name)
+    with open(p, 'w') as wfile:
+        wfile.write(text)
+    repo.index.add([p])
+    repo.index.commit('add {}'.format(name))
+
+
+class RepositorySyncManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.remotes = os.path.join(self.root, 'remotes')
+        self.local = os.path.join(self.root, 'local')
+        os.mkdir(self.local)
+
+        self._repository_path = sync_manager.repository_path
+        sync_manager.repository_path = lambda *args: os.path.join(self.local, *args)
+
+        self.upstream = {}
+        for name in ('A', 'B', 'C'):
+            bare = os.path.join(self.remotes, name)
+            Repo.init(bare, bare=True)
+            up = Repo.clone_from(bare, os.path.join(self.root, 'upstream', name))
+            commit(up, 'first')
+            up.git.push('origin', 'HEAD:master')
+            self.upstream[name] = up
+            Repo.clone_from(bare, os.path.join(self.local, name))
+
+        self.synced = []
+
+    def tearDown(self):
+        sync_manager.repository_path = self._repository_path
+        shutil.rmtree(self.root)
+
+    def _sync(self, name):
+        self.synced.append(name)
+        Repo(os.path.join(self.local, name)).git.merge('FETCH_HEAD')
+        return True
+
+    def _push(self, name):
+        up = self.upstream[name]
+        commit(up, 'second', 'b')
+        up.git.push('origin', 'HEAD:master')
+
+    def test_check_up_to_date(self):
+        r = check_repository('A', os.path.join(self.local, 'A'))
+        self.assertEqual(r.status, UP_TO_DATE)
+        self.assertEqual(r.branch, 'master')
+
+    def test_check_stale_fetches(self):
+        self._push('A')
+        r = check_repository('A', os.path.join(self.local, 'A'))
+        self.assertEqual(r.status, STALE)
+
+        repo = Repo(os.path.join(self.local, 'A'))
+        self.assertEqual(repo.commit('FETCH_HEAD').hexsha, self.upstream['A'].head.commit.hexsha)
+
+    def test_check_ahead(self):
+        commit(Repo(os.path.join(self.local, 'A')), 'local')
+        r = check_repository('A', os.path.join(self.local, 'A'))
+        self.assertEqual(r.status, UP_TO_DATE)
+
+    def test_check_missing(self):
+        r = check_repository('D', os.path.join(self.local, 'D'))
+        self.assertEqual(r.status, MISSING)
+
+    def test_sync_only_stale(self):
+        self._push('B')
+        sm = RepositorySyncManager(window=0)
+        results = sm.sync(('A', 'B', 'C'), self._sync, use_progress=False)
+        self.assertListEqual(self.synced, ['B'])
+        self.assertEqual(results['B'].branch, 'master')
+        self.assertEqual(Repo(os.path.join(self.local, 'B')).head.commit.hexsha,
+                         self.upstream['B'].head.commit.hexsha)
+
+    def test_window(self):
+        sm = RepositorySyncManager(window=300)
+        sm.sync(('A', 'B'), self._sync, use_progress=False)
+
+        self._push('A')
+        results = sm.sync(('A', 'B', 'C'), self._sync, use_progress=False)
+        self.assertEqual(results['A'].status, RECENT)
+        self.assertEqual(results['C'].status, UP_TO_DATE)
+        self.assertListEqual(self.synced, [])
+
+        sm.invalidate('A')
+        sm.sync(('A', 'B', 'C'), self._sync, use_progress=False)
+        self.assertListEqual(self.synced, ['A'])
+
+    def test_failed_sync_not_recent(self):
+        self._push('A')
+        sm = RepositorySyncManager(window=300)
+        sm.sync(('A',), lambda name: None, use_progress=False)
+        self.assertIsNone(sm.get_recent_branch('A'))
+
+
+if __name__ == '__main__':
+    unittest.main()
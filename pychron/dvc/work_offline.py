@@ -22,13 +22,14 @@ from operator import attrgetter
 import yaml
 from pyface.constant import OK
 from pyface.file_dialog import FileDialog
-from traits.api import Str, Button, List
-from traitsui.api import View, UItem, VGroup
+from traits.api import Str, Button, List, Bool
+from traitsui.api import View, UItem, VGroup, Item
 from traitsui.editors import TabularEditor
 from traitsui.tabular_adapter import TabularAdapter
 
 from pychron.core.helpers.filetools import unique_path2, add_extension
 from pychron.core.progress import progress_iterator, open_progress
+from pychron.dvc.offline_index import offline_index_path
 from pychron.envisage.browser.record_views import RepositoryRecordView
 from pychron.loggable import Loggable
 from pychron.paths import paths
@@ -48,6 +49,11 @@ def switch_to_offline_database(preferences):
     preferences.save()
 
 
+def switch_to_offline_index(preferences):
+    preferences.set('pychron.dvc.use_offline_index', True)
+    preferences.save()
+
+
 class RepositoryTabularAdapter(TabularAdapter):
     columns = [('Name', 'name'),
                ('Create Date', 'created_at'),
@@ -59,11 +65,12 @@ class WorkOffline(Loggable):
     1. Select set of repositories
     2. clone repositories
     3. update the meta repo
-    4. copy the central db to a sqlite db
+    4. index the local repositories or copy the central db to a sqlite db
     5. set DVC db preferences to sqlite
     """
     work_offline_user = Str
     work_offline_password = Str
+    use_local_index = Bool(True)
 
     repositories = List
     selected_repositories = List
@@ -107,8 +114,12 @@ class WorkOffline(Loggable):
         self.dvc.open_meta_repo()
         self.dvc.meta_pull()
 
-        # clone central db
         repos = [ri.name for ri in self.selected_repositories]
+        if self.use_local_index:
+            self._build_index(repos)
+            return
+
+        # clone central db
         path = self._clone_central_db(repos)
         if not path:
             return
@@ -153,6 +164,27 @@ class WorkOffline(Loggable):
 
         return True
 
+    def _build_index(self, repositories):
+        self.info('--------- Build Local Index -----------')
+        st = time.time()
+        try:
+            n = self.dvc.update_offline_index(repositories, reraise=True)
+        except BaseException as e:
+            self.warning_dialog('Failed building the local index. error={}'.format(e))
+            return
+
+        self.debug('index updated n={} et={:0.3f}'.format(n, time.time() - st))
+
+        # browse with the index
+        if self.application:
+            switch_to_offline_index(self.application.preferences)
+        else:
+            self.dvc.use_offline_index = True
+
+        self.information_dialog('Local index saved to "{}". The browser will use it while working '
+                                'offline'.format(offline_index_path()))
+        return True
+
     def _get_new_path(self):
         return unique_path2(paths.dvc_dir, 'index', extension='.sqlite3')[0]
 
@@ -325,6 +357,8 @@ class WorkOffline(Loggable):
                               editor=TabularEditor(adapter=RepositoryTabularAdapter(),
                                                    selected='selected_repositories',
                                                    multi_select=True)),
+                        Item('use_local_index', label='Index Local Repositories',
+                             tooltip='Index the cloned repositories instead of copying the central database'),
                         UItem('work_offline_button',
                               enabled_when='selected_repositories')),
                  title='Work Offline',
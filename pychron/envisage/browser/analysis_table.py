@@ -28,7 +28,7 @@ from traits.api import List, Any, Str, Enum, Bool, Event, Property, cached_prope
     CStr, Int, Button
 
 from pychron.column_sorter_mixin import ColumnSorterMixin
-from pychron.core.fuzzyfinder import fuzzyfinder
+from pychron.core.fuzzy_index import FuzzyIndex
 from pychron.core.helpers.iterfuncs import groupby_repo
 from pychron.core.select_same import SelectSameMixin
 from pychron.dvc.func import get_review_status
@@ -67,6 +67,7 @@ class AnalysisTable(ColumnSorterMixin, SelectSameMixin):
     scroll_to_row = Event
     scroll_to_bottom = Event
     scroll_to_top = Event
+    scrolled_to_end = Event
 
     refresh_needed = Event
     tabular_adapter = Instance(AnalysisAdapter)
@@ -87,6 +88,9 @@ class AnalysisTable(ColumnSorterMixin, SelectSameMixin):
     one_selected_is_all = Bool(True)
     auto_scroll_kind = Enum(AUTO_SCROLL_KINDS)
 
+    # (parameter, FuzzyIndex) of oanalyses used by the analysis filter
+    _filter_index = None
+
     def __init__(self, *args, **kw):
         super(AnalysisTable, self).__init__(*args, **kw)
         bind_preference(self, 'one_selected_is_all', 'pychron.browser.one_selected_is_all')
@@ -164,6 +168,8 @@ class AnalysisTable(ColumnSorterMixin, SelectSameMixin):
             if ai:
                 ai.set_tag(tag)
 
+        # the tag may be the filtered attribute
+        self._filter_index = None
         self._analysis_filter_changed(self.analysis_filter)
         self.selected = []
 
@@ -179,6 +185,17 @@ class AnalysisTable(ColumnSorterMixin, SelectSameMixin):
         # self.scroll_to_row = len(self.analyses) - 1
         self._auto_scroll()
 
+    def append_analyses(self, ans):
+        """
+            add the next page of analyses to the end of the table. does not sort or scroll
+        """
+        uuids = {ai.uuid for ai in self.oanalyses}
+        ans = [ai for ai in ans if ai.uuid not in uuids]
+        if ans:
+            self.oanalyses = self.oanalyses + ans
+            self._analysis_filter_changed(self.analysis_filter)
+            self.calculate_dts(self.analyses)
+
     def clear_non_frozen(self):
         self.analyses = [a for a in self.analyses if a.frozen]
         self.oanalyses = self.analyses
@@ -348,10 +365,35 @@ class AnalysisTable(ColumnSorterMixin, SelectSameMixin):
     def _analysis_filter_changed(self, new):
         if new:
             name = self.analysis_filter_parameter
-            self.analyses = fuzzyfinder(new, self.oanalyses, name)
+            ms = set(self._get_filter_index(name).search(new))
+            self.analyses = [ai for ai in self.oanalyses if ai in ms]
         else:
             self.analyses = self.oanalyses
 
+    def _get_filter_index(self, name):
+        if self._filter_index is None or self._filter_index[0] != name:
+            self._filter_index = name, FuzzyIndex(self.oanalyses, attr=name, max_distance=0)
+        return self._filter_index[1]
+
+    def _oanalyses_changed(self, old, new):
+        # keep the filter index in sync instead of rebuilding it, e.g. when a page is appended or the table sorted
+        if self._filter_index is not None:
+            idx = self._filter_index[1]
+            if old:
+                for ai in set(old).difference(new):
+                    idx.remove(ai)
+            for ai in new:
+                if ai not in idx:
+                    idx.add(ai)
+
+    def _oanalyses_items_changed(self, new):
+        if self._filter_index is not None:
+            idx = self._filter_index[1]
+            for ai in new.removed:
+                idx.remove(ai)
+            for ai in new.added:
+                idx.add(ai)
+
     def _analysis_filter_comparator_changed(self):
         self._analysis_filter_changed(self.analysis_filter)
 
@@ -26,9 +26,10 @@ from traits.trait_types import BaseStr
 from traitsui.tabular_adapter import TabularAdapter
 
 from pychron.column_sorter_mixin import ColumnSorterMixin
-from pychron.core.fuzzyfinder import fuzzyfinder
+from pychron.core.fuzzy_index import FuzzyIndex
 from pychron.core.progress import progress_loader
 from pychron.core.ui.table_configurer import SampleTableConfigurer
+from pychron.dvc.paging import AnalysisPager
 from pychron.envisage.browser import progress_bind_records
 from pychron.envisage.browser.adapters import LabnumberAdapter
 from pychron.envisage.browser.record_views import ProjectRecordView, LabnumberRecordView, \
@@ -134,6 +135,8 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
     auto_select_analysis = Bool(False)
 
     sample_filter_values = Property(List, depends_on='osamples, sample_filter_parameter')
+    # (parameter, FuzzyIndex) of osamples used by the fuzzy sample filter
+    _sample_filter_index = None
     sample_filter_parameter = Str('name')
     sample_filter_comparator = Enum('fuzzy', 'startswith', '=', 'not =', )
     sample_filter_parameters = Property(List, depends_on='labnumber_tabular_adapter.columns')
@@ -171,6 +174,8 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
     _recent_low_post = None
     _recent_mass_spectrometers = None
     _previous_recent_name = ''
+    _analysis_pager = None
+    _loading_page = False
 
     use_analysis_type_filtering = Bool
     analysis_include_types = Property(List)
@@ -438,9 +443,31 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
                            repositories=None,
                            loads=None,
                            make_records=True,
-                           analysis_types=None):
+                           analysis_types=None,
+                           paged=False):
+        """
+        if ``paged`` only the first ``limit`` analyses of ``samples`` are retrieved.
+        use ``load_next_analyses_page`` to get the rest
+        """
         db = self.db
-        if samples:
+
+        # only a paged query has more pages to load
+        self._analysis_pager = None
+        if samples and paged:
+            lns = [si.labnumber for si in samples]
+            self.debug('retrieving first page identifiers={}'.format(','.join(lns)))
+            self._analysis_pager = pager = AnalysisPager(db, lns, page_size=limit or 200,
+                                                         order=order,
+                                                         low_post=low_post,
+                                                         high_post=high_post,
+                                                         exclude_uuids=exclude_uuids,
+                                                         include_invalid=include_invalid,
+                                                         mass_spectrometers=mass_spectrometers,
+                                                         repositories=repositories,
+                                                         loads=loads)
+            ans = pager.next_page()
+            self.debug('retrieved analyses n={} more={}'.format(len(ans), pager.has_more))
+        elif samples:
             lns = [si.labnumber for si in samples]
             self.debug('retrieving identifiers={}'.format(','.join(lns)))
             # if low_post is None:
@@ -472,6 +499,20 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
         else:
             return ans
 
+    def load_next_analyses_page(self):
+        pager = self._analysis_pager
+        if pager is None or not pager.has_more or self._loading_page:
+            return []
+
+        self._loading_page = True
+        try:
+            ans = pager.next_page()
+            self.debug('retrieved next analyses page n={} loaded={} more={}'.format(len(ans), pager.nloaded,
+                                                                                     pager.has_more))
+            return self._make_records(ans)
+        finally:
+            self._loading_page = False
+
     # def _retrieve_sample_analyses(self, samples, **kw):
     #    return self._retrieve_analyses(samples=samples, **kw)
 
@@ -677,6 +718,7 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
         self.table_configurer.set_adapter(self.labnumber_tabular_adapter)
 
     def _clear_selection_button_fired(self):
+        self._analysis_pager = None
         self.selected_projects = []
         self.selected_samples = []
         self.samples = []
@@ -701,12 +743,31 @@ class BaseBrowserModel(PersistenceLoggable, ColumnSorterMixin):
         name = self._get_sample_filter_parameter()
         comp = self.sample_filter_comparator
         if comp == 'fuzzy':
-            self.samples = fuzzyfinder(new, self.osamples, name)
+            if new:
+                ms = set(self._get_sample_filter_index(name).search(new))
+                self.samples = [s for s in self.osamples if s in ms]
+            else:
+                self.samples = self.osamples
         else:
             func = filter_func(new, name, comp)
             self.samples = [s for s in self.osamples if func(s)]
             # self.samples = list(filter(filter_func(new, name, comp), self.osamples))
 
+    def _get_sample_filter_index(self, name):
+        if self._sample_filter_index is None or self._sample_filter_index[0] != name:
+            self._sample_filter_index = name, FuzzyIndex(self.osamples, attr=name, max_distance=0)
+        return self._sample_filter_index[1]
+
+    def _osamples_changed(self):
+        self._sample_filter_index = None
+
+    def _osamples_items_changed(self, new):
+        if self._sample_filter_index is not None:
+            idx = self._sample_filter_index[1]
+            for si in new.removed:
+                idx.remove(si)
+            idx.extend(new.added)
+
     # property get/set
     def _set_low_post(self, v):
         if not self._suppress_post_update:
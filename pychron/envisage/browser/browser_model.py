@@ -248,6 +248,8 @@ class BrowserModel(BaseBrowserModel):
                 #     print lvsm.selections
 
     def _selected_samples_changed(self, new):
+        # the pages of the previous selection
+        self._analysis_pager = None
         self._selected_samples_changed_hook(new)
         self.dump_browser()
 
@@ -303,7 +303,7 @@ class SampleBrowserModel(BrowserModel):
             if self.load_enabled and self.selected_loads:
                 ls = [l.name for l in self.selected_loads]
 
-            ans = self._retrieve_analyses(samples=new, loads=ls, low_post=lp, high_post=hp, **kw)
+            ans = self._retrieve_analyses(samples=new, loads=ls, low_post=lp, high_post=hp, paged=True, **kw)
 
             self.debug('selected samples changed. loading analyses. '
                        'low={}, high={}, limit={} n={}'.format(lp, hp, lim, len(ans)))
@@ -437,6 +437,11 @@ class SampleBrowserModel(BrowserModel):
 
         self.irradiations = [i.name for i in irrads]
 
+    def _handle_analyses_scrolled_to_end(self):
+        ans = self.load_next_analyses_page()
+        if ans:
+            self.analysis_table.append_analyses(ans)
+
     def _get_find_references_enabled(self):
         return bool(self.analysis_table.analyses)
 
@@ -445,6 +450,7 @@ class SampleBrowserModel(BrowserModel):
 
     def _analysis_table_default(self):
         at = AnalysisTable(dvc=self.dvc)
+        at.on_trait_change(self._handle_analyses_scrolled_to_end, 'scrolled_to_end')
         # at.on_trait_change(self._analysis_set_changed, 'analysis_set')
         # at.load()
         prefid = 'pychron.browser'
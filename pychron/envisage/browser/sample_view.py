@@ -278,6 +278,7 @@ class AnalysisGroupView(GroupView):
                                                          scroll_to_row='analysis_table.scroll_to_row',
                                                          scroll_to_bottom='analysis_table.scroll_to_bottom',
                                                          scroll_to_top='analysis_table.scroll_to_top',
+                                                         scrolled_to_end='analysis_table.scrolled_to_end',
                                                          stretch_last_section=False)),
                             defined_when=self.pane.analyses_defined,
                             show_border=True,
@@ -0,0 +1,192 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import time
+from queue import Queue, Empty, Full
+from threading import Thread
+
+_STOP = object()
+
+
+class WriterStats(object):
+    __slots__ = ('nwritten', 'nbatches', 'nflushes', 'total_latency', 'max_latency', 'max_depth', 'nblocked')
+
+    def __init__(self):
+        self.nwritten = 0
+        self.nbatches = 0
+        self.nflushes = 0
+        self.total_latency = 0
+        self.max_latency = 0
+        self.max_depth = 0
+        self.nblocked = 0
+
+    @property
+    def mean_latency(self):
+        return self.total_latency / self.nwritten if self.nwritten else 0
+
+    def __str__(self):
+        return 'written={} batches={} flushes={} latency mean={:0.2f}ms max={:0.2f}ms ' \
+               'max_queue_depth={} blocked={}'.format(self.nwritten, self.nbatches, self.nflushes,
+                                                       self.mean_latency * 1000, self.max_latency * 1000,
+                                                       self.max_depth, self.nblocked)
+
+
+class AsyncDataWriter(object):
+    """
+        call ``writer`` from a background thread so disk io does not delay the measurement thread.
+
+        samples are put on a bounded queue. the worker writes everything that is queued as one batch and calls
+        ``writer.flush()`` at most every ``flush_period`` seconds. if writer has no ``flush`` each sample is
+        written with ``writer(*args)``.
+
+        ``put`` blocks if the queue is full, i.e. if the disk cannot keep up, rather than dropping samples.
+        ``stop`` writes everything still queued, flushes and waits for the worker to finish.
+
+        latency is the time from ``put`` to the sample being written
+    """
+
+    def __init__(self, writer, maxsize=1000, flush_period=1.0, max_batch=100, logger=None):
+        self.writer = writer
+        self.flush_period = flush_period
+        self.max_batch = max_batch
+        self.logger = logger
+        self.stats = WriterStats()
+
+        self._queue = Queue(maxsize=maxsize)
+        self._thread = None
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    @property
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = Thread(target=self._run, name='AsyncDataWriter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, *args):
+        if not self.is_alive:
+            # worker failed or was never started. write inline so no data is lost
+            self._write(args, time.time())
+            self._flush()
+            return
+
+        item = (args, time.time())
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            self.stats.nblocked += 1
+            self._queue.put(item)
+
+        depth = self._queue.qsize()
+        if depth > self.stats.max_depth:
+            self.stats.max_depth = depth
+
+    def stop(self, timeout=None):
+        """
+            drain the queue and wait for the worker. returns the stats
+        """
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._log('warning', 'data writer did not finish in {}s'.format(timeout))
+            else:
+                self._thread = None
+
+        self._log('debug', 'data writer stopped. {}'.format(self.stats))
+        return self.stats
+
+    # private
+    def _run(self):
+        q = self._queue
+        last_flush = time.time()
+        alive = True
+        while alive:
+            try:
+                item = q.get(timeout=self.flush_period)
+            except Empty:
+                item = None
+
+            n = 0
+            while item is not None:
+                if item is _STOP:
+                    alive = False
+                    break
+
+                self._safe_write(*item)
+                n += 1
+                if n >= self.max_batch:
+                    break
+
+                try:
+                    item = q.get_nowait()
+                except Empty:
+                    item = None
+
+            if n:
+                self.stats.nbatches += 1
+
+            now = time.time()
+            if alive and now - last_flush >= self.flush_period:
+                self._flush()
+                last_flush = now
+
+        # samples put after stop then a final flush
+        while not q.empty():
+            item = q.get_nowait()
+            if item is not _STOP:
+                self._safe_write(*item)
+        self._flush()
+
+    def _safe_write(self, args, st):
+        try:
+            self._write(args, st)
+        except BaseException as e:
+            self._log('warning', 'data writer failed. {}'.format(e))
+
+    def _write(self, args, st):
+        flush = getattr(self.writer, 'flush', None)
+        if flush is None:
+            self.writer(*args)
+        else:
+            self.writer(*args, flush=False)
+
+        lat = time.time() - st
+        s = self.stats
+        s.nwritten += 1
+        s.total_latency += lat
+        if lat > s.max_latency:
+            s.max_latency = lat
+
+    def _flush(self):
+        flush = getattr(self.writer, 'flush', None)
+        if flush is not None:
+            try:
+                flush()
+            except BaseException as e:
+                self._log('warning', 'data writer flush failed. {}'.format(e))
+            self.stats.nflushes += 1
+
+    def _log(self, level, msg):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+# ============= EOF =============================================
@@ -2276,6 +2276,11 @@ anaylsis_type={}
         with self.persister.writer_ctx():
             m.measure()
 
+        if m.timing_stats and self.persistence_spec:
+            timing = m.timing_stats.to_dict()
+            timing['kind'] = grpname
+            self.persistence_spec.measurement_timing.append(timing)
+
         # mem_log('post measure')
         if m.terminated:
             self.debug('measurement terminated')
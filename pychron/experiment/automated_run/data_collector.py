@@ -16,13 +16,15 @@
 
 import time
 from datetime import datetime
-from threading import Event
+from threading import Event, RLock
 
 # ============= enthought library imports =======================
 from apptools.preferences.preference_binding import bind_preference
 from traits.api import Any, List, CInt, Int, Bool, Enum, Str, Instance
 
 from pychron.envisage.consoleable import Consoleable
+from pychron.experiment.automated_run.async_writer import AsyncDataWriter
+from pychron.experiment.automated_run.measurement_scheduler import DeadlineScheduler, MeasurementWorker
 from pychron.pychron_constants import AR_AR, SIGNAL, BASELINE, WHIFF, SNIFF
 
 
@@ -62,7 +64,6 @@ class DataCollector(Consoleable):
     _data = None
     _temp_conds = None
     _result = None
-    _queue = None
 
     err_message = Str
     no_intensity_threshold = 100
@@ -70,9 +71,22 @@ class DataCollector(Consoleable):
     trigger = None
     plot_panel_update_period = Int(1)
 
+    data_writer = None
+    use_async_data_writer = Bool(True)
+    _writer = None
+
+    # counts are taken on a fixed grid of ticks. collectors that move the magnet between counts wait a full period
+    # after each move instead
+    fixed_cadence = True
+    timing_stats = None
+    _worker = None
+    _data_lock = None
+
     def __init__(self, *args, **kw):
         super(DataCollector, self).__init__(*args, **kw)
+        self._data_lock = RLock()
         bind_preference(self, 'plot_panel_update_period', 'pychron.experiment.plot_panel_update_period')
+        bind_preference(self, 'use_async_data_writer', 'pychron.experiment.use_async_data_writer')
 
     def wait(self):
         st = time.time()
@@ -111,16 +125,21 @@ class DataCollector(Consoleable):
 
         et = self.ncounts * self.period_ms * 0.001
 
+        ig = self.isotope_group
+        if ig is not None:
+            ig.reserve_data(self.ncounts, self.collection_kind)
+
         self._alive = True
 
         self._measure()
 
         tt = time.time() - self.starttime
         self.debug('estimated time: {:0.3f} actual time: :{:0.3f}'.format(et, tt))
+        if self.timing_stats:
+            self.debug('measurement timing {}'.format(self.timing_stats))
 
-    def plot_data(self, *args, **kw):
-        from pychron.core.ui.gui import invoke_in_main_thread
-        invoke_in_main_thread(self._plot_data, *args, **kw)
+    def plot_data(self, cnt, x, keys, signals):
+        self._plot_data(cnt, x, self._get_plot_snapshot(keys, signals))
 
     def set_temporary_conditionals(self, cd):
         self._temp_conds = cd
@@ -135,50 +154,67 @@ class DataCollector(Consoleable):
         self._evt = Event()
         evt = self._evt
 
-        # self._queue = q = Queue()
-        # def writefunc():
-        #     writer = self.data_writer
-        #     while not q.empty() or not evt.wait(10):
-        #         dets = self.detectors
-        #         while not q.empty():
-        #             x, keys, signals = q.get()
-        #             writer(dets, x, keys, signals)
-        #
-        # # only write to file every 10 seconds and not on main thread
-        # t = Thread(target=writefunc)
-        # # t.setDaemon(True)
-        # t.start()
+        # write to file on a background thread so disk io does not delay the counts
+        writer = None
+        if self.use_async_data_writer and self.data_writer is not None:
+            writer = AsyncDataWriter(self.data_writer, logger=self)
+            writer.start()
+        self._writer = writer
+
+        # plotting and age refresh are not needed to take the next count
+        worker = MeasurementWorker(logger=self)
+        worker.start()
+        self._worker = worker
 
         self.debug('measurement period (ms) = {}'.format(self.period_ms))
         period = self.period_ms * 0.001
-        i = 1
-        # elapsed = 0
-        while not evt.is_set():
-            result = self._check_iteration(i)
-            if not result:
-                if not self._pre_trigger_hook():
-                    break
 
-                if self.trigger:
-                    self.trigger()
+        # ticks are relative to the start of the measurement so counts do not drift as processing time varies
+        scheduler = DeadlineScheduler(period, anchor=self.starttime)
+        self.timing_stats = scheduler.stats
+        fixed = self.fixed_cadence and not self.trigger
 
-                evt.wait(period)
-                self.automated_run.plot_panel.counts = i
-                if not self._iter_hook(i):
+        i = 1
+        try:
+            while not evt.is_set():
+                with self._data_lock:
+                    result = self._check_iteration(i)
+
+                if not result:
+                    if not self._pre_trigger_hook():
+                        break
+
+                    if self.trigger:
+                        self.trigger()
+
+                    if fixed:
+                        scheduler.wait(evt)
+                    else:
+                        # the integration starts at the trigger or the end of the hop
+                        scheduler.wait(evt, time.time() + period)
+
+                    self.automated_run.plot_panel.counts = i
+                    if not self._iter_hook(i):
+                        break
+
+                    self._post_iter_hook(i)
+                    i += 1
+                else:
+                    if result == 'cancel':
+                        self.canceled = True
+                    elif result == 'terminate':
+                        self.terminated = True
                     break
+        finally:
+            evt.set()
+            self.debug('waiting for plotting to finish')
+            worker.stop()
+            self._worker = None
 
-                self._post_iter_hook(i)
-                i += 1
-            else:
-                if result == 'cancel':
-                    self.canceled = True
-                elif result == 'terminate':
-                    self.terminated = True
-                break
-
-        evt.set()
-        self.debug('waiting for write to finish')
-        # t.join()
+            if writer is not None:
+                self.debug('waiting for write to finish')
+                writer.stop()
+                self._writer = None
 
         self.debug('measurement finished')
         
@@ -187,8 +223,18 @@ class DataCollector(Consoleable):
 
     def _post_iter_hook(self, i):
         if self.experiment_type == AR_AR and self.refresh_age and not i % 5:
+            self._submit(self._refresh_age, key='age')
+
+    def _refresh_age(self):
+        with self._data_lock:
             self.isotope_group.calculate_age(force=True)
 
+    def _submit(self, func, *args, **kw):
+        if self._worker is not None:
+            self._worker.submit(func, *args, **kw)
+        else:
+            func(*args)
+
     def _pre_trigger_hook(self):
         return True
 
@@ -210,7 +256,7 @@ class DataCollector(Consoleable):
         if k is not None and s is not None:
             x = self._get_time(t)
             self._save_data(x, k, s)
-            self._plot_data(i, x, k, s)
+            self._submit(self._plot_data, i, x, self._get_plot_snapshot(k, s))
 
         return True
 
@@ -253,14 +299,20 @@ class DataCollector(Consoleable):
             return data
 
     def _save_data(self, x, keys, signals):
-        # self._queue.put((x, keys, signals))
-        self.data_writer(self.detectors, x, keys, signals)
+        # peak hops change the isotope of a detector. snapshot it with the count so a background writer that
+        # falls behind still saves the count under the isotope it was measured for
+        dets = [(d.name, d.isotope) for d in self.detectors]
+        if self._writer is not None:
+            self._writer.put(dets, x, list(keys), list(signals))
+        else:
+            self.data_writer(dets, x, keys, signals)
 
         # update arar_age
-        if self.is_baseline and self.for_peak_hop:
-            self._update_baseline_peak_hop(x, keys, signals)
-        else:
-            self._update_isotopes(x, keys, signals)
+        with self._data_lock:
+            if self.is_baseline and self.for_peak_hop:
+                self._update_baseline_peak_hop(x, keys, signals)
+            else:
+                self._update_isotopes(x, keys, signals)
 
     def _update_baseline_peak_hop(self, x, keys, signals):
         ig = self.isotope_group
@@ -301,22 +353,34 @@ class DataCollector(Consoleable):
                       if di.name == d), None)
         return d
 
-    def _plot_data(self, cnt, x, keys, signals):
+    def _get_plot_snapshot(self, keys, signals):
+        """
+            everything the plot of a count depends on that a peak hop changes. taken when the count is measured so
+            a lagging worker plots the count in the series it was measured for
+        """
+        dets = []
         for dn, signal in zip(keys, signals):
             det = self._get_detector(dn)
             if det:
-                self._set_plot_data(cnt, det.isotope, det.name, x, signal)
+                dets.append((det.isotope, det.name, det.ypadding, signal))
 
-        if not cnt % self.plot_panel_update_period:
-            self.plot_panel.update()
+        return self.collection_kind, self.series_idx, self.fit_series_idx, dets
+
+    def _plot_data(self, cnt, x, snapshot):
+        kind, series, fit_series, dets = snapshot
+        with self._data_lock:
+            gs = [gi for iso, det, ypadding, signal in dets
+                  for gi in self._get_plot_data(cnt, kind, series, fit_series, iso, det, ypadding, signal)]
 
-    def _set_plot_data(self, cnt, iso, det, x, signal):
+        from pychron.core.ui.gui import invoke_in_main_thread
+        invoke_in_main_thread(self._set_plot_data, x, gs, not cnt % self.plot_panel_update_period)
 
-        if self.collection_kind == SNIFF:
+    def _get_plot_data(self, cnt, kind, series, fit_series, iso, det, ypadding, signal):
+        if kind == SNIFF:
             gs = [(self.plot_panel.sniff_graph, iso, None, 0, 0),
                   (self.plot_panel.isotope_graph, iso, None, 0, 0)]
 
-        elif self.collection_kind == BASELINE:
+        elif kind == BASELINE:
             iso = self.isotope_group.get_isotope(detector=det, kind='baseline')
             if iso is not None:
                 fit = iso.get_fit(cnt)
@@ -327,12 +391,12 @@ class DataCollector(Consoleable):
             title = self.isotope_group.get_isotope_title(name=iso, detector=det)
             iso = self.isotope_group.get_isotope(name=iso, detector=det)
             fit = iso.get_fit(cnt)
-            gs = [(self.plot_panel.isotope_graph, title, fit, self.series_idx, self.fit_series_idx)]
+            gs = [(self.plot_panel.isotope_graph, title, fit, series, fit_series)]
 
-        dd = self._get_detector(det)
-        ypadding = dd.ypadding
+        return [gi + (ypadding, signal) for gi in gs]
 
-        for g, name, fit, series, fit_series in gs:
+    def _set_plot_data(self, x, gs, update):
+        for g, name, fit, series, fit_series, ypadding, signal in gs:
 
             pid = g.get_plotid_by_ytitle(name)
             g.add_datum((x, signal),
@@ -343,6 +407,9 @@ class DataCollector(Consoleable):
             if fit:
                 g.set_fit(fit, plotid=pid, series=fit_series)
 
+        if update:
+            self.plot_panel.update()
+
     # ===============================================================================
     #
     # ===============================================================================
@@ -0,0 +1,221 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import math
+import time
+from queue import Queue
+from threading import Thread
+
+_STOP = object()
+
+
+class TimingStats(object):
+    """
+        per count timing of a measurement block.
+
+        jitter is how late the collector woke up relative to the tick it was waiting for.
+        an overrun is a count whose processing was not finished by the next tick. skipped is the number of ticks
+        that were dropped to get back on the grid after an overrun longer than one period
+    """
+    __slots__ = ('period', 'ncounts', 'noverruns', 'nskipped', 'total_jitter', 'total_jitter2', 'max_jitter',
+                 'first', 'last')
+
+    def __init__(self, period=0):
+        self.period = period
+        self.ncounts = 0
+        self.noverruns = 0
+        self.nskipped = 0
+        self.total_jitter = 0
+        self.total_jitter2 = 0
+        self.max_jitter = 0
+        self.first = None
+        self.last = None
+
+    def add(self, t, jitter):
+        self.ncounts += 1
+        self.total_jitter += jitter
+        self.total_jitter2 += jitter * jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+        if self.first is None:
+            self.first = t
+        self.last = t
+
+    @property
+    def mean_jitter(self):
+        return self.total_jitter / self.ncounts if self.ncounts else 0
+
+    @property
+    def std_jitter(self):
+        n = self.ncounts
+        if n < 2:
+            return 0
+        v = (self.total_jitter2 - self.total_jitter ** 2 / n) / (n - 1)
+        return math.sqrt(max(v, 0))
+
+    @property
+    def mean_period(self):
+        """
+            average time between counts
+        """
+        if self.ncounts > 1:
+            return (self.last - self.first) / (self.ncounts - 1)
+        return 0
+
+    def to_dict(self):
+        return {'period': self.period,
+                'ncounts': self.ncounts,
+                'mean_period': self.mean_period,
+                'mean_jitter': self.mean_jitter,
+                'std_jitter': self.std_jitter,
+                'max_jitter': self.max_jitter,
+                'overruns': self.noverruns,
+                'skipped': self.nskipped}
+
+    def __str__(self):
+        return 'counts={} period={:0.3f}s mean_period={:0.4f}s jitter mean={:0.2f}ms std={:0.2f}ms ' \
+               'max={:0.2f}ms overruns={} skipped={}'.format(self.ncounts, self.period, self.mean_period,
+                                                           self.mean_jitter * 1000, self.std_jitter * 1000,
+                                                           self.max_jitter * 1000, self.noverruns, self.nskipped)
+
+
+class DeadlineScheduler(object):
+    """
+        wait for absolute tick times ``anchor + k * period`` instead of sleeping ``period`` after each count, so
+        the time spent processing a count does not accumulate.
+
+        the first tick is the first grid point at least one period after the first call to ``next_deadline``, i.e.
+        the first count is always a full integration.
+
+        if processing a count takes longer than a period the next count is taken immediately (an overrun). if it
+        takes longer than two periods the missed ticks are skipped and the scheduler waits for the next grid point
+        rather than taking a burst of counts.
+    """
+
+    def __init__(self, period, anchor=None, clock=None):
+        self.period = period
+        self.clock = clock or time.time
+        if anchor is None:
+            anchor = self.clock()
+        self.anchor = anchor
+        self.stats = TimingStats(period)
+        self._tick = None
+
+    def next_deadline(self):
+        now = self.clock()
+        period = self.period
+        if self._tick is None:
+            self._tick = int(math.ceil((now + period - self.anchor) / period))
+        else:
+            self._tick += 1
+            deadline = self.anchor + self._tick * period
+            if now > deadline:
+                self.stats.noverruns += 1
+                if now > deadline + period:
+                    tick = int(math.ceil((now - self.anchor) / period))
+                    self.stats.nskipped += tick - self._tick
+                    self._tick = tick
+
+        return self.anchor + self._tick * period
+
+    def wait(self, evt, deadline=None):
+        """
+            block until ``deadline`` or until ``evt`` is set. returns True if ``evt`` was set
+        """
+        if deadline is None:
+            deadline = self.next_deadline()
+
+        dt = deadline - self.clock()
+        if dt > 0 and evt.wait(dt):
+            return True
+
+        now = self.clock()
+        self.stats.add(now, max(0, now - deadline))
+
+
+class MeasurementWorker(object):
+    """
+        run work that is not needed to acquire the next count, i.e. plotting and age refresh, on a single
+        background thread. jobs run in the order they were submitted.
+
+        a job submitted with a ``key`` is coalesced. if a job with the same key is still waiting it is not
+        queued again.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self._queue = Queue()
+        self._pending = set()
+        self._thread = None
+
+    @property
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = Thread(target=self._run, name='MeasurementWorker')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, func, *args, **kw):
+        key = kw.pop('key', None)
+        if not self.is_alive:
+            self._call(func, args)
+            return
+
+        if key is not None:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        self._queue.put((key, func, args))
+
+    def stop(self, timeout=None):
+        """
+            run everything that is queued then wait for the thread to finish
+        """
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._log('warning', 'measurement worker did not finish in {}s'.format(timeout))
+            else:
+                self._thread = None
+
+    def _run(self):
+        q = self._queue
+        while 1:
+            item = q.get()
+            if item is _STOP:
+                break
+
+            key, func, args = item
+            if key is not None:
+                self._pending.discard(key)
+            self._call(func, args)
+
+    def _call(self, func, args):
+        try:
+            func(*args)
+        except BaseException as e:
+            self._log('warning', 'measurement worker failed. {}'.format(e))
+
+    def _log(self, level, msg):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+# ============= EOF =============================================
@@ -33,6 +33,7 @@ class PeakHopCollector(DataCollector):
     settling_time = 0
     ncycles = Int
     hop_generator = None
+    fixed_cadence = False
 
     _was_deflected = False
     _detectors = None
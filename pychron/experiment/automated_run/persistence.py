@@ -91,6 +91,56 @@ class BasePersister(Loggable):
         pass
 
 
+class H5DataWriter(object):
+    """
+        append (x, signal) rows to the h5 tables of a measurement group.
+
+        ``writer(dets, x, keys, signals)`` writes and flushes one count. ``dets`` is a list of (detector name,
+        isotope) pairs taken when the count was measured. pass flush=False to only append the rows and call
+        ``flush`` later, e.g. from a background writer
+    """
+
+    def __init__(self, persister, grpname):
+        self.persister = persister
+        self.grpname = grpname
+        self._tables = {}
+        self._dirty = set()
+
+    def __call__(self, dets, x, keys, signals, flush=True):
+        dm = self.persister.data_manager
+        grpname = self.grpname
+        tables = self._tables
+        for k, iso in dets:
+            try:
+                if k in keys:
+                    if grpname == 'baseline':
+                        grp = '/{}'.format(grpname)
+                    else:
+                        grp = '/{}/{}'.format(grpname, iso)
+
+                    tag = '{}/{}'.format(grp, k)
+                    t = tables.get(tag)
+                    if t is None:
+                        t = dm.get_table(k, grp)
+                        tables[tag] = t
+
+                    nrow = t.row
+                    nrow['time'] = x
+                    nrow['value'] = signals[keys.index(k)]
+                    nrow.append()
+                    self._dirty.add(tag)
+            except AttributeError as e:
+                self.persister.debug('error: {} group:{} det:{} iso:{}'.format(e, grpname, k, iso))
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        for tag in self._dirty:
+            self._tables[tag].flush()
+        self._dirty.clear()
+
+
 def get_sheet(wb, name):
     i = 0
     while 1:
@@ -277,45 +327,12 @@ class AutomatedRunPersister(BasePersister):
     def get_data_writer(self, grpname):
         """
         grpname should be a str such as "signal", "baseline",etc
-        return a closure for writing the data
+        return a callable for writing the data
 
         :param grpname: str
-        :return: function
+        :return: H5DataWriter
         """
-        tables = {}
-
-        def write_data(dets, x, keys, signals):
-            # todo: test whether saving data to h5 in real time is expansive
-
-            # disable H5 data writer
-            # self.unique_warning('NOT Writing data to H5 in real time')
-            # return
-
-            dm = self.data_manager
-            for det in dets:
-                k = det.name
-                try:
-                    if k in keys:
-                        if grpname == 'baseline':
-                            grp = '/{}'.format(grpname)
-                        else:
-                            grp = '/{}/{}'.format(grpname, det.isotope)
-
-                        tag = '{}/{}'.format(grp, k)
-                        if tag in tables:
-                            t = tables['tag']
-                        else:
-                            t = dm.get_table(k, grp)
-
-                        nrow = t.row
-                        nrow['time'] = x
-                        nrow['value'] = signals[keys.index(k)]
-                        nrow.append()
-                        t.flush()
-                except AttributeError as e:
-                    self.debug('error: {} group:{} det:{} iso:{}'.format(e, grpname, k, det.isotope))
-
-        return write_data
+        return H5DataWriter(self, grpname)
 
     def build_tables(self, grpname, detectors, n):
         """
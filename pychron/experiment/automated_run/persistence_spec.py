@@ -105,6 +105,9 @@ class PersistenceSpec(HasTraits):
     lab_humiditys = List
     lab_pneumatics = List
 
+    # per block count timing. list of TimingStats.to_dict() with the block's kind
+    measurement_timing = List
+
     # lithographic_unit = Str
     # lat_long = Str
     # rock_type = Str
@@ -982,6 +982,12 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
         msg = '{} {}'.format(n, msg)
         self._set_message(msg, c)
 
+        # push analyses still waiting in the commit pipeline
+        if self.use_dvc_persistence and self.application:
+            dvcp = self.application.get_service('pychron.dvc.dvc_persister.DVCPersister')
+            if dvcp:
+                dvcp.flush_commits()
+
     def _show_conditionals(self, active_run=None, tripped=None, kind='live'):
         try:
 
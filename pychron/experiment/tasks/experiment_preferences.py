@@ -97,6 +97,7 @@ class ExperimentPreferences(BasePreferencesHelper):
     failed_intensity_count_threshold = PositiveInteger(3)
     ratio_change_detection_enabled = Bool(False)
     plot_panel_update_period = PositiveInteger(1)
+    use_async_data_writer = Bool(True)
 
     execute_open_queues = Bool
 
@@ -250,6 +251,9 @@ class ExperimentPreferencesPane(PreferencesPane):
                                                   'Configured via "setupfiles/ratio_change_detection.yaml"'),
                                      Item('plot_panel_update_period', label='Regression Update Period',
                                           tooltip='update the isotope regression graph every N counts'),
+                                     Item('use_async_data_writer', label='Background Data Writer',
+                                          tooltip='Write measured signals to file on a background thread so '
+                                                  'disk access does not delay the measurement'),
                                      pc_grp,
                                      persist_grp,
                                      monitor_grp, overlap_grp),
@@ -0,0 +1,210 @@
+import time
+import unittest
+
+from apptools.preferences.api import get_default_preferences, set_default_preferences, Preferences
+
+from pychron.experiment.automated_run.async_writer import AsyncDataWriter
+from pychron.experiment.automated_run.persistence import H5DataWriter
+
+
+class FlushWriter(object):
+    def __init__(self, delay=0):
+        self.rows = []
+        self.flushed = []
+        self.nflushes = 0
+        self.delay = delay
+
+    def __call__(self, dets, x, keys, signals, flush=True):
+        if self.delay:
+            time.sleep(self.delay)
+        self.rows.append((x, signals))
+        if flush:
+            self.flush()
+
+    def flush(self):
+        self.nflushes += 1
+        self.flushed = list(self.rows)
+
+
+class Table(object):
+    def __init__(self):
+        self.rows = []
+        self.nflushes = 0
+
+    @property
+    def row(self):
+        table = self
+
+        class Row(dict):
+            def append(self):
+                table.rows.append((self['time'], self['value']))
+
+        return Row()
+
+    def flush(self):
+        self.nflushes += 1
+
+
+class DataManager(object):
+    def __init__(self):
+        self.tables = {}
+        self.nget = 0
+
+    def get_table(self, name, grp):
+        self.nget += 1
+        return self.tables.setdefault((grp, name), Table())
+
+
+class Persister(object):
+    def __init__(self):
+        self.data_manager = DataManager()
+
+    def debug(self, msg):
+        pass
+
+
+class Detector(object):
+    def __init__(self, name, isotope):
+        self.name = name
+        self.isotope = isotope
+
+
+class AsyncDataWriterTestCase(unittest.TestCase):
+    def test_drain_on_stop(self):
+        w = FlushWriter(delay=0.001)
+        a = AsyncDataWriter(w, flush_period=10)
+        a.start()
+        for i in range(200):
+            a.put([], i, [], [i])
+        stats = a.stop()
+
+        self.assertListEqual([r[0] for r in w.rows], list(range(200)))
+        self.assertEqual(len(w.flushed), 200)
+        self.assertEqual(stats.nwritten, 200)
+        # one flush when stopping since the flush period was never reached
+        self.assertEqual(w.nflushes, 1)
+
+    def test_periodic_flush(self):
+        w = FlushWriter()
+        a = AsyncDataWriter(w, flush_period=0.01)
+        a.start()
+        a.put([], 0, [], [0])
+        time.sleep(0.1)
+        self.assertEqual(len(w.flushed), 1)
+        a.stop()
+
+    def test_bounded(self):
+        w = FlushWriter(delay=0.005)
+        a = AsyncDataWriter(w, maxsize=5)
+        a.start()
+        for i in range(30):
+            a.put([], i, [], [i])
+        stats = a.stop()
+        self.assertLessEqual(stats.max_depth, 5)
+        self.assertGreater(stats.nblocked, 0)
+        self.assertEqual(len(w.rows), 30)
+
+    def test_plain_function(self):
+        rows = []
+
+        def writer(dets, x, keys, signals):
+            rows.append(x)
+
+        a = AsyncDataWriter(writer)
+        a.start()
+        for i in range(10):
+            a.put([], i, [], [])
+        a.stop()
+        self.assertListEqual(rows, list(range(10)))
+
+    def test_not_started(self):
+        w = FlushWriter()
+        a = AsyncDataWriter(w)
+        a.put([], 1, [], [1])
+        self.assertEqual(len(w.flushed), 1)
+
+
+class H5DataWriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.persister = Persister()
+        self.dets = [('H1', 'Ar40'), ('CDD', 'Ar36')]
+
+    def test_table_cache(self):
+        w = H5DataWriter(self.persister, 'signal')
+        for i in range(10):
+            w(self.dets, i, ['H1', 'CDD'], [i, -i])
+
+        dm = self.persister.data_manager
+        self.assertEqual(dm.nget, 2)
+        t = dm.tables[('/signal/Ar40', 'H1')]
+        self.assertEqual(len(t.rows), 10)
+        self.assertEqual(t.nflushes, 10)
+        self.assertListEqual(dm.tables[('/signal/Ar36', 'CDD')].rows[-1:], [(9, -9)])
+
+    def test_deferred_flush(self):
+        w = H5DataWriter(self.persister, 'baseline')
+        for i in range(10):
+            w(self.dets, i, ['H1'], [i], flush=False)
+        t = self.persister.data_manager.tables[('/baseline', 'H1')]
+        self.assertEqual(t.nflushes, 0)
+        w.flush()
+        self.assertEqual(t.nflushes, 1)
+        self.assertEqual(len(t.rows), 10)
+
+
+class IsotopeGroup(object):
+    def append_data(self, *args):
+        return True
+
+
+class SlowWriter(H5DataWriter):
+    def __call__(self, *args, **kw):
+        time.sleep(0.01)
+        super(SlowWriter, self).__call__(*args, **kw)
+
+
+class CollectorWriteTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._preferences = get_default_preferences()
+        if cls._preferences is None:
+            # DataCollector binds preferences when it is created
+            set_default_preferences(Preferences())
+
+        from pychron.experiment.automated_run.data_collector import DataCollector
+
+        class Collector(DataCollector):
+            @property
+            def isotope_group(self):
+                return IsotopeGroup()
+
+        cls.klass = Collector
+
+    @classmethod
+    def tearDownClass(cls):
+        set_default_preferences(cls._preferences)
+
+    def test_peak_hop_snapshot(self):
+        persister = Persister()
+        det = Detector('H1', 'Ar40')
+        c = self.klass(detectors=[det])
+        writer = AsyncDataWriter(SlowWriter(persister, 'signal'))
+        writer.start()
+        c._writer = writer
+
+        for i in range(5):
+            c._save_data(i, ['H1'], [i])
+
+        # the writer is behind when the magnet hops to the next isotope
+        det.isotope = 'Ar39'
+        for i in range(5, 10):
+            c._save_data(i, ['H1'], [i])
+        writer.stop()
+
+        tables = persister.data_manager.tables
+        self.assertListEqual([r[0] for r in tables[('/signal/Ar40', 'H1')].rows], list(range(5)))
+        self.assertListEqual([r[0] for r in tables[('/signal/Ar39', 'H1')].rows], list(range(5, 10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import time
+import unittest
+from threading import Event
+from unittest.mock import patch
+
+from apptools.preferences.api import get_default_preferences, set_default_preferences, Preferences
+
+from pychron.experiment.automated_run.measurement_scheduler import DeadlineScheduler, MeasurementWorker
+from pychron.pychron_constants import SIGNAL
+
+
+class Clock(object):
+    def __init__(self, t=100.):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class ClockEvent(object):
+    def __init__(self, clock):
+        self.clock = clock
+
+    def wait(self, dt):
+        self.clock.t += dt
+        return False
+
+
+class DeadlineSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.evt = ClockEvent(self.clock)
+
+    def test_first_tick(self):
+        s = DeadlineScheduler(1, anchor=99.5, clock=self.clock)
+        # first grid point at least one period away
+        self.assertEqual(s.next_deadline(), 101.5)
+
+    def test_no_drift(self):
+        s = DeadlineScheduler(1, anchor=100, clock=self.clock)
+        ts = []
+        for i in range(10):
+            s.wait(self.evt)
+            ts.append(self.clock.t)
+            # processing
+            self.clock.t += 0.3
+
+        self.assertListEqual(ts, [101. + i for i in range(10)])
+        self.assertEqual(s.stats.noverruns, 0)
+        self.assertEqual(s.stats.ncounts, 10)
+        self.assertAlmostEqual(s.stats.mean_period, 1)
+
+    def test_overrun(self):
+        s = DeadlineScheduler(1, anchor=100, clock=self.clock)
+        s.wait(self.evt)
+        self.clock.t += 1.5
+        s.wait(self.evt)
+        # late count is taken immediately then back on the grid
+        self.assertEqual(self.clock.t, 102.5)
+        s.wait(self.evt)
+        self.assertEqual(self.clock.t, 103)
+
+        stats = s.stats
+        self.assertEqual(stats.noverruns, 1)
+        self.assertEqual(stats.nskipped, 0)
+        self.assertAlmostEqual(stats.max_jitter, 0.5)
+
+    def test_skip(self):
+        s = DeadlineScheduler(1, anchor=100, clock=self.clock)
+        s.wait(self.evt)
+        self.clock.t += 3.2
+        s.wait(self.evt)
+        self.assertEqual(self.clock.t, 105)
+        self.assertEqual(s.stats.nskipped, 3)
+
+    def test_explicit_deadline(self):
+        s = DeadlineScheduler(1, anchor=100, clock=self.clock)
+        s.wait(self.evt, 100.25)
+        self.assertEqual(self.clock.t, 100.25)
+
+    def test_evt(self):
+        s = DeadlineScheduler(10)
+        evt = Event()
+        evt.set()
+        st = time.time()
+        self.assertTrue(s.wait(evt))
+        self.assertLess(time.time() - st, 1)
+
+    def test_real_time(self):
+        period = 0.05
+        s = DeadlineScheduler(period)
+        evt = Event()
+        for i in range(10):
+            s.wait(evt)
+            time.sleep(0.03)
+
+        stats = s.stats
+        self.assertAlmostEqual(stats.mean_period, period, delta=0.01)
+        self.assertIn('overruns', stats.to_dict())
+
+
+class MeasurementWorkerTestCase(unittest.TestCase):
+    def test_order(self):
+        w = MeasurementWorker()
+        w.start()
+        r = []
+        for i in range(50):
+            w.submit(r.append, i)
+        w.stop()
+        self.assertListEqual(r, list(range(50)))
+
+    def test_coalesce(self):
+        w = MeasurementWorker()
+        w.start()
+        evt = Event()
+        r = []
+        w.submit(evt.wait, 1)
+        for i in range(5):
+            w.submit(r.append, i, key='age')
+        evt.set()
+        w.stop()
+        self.assertListEqual(r, [0])
+
+    def test_not_started(self):
+        w = MeasurementWorker()
+        r = []
+        w.submit(r.append, 1)
+        self.assertListEqual(r, [1])
+
+    def test_failure(self):
+        w = MeasurementWorker()
+        w.start()
+        r = []
+        w.submit(lambda: 1 / 0)
+        w.submit(r.append, 1)
+        w.stop()
+        self.assertListEqual(r, [1])
+
+
+class Detector(object):
+    ypadding = '0.1'
+
+    def __init__(self, name, isotope):
+        self.name = name
+        self.isotope = isotope
+
+
+class Isotope(object):
+    def get_fit(self, cnt):
+        return 'linear'
+
+
+class IsotopeGroup(object):
+    def append_data(self, *args):
+        return True
+
+    def get_isotope_title(self, name, detector):
+        return '{}{}'.format(name, detector)
+
+    def get_isotope(self, **kw):
+        return Isotope()
+
+
+class Graph(object):
+    def __init__(self):
+        self.data = []
+
+    def get_plotid_by_ytitle(self, name):
+        return name
+
+    def add_datum(self, xy, series, plotid, **kw):
+        self.data.append((plotid, series, xy))
+
+    def set_fit(self, *args, **kw):
+        pass
+
+
+class PlotPanel(object):
+    def __init__(self):
+        self.isotope_graph = Graph()
+        self.nupdates = 0
+
+    def update(self):
+        self.nupdates += 1
+
+
+class CollectorPlotTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._preferences = get_default_preferences()
+        if cls._preferences is None:
+            # DataCollector binds preferences when it is created
+            set_default_preferences(Preferences())
+
+        from pychron.experiment.automated_run.data_collector import DataCollector
+
+        panel = PlotPanel()
+
+        class Collector(DataCollector):
+            @property
+            def isotope_group(self):
+                return IsotopeGroup()
+
+            @property
+            def plot_panel(self):
+                return panel
+
+        cls.klass = Collector
+        cls.panel = panel
+
+    @classmethod
+    def tearDownClass(cls):
+        set_default_preferences(cls._preferences)
+
+    def test_peak_hop_plot(self):
+        det = Detector('H1', 'Ar40')
+        c = self.klass(detectors=[det], collection_kind=SIGNAL, series_idx=0, fit_series_idx=0)
+        c.data_writer = lambda *args: None
+        c.starttime = time.time()
+        c.data_generator = iter([(['H1'], [10.0], None)])
+
+        w = MeasurementWorker()
+        w.start()
+        c._worker = w
+
+        # the worker is behind when the magnet hops
+        evt = Event()
+        w.submit(evt.wait, 1)
+
+        invoked = []
+        with patch('pychron.core.ui.gui.invoke_in_main_thread', lambda f, *args: invoked.append((f, args))):
+            c._iteration(1)
+            det.isotope = 'Ar39'
+            c.series_idx = 1
+            evt.set()
+            w.stop()
+
+        # the worker does not touch the graph
+        graph = self.panel.isotope_graph
+        self.assertListEqual(graph.data, [])
+        for f, args in invoked:
+            f(*args)
+
+        self.assertEqual(len(graph.data), 1)
+        self.assertEqual(graph.data[0][:2], ('Ar40H1', 0))
+        self.assertEqual(self.panel.nupdates, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -82,6 +82,7 @@ class ExtractionLineManager(Manager, Consoleable):
 
     use_hardware_update = Bool
     hardware_update_period = Float
+    use_adaptive_hardware_update = Bool
 
     file_listener = None
 
@@ -121,7 +122,7 @@ class ExtractionLineManager(Manager, Consoleable):
         prefid = 'pychron.extraction_line'
 
         attrs = ('canvas_path', 'canvas_config_path',
-                 'use_hardware_update', 'hardware_update_period',
+                 'use_hardware_update', 'hardware_update_period', 'use_adaptive_hardware_update',
                  'check_master_owner', 'use_network', 'logging_level')
 
         for attr in attrs:
@@ -543,7 +544,11 @@ class ExtractionLineManager(Manager, Consoleable):
         if self.use_hardware_update and self._active:
             self.switch_manager.load_hardware_states()
             self.switch_manager.load_valve_owners()
-            do_after(self.hardware_update_period * 1000, self._update)
+
+            period = self.hardware_update_period
+            if self.use_adaptive_hardware_update:
+                period = self.switch_manager.get_refresh_period(period)
+            do_after(period * 1000, self._update)
 
     def _deactivate_hook(self):
         pass
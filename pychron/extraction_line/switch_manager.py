@@ -19,9 +19,12 @@ import binascii
 import os
 import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from operator import itemgetter
 from pickle import PickleError
 from string import digits
+from threading import Lock
 
 import yaml
 from traits.api import Any, Dict, List, Bool, Event, Str
@@ -57,10 +60,14 @@ def parse_interlocks(vobj, tag):
     return interlocks
 
 
+# clients poll the same words repeatedly. computeCRC is pure python so remember recent results
+_compute_crc = lru_cache(maxsize=64)(computeCRC)
+
+
 def add_checksum(func):
     def wrapper(*args, **kw):
         d = func(*args, **kw)
-        return '{}{}'.format(d, computeCRC(d))
+        return '{}{}'.format(d, _compute_crc(d))
 
     return wrapper
 
@@ -98,7 +105,30 @@ class SwitchManager(Manager):
 
     setup_name = Str('valves')
 
+    # hardware sweep
+    sweep_workers = 8
+
+    # adaptive refresh. poll at fast_refresh_period for fast_refresh_window seconds after a valve changes and
+    # slow down by idle_refresh_factor once nothing has changed for idle_refresh_threshold seconds
+    fast_refresh_period = 0.5
+    fast_refresh_window = 10
+    idle_refresh_threshold = 120
+    idle_refresh_factor = 4
+
     _prev_keys = None
+    _sweep_executor = None
+    _last_activity = 0
+
+    # secondary indexes for _get_valve_by. rebuilt lazily after the switches change
+    _indexes = None
+    # incremented whenever a switch's state or lock changes. cached checksums and words are tagged with it
+    _state_version = 0
+
+    def __init__(self, *args, **kw):
+        super(SwitchManager, self).__init__(*args, **kw)
+        self._sweep_lock = Lock()
+        self._checksum_cache = {}
+        self._word_cache = {}
 
     def set_logger_level_hook(self, level):
         for v in self.switches.values():
@@ -129,6 +159,9 @@ class SwitchManager(Manager):
     def kill(self):
         super(SwitchManager, self).kill()
         self._save_states()
+        if self._sweep_executor is not None:
+            self._sweep_executor.shutdown(wait=False)
+            self._sweep_executor = None
 
     def create_device(self, name, *args, **kw):
         """
@@ -174,16 +207,29 @@ class SwitchManager(Manager):
                 # elm.update_valve_state(k, state)
 
     def calculate_checksum(self, vkeys):
+        key = tuple(vkeys)
+        version = self._state_version
+        cached = self._checksum_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
         vs = self.switches
+        crc = 0
+        for k in key:
+            if k in vs:
+                crc = binascii.crc32(vs[k].state_str().encode('utf-8'), crc)
 
-        val = b''.join((vs[k].state_str().encode('utf-8') for k in vkeys if k in vs))
-        return binascii.crc32(val)
+        if len(self._checksum_cache) > 16:
+            self._checksum_cache.clear()
+        self._checksum_cache[key] = (version, crc)
+        return crc
 
     def get_valve_names(self):
         return list(self.switches.keys())
 
     def refresh_network(self):
         self.debug('refresh network')
+        self._invalidate()
         for k, v in self.switches.items():
             self.refresh_state = (k, v.state, False)
 
@@ -232,6 +278,13 @@ class SwitchManager(Manager):
         # return ','.join(['{}{}'.format(k, int(v.software_lock)) for k, v in self.switches.items()])
 
     def _make_word(self, attr, timeout=0.25, version=0):
+        # nothing has changed since the last complete word
+        ckey = (attr, version)
+        state_version = self._state_version
+        cached = self._word_cache.get(ckey)
+        if cached is not None and cached[0] == state_version and not self._prev_keys:
+            return cached[1]
+
         word = 0x00
         keys = []
 
@@ -285,6 +338,9 @@ class SwitchManager(Manager):
             r = '{}:{:X}'.format(','.join(skeys), word)
         else:
             r = ','.join(keys)
+
+        if len(keys) == len(self.switches):
+            self._word_cache[ckey] = (state_version, r)
         return r
 
     @add_checksum
@@ -505,44 +561,56 @@ class SwitchManager(Manager):
     def _verbose_debug(self, msg):
         self.log(msg, VERBOSE_DEBUG)
 
+    def get_refresh_period(self, period):
+        """
+            return the period to wait before the next hardware sweep given the nominal ``period``
+        """
+        since = time.time() - self._last_activity
+        if since < self.fast_refresh_window:
+            return min(period, self.fast_refresh_period)
+        elif since > self.idle_refresh_threshold:
+            return period * self.idle_refresh_factor
+        return period
+
     def load_hardware_states(self, force=False, verbose=False):
         """
+            query the hardware for the state of every switch.
+
+            switches are grouped by the device that reports their state and each device is swept on its own
+            thread, so a refresh takes as long as the slowest device instead of the sum of all of them.
+
+            a device reads all of its state word switches with one ``get_state_word``. a device that defines
+            ``get_indicator_states(addresses, verbose)`` reads the rest of its switches in one query as well.
         """
-        states = []
-        words = {}
+        groups = {}
         for k, v in self.switches.items():
-            a = (k, v.address, v.state)
             if v.use_state_word:
-                if v.actuator not in words:
-                    words[v.actuator] = [a]
-                else:
-                    words[v.actuator].append(a)
-
+                dev = v.actuator
             elif v.query_state or force:
-                ostate = v.state
-                s = v.get_hardware_indicator_state(verbose=verbose)
-                if not isinstance(s, bool):
-                    s = None
+                dev, _ = v.get_indicator_device()
+            else:
+                continue
 
-                if ostate != s:
-                    states.append((k, s, False))
-                    
-        for actuator, items in words.items():
-            stateword = actuator.get_state_word()
-            if stateword:
-                for k, address, ostate in items:
-                    try:
-                        s = stateword[address]
-                        if s != ostate:
-                            states.append((k, s, False))
-                        self.switches[k].set_state(s)
-                    except KeyError:
-                        self.warning('Failed getting state from valve word={}, '
-                                     'valve={}({})'.format(stateword, k, address))
+            groups.setdefault(dev, []).append((k, v))
+
+        with self._sweep_lock:
+            if len(groups) > 1 and self.sweep_workers > 1:
+                results = self._get_sweep_executor().map(self._sweep_device, list(groups.items()),
+                                                         [verbose] * len(groups))
             else:
-                self.warning('Actuator failed to return state word')
+                results = [self._sweep_device(g, verbose) for g in groups.items()]
+
+            results = [r for rs in results for r in rs]
+
+        states = []
+        for k, s in results:
+            v = self.switches[k]
+            if v.state != s:
+                states.append((k, s, False))
+            v.set_state(s)
 
         if states:
+            self._last_activity = time.time()
             self.refresh_state = states
             self.refresh_canvas_needed = True
 
@@ -605,6 +673,50 @@ class SwitchManager(Manager):
                         self._verbose_debug('interlocked {}'.format(interlock))
                         return v
 
+    def _get_sweep_executor(self):
+        if self._sweep_executor is None:
+            self._sweep_executor = ThreadPoolExecutor(max_workers=self.sweep_workers,
+                                                      thread_name_prefix='switch_sweep')
+        return self._sweep_executor
+
+    def _sweep_device(self, group, verbose):
+        """
+            read the states of all the switches in ``group`` from one device. returns a list of (name, state).
+            switches are not modified here, the caller applies the states
+        """
+        dev, items = group
+        results = []
+
+        word_items = [(k, v) for k, v in items if v.use_state_word]
+        if word_items:
+            stateword = dev.get_state_word() if dev is not None else None
+            if stateword:
+                for k, v in word_items:
+                    try:
+                        results.append((k, stateword[v.address]))
+                    except KeyError:
+                        self.warning('Failed getting state from valve word={}, '
+                                     'valve={}({})'.format(stateword, k, v.address))
+            else:
+                self.warning('Actuator failed to return state word')
+
+        items = [(k, v) for k, v in items if not v.use_state_word]
+        if items:
+            rs = None
+            func = getattr(dev, 'get_indicator_states', None) if dev is not None else None
+            if func is not None:
+                rs = func([v.get_indicator_device()[1] for k, v in items], verbose=verbose)
+                if rs is None or len(rs) != len(items):
+                    self.debug('batched indicator query failed for {}. querying individually'.format(dev.name))
+                    rs = None
+
+            if rs is None:
+                rs = [v.get_indicator_response(verbose) for k, v in items]
+
+            results.extend((k, v.convert_indicator_state(r)) for (k, v), r in zip(items, rs))
+
+        return results
+
     def _get_indicator_state_by(self, v, force=False):
         state = None
         if (self.query_valve_state and v.query_state) or force:
@@ -634,6 +746,17 @@ class SwitchManager(Manager):
         return state
 
     def _get_valve_by(self, a, attr):
+        if isinstance(attr, list):
+            attr = tuple(attr)
+
+        indexes = self._indexes
+        if indexes is None:
+            indexes = self._build_indexes()
+
+        idx = indexes.get(attr)
+        if idx is not None:
+            return idx.get(a)
+
         if isinstance(a, tuple):
             for vi in self.switches.values():
                 if all((getattr(vi, attri) == ai for ai, attri in zip(a, attr))):
@@ -641,6 +764,51 @@ class SwitchManager(Manager):
         else:
             return next((valve for valve in self.switches.values() if getattr(valve, attr) == a), None)
 
+    def _build_indexes(self):
+        """
+            map address, description, display name and (description, display name) to switches. the first switch
+            wins a duplicate key, the same as a linear search
+        """
+        indexes = {k: {} for k in ('address', 'description', 'display_name', ('description', 'display_name'))}
+        for v in self.switches.values():
+            for attr, idx in indexes.items():
+                if isinstance(attr, tuple):
+                    key = tuple(getattr(v, ai, None) for ai in attr)
+                    if None in key:
+                        continue
+                else:
+                    key = getattr(v, attr, None)
+                    if key is None:
+                        continue
+                idx.setdefault(key, v)
+
+        self._indexes = indexes
+        return indexes
+
+    def _invalidate(self):
+        self._indexes = None
+        self._state_version += 1
+
+    def _watch_switches(self, vs, remove=False):
+        for v in vs:
+            v.on_trait_change(self._handle_switch_state, 'state, software_lock', remove=remove)
+
+    def _handle_switch_state(self):
+        self._state_version += 1
+
+    def _switches_changed(self, old, new):
+        self._watch_switches(old.values(), remove=True)
+        self._watch_switches(new.values())
+        self._invalidate()
+
+    def _switches_items_changed(self, event):
+        self._watch_switches(event.removed.values(), remove=True)
+        # changed holds the replaced switches
+        self._watch_switches(event.changed.values(), remove=True)
+        self._watch_switches([self.switches[k] for k in event.changed if k in self.switches])
+        self._watch_switches(event.added.values())
+        self._invalidate()
+
     def _validate_checksum(self, word):
         if word is not None:
             checksum = word[-4:]
@@ -877,6 +1045,7 @@ class SwitchManager(Manager):
 
         # update actuation tracker
         if changed:
+            self._last_activity = time.time()
             self.refresh_explanation = True
             if v.track_actuation:
                 self._update_actuation_tracker(v)
@@ -958,6 +1127,7 @@ class SwitchManager(Manager):
                     ps.append(pip)
 
             self.pipette_trackers = ps
+            self._build_indexes()
             self._report_valves()
 
     def _report_valves(self):
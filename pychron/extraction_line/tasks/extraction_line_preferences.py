@@ -80,6 +80,7 @@ class BaseExtractionLinePreferences(BasePreferencesHelper):
 class ExtractionLinePreferences(BaseExtractionLinePreferences):
     use_hardware_update = Bool
     hardware_update_period = Float
+    use_adaptive_hardware_update = Bool(True)
     check_master_owner = Bool
 
 
@@ -118,6 +119,11 @@ class ExtractionLinePreferencesPane(PreferencesPane):
                               Item('use_hardware_update'),
                               Item('hardware_update_period',
                                    enabled_when='use_hardware_update'),
+                              Item('use_adaptive_hardware_update',
+                                   label='Adaptive',
+                                   tooltip='Update faster right after a valve changes and slower when the '
+                                           'extraction line is idle',
+                                   enabled_when='use_hardware_update'),
                               show_border=True, label='Update'),
                        self._network_group(),
                        show_border=True,
@@ -0,0 +1,189 @@
+import binascii
+import threading
+import time
+import unittest
+
+from pychron.extraction_line.switch_manager import SwitchManager
+from pychron.hardware.valve import HardwareValve
+
+
+class FakeActuator(object):
+    """
+        every query takes ``delay`` seconds
+    """
+
+    def __init__(self, name, states, delay=0.1, batch=False):
+        self.name = name
+        self.states = states
+        self.delay = delay
+        self.nqueries = 0
+        self.threads = set()
+        if batch:
+            self.get_indicator_states = self._get_indicator_states
+
+    def _query(self):
+        self.nqueries += 1
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+
+    def get_indicator_state(self, address, *args, **kw):
+        self._query()
+        return self.states[address]
+
+    def get_state_word(self):
+        self._query()
+        return dict(self.states)
+
+    def _get_indicator_states(self, addresses, verbose=False):
+        self._query()
+        return [self.states[a] for a in addresses]
+
+
+class SwitchManagerSweepTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = SwitchManager()
+        self.refreshed = []
+        self.manager.on_trait_change(lambda new: self.refreshed.append(new), 'refresh_state')
+
+    def tearDown(self):
+        if self.manager._sweep_executor:
+            self.manager._sweep_executor.shutdown()
+
+    def _add(self, actuator, use_state_word=False, **kw):
+        for address in actuator.states:
+            name = '{}{}'.format(actuator.name, address)
+            self.manager.switches[name] = HardwareValve(name, address=address, actuator=actuator,
+                                                        use_state_word=use_state_word, **kw)
+
+    def test_concurrent(self):
+        acts = [FakeActuator('a{}'.format(i), {'1': True, '2': False}) for i in range(4)]
+        for a in acts:
+            self._add(a)
+
+        st = time.time()
+        self.manager.load_hardware_states()
+        et = time.time() - st
+
+        # 8 queries at 0.1s each. two per actuator in parallel
+        self.assertLess(et, 0.6)
+        self.assertTrue(self.manager.switches['a01'].state)
+        self.assertFalse(self.manager.switches['a02'].state)
+        self.assertEqual(len(self.refreshed), 1)
+        self.assertListEqual(sorted(k for k, s, _ in self.refreshed[0]), ['a01', 'a11', 'a21', 'a31'])
+        # queries for one actuator stay on one thread
+        for a in acts:
+            self.assertEqual(len(a.threads), 1)
+
+    def test_state_word(self):
+        a = FakeActuator('w', {'1': True, '2': True, '3': False})
+        self._add(a, use_state_word=True)
+        self.manager.load_hardware_states()
+        self.assertEqual(a.nqueries, 1)
+        self.assertTrue(self.manager.switches['w2'].state)
+
+    def test_batched(self):
+        a = FakeActuator('b', {'1': True, '2': True, '3': False}, batch=True)
+        self._add(a)
+        self.manager.load_hardware_states()
+        self.assertEqual(a.nqueries, 1)
+        self.assertTrue(self.manager.switches['b1'].state)
+        self.assertFalse(self.manager.switches['b3'].state)
+
+    def test_invert(self):
+        a = FakeActuator('i', {'1': True})
+        self._add(a, state_invert=True)
+        self.manager.switches['i1'].state = True
+        self.manager.load_hardware_states()
+        self.assertFalse(self.manager.switches['i1'].state)
+        self.assertListEqual(self.refreshed, [[('i1', False, False)]])
+
+    def test_no_change(self):
+        a = FakeActuator('n', {'1': False}, delay=0)
+        self._add(a)
+        self.manager.load_hardware_states()
+        self.assertListEqual(self.refreshed, [])
+
+    def test_refresh_period(self):
+        m = self.manager
+        m._last_activity = 0
+        self.assertEqual(m.get_refresh_period(2), 2 * m.idle_refresh_factor)
+
+        m._last_activity = time.time()
+        self.assertEqual(m.get_refresh_period(2), m.fast_refresh_period)
+
+        m._last_activity = time.time() - m.fast_refresh_window - 1
+        self.assertEqual(m.get_refresh_period(2), 2)
+
+    def test_activity(self):
+        a = FakeActuator('c', {'1': True}, delay=0)
+        self._add(a)
+        self.manager.load_hardware_states()
+        self.assertEqual(self.manager.get_refresh_period(2), self.manager.fast_refresh_period)
+
+
+
+class SwitchManagerIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = m = SwitchManager()
+        for i, n in enumerate('ABC'):
+            m.switches[n] = HardwareValve(n, address=str(i + 1), description='desc{}'.format(n))
+
+    def test_lookup(self):
+        m = self.manager
+        self.assertIs(m.get_valve_by_address('2'), m.switches['B'])
+        self.assertIs(m.get_valve_by_description('descC'), m.switches['C'])
+        self.assertIs(m.get_valve_by_description('descA', name='A'), m.switches['A'])
+        self.assertIsNone(m.get_valve_by_description('descA', name='B'))
+        self.assertIsNone(m.get_valve_by_address('9'))
+        self.assertEqual(m.get_name_by_address('3'), 'VALVE-C')
+
+    def test_rebuild(self):
+        m = self.manager
+        self.assertIsNone(m.get_valve_by_address('4'))
+        m.switches['D'] = HardwareValve('D', address='4')
+        self.assertIs(m.get_valve_by_address('4'), m.switches['D'])
+
+        m.switches['A'].description = 'new'
+        m.refresh_network()
+        self.assertIs(m.get_valve_by_description('new'), m.switches['A'])
+
+    def test_duplicate(self):
+        m = self.manager
+        m.switches['D'] = HardwareValve('D', address='1')
+        self.assertIs(m.get_valve_by_address('1'), m.switches['A'])
+
+    def test_checksum(self):
+        m = self.manager
+        keys = ['A', 'B', 'C']
+        a = m.calculate_checksum(keys)
+        self.assertEqual(a, m.calculate_checksum(keys))
+
+        m.switches['B'].state = True
+        b = m.calculate_checksum(keys)
+        self.assertNotEqual(a, b)
+
+        # matches a checksum over the concatenated states
+        val = b''.join(m.switches[k].state_str().encode('utf-8') for k in keys)
+        self.assertEqual(b, binascii.crc32(val))
+
+        m.switches['C'].software_lock = True
+        self.assertNotEqual(b, m.calculate_checksum(keys))
+
+    def test_states_word(self):
+        m = self.manager
+        a = m.get_states()
+        self.assertEqual(a[:-4], 'A0,B0,C0')
+        self.assertEqual(a, m.get_states())
+
+        m.switches['A'].state = True
+        self.assertEqual(m.get_states()[:-4], 'A1,B0,C0')
+
+        m.switches['C'].software_lock = True
+        self.assertEqual(m.get_software_locks()[:-4], 'A0,B0,C1')
+
+        del m.switches['B']
+        self.assertEqual(m.get_states()[:-4], 'A1,C0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,7 +24,7 @@ import time
 from datetime import datetime
 
 from git import Repo
-from git.exc import GitCommandError
+from git.exc import GitCommandError, NoSuchPathError, InvalidGitRepositoryError
 from traits.api import Any, Str, List, Event
 
 from pychron.core.helpers.filetools import fileiter
@@ -47,6 +47,13 @@ def get_repository_branch(path):
     return b.name
 
 
+def get_repository_head(path):
+    try:
+        return Repo(path).head.commit.hexsha
+    except (ValueError, GitCommandError, NoSuchPathError, InvalidGitRepositoryError):
+        pass
+
+
 def grep(arg, name):
     process = subprocess.Popen(['grep', '-lr', arg, name], stdout=subprocess.PIPE)
     stdout, stderr = process.communicate()
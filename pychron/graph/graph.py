@@ -18,6 +18,7 @@
 import csv
 import math
 import os
+from weakref import WeakKeyDictionary
 
 import six
 from chaco.api import OverlayPlotContainer, \
@@ -33,6 +34,7 @@ from traitsui.api import View, Item, UItem
 
 from pychron.core.helpers.color_generators import colorname_generator as color_generator
 from pychron.core.helpers.filetools import add_extension
+from pychron.core.helpers.growable_array import GrowableArray
 from pychron.graph.context_menu_mixin import ContextMenuMixin
 from pychron.graph.ml_label import MPlotAxis
 from pychron.graph.offset_plot_label import OffsetPlotLabel
@@ -177,6 +179,7 @@ class Graph(ContextMenuMixin):
     autoupdate = Bool(False)
 
     _convert_index = None
+    _datum_buffers = None
 
     status_text = Str
     x_limits_changed = Event
@@ -893,14 +896,18 @@ class Graph(ContextMenuMixin):
         data = plot.data
         mi, ma = -Inf, Inf
         for i, (name, di) in enumerate(zip(names, datum)):
-            d = data.get_data(name)
-            nd = hstack((d, di))
-            data.set_data(name, nd)
-
-            if i == 1:
-                # y values
-                mi = min(nd)
-                ma = max(nd)
+            buf = self._get_datum_buffer(data, name)
+            if buf is None:
+                nd = hstack((data.get_data(name), di))
+                data.set_data(name, nd)
+                if i == 1:
+                    mi, ma = min(nd), max(nd)
+            else:
+                buf.append(di)
+                data.set_data(name, buf.view)
+                if i == 1:
+                    # y values
+                    mi, ma = buf.min, buf.max
 
         if update_y_limits:
             if isinstance(ypadding, str):
@@ -915,6 +922,30 @@ class Graph(ContextMenuMixin):
                               max_=ma + ypad,
                               plotid=plotid)
 
+    def _get_datum_buffer(self, data, name):
+        """
+            return the growable buffer backing the series ``name``. a new buffer is started from the current data
+            if the series was set some other way, e.g. set_data or clear
+        """
+        if self._datum_buffers is None:
+            self._datum_buffers = WeakKeyDictionary()
+
+        bufs = self._datum_buffers.setdefault(data, {})
+        buf = bufs.get(name)
+        d = data.get_data(name)
+        if buf is None or d is not buf.view:
+            if d is None:
+                return
+
+            d = array(d)
+            if d.ndim != 1 or d.dtype.kind not in 'biuf':
+                bufs.pop(name, None)
+                return
+
+            buf = GrowableArray(d, dtype=float)
+            bufs[name] = buf
+        return buf
+
     def add_range_selector(self, plotid=0, series=0):
         from chaco.tools.range_selection import RangeSelection
         from chaco.tools.range_selection_overlay import RangeSelectionOverlay
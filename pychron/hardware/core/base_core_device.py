@@ -164,13 +164,15 @@ class BaseCoreDevice(HasCommunicator, ConsumerMixin):
     @crc_caller
     def ask(self, cmd, **kw):
         """
+            coalesce=True shares the reply with identical queued or just finished requests. only for idempotent reads
         """
 
+        coalesce = kw.pop('coalesce', False)
         comm = self.communicator
         if comm is not None:
             if comm.scheduler:
                 r = comm.scheduler.schedule(comm.ask, args=(cmd,),
-                                            kwargs=kw)
+                                            kwargs=kw, client=self.name, coalesce=coalesce)
             else:
                 r = comm.ask(cmd, **kw)
 
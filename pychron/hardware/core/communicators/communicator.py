@@ -24,6 +24,7 @@ import codecs
 import time
 from threading import RLock
 
+from pychron.hardware.core.communicators.latency import LatencyHistogram
 from pychron.headless_config_loadable import HeadlessConfigLoadable
 
 
@@ -94,6 +95,7 @@ class Communicator(HeadlessConfigLoadable):
     handle = None
     scheduler = None
     address = None
+    latency = None
     _comms_report_attrs = None
     
     def __init__(self, *args, **kw):
@@ -101,6 +103,7 @@ class Communicator(HeadlessConfigLoadable):
         """
         super(Communicator, self).__init__(*args, **kw)
         self._lock = RLock()
+        self.latency = LatencyHistogram()
 
     def load(self, config, path):
         self.set_attribute(config, 'verbose', 'Communications', 'verbose', default=False, optional=True, cast='boolean')
@@ -118,6 +121,7 @@ class Communicator(HeadlessConfigLoadable):
     def report(self):
         self.debug('============ Communications Report ==============')
         self._generate_comms_report()
+        self.debug('Latency {}'.format(self.latency))
         self.debug('=================================================')
 
     def close(self):
@@ -0,0 +1,156 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import time
+from threading import Condition, Lock
+
+
+class Backoff(object):
+    """
+        exponential reconnect backoff. while ``ready`` is False callers should fail fast instead of
+        waiting on another connect timeout
+    """
+
+    def __init__(self, initial=0.1, maximum=5, factor=2):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = 0
+        self.next_attempt = 0
+        self.nfailures = 0
+
+    def ready(self):
+        return time.time() >= self.next_attempt
+
+    @property
+    def remaining(self):
+        return max(0, self.next_attempt - time.time())
+
+    def failed(self):
+        self.nfailures += 1
+        self.delay = min(self.maximum, self.delay * self.factor if self.delay else self.initial)
+        self.next_attempt = time.time() + self.delay
+
+    def succeeded(self):
+        self.delay = 0
+        self.next_attempt = 0
+        self.nfailures = 0
+
+
+class ConnectionPool(object):
+    """
+        pool of persistent connections to one address.
+
+        ``factory()`` returns a new connection or None if the address could not be reached. a connection must
+        provide ``end()`` and ``healthy()``. idle connections are health checked before being handed out again
+        and closed if they have been idle longer than ``max_idle`` seconds.
+
+        at most ``max_size`` connections are open at once. ``acquire`` blocks until one is released
+    """
+
+    def __init__(self, factory, max_size=1, max_idle=300, backoff=None):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.max_idle = max_idle
+        self.backoff = backoff or Backoff()
+
+        self._cond = Condition(Lock())
+        self._idle = []
+        self._nopen = 0
+
+        self.ncreated = 0
+        self.nreused = 0
+        self.ndiscarded = 0
+
+    @property
+    def nopen(self):
+        return self._nopen
+
+    def acquire(self, timeout=None):
+        """
+            return a connection or None if the address is unreachable, in backoff or ``timeout`` elapsed waiting
+            for a free connection
+        """
+        st = time.time()
+        with self._cond:
+            while 1:
+                while self._idle:
+                    conn, released = self._idle.pop()
+                    if time.time() - released < self.max_idle and conn.healthy():
+                        self.nreused += 1
+                        return conn
+                    self._close(conn)
+
+                if self._nopen < self.max_size:
+                    break
+
+                if timeout is None:
+                    self._cond.wait()
+                else:
+                    remaining = timeout - (time.time() - st)
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+
+            if not self.backoff.ready():
+                return
+
+            # reserve the slot so the connect can happen outside the lock
+            self._nopen += 1
+
+        conn = None
+        try:
+            conn = self.factory()
+        finally:
+            with self._cond:
+                if conn is None:
+                    self._nopen -= 1
+                    self.backoff.failed()
+                    self._cond.notify()
+                else:
+                    self.ncreated += 1
+                    self.backoff.succeeded()
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            if discard:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.time()))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self):
+        return {'open': self._nopen, 'idle': len(self._idle), 'created': self.ncreated, 'reused': self.nreused,
+                'discarded': self.ndiscarded, 'backoff': self.backoff.remaining}
+
+    # private
+    def _close(self, conn):
+        self._nopen -= 1
+        self.ndiscarded += 1
+        try:
+            conn.end()
+        except BaseException:
+            pass
+
+# ============= EOF =============================================
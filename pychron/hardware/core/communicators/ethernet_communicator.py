@@ -15,8 +15,12 @@
 # ===============================================================================
 
 # ============= standard library imports ========================
+import asyncio
+import select
 import socket
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from six.moves import range
 # ============= enthought library imports =======================
@@ -26,6 +30,7 @@ from traits.api import Float
 from pychron.globals import globalv
 from pychron.hardware.core.checksum_helper import computeCRC
 from pychron.hardware.core.communicators.communicator import Communicator, process_response
+from pychron.hardware.core.communicators.connection_pool import ConnectionPool
 from pychron.regex import IPREGEX
 
 
@@ -68,8 +73,17 @@ class Handler(object):
     def send_packet(self, p):
         raise NotImplementedError
 
+    def settimeout(self, timeout):
+        if globalv.communication_simulation:
+            timeout = 0.01
+        self.sock.settimeout(timeout)
+
+    def healthy(self):
+        return True
+
     def end(self):
-        pass
+        if self.sock is not None:
+            self.sock.close()
 
     # private
     def _recvall(self, recv, datasize=None, frame=None):
@@ -144,8 +158,16 @@ class TCPHandler(Handler):
     def send_packet(self, p):
         self.sock.send(p.encode('utf-8'))
 
-    def end(self):
-        self.sock.close()
+    def healthy(self):
+        """
+            an idle connection should have nothing to read. readable means the peer closed it or there is a
+            late reply that would be mistaken for the next response
+        """
+        try:
+            r, _, _ = select.select([self.sock], [], [], 0)
+        except (ValueError, socket.error):
+            return False
+        return not r
 
 
 class UDPHandler(Handler):
@@ -173,15 +195,62 @@ class UDPHandler(Handler):
     def send_packet(self, p):
         self.sock.sendto(p.encode('utf-8'), self.address)
 
+    def healthy(self):
+        """
+            drop late datagrams left over from a request that timed out
+        """
+        try:
+            while select.select([self.sock], [], [], 0)[0]:
+                self.sock.recvfrom(self.datasize)
+        except (ValueError, socket.error):
+            return False
+        return True
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='ethernet')
+    return _executor
+
+
+def ask_concurrent(requests):
+    """
+        query several communicators at once. returns the responses in order.
+
+        requests: list of (communicator, cmd) or (communicator, cmd, kw)
+
+        e.g. ``ask_concurrent([(a, 'GetPressure'), (b, 'GetPressure'), (c, 'Read', {'timeout': 1})])``
+        takes as long as the slowest device instead of the sum of all of them
+    """
+
+    async def gather():
+        return await asyncio.gather(*[r[0].ask_async(r[1], **(r[2] if len(r) > 2 else {})) for r in requests])
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(gather())
+    finally:
+        loop.close()
+
 
 class EthernetCommunicator(Communicator):
     """
     Communicator of UDP or TCP.
+
+    connections are kept open in a pool and health checked before reuse. ``pool_size`` connections may be in
+    use at once, so concurrent asks only wait on each other when the pool is exhausted. devices that only accept
+    one client should keep the default of 1.
+
+    after a failed connect further attempts fail fast until the reconnect backoff expires instead of each one
+    waiting for the full timeout.
     """
     host = None
     port = None
     read_port = None
-    handler = None
     kind = 'UDP'
     test_cmd = None
     use_end = False
@@ -189,15 +258,25 @@ class EthernetCommunicator(Communicator):
     error_mode = False
     message_frame = ''
     timeout = Float(1.0)
+    pool_size = 1
+    max_idle = 300
 
     default_timeout = 3
 
-    _comms_report_attrs = ('host', 'port', 'read_port', 'kind', 'timeout')
+    _pool = None
+    _read_handler = None
+    _comms_report_attrs = ('host', 'port', 'read_port', 'kind', 'timeout', 'pool_size')
 
     @property
     def address(self):
         return '{}://{}:{}'.format(self.kind, self.host, self.port)
 
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ConnectionPool(self.get_handler, max_size=self.pool_size, max_idle=self.max_idle)
+        return self._pool
+
     def load(self, config, path):
         """
         """
@@ -222,6 +301,8 @@ class EthernetCommunicator(Communicator):
         self.message_frame = self.config_get(config, 'Communications', 'message_frame', optional=True, default='')
         self.default_timeout = self.config_get(config, 'Communications', 'default_timeout', cast='int',
                                                optional=True, default=3)
+        self.pool_size = self.config_get(config, 'Communications', 'pool_size', cast='int', optional=True,
+                                         default=1)
 
         if self.kind is None:
             self.kind = 'UDP'
@@ -230,17 +311,21 @@ class EthernetCommunicator(Communicator):
 
     def open(self, *args, **kw):
 
-        for k in ('host', 'port', 'message_frame', 'kind'):
+        for k in ('host', 'port', 'message_frame', 'kind', 'pool_size'):
             if k in kw:
                 setattr(self, k, kw[k])
 
         return self.test_connection()
 
+    def close(self):
+        self.reset()
+
     def test_connection(self):
         self.simulation = False
 
-        with self._lock:
-            handler = self.get_handler()
+        handler = self.pool.acquire(self.timeout)
+        if handler:
+            self.pool.release(handler)
 
         # send a test command so see if wer have connection
         cmd = self.test_cmd
@@ -251,53 +336,51 @@ class EthernetCommunicator(Communicator):
             if r is None:
                 self.simulation = True
 
-                # if handler:
-                #     if handler.send_packet(cmd):
-                #         r = handler.get_packet(cmd)
-                #         if r is None:
-                #             self.simulation = True
-                #     else:
-                #         self.simulation = True
-                # else:
-                #     self.simulation = True
         ret = not self.simulation and handler is not None
         return ret
 
-    def get_read_handler(self, handler, **kw):
-        
+    def get_read_handler(self, handler, timeout=None):
         if self.read_port:
-            handler = self.get_handler(addrs=(self.host, self.read_port), bind=True, **kw)
-        
+            h = self._read_handler
+            if h is None:
+                h = self.get_handler(addrs=(self.host, self.read_port), timeout=timeout, bind=True)
+                self._read_handler = h
+            elif timeout is not None:
+                h.settimeout(timeout)
+            handler = h
+
         return handler
 
     def get_handler(self, addrs=None, timeout=None, bind=False):
+        """
+            open a new connection. returns None if the address could not be reached
+        """
         if timeout is None:
             timeout = self.timeout
         if addrs is None:
             addrs = (self.host, self.port)
 
         try:
-            
-            h = self.handler
-            if h is None or h.address!=addrs:
-                if self.kind.lower() == 'udp':
-                    h = UDPHandler()
-                else:
-                    h = TCPHandler()
-
-                # self.debug('get handler cmd={}, {},{} {}'.format(cmd.strip() if cmd is not None else '---', self.host,
-                #                                                  self.port, timeout))
-                h.open_socket(addrs, timeout=timeout, bind=bind)
-                h.set_frame(self.message_frame)
-                self.handler = h
+            if self.kind.lower() == 'udp':
+                h = UDPHandler()
+            else:
+                h = TCPHandler()
+
+            h.open_socket(addrs, timeout=timeout, bind=bind)
+            h.set_frame(self.message_frame)
             return h
         except socket.error as e:
-            print('ewafs', e, self.host, self.port)
             self.debug('Get Handler {}. timeout={}. comms simulation={}'.format(str(e),
                                                                                 timeout,
                                                                                 globalv.communication_simulation))
             self.error_mode = True
-            self.handler = None
+
+    async def ask_async(self, cmd, **kw):
+        """
+            awaitable ``ask``. independent devices can be queried concurrently, see ``ask_concurrent``
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(get_executor(), partial(self.ask, cmd, **kw))
 
     def ask(self, cmd, retries=3, verbose=True, quiet=False, info=None, timeout=None,
             message_frame=None, delay=None, use_error_mode=True, *args, **kw):
@@ -320,101 +403,125 @@ class EthernetCommunicator(Communicator):
 
         cmd = '{}{}'.format(cmd, self.write_terminator)
 
-        r = None
-        with self._lock:
-            if use_error_mode and self.error_mode:
-                retries = 2
+        if use_error_mode and self.error_mode:
+            retries = 2
 
-            if timeout is None:
-                timeout = self.default_timeout
+        if timeout is None:
+            timeout = self.default_timeout
 
-            re = 'ERROR: Connection refused: {}, timeout={}'.format(self.address, timeout)
-            for i in range(retries):
+        r = None
+        st = time.time()
+        re = 'ERROR: Connection refused: {}, timeout={}'.format(self.address, timeout)
+        for i in range(retries):
+            if self.read_port:
+                # replies come back on one bound port so requests cannot overlap
+                with self._lock:
+                    r = self._ask(cmd, timeout=timeout, message_frame=message_frame, delay=delay,
+                                  use_error_mode=use_error_mode)
+            else:
                 r = self._ask(cmd, timeout=timeout, message_frame=message_frame, delay=delay,
                               use_error_mode=use_error_mode)
-                if r is not None:
-                    break
-                else:
-                    time.sleep(0.025)
-                    self.debug('doing retry {}'.format(i))
-                    # else:
-                    #     self._reset_connection()
-
             if r is not None:
-                re = process_response(r)
-            # else:
-            #     self.error_mode = True
+                break
+
+            if not self.pool.backoff.ready():
+                re = 'ERROR: Connection refused: {}, reconnect in {:0.2f}s'.format(self.address,
+                                                                                   self.pool.backoff.remaining)
+                break
+
+            self.debug('doing retry {}'.format(i))
 
-            if self.use_end:
-                # self.debug('ending connection. Handler: {}, cmd={}'.format(self.handler, cmd))
-                if self.handler:
-                    self.handler.end()
-                self._reset_connection()
+        self.latency.add(time.time() - st, timeout=r is None)
+        if r is not None:
+            re = process_response(r)
 
-            if verbose or (self.verbose and not quiet):
-                self.log_response(cmd, re, info)
+        if verbose or (self.verbose and not quiet):
+            self.log_response(cmd, re, info)
 
         return r
 
     def reset(self):
-        if self.handler:
-            self.handler.end()
+        self.pool.close()
+        if self._read_handler:
+            self._read_handler.end()
         self._reset_connection()
 
     def read(self, datasize=None, *args, **kw):
-        with self._lock:
-            handler = self.get_handler()
-            if handler:
+        handler = self.pool.acquire()
+        if handler:
+            discard = False
+            try:
                 return handler.get_packet(datasize=datasize)
+            except socket.error as e:
+                self.warning('read. get packet. error: {}'.format(e))
+                discard = True
+            finally:
+                self.pool.release(handler, discard=discard)
 
     def tell(self, cmd, verbose=True, quiet=False, info=None):
-        with self._lock:
-            handler = self.get_handler()
-            if handler:
-                try:
-                    cmd = '{}{}'.format(cmd, self.write_terminator)
-                    handler.send_packet(cmd)
-                    if verbose or self.verbose and not quiet:
-                        self.log_tell(cmd, info)
-                except socket.error as e:
-                    self.warning('tell. send packet. error: {}'.format(e))
-                    self.error_mode = True
+        handler = self.pool.acquire()
+        if handler:
+            discard = self.use_end
+            try:
+                cmd = '{}{}'.format(cmd, self.write_terminator)
+                handler.send_packet(cmd)
+                if verbose or self.verbose and not quiet:
+                    self.log_tell(cmd, info)
+            except socket.error as e:
+                self.warning('tell. send packet. error: {}'.format(e))
+                self.error_mode = True
+                discard = True
+            finally:
+                self.pool.release(handler, discard=discard)
 
     # private
     def _reset_connection(self):
-        self.handler = None
+        self._read_handler = None
         self.error_mode = False
 
     def _ask(self, cmd, timeout=None, message_frame=None, delay=None, use_error_mode=True):
-        if self.error_mode:
-            self.handler = None
-            if use_error_mode:
-                timeout = 0.25
+        if self.error_mode and use_error_mode:
+            timeout = 0.25
 
         if timeout is None:
             timeout = self.default_timeout
 
-        self.error_mode = False
-
-        handler = self.get_handler(timeout=timeout)
+        handler = self.pool.acquire()
         if not handler:
             return
 
+        # devices configured with use_end expect a new connection for every command
+        discard = self.use_end
         try:
+            handler.settimeout(timeout)
             handler.send_packet(cmd)
 
             if delay:
                 time.sleep(delay)
 
-            handler = self.get_read_handler(handler, timeout=timeout)
+            rhandler = self.get_read_handler(handler, timeout=timeout)
             try:
-                return handler.get_packet(message_frame=message_frame)
+                r = rhandler.get_packet(message_frame=message_frame)
+                if r is None or (r == '' and isinstance(rhandler, TCPHandler)):
+                    # checksum failure or the peer closed the connection
+                    discard = True
+                    return
+
+                self.error_mode = False
+                return r
             except socket.error as e:
                 self.debug_exception()
-                self.warning('ask. get packet. error: {} address: {}'.format(e, handler.address))
+                self.warning('ask. get packet. error: {} address: {}'.format(e, rhandler.address))
                 self.error_mode = True
+                discard = True
+                if rhandler is not handler:
+                    rhandler.end()
+                    self._read_handler = None
         except socket.error as e:
             self.warning('ask. send packet. error: {} address: {}'.format(e, handler.address))
             self.error_mode = True
+            discard = True
+        finally:
+            self.pool.release(handler, discard=discard)
 
 # ============= EOF ====================================
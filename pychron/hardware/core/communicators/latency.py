@@ -0,0 +1,94 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+from bisect import bisect_left
+
+# upper edges in ms. the last bin is everything slower
+BIN_EDGES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram(object):
+    """
+        fixed bin histogram of round trip times.
+
+        ``add`` takes seconds. bins, mean, max and percentiles are reported in ms
+    """
+
+    def __init__(self, edges=BIN_EDGES):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.n = 0
+        self.ntimeouts = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, dt, timeout=False):
+        ms = dt * 1000
+        self.counts[bisect_left(self.edges, ms)] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        if timeout:
+            self.ntimeouts += 1
+
+    def clear(self):
+        self.counts = [0] * (len(self.edges) + 1)
+        self.n = 0
+        self.ntimeouts = 0
+        self.total = 0
+        self.max = 0
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else 0
+
+    def percentile(self, p):
+        """
+            upper edge of the bin that contains the pth percentile
+        """
+        if not self.n:
+            return 0
+
+        target = self.n * p / 100.
+        c = 0
+        for edge, ci in zip(self.edges, self.counts):
+            c += ci
+            if c >= target:
+                return edge
+        return self.max
+
+    def to_dict(self):
+        return {'n': self.n,
+                'timeouts': self.ntimeouts,
+                'mean': self.mean,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p95': self.percentile(95),
+                'bins': dict(zip(self.labels(), self.counts))}
+
+    def labels(self):
+        return ['<{}ms'.format(e) for e in self.edges] + ['>{}ms'.format(self.edges[-1])]
+
+    def __str__(self):
+        bins = ' '.join('{}:{}'.format(l, c) for l, c in zip(self.labels(), self.counts) if c)
+        return 'n={} timeouts={} mean={:0.1f}ms max={:0.1f}ms p50<{}ms p95<{}ms [{}]'.format(self.n, self.ntimeouts,
+                                                                                            self.mean, self.max,
+                                                                                            self.percentile(50),
+                                                                                            self.percentile(95),
+                                                                                            bins)
+
+# ============= EOF =============================================
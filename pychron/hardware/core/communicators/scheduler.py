@@ -16,95 +16,321 @@
 
 # ============= enthought library imports =======================
 from __future__ import absolute_import
-from traits.api import Float, HasTraits
+from traits.api import Float, HasTraits, Str
 
 # ============= standard library imports ========================
-from threading import Lock
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock, Condition, Event, Thread, local, current_thread
 
 # ============= local library imports  ==========================
 
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+PRIORITIES = (INTERACTIVE, NORMAL, BACKGROUND)
+PRIORITY_NAMES = ('interactive', 'normal', 'background')
 
-# SINGLE_ITEM_BUF = True
-# SINGLE_ITEM_BUF=False
-class CommunicationScheduler(HasTraits):
+_context = local()
+
+
+@contextmanager
+def scheduler_priority(priority):
     """
+        requests scheduled by this thread inside the context use ``priority`` unless one is given explicitly.
+        e.g. scans use::
 
+            with scheduler_priority(BACKGROUND):
+                self._scan_()
+    """
+    prev = getattr(_context, 'priority', None)
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = prev
 
-        this class should be used when working with multiple rs485 devices on the same port.
 
-        it uses a simple lock and sleep cycle to avoid collision on the data lines
+def get_context_priority(default=INTERACTIVE):
+    p = getattr(_context, 'priority', None)
+    return default if p is None else p
+
+
+class Request(object):
+    __slots__ = ('func', 'args', 'kwargs', 'priority', 'client', 'key', 'batch_key', 'submitted', 'started',
+                 'result', 'error', 'event')
+
+    def __init__(self, func, args, kwargs, priority, client, key, batch_key):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.client = client
+        self.key = key
+        self.batch_key = batch_key
+        self.submitted = time.time()
+        self.started = None
+        self.result = None
+        self.error = None
+        self.event = Event()
+
+
+class ClientStats(object):
+    __slots__ = ('n', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.n = 0
+        self.total_wait = 0
+        self.max_wait = 0
+
+    @property
+    def mean_wait(self):
+        return self.total_wait / self.n if self.n else 0
+
+    def add(self, wait):
+        self.n += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+
+class CommunicationScheduler(HasTraits):
+    """
+        this class should be used when working with multiple rs485 devices on the same port.
 
         when setting up the devices use device.set_scheduler to set the shared scheduler
 
+        requests are executed one at a time by a worker thread in priority order. interactive requests go before
+        normal ones and normal before background (scan) requests. within a priority requests are first come first
+        served. a request that has waited longer than ``aging_period`` seconds is served next regardless of its
+        priority so scans are never starved.
+
+        ``coalesce=True`` marks a request as a read that can be shared. an identical request that is still queued,
+        or finished less than ``coalesce_window`` ms ago, is answered with the same result instead of going on
+        the bus again. coalescing is off by default. only pass ``coalesce=True`` for reads without side effects
+        whose result does not depend on when they reach the device.
+
+        requests with the same ``batch_key`` that are queued together are passed as one list to the function
+        registered with ``register_batcher``. it must return a result for each request in order.
     """
 
+    name = Str
     #    collision_delay = Float(125)
     collision_delay = Float(50)
+    coalesce_window = Float(50)
+    aging_period = Float(1)
 
     def __init__(self, *args, **kw):
         super(CommunicationScheduler, self).__init__(*args, **kw)
-        self._lock = Lock()
-
-    #        self._condition = Condition()
-    #        self._command_queue = Queue()
-    #        self._buffer = Queue()
-    #
-    #        consumer = Consumer(self._command_queue,
-    #                            self._buffer,
-    # #                            self._condition,
-    #                            self.collision_delay)
-    #        consumer.start()
-
-    def schedule(self, func, args=None, kwargs=None):
+        self._cond = Condition(Lock())
+        self._queues = [deque() for _ in PRIORITIES]
+        self._pending = {}
+        self._recent = {}
+        self._batchers = {}
+        self._thread = None
+
+        self._clients = {}
+        self._priority_stats = [ClientStats() for _ in PRIORITIES]
+        self._ncoalesced = 0
+        self._nbatched = 0
+        self._max_depth = 0
+
+    def register_batcher(self, batch_key, func):
+        """
+            func(list of (args, kwargs)) -> list of results
+        """
+        self._batchers[batch_key] = func
+
+    def schedule(self, func, args=None, kwargs=None, priority=None, coalesce=False, client=None, batch_key=None):
         if args is None:
             args = tuple()
         if kwargs is None:
             kwargs = dict()
 
-        #        while SINGLE_ITEM_BUF and not self._buffer.empty():
-        #            time.sleep(0.0001)
-        #
-        #        self._command_queue.put((func, args, kwargs))
-        #
-        #        try:
-        #            r = self._buffer.get(timeout=0.5)
-        #        except Empty:
-        #            r = None
+        if self._thread is not None and self._thread is current_thread():
+            # called from a request that is already running on the bus
+            return func(*args, **kwargs)
 
-        with self._lock:
-            r = func(*args, **kwargs)
+        if priority is None:
+            priority = get_context_priority()
+        if client is None:
+            client = _get_client_name(func)
 
-        return r
+        key = None
+        if coalesce:
+            try:
+                key = (func, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                key = None
 
-# class Consumer(Thread):
-#
-#    def __init__(self, q, b, cd):
-#        Thread.__init__(self)
-#        self._q = q
-#        self._buf = b
-# #        self.logger = add_console(name='consumer')
-# #        self.cond = cond
-#        self.cd = cd
-#
-#    def run(self):
-#        while 1:
-# #            self.cond.acquire()
-#            while self._q.empty():
-#                time.sleep(0.0001)
-# #                self.cond.wait(timeout=0.05)
-# #            st = time.time()
-#            func, args, kwargs = self._q.get()
-#
-#            while SINGLE_ITEM_BUF and not self._buf.empty():
-#                time.sleep(0.0001)
-#
-#            r = func(*args, **kwargs)
-# #            self.logger.info(r)
-#            self._buf.put(r)
-# #            self.cond.release()
-#
-# #            time.sleep(self.cd/1000.)
-# #            time.sleep(max(0.0001, self.cd / 1000. - (time.time() - st) - 0.001))
+        with self._cond:
+            req = None
+            if key is not None:
+                req = self._get_coalesced(key)
+
+            if req is None:
+                req = Request(func, args, kwargs, priority, client, key, batch_key)
+                self._queues[priority].append(req)
+                if key is not None:
+                    self._pending[key] = req
+
+                depth = sum(len(q) for q in self._queues)
+                if depth > self._max_depth:
+                    self._max_depth = depth
+
+                self._start()
+                self._cond.notify()
+
+        req.event.wait()
+        return self._get_result(req)
+
+    def metrics(self):
+        """
+            queue latency is the time from ``schedule`` to the request starting on the bus
+        """
+        with self._cond:
+            clients = {k: {'n': v.n, 'mean_wait': v.mean_wait, 'max_wait': v.max_wait}
+                       for k, v in self._clients.items()}
+            priorities = {PRIORITY_NAMES[i]: {'n': v.n, 'mean_wait': v.mean_wait, 'max_wait': v.max_wait}
+                          for i, v in enumerate(self._priority_stats)}
+            depth = sum(len(q) for q in self._queues)
+
+        return {'clients': clients,
+                'priorities': priorities,
+                'fairness': _fairness([c['mean_wait'] for c in clients.values()]),
+                'coalesced': self._ncoalesced,
+                'batched': self._nbatched,
+                'depth': depth,
+                'max_depth': self._max_depth}
+
+    def report(self):
+        m = self.metrics()
+        lines = ['scheduler={} depth={} max_depth={} coalesced={} batched={} fairness={:0.3f}'.format(
+            self.name, m['depth'], m['max_depth'], m['coalesced'], m['batched'], m['fairness'])]
+        for tag in ('priorities', 'clients'):
+            for k, v in sorted(m[tag].items()):
+                if v['n']:
+                    lines.append('    {:<20s} n={:<6d} wait mean={:0.1f}ms max={:0.1f}ms'.format(
+                        k, v['n'], v['mean_wait'] * 1000, v['max_wait'] * 1000))
+        return '\n'.join(lines)
+
+    # private
+    def _get_result(self, req):
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def _get_coalesced(self, key):
+        r = self._pending.get(key)
+        if r is not None:
+            self._ncoalesced += 1
+            return r
+
+        r = self._recent.get(key)
+        if r is not None:
+            if time.time() - r[0] < self.coalesce_window / 1000.:
+                self._ncoalesced += 1
+                return r[1]
+            del self._recent[key]
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='CommunicationScheduler {}'.format(self.name))
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _next(self):
+        """
+            return the next request(s) to execute. called with the condition held
+        """
+        now = time.time()
+        heads = [(q[0].submitted, q) for q in self._queues if q]
+        aged = [h for h in heads if now - h[0] > self.aging_period]
+        if aged:
+            q = min(aged, key=lambda h: h[0])[1]
+        else:
+            q = heads[0][1]
+
+        req = q.popleft()
+        reqs = [req]
+        if req.batch_key is not None and req.batch_key in self._batchers:
+            for qi in self._queues:
+                for r in list(qi):
+                    if r.batch_key == req.batch_key:
+                        qi.remove(r)
+                        reqs.append(r)
+        return reqs
 
+    def _run(self):
+        while 1:
+            with self._cond:
+                while not any(self._queues):
+                    self._cond.wait()
+                reqs = self._next()
+
+                now = time.time()
+                for r in reqs:
+                    r.started = now
+                    wait = now - r.submitted
+                    self._priority_stats[r.priority].add(wait)
+                    self._clients.setdefault(r.client, ClientStats()).add(wait)
+
+            if len(reqs) > 1:
+                self._execute_batch(reqs)
+            else:
+                self._execute(reqs[0])
+
+            with self._cond:
+                now = time.time()
+                for r in reqs:
+                    if r.key is not None:
+                        self._pending.pop(r.key, None)
+                        if r.error is None:
+                            self._recent[r.key] = (now, r)
+
+                if len(self._recent) > 1000:
+                    self._recent = {k: v for k, v in self._recent.items()
+                                    if now - v[0] < self.coalesce_window / 1000.}
+
+            for r in reqs:
+                r.event.set()
+
+    def _execute(self, req):
+        try:
+            req.result = req.func(*req.args, **req.kwargs)
+        except BaseException as e:
+            req.error = e
+
+    def _execute_batch(self, reqs):
+        self._nbatched += len(reqs)
+        func = self._batchers[reqs[0].batch_key]
+        try:
+            results = func([(r.args, r.kwargs) for r in reqs])
+            for r, ri in zip(reqs, results):
+                r.result = ri
+        except BaseException as e:
+            for r in reqs:
+                r.error = e
+
+
+def _get_client_name(func):
+    obj = getattr(func, '__self__', None)
+    if obj is not None:
+        name = getattr(obj, 'name', None)
+        if name:
+            return str(name)
+    return getattr(func, '__name__', str(func))
+
+
+def _fairness(xs):
+    """
+        Jain's fairness index. 1 when every client waits the same on average
+    """
+    xs = [x for x in xs if x > 0]
+    if not xs:
+        return 1.
+    return sum(xs) ** 2 / (len(xs) * sum(x * x for x in xs))
 
 # ============= EOF ====================================
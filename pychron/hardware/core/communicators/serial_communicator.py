@@ -20,6 +20,7 @@
 import codecs
 import glob
 import os
+import select
 import sys
 import time
 
@@ -77,6 +78,12 @@ class SerialCommunicator(Communicator):
     read_terminator_position = None
     clear_output = False
 
+    # block until data arrives instead of polling the port every 10 ms
+    event_reads = True
+    # ms to wait for the \n or \x00 of a reply that ends with a bare \r when the default terminators are used
+    terminator_settle = 20
+    _pushback = b''
+
     _config = None
     _comms_report_attrs = ('port', 'baudrate', 'bytesize', 'parity', 'stopbits', 'timeout')
 
@@ -142,7 +149,9 @@ class SerialCommunicator(Communicator):
         self.set_stopbits(stopbits)
 
         self.set_attribute(config, 'read_delay', 'Communications', 'read_delay',
-                           cast='float', optional=True, default=25)
+                           cast='float', optional=True, default=None)
+        self.set_attribute(config, 'event_reads', 'Communications', 'event_reads',
+                           cast='boolean', optional=True, default=True)
 
         self.set_attribute(config, 'read_terminator', 'Communications', 'terminator',
                            optional=True, default=None)
@@ -222,7 +231,9 @@ class SerialCommunicator(Communicator):
             if self.clear_output:
                 self.handle.flushInput()
                 self.handle.flushOutput()
+                self._pushback = b''
 
+            st = time.time()
             cmd = self._write(cmd, is_hex=is_hex)
             if cmd is None:
                 return
@@ -239,6 +250,9 @@ class SerialCommunicator(Communicator):
                 re = self._read_terminator(delay=delay,
                                            terminator=read_terminator,
                                            terminator_position=terminator_position)
+
+            self.latency.add(time.time() - st, timeout=not re)
+
         if remove_eol and not is_hex:
             re = remove_eol_func(re)
 
@@ -422,6 +436,10 @@ class SerialCommunicator(Communicator):
         return self._read_loop(func, delay, timeout)
 
     def _read_handshake(self, handshake, handshake_only, timeout=1, delay=None):
+        # the end of a handshake response cannot be detected so give the device time to send it
+        if delay is None and self.read_delay is None:
+            delay = 25
+
         def hfunc(r):
             terminated = False
             ack, r = self._check_handshake(handshake)
@@ -451,11 +469,7 @@ class SerialCommunicator(Communicator):
         """
             1 byte == 2 chars
         """
-        handle = self.handle
-        inw = handle.inWaiting()
-        c = min(inw, nchars - len(r))
-        re = handle.read(c)
-        # print('inw', inw, 'c', c, re)
+        re = self._read_available(nchars - len(r))
         r += re
         # print('r', r, len(r), nchars)
         # r += b''.join(map('{:02X}'.format, map(ord, handle.read(c)))))
@@ -463,16 +477,12 @@ class SerialCommunicator(Communicator):
         return r[:nchars], len(r) >= nchars
 
     def _get_nchars(self, nchars, r):
-        handle = self.handle
-        inw = handle.inWaiting()
-        c = min(inw, nchars - len(r))
-        r += handle.read(c)
+        r += self._read_available(nchars - len(r))
         return r[:nchars], len(r) >= nchars
 
     def _check_handshake(self, handshake_chrs):
         ack, nak = handshake_chrs
-        inw = self.handle.inWaiting()
-        r = self.handle.read(inw)
+        r = self._read_available()
         if r:
             return ack == r[0], r[1:]
         return False, None
@@ -480,11 +490,11 @@ class SerialCommunicator(Communicator):
     def _get_isterminated(self, r, terminator=None, pos=None):
         terminated = False
         try:
-            inw = self.handle.inWaiting()
-            r += self.handle.read(inw)
+            r += self._read_available()
             # r += chrs.decode('utf-8')
             #            print 'inw', inw, r, terminator
-            if terminator is None:
+            default = terminator is None
+            if default:
                 terminator = (b'\r\x00', b'\r\n', b'\r', b'\n')
             if not isinstance(terminator, (list, tuple)):
                 terminator = (terminator,)
@@ -503,24 +513,83 @@ class SerialCommunicator(Communicator):
                     if t:
                         terminated = True
                         break
+
+                if terminated and default and r.endswith(b'\r'):
+                    r = self._drain_terminator(r)
         except BaseException as e:
             self.warning(e)
         return r, terminated
 
+    def _drain_terminator(self, r):
+        """
+            a \r\n reply can arrive as \r then \n. read the rest of the terminator so it is not left at the start
+            of the next reply
+        """
+        if self._wait_for_data(self.terminator_settle / 1000.):
+            c = self._read_available(1)
+            if c in (b'\n', b'\x00'):
+                r += c
+            else:
+                self._pushback = c + self._pushback
+        return r
+
+    def _read_available(self, n=None):
+        """
+            return up to n bytes, or everything, that has already been received without blocking
+        """
+        pb = self._pushback
+        self._pushback = b''
+        if n is not None and len(pb) >= n:
+            self._pushback = pb[n:]
+            return pb[:n]
+
+        handle = self.handle
+        inw = handle.inWaiting()
+        if n is not None:
+            inw = min(inw, n - len(pb))
+
+        if inw:
+            pb += handle.read(inw)
+        return pb
+
+    def _wait_for_data(self, timeout):
+        """
+            block until data is available to read or timeout
+        """
+        handle = self.handle
+        if self._pushback or handle.inWaiting():
+            return True
+
+        if os.name == 'posix' and hasattr(handle, 'fileno'):
+            r, _, _ = select.select([handle.fileno()], [], [], timeout)
+            return bool(r)
+
+        # no selectable file descriptor, e.g. windows. block reading one byte and keep it for the next read
+        ot = handle.timeout
+        handle.timeout = timeout
+        try:
+            c = handle.read(1)
+        finally:
+            handle.timeout = ot
+
+        if c:
+            self._pushback += c
+            return True
+
     def _read_loop(self, func, delay, timeout=1):
         if delay is not None:
             time.sleep(delay / 1000.)
-
         elif self.read_delay:
             time.sleep(self.read_delay / 1000.)
+        elif not self.event_reads:
+            time.sleep(0.025)
 
         r = b''
         st = time.time()
 
         handle = self.handle
 
-        ct = time.time()
-        while ct - st < timeout:
+        while 1:
             if not handle.isOpen():
                 break
 
@@ -530,12 +599,21 @@ class SerialCommunicator(Communicator):
                     break
             except (ValueError, TypeError):
                 pass
-            time.sleep(0.01)
-            ct = time.time()
 
-        if ct - st > timeout:
-            l = len(r) if r else 0
-            self.info('timed out. {}s r={}, len={}'.format(timeout, r, l))
+            remaining = timeout - (time.time() - st)
+            if remaining <= 0:
+                l = len(r) if r else 0
+                self.info('timed out. {}s r={}, len={}'.format(timeout, r, l))
+                break
+
+            if self.event_reads:
+                try:
+                    self._wait_for_data(remaining)
+                except (ValueError, OSError, serial.SerialException) as e:
+                    self.debug('wait for data failed. {}'.format(e))
+                    time.sleep(0.01)
+            else:
+                time.sleep(0.01)
 
         return r
 
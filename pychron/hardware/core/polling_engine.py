@@ -0,0 +1,326 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= standard library imports ========================
+import heapq
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Condition, Lock, Thread
+
+# ============= local library imports  ==========================
+from pychron.loggable import Loggable
+
+
+class PollTask(object):
+    """
+        one periodic function, usually a device's ``scan``
+    """
+
+    def __init__(self, name, func, period, group):
+        self.name = name
+        self.func = func
+        self.period = period
+        self.group = group
+
+        self.active = True
+        self.pending = False
+
+        self.ncalls = 0
+        self.nskipped = 0
+        self.nlate = 0
+        self.nerrors = 0
+        self.total_duration = 0
+        self.max_duration = 0
+        self._starts = deque(maxlen=20)
+
+    @property
+    def target_rate(self):
+        return 1 / self.period if self.period else 0
+
+    @property
+    def rate(self):
+        """
+            achieved calls per second over the last few calls
+        """
+        s = self._starts
+        if len(s) < 2 or s[-1] == s[0]:
+            return 0
+        return (len(s) - 1) / (s[-1] - s[0])
+
+    @property
+    def behind(self):
+        return len(self._starts) > 2 and self.rate < 0.9 * self.target_rate
+
+    @property
+    def mean_duration(self):
+        return self.total_duration / self.ncalls if self.ncalls else 0
+
+    def started(self, st):
+        self._starts.append(st)
+
+    def finished(self, dt):
+        self.ncalls += 1
+        self.total_duration += dt
+        if dt > self.max_duration:
+            self.max_duration = dt
+
+    def to_dict(self):
+        return {'name': self.name,
+                'group': str(self.group),
+                'period': self.period,
+                'target_rate': self.target_rate,
+                'rate': self.rate,
+                'behind': self.behind,
+                'ncalls': self.ncalls,
+                'nskipped': self.nskipped,
+                'nlate': self.nlate,
+                'nerrors': self.nerrors,
+                'mean_duration': self.mean_duration,
+                'max_duration': self.max_duration}
+
+
+class PollingEngine(Loggable):
+    """
+        runs every device scan from one scheduler thread and a small worker pool instead of a timer thread per
+        device.
+
+        devices that share a communicator (same port or scheduler) form a group. a group runs one task at a time
+        so scans do not contend for the port, different groups run concurrently.
+
+        a task that is still queued or running when it comes due again is skipped rather than piling up.
+        ``rates`` reports the achieved rate of each task so slow scans are visible.
+
+        rows passed to ``record`` are buffered and handed to ``device.write_scan_rows`` every ``flush_period``
+        seconds so data files are written in batches.
+    """
+
+    nworkers = 4
+    flush_period = 2.0
+
+    def __init__(self, *args, **kw):
+        super(PollingEngine, self).__init__(*args, **kw)
+        self._cond = Condition(Lock())
+        self._heap = []
+        self._seq = count()
+        self._tasks = {}
+        self._queues = {}
+        self._busy = set()
+
+        self._buffer_lock = Lock()
+        self._flush_lock = Lock()
+        self._buffers = {}
+        self._last_flush = time.time()
+
+        self._executor = None
+        self._thread = None
+        self._alive = False
+
+    def register(self, device, period, func=None, group=None):
+        """
+            poll ``func`` (default ``device.scan``) every ``period`` seconds. returns the PollTask
+        """
+        if func is None:
+            func = device.scan
+        if group is None:
+            group = get_group_key(device)
+
+        task = PollTask(device.name, func, period, group)
+        with self._cond:
+            old = self._tasks.get(device)
+            if old is not None:
+                old.active = False
+
+            self._tasks[device] = task
+            heapq.heappush(self._heap, (time.time(), next(self._seq), task))
+            self._start()
+            self._cond.notify()
+
+        self.debug('registered {} period={}s group={}'.format(task.name, period, group))
+        return task
+
+    def unregister(self, device):
+        with self._cond:
+            task = self._tasks.pop(device, None)
+            if task is not None:
+                task.active = False
+
+        self.flush(device)
+
+    def get_task(self, device):
+        return self._tasks.get(device)
+
+    def rates(self):
+        with self._cond:
+            tasks = list(self._tasks.values())
+        return [t.to_dict() for t in tasks]
+
+    def report(self):
+        self.debug('============ Polling Report ==============')
+        for r in sorted(self.rates(), key=lambda x: (x['group'], x['name'])):
+            self.debug('{:<25s} {:<30s} target={:0.2f}Hz rate={:0.2f}Hz skipped={} late={} '
+                       'duration={:0.1f}ms{}'.format(r['name'], r['group'], r['target_rate'], r['rate'],
+                                                    r['nskipped'], r['nlate'], r['mean_duration'] * 1000,
+                                                    ' BEHIND' if r['behind'] else ''))
+        self.debug('==========================================')
+
+    def record(self, device, row):
+        with self._buffer_lock:
+            self._buffers.setdefault(device, []).append(row)
+
+    def flush(self, device=None):
+        with self._flush_lock:
+            with self._buffer_lock:
+                if device is None:
+                    items = list(self._buffers.items())
+                    self._buffers = {}
+                else:
+                    rows = self._buffers.pop(device, None)
+                    items = [(device, rows)] if rows else []
+
+            for dev, rows in items:
+                try:
+                    dev.write_scan_rows(rows)
+                except BaseException as e:
+                    self.warning('failed writing {} scan rows for {}. {}'.format(len(rows), dev.name, e))
+
+    def stop(self):
+        with self._cond:
+            self._alive = False
+            for t in self._tasks.values():
+                t.active = False
+            self._tasks = {}
+            self._heap = []
+            self._cond.notify()
+
+        if self._thread is not None:
+            self._thread.join(1)
+            self._thread = None
+
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # private
+    def _start(self):
+        if self._thread is None:
+            self._alive = True
+            self._executor = ThreadPoolExecutor(max_workers=self.nworkers, thread_name_prefix='poll')
+            self._thread = Thread(target=self._run, name='PollingEngine')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while 1:
+            with self._cond:
+                if not self._alive:
+                    break
+
+                now = time.time()
+                heap = self._heap
+                while heap and heap[0][0] <= now:
+                    due, _, task = heapq.heappop(heap)
+                    if task.active:
+                        self._dispatch(task, due, now)
+
+                timeout = self.flush_period - (now - self._last_flush)
+                if heap:
+                    timeout = min(timeout, heap[0][0] - now)
+
+                if timeout > 0:
+                    self._cond.wait(timeout)
+
+            if time.time() - self._last_flush >= self.flush_period:
+                self._last_flush = time.time()
+                self._executor.submit(self.flush)
+
+    def _dispatch(self, task, due, now):
+        """
+            called with the condition held
+        """
+        nxt = due + task.period
+        if nxt <= now:
+            # fell behind. do not try to make up the missed calls
+            task.nlate += 1
+            nxt = now + task.period
+        heapq.heappush(self._heap, (nxt, next(self._seq), task))
+
+        if task.pending:
+            task.nskipped += 1
+            return
+
+        task.pending = True
+        if task.group in self._busy:
+            self._queues.setdefault(task.group, deque()).append(task)
+        else:
+            self._busy.add(task.group)
+            self._executor.submit(self._execute, task)
+
+    def _execute(self, task):
+        """
+            run ``task`` then any tasks of the same group that queued behind it
+        """
+        group = task.group
+        while task is not None:
+            if task.active:
+                st = time.time()
+                task.started(st)
+                try:
+                    task.func()
+                except BaseException as e:
+                    task.nerrors += 1
+                    # only warn once, a broken scan would otherwise warn every period
+                    log = self.warning if task.nerrors == 1 else self.debug
+                    log('poll {} failed. {}'.format(task.name, e))
+                task.finished(time.time() - st)
+
+            with self._cond:
+                task.pending = False
+                q = self._queues.get(group)
+                task = q.popleft() if q else None
+                if task is None:
+                    self._busy.discard(group)
+
+
+def get_group_key(device):
+    """
+        devices on the same port or sharing a scheduler get the same key
+    """
+    comm = getattr(device, 'communicator', None)
+    if comm is None:
+        return device.name
+
+    scheduler = getattr(comm, 'scheduler', None)
+    if scheduler is not None:
+        return 'scheduler:{}'.format(id(scheduler))
+
+    address = getattr(comm, 'address', None) or getattr(comm, 'port', None)
+    if address:
+        return '{}:{}'.format(comm.__class__.__name__, address)
+    return device.name
+
+
+_engine = None
+
+
+def get_polling_engine():
+    global _engine
+    if _engine is None:
+        _engine = PollingEngine(name='polling_engine')
+    return _engine
+
+# ============= EOF =============================================
@@ -30,6 +30,8 @@ from pychron.core.helpers.datetime_tools import generate_datetimestamp
 from pychron.database.data_warehouse import DataWarehouse
 from pychron.graph.plot_record import PlotRecord
 from pychron.hardware.core.alarm import Alarm
+from pychron.hardware.core.communicators.scheduler import scheduler_priority, BACKGROUND
+from pychron.hardware.core.polling_engine import get_polling_engine
 # ============= local library imports  ==========================
 from pychron.hardware.core.viewable_device import ViewableDevice
 from pychron.managers.data_managers.csv_data_manager import CSVDataManager
@@ -56,6 +58,8 @@ class ScanableDevice(ViewableDevice):
     auto_start = Bool(False)
     scan_root = Str
     scan_name = Str
+    scan_rate = Float
+    scan_behind = Bool
 
     graph = Instance('pychron.graph.graph.Graph')
     graph_ytitle = Str
@@ -66,6 +70,7 @@ class ScanableDevice(ViewableDevice):
     dm_kind = 'csv'
     use_db = False
     _auto_started = False
+    _poll_task = None
     graph_klass = None
 
     def is_scanning(self):
@@ -144,16 +149,15 @@ class ScanableDevice(ViewableDevice):
 
                     if self.dm_kind == 'csv':
                         ts = generate_datetimestamp()
+                        row = (ts, '{:<8s}'.format('{:0.2f}'.format(x))) + v
+                    else:
+                        row = (x, v[0])
 
-                        self.data_manager.write_to_frame((ts, '{:<8s}'.format('{:0.2f}'.format(x))) + v)
+                    if self._poll_task is not None:
+                        # written in batches by the polling engine
+                        get_polling_engine().record(self, row)
                     else:
-                        tab = self.data_manager.get_table('scan1', '/scans')
-                        if tab is not None:
-                            r = tab.row
-                            r['time'] = x
-                            r['value'] = v[0]
-                            r.append()
-                            tab.flush()
+                        self.write_scan_rows([row])
 
                 self._scan_hook(v)
 
@@ -164,7 +168,7 @@ class ScanableDevice(ViewableDevice):
                     slow user interaction
                 '''
                 if self._no_response_counter > 3:
-                    self.timer.Stop()
+                    self._stop_polling()
                     self.info('no response. stopping scan func={}'.format(self.scan_func))
                     self._scanning = False
                     self._no_response_counter = 0
@@ -176,18 +180,39 @@ class ScanableDevice(ViewableDevice):
         if self.scan_lock is None:
             self.scan_lock = Lock()
 
-        with self.scan_lock:
+        # scans queue behind interactive commands on a shared bus
+        with self.scan_lock, scheduler_priority(BACKGROUND):
             self._scan_(*args, **kw)
 
+        task = self._poll_task
+        if task is not None:
+            self.scan_rate = round(task.rate, 3)
+            self.scan_behind = task.behind
+
+    def write_scan_rows(self, rows):
+        dm = self.data_manager
+        if dm is None:
+            return
+
+        if self.dm_kind == 'csv':
+            dm.write_to_frame(rows)
+        else:
+            tab = dm.get_table('scan1', '/scans')
+            if tab is not None:
+                for x, v in rows:
+                    r = tab.row
+                    r['time'] = x
+                    r['value'] = v
+                    r.append()
+                tab.flush()
+
     def start_scan(self, period=None):
         """
 
         :param period: delapy between triggers in milliseconds
         :return:
         """
-        if self.timer is not None:
-            self.timer.Stop()
-            self.timer.wait_for_completion()
+        self._stop_polling()
 
         self._scanning = True
         self.info('Starting scan')
@@ -229,8 +254,7 @@ class ScanableDevice(ViewableDevice):
         if period is None:
             period = self.scan_period * self.time_dict[self.scan_units]
 
-        from pychron.core.helpers.timer import Timer
-        self.timer = Timer(period, self.scan)
+        self._poll_task = get_polling_engine().register(self, period / 1000.)
         self.info('Scan started func={} period={}'.format(self.scan_func, period))
 
     def save_scan_to_db(self):
@@ -252,8 +276,7 @@ class ScanableDevice(ViewableDevice):
         self.info('Stoppiing scan')
 
         self._scanning = False
-        if self.timer is not None:
-            self.timer.Stop()
+        self._stop_polling()
 
         if self.record_scan_data and not self._auto_started:
             if self.use_db:
@@ -268,6 +291,12 @@ class ScanableDevice(ViewableDevice):
         self._auto_started = False
         self.info('Scan stopped')
 
+    def _stop_polling(self):
+        if self._poll_task is not None:
+            self._poll_task = None
+            # flushes any buffered rows
+            get_polling_engine().unregister(self)
+
     def _get_scan_label(self):
         return 'Start' if not self._scanning else 'Stop'
 
@@ -309,7 +338,9 @@ class ScanableDevice(ViewableDevice):
         g = VGroup(Item('graph', show_label=False, style='custom'),
                    VGroup(Item('scan_func', label='Function', style='readonly'),
 
-                          HGroup(Item('scan_period', label='Period ({})'.format(self.scan_units)), spring),
+                          HGroup(Item('scan_period', label='Period ({})'.format(self.scan_units)),
+                                 Item('scan_rate', label='Achieved (Hz)', style='readonly'),
+                                 Item('scan_behind', label='Behind', style='readonly'), spring),
                           Item('current_scan_value', style='readonly')),
                    VGroup(
                        HGroup(Item('scan_button', editor=ButtonEditor(label_value='scan_label'),
@@ -0,0 +1,191 @@
+import socket
+import socketserver
+import threading
+import time
+import unittest
+
+from pychron.hardware.core.communicators.connection_pool import ConnectionPool, Backoff
+from pychron.hardware.core.communicators.ethernet_communicator import EthernetCommunicator, ask_concurrent
+
+
+class EchoTCPHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        server.nconnections += 1
+        while 1:
+            try:
+                data = self.request.recv(1024)
+            except socket.error:
+                break
+            if not data:
+                break
+            cmd = data.decode('utf-8').strip()
+            if cmd == 'CLOSE':
+                break
+            time.sleep(server.delay)
+            self.request.sendall('{}:OK'.format(cmd).encode('utf-8'))
+
+
+class EchoTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    nconnections = 0
+    delay = 0
+
+
+class EchoUDPHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        sock.sendto(data.strip() + b':OK', self.client_address)
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    class Conn(object):
+        ok = True
+        ended = False
+
+        def healthy(self):
+            return self.ok
+
+        def end(self):
+            self.ended = True
+
+    def test_reuse(self):
+        pool = ConnectionPool(self.Conn)
+        a = pool.acquire()
+        pool.release(a)
+        self.assertIs(pool.acquire(), a)
+        self.assertEqual(pool.ncreated, 1)
+        self.assertEqual(pool.nreused, 1)
+
+    def test_unhealthy(self):
+        pool = ConnectionPool(self.Conn)
+        a = pool.acquire()
+        a.ok = False
+        pool.release(a)
+        b = pool.acquire()
+        self.assertIsNot(a, b)
+        self.assertTrue(a.ended)
+        self.assertEqual(pool.nopen, 1)
+
+    def test_exhausted(self):
+        pool = ConnectionPool(self.Conn, max_size=2)
+        a, b = pool.acquire(), pool.acquire()
+        st = time.time()
+        self.assertIsNone(pool.acquire(timeout=0.1))
+        self.assertGreater(time.time() - st, 0.09)
+
+        threading.Timer(0.05, pool.release, args=(a,)).start()
+        self.assertIs(pool.acquire(timeout=1), a)
+
+    def test_backoff(self):
+        pool = ConnectionPool(lambda: None, backoff=Backoff(initial=0.1))
+        self.assertIsNone(pool.acquire())
+        self.assertFalse(pool.backoff.ready())
+        self.assertEqual(pool.nopen, 0)
+
+        pool.factory = self.Conn
+        self.assertIsNone(pool.acquire())
+        time.sleep(0.11)
+        self.assertIsNotNone(pool.acquire())
+        self.assertEqual(pool.backoff.nfailures, 0)
+
+
+class EthernetCommunicatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = EchoTCPServer(('127.0.0.1', 0), EchoTCPHandler)
+        self.port = self.server.server_address[1]
+        t = threading.Thread(target=self.server.serve_forever)
+        t.daemon = True
+        t.start()
+        self.comms = []
+
+    def tearDown(self):
+        for c in self.comms:
+            c.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _comm(self, port=None, **kw):
+        c = EthernetCommunicator(name='test')
+        c.simulation = False
+        c.host = '127.0.0.1'
+        c.port = port or self.port
+        c.kind = 'TCP'
+        c.write_terminator = '\r'
+        for k, v in kw.items():
+            setattr(c, k, v)
+        self.comms.append(c)
+        return c
+
+    def test_persistent(self):
+        c = self._comm()
+        for i in range(5):
+            self.assertEqual(c.ask('A{}'.format(i), verbose=False), 'A{}:OK'.format(i))
+        self.assertEqual(self.server.nconnections, 1)
+        self.assertEqual(c.pool.nreused, 4)
+        self.assertEqual(c.latency.n, 5)
+
+    def test_use_end(self):
+        c = self._comm(use_end=True)
+        for i in range(3):
+            self.assertEqual(c.ask('A', verbose=False), 'A:OK')
+        self.assertEqual(c.pool.ncreated, 3)
+
+    def test_peer_closed(self):
+        c = self._comm()
+        c.tell('CLOSE', verbose=False)
+        time.sleep(0.05)
+        # the health check replaces the closed connection
+        self.assertEqual(c.ask('A', verbose=False), 'A:OK')
+        self.assertEqual(c.pool.ndiscarded, 1)
+
+    def test_backoff(self):
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+        s.close()
+
+        c = self._comm(port=port)
+        st = time.time()
+        self.assertIsNone(c.ask('A', verbose=False))
+        self.assertIsNone(c.ask('A', verbose=False))
+        self.assertLess(time.time() - st, 0.5)
+        # the retries and the second ask did not try to connect again
+        self.assertEqual(c.pool.backoff.nfailures, 1)
+
+    def test_ask_concurrent(self):
+        self.server.delay = 0.2
+        cs = [self._comm() for _ in range(4)]
+        st = time.time()
+        rs = ask_concurrent([(c, 'R{}'.format(i), {'verbose': False}) for i, c in enumerate(cs)])
+        et = time.time() - st
+        self.assertListEqual(rs, ['R{}:OK'.format(i) for i in range(4)])
+        self.assertLess(et, 0.6)
+
+    def test_pool_size(self):
+        self.server.delay = 0.2
+        c = self._comm(pool_size=3)
+        st = time.time()
+        rs = ask_concurrent([(c, 'R{}'.format(i), {'verbose': False}) for i in range(3)])
+        self.assertLess(time.time() - st, 0.5)
+        self.assertListEqual(rs, ['R{}:OK'.format(i) for i in range(3)])
+        self.assertEqual(c.pool.ncreated, 3)
+
+    def test_udp(self):
+        server = socketserver.UDPServer(('127.0.0.1', 0), EchoUDPHandler)
+        t = threading.Thread(target=server.serve_forever)
+        t.daemon = True
+        t.start()
+        try:
+            c = self._comm(port=server.server_address[1], kind='UDP')
+            self.assertEqual(c.ask('A', verbose=False), 'A:OK')
+            self.assertEqual(c.ask('B', verbose=False), 'B:OK')
+            self.assertEqual(c.pool.ncreated, 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import threading
+import time
+import unittest
+
+from pychron.hardware.core.polling_engine import PollingEngine, PollTask, get_group_key
+
+
+class FakeCommunicator(object):
+    scheduler = None
+
+    def __init__(self, port):
+        self.port = port
+
+
+class FakeDevice(object):
+    def __init__(self, name, port=None, delay=0.0):
+        self.name = name
+        self.communicator = FakeCommunicator(port) if port else None
+        self.delay = delay
+        self.calls = []
+        self.rows = []
+
+    def scan(self):
+        self.calls.append(time.time())
+        time.sleep(self.delay)
+
+    def write_scan_rows(self, rows):
+        self.rows.append(list(rows))
+
+
+class SharedPortDevice(FakeDevice):
+    """
+        tracks how many devices on the port are being scanned at once
+    """
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def scan(self):
+        with self.lock:
+            SharedPortDevice.active += 1
+            SharedPortDevice.max_active = max(SharedPortDevice.max_active, SharedPortDevice.active)
+        time.sleep(self.delay)
+        with self.lock:
+            SharedPortDevice.active -= 1
+
+
+class PollTaskTestCase(unittest.TestCase):
+    def test_rate(self):
+        t = PollTask('a', None, 0.1, 'g')
+        for i in range(5):
+            t.started(i * 0.2)
+            t.finished(0.01)
+        self.assertAlmostEqual(t.rate, 5)
+        self.assertAlmostEqual(t.target_rate, 10)
+        self.assertTrue(t.behind)
+        self.assertAlmostEqual(t.mean_duration, 0.01)
+
+
+class PollingEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = PollingEngine(name='test')
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_period(self):
+        d = FakeDevice('a')
+        task = self.engine.register(d, 0.05)
+        time.sleep(0.52)
+        self.engine.unregister(d)
+        self.assertTrue(9 <= len(d.calls) <= 12, len(d.calls))
+        self.assertAlmostEqual(task.rate, 20, delta=3)
+        self.assertFalse(task.behind)
+
+        n = len(d.calls)
+        time.sleep(0.1)
+        self.assertEqual(len(d.calls), n)
+
+    def test_group_serialized(self):
+        SharedPortDevice.max_active = 0
+        ds = [SharedPortDevice('d{}'.format(i), port='/dev/ttyS0', delay=0.02) for i in range(4)]
+        for d in ds:
+            self.engine.register(d, 0.05)
+        time.sleep(0.3)
+        self.assertEqual(SharedPortDevice.max_active, 1)
+
+    def test_groups_concurrent(self):
+        ds = [FakeDevice('d{}'.format(i), port='/dev/ttyS{}'.format(i), delay=0.2) for i in range(4)]
+        st = time.time()
+        for d in ds:
+            self.engine.register(d, 10)
+        time.sleep(0.3)
+        # all four ran in parallel within the first 0.3s
+        self.assertTrue(all(len(d.calls) == 1 for d in ds))
+        self.assertLess(max(d.calls[0] for d in ds) - st, 0.1)
+
+    def test_behind(self):
+        d = FakeDevice('slow', delay=0.1)
+        task = self.engine.register(d, 0.02)
+        time.sleep(0.6)
+        self.assertTrue(task.behind)
+        self.assertGreater(task.nskipped + task.nlate, 0)
+        rates = self.engine.rates()
+        self.assertEqual(rates[0]['name'], 'slow')
+        self.assertTrue(rates[0]['behind'])
+
+    def test_batched_write(self):
+        self.engine.flush_period = 0.2
+        d = FakeDevice('a')
+        for i in range(5):
+            self.engine.record(d, (i, i * 2))
+        self.engine.register(d, 10)
+        time.sleep(0.35)
+        self.assertEqual(d.rows, [[(i, i * 2) for i in range(5)]])
+
+        self.engine.record(d, (5, 10))
+        self.engine.unregister(d)
+        self.assertEqual(d.rows[-1], [(5, 10)])
+
+    def test_error(self):
+        d = FakeDevice('a')
+
+        def func():
+            raise ValueError
+
+        task = self.engine.register(d, 0.05, func=func)
+        st = time.time()
+        while task.nerrors < 3 and time.time() - st < 5:
+            time.sleep(0.05)
+        # keeps polling after a failure
+        self.assertGreaterEqual(task.nerrors, 3)
+
+    def test_group_key(self):
+        self.assertEqual(get_group_key(FakeDevice('a', port='COM1')), get_group_key(FakeDevice('b', port='COM1')))
+        self.assertNotEqual(get_group_key(FakeDevice('a', port='COM1')),
+                            get_group_key(FakeDevice('b', port='COM2')))
+        self.assertEqual(get_group_key(FakeDevice('a')), 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import threading
+import time
+import unittest
+
+from pychron.hardware.core.communicators.scheduler import CommunicationScheduler, scheduler_priority, \
+    INTERACTIVE, BACKGROUND, get_context_priority
+
+
+class FakeBus(object):
+    def __init__(self, name='bus', delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def ask(self, cmd):
+        self.gate.wait()
+        self.calls.append(cmd)
+        time.sleep(self.delay)
+        return '{}:{}'.format(cmd, len(self.calls))
+
+
+class CommunicationSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = CommunicationScheduler(name='test')
+        self.bus = FakeBus()
+
+    def _spawn(self, func, *args, **kw):
+        results = {}
+
+        def target():
+            results['r'] = func(*args, **kw)
+
+        t = threading.Thread(target=target)
+        t.start()
+        return t, results
+
+    def _block(self):
+        """
+            occupy the worker so following requests queue up
+        """
+        self.bus.gate.clear()
+        t, _ = self._spawn(self.scheduler.schedule, self.bus.ask, args=('BLOCK',))
+        while not self.scheduler._thread or not self.scheduler.metrics()['priorities']['interactive']['n']:
+            time.sleep(0.005)
+        return t
+
+    def test_schedule(self):
+        r = self.scheduler.schedule(self.bus.ask, args=('A',))
+        self.assertEqual(r, 'A:1')
+        m = self.scheduler.metrics()
+        self.assertEqual(m['clients']['bus']['n'], 1)
+        self.assertEqual(m['priorities']['interactive']['n'], 1)
+
+    def test_priority(self):
+        blocker = self._block()
+        ts = [self._spawn(self.scheduler.schedule, self.bus.ask, args=('S{}'.format(i),),
+                          priority=BACKGROUND, coalesce=False)[0] for i in range(3)]
+        time.sleep(0.05)
+        ts.append(self._spawn(self.scheduler.schedule, self.bus.ask, args=('I',))[0])
+        time.sleep(0.05)
+
+        self.bus.gate.set()
+        for t in [blocker] + ts:
+            t.join()
+
+        self.assertListEqual(self.bus.calls, ['BLOCK', 'I', 'S0', 'S1', 'S2'])
+        self.assertEqual(self.scheduler.metrics()['max_depth'], 4)
+
+    def test_aging(self):
+        self.scheduler.aging_period = 0.05
+        blocker = self._block()
+        s, _ = self._spawn(self.scheduler.schedule, self.bus.ask, args=('S',), priority=BACKGROUND)
+        time.sleep(0.1)
+        i, _ = self._spawn(self.scheduler.schedule, self.bus.ask, args=('I',))
+        time.sleep(0.05)
+
+        self.bus.gate.set()
+        for t in (blocker, s, i):
+            t.join()
+        self.assertListEqual(self.bus.calls, ['BLOCK', 'S', 'I'])
+
+    def test_coalesce_pending(self):
+        blocker = self._block()
+        ts = [self._spawn(self.scheduler.schedule, self.bus.ask, args=('READ',), priority=BACKGROUND,
+                          coalesce=True)
+              for _ in range(3)]
+        time.sleep(0.05)
+        self.bus.gate.set()
+        blocker.join()
+        for t, _ in ts:
+            t.join()
+
+        self.assertListEqual(self.bus.calls, ['BLOCK', 'READ'])
+        self.assertListEqual([r['r'] for _, r in ts], ['READ:2'] * 3)
+        self.assertEqual(self.scheduler.metrics()['coalesced'], 2)
+
+    def test_coalesce_window(self):
+        self.scheduler.coalesce_window = 100
+        a = self.scheduler.schedule(self.bus.ask, args=('READ',), coalesce=True)
+        b = self.scheduler.schedule(self.bus.ask, args=('READ',), coalesce=True)
+        self.assertEqual(a, b)
+        self.assertEqual(len(self.bus.calls), 1)
+
+        time.sleep(0.15)
+        self.scheduler.schedule(self.bus.ask, args=('READ',), coalesce=True)
+        self.assertEqual(len(self.bus.calls), 2)
+
+    def test_no_coalesce_background(self):
+        self.scheduler.schedule(self.bus.ask, args=('READ',), priority=BACKGROUND)
+        self.scheduler.schedule(self.bus.ask, args=('READ',), priority=BACKGROUND)
+        self.assertEqual(len(self.bus.calls), 2)
+
+    def test_no_coalesce_interactive(self):
+        self.scheduler.schedule(self.bus.ask, args=('READ',))
+        self.scheduler.schedule(self.bus.ask, args=('READ',))
+        self.assertEqual(len(self.bus.calls), 2)
+
+    def test_batch(self):
+        batches = []
+
+        def batcher(reqs):
+            batches.append([a[0] for a, kw in reqs])
+            return [a[0].lower() for a, kw in reqs]
+
+        self.scheduler.register_batcher('read', batcher)
+        blocker = self._block()
+        ts = [self._spawn(self.scheduler.schedule, self.bus.ask, args=(c,), batch_key='read') for c in 'ABC']
+        time.sleep(0.05)
+        self.bus.gate.set()
+        blocker.join()
+        for t, _ in ts:
+            t.join()
+
+        self.assertEqual(len(batches), 1)
+        self.assertListEqual(sorted(batches[0]), ['A', 'B', 'C'])
+        self.assertListEqual([r['r'] for _, r in ts], ['a', 'b', 'c'])
+        self.assertEqual(self.scheduler.metrics()['batched'], 3)
+
+    def test_error(self):
+        def func():
+            raise ValueError('bad')
+
+        self.assertRaises(ValueError, self.scheduler.schedule, func)
+        # worker survives
+        self.assertEqual(self.scheduler.schedule(self.bus.ask, args=('A',)), 'A:1')
+
+    def test_reentrant(self):
+        def func():
+            return self.scheduler.schedule(self.bus.ask, args=('A',))
+
+        self.assertEqual(self.scheduler.schedule(func), 'A:1')
+
+    def test_context_priority(self):
+        self.assertEqual(get_context_priority(), INTERACTIVE)
+        with scheduler_priority(BACKGROUND):
+            self.assertEqual(get_context_priority(), BACKGROUND)
+            self.scheduler.schedule(self.bus.ask, args=('A',))
+        self.assertEqual(get_context_priority(), INTERACTIVE)
+        self.assertEqual(self.scheduler.metrics()['priorities']['background']['n'], 1)
+
+    def test_fairness(self):
+        other = FakeBus('other')
+        for i in range(3):
+            self.scheduler.schedule(self.bus.ask, args=('A',))
+            self.scheduler.schedule(other.ask, args=('B',))
+        m = self.scheduler.metrics()
+        self.assertEqual(len(m['clients']), 2)
+        self.assertTrue(0 < m['fairness'] <= 1)
+        self.assertIn('other', self.scheduler.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
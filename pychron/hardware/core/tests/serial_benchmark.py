@@ -0,0 +1,80 @@
+"""
+    round trip benchmark for SerialCommunicator
+
+    a thread answers on the master side of a pseudo terminal like a simple instrument. asks are made through the
+    slave side with the old polling read loop (25 ms read delay, 10 ms polls) and with event driven reads
+
+    usage: python serial_benchmark.py [n]
+"""
+from __future__ import print_function
+
+import os
+import pty
+import sys
+import threading
+import tty
+
+import serial
+
+from pychron.hardware.core.communicators.serial_communicator import SerialCommunicator
+
+
+def device(fd, stop, reply_delay=0.002):
+    """
+        answer every \\r terminated command with ``<command> OK\\r\\n`` after ``reply_delay`` seconds
+    """
+    import select
+    import time
+
+    buf = b''
+    while not stop.is_set():
+        r, _, _ = select.select([fd], [], [], 0.1)
+        if not r:
+            continue
+
+        buf += os.read(fd, 1024)
+        while b'\r' in buf:
+            cmd, buf = buf.split(b'\r', 1)
+            time.sleep(reply_delay)
+            os.write(fd, cmd + b' OK\r\n')
+
+
+def make_communicator(name, event_reads):
+    c = SerialCommunicator(name='benchmark')
+    c.handle = serial.Serial(name, timeout=1)
+    c.simulation = False
+    c.write_terminator = b'\r'
+    c.read_terminator = b'\r\n'
+    c.event_reads = event_reads
+    return c
+
+
+def benchmark(n=200):
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+
+    stop = threading.Event()
+    t = threading.Thread(target=device, args=(master, stop))
+    t.daemon = True
+    t.start()
+
+    try:
+        for label, event_reads in (('polling', False), ('event', True)):
+            c = make_communicator(name, event_reads)
+            for i in range(n):
+                r = c.ask('READ{}'.format(i), verbose=False)
+                assert r == 'READ{} OK'.format(i), r
+
+            print('{:<8s} {}'.format(label, c.latency))
+            c.close()
+    finally:
+        stop.set()
+        t.join()
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == '__main__':
+    benchmark(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,128 @@
+import os
+import pty
+import threading
+import time
+import tty
+import unittest
+
+import serial
+
+from pychron.hardware.core.communicators.latency import LatencyHistogram
+from pychron.hardware.core.communicators.serial_communicator import SerialCommunicator
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+    def test_add(self):
+        h = LatencyHistogram()
+        for ms in (0.5, 1.5, 1.7, 30, 2000):
+            h.add(ms / 1000.)
+        h.add(1, timeout=True)
+
+        self.assertEqual(h.n, 6)
+        self.assertEqual(h.ntimeouts, 1)
+        self.assertListEqual(h.counts, [1, 2, 0, 0, 0, 1, 0, 0, 0, 1, 1])
+        self.assertAlmostEqual(h.max, 2000)
+        self.assertEqual(h.percentile(50), 2)
+        self.assertEqual(h.to_dict()['bins']['>1000ms'], 1)
+
+    def test_empty(self):
+        h = LatencyHistogram()
+        self.assertEqual(h.mean, 0)
+        self.assertEqual(h.percentile(95), 0)
+        str(h)
+
+
+class SerialCommunicatorTestCase(unittest.TestCase):
+    """
+        the master side of a pseudo terminal plays the device
+    """
+
+    def setUp(self):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+
+        c = SerialCommunicator(name='test')
+        c.handle = serial.Serial(os.ttyname(self.slave), timeout=1)
+        c.simulation = False
+        c.write_terminator = b'\r'
+        c.read_terminator = b'\r\n'
+        self.comm = c
+
+    def tearDown(self):
+        self.comm.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def _reply(self, *chunks, **kw):
+        delay = kw.get('delay', 0.05)
+
+        def func():
+            os.read(self.master, 1024)
+            for c in chunks:
+                time.sleep(delay)
+                os.write(self.master, c)
+
+        t = threading.Thread(target=func)
+        t.start()
+        return t
+
+    def test_terminator(self):
+        t = self._reply(b'1.23', b'4E-5\r\n')
+        st = time.time()
+        r = self.comm.ask('READ', verbose=False)
+        et = time.time() - st
+        t.join()
+
+        self.assertEqual(r, '1.234E-5')
+        # answered as soon as the terminator arrived, not after a polling period
+        self.assertLess(et, 0.5)
+        self.assertEqual(self.comm.latency.n, 1)
+        self.assertEqual(self.comm.latency.ntimeouts, 0)
+
+    def test_nchars(self):
+        t = self._reply(b'AB', b'CDEF')
+        r = self.comm.ask('READ', nchars=5, verbose=False)
+        t.join()
+        self.assertEqual(r, 'ABCDE')
+
+    def test_timeout(self):
+        st = time.time()
+        t = self._reply(delay=0)
+        self.comm.ask('READ', verbose=False)
+        t.join()
+        self.assertGreater(time.time() - st, 0.9)
+        self.assertEqual(self.comm.latency.ntimeouts, 1)
+
+    def test_polling(self):
+        self.comm.event_reads = False
+        t = self._reply(b'OK\r\n', delay=0)
+        r = self.comm.ask('READ', verbose=False)
+        t.join()
+        self.assertEqual(r, 'OK')
+
+    def test_pushback(self):
+        self.comm._pushback = b'AB'
+        t = self._reply(b'C\r\n', delay=0)
+        r = self.comm.ask('READ', verbose=False)
+        t.join()
+        self.assertEqual(r, 'ABC')
+
+    def test_split_terminator(self):
+        self.comm.read_terminator = None
+        t = self._reply(b'OK\r', b'\n', delay=0.005)
+        r = self.comm.ask('READ', verbose=False)
+        t.join()
+        self.assertEqual(r, 'OK')
+        # the \n was read with the reply and is not left for the next one
+        self.assertEqual(self.comm._pushback, b'')
+        self.assertEqual(self.comm.handle.inWaiting(), 0)
+
+        t = self._reply(b'NEXT\r\n', delay=0)
+        r = self.comm.ask('READ', remove_eol=False, verbose=False)
+        t.join()
+        self.assertEqual(r, b'NEXT\r\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
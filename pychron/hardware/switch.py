@@ -139,20 +139,39 @@ class Switch(BaseSwitch):
 
         return result
 
-    def get_hardware_indicator_state(self, verbose=True):
-        msg = 'Get hardware indicator state err'
+    def get_indicator_device(self):
+        """
+            return the device and address used to query the indicator state
+        """
+        if self.state_device is not None:
+            return self.state_device, self.state_address
+        return self.actuator, self.address
 
-        result = self._state_call('get_indicator_state', 'closed', verbose)
+    def convert_indicator_state(self, result):
+        """
+            convert a raw indicator response to a state. returns None if the response is invalid
+        """
         s = result
         if not isinstance(result, bool):
-            self.debug('{}: {}'.format(msg, result))
+            self.debug('Get hardware indicator state err: {}'.format(result))
             s = None
-        else:
-            if self.state_invert:
-                s = not s
+        elif self.state_invert:
+            s = not s
 
         if s is None and globalv.communication_simulation:
             s = self.state
+        return s
+
+    def get_indicator_response(self, verbose=True):
+        """
+            return the raw indicator response without updating ``state``
+        """
+        return self._state_call('get_indicator_state', 'closed', verbose)
+
+    def get_hardware_indicator_state(self, verbose=True):
+        result = self.get_indicator_response(verbose)
+        s = self.convert_indicator_state(result)
+        if s is not None and not isinstance(result, bool):
             result = s
 
         self.set_state(s)
@@ -28,6 +28,7 @@ from pychron.core.helpers.strtools import to_bool
 from pychron.envisage.tasks.base_task_plugin import BaseTaskPlugin
 from pychron.envisage.view_util import open_view
 from pychron.hardware.core.i_core_device import ICoreDevice
+from pychron.hardware.core.polling_engine import get_polling_engine
 from pychron.hardware.flag_manager import FlagManager
 from pychron.hardware.tasks.hardware_preferences import HardwarePreferencesPane
 from pychron.hardware.tasks.hardware_task import HardwareTask
@@ -148,6 +149,8 @@ class HardwarePlugin(BaseTaskPlugin):
             if s.is_scanable:
                 s.stop_scan()
 
+        get_polling_engine().stop()
+
     def _factory(self):
         task = HardwareTask(application=self.application)
         return task
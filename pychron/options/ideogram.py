@@ -47,6 +47,7 @@ class IdeogramOptions(AgeOptions):
     # refresh_asymptotic_button = Button
     index_attrs = Dict(transient=True)
     probability_curve_kind = Enum('cumulative', 'kernel')
+    use_adaptive_grid = Bool(False)
     mean_calculation_kind = Enum('weighted mean', 'kernel')
     use_centered_range = Bool
     use_static_limits = Bool
@@ -117,6 +117,10 @@ class CalculationSubOptions(SubOptions):
             Item('probability_curve_kind',
                  width=-150,
                  label='Probability Curve Method'),
+            Item('use_adaptive_grid',
+                 label='Adaptive Grid',
+                 tooltip='Concentrate the points of the cumulative probability curve around the peaks',
+                 enabled_when='probability_curve_kind=="cumulative"'),
             Item('mean_calculation_kind',
                  width=-150,
                  label='Mean Calculation Method'),
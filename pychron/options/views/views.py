@@ -35,7 +35,10 @@ class SubviewAdapter(TabularAdapter):
         return self.item
 
 
-def view(title):
+def view(title, node_grp=None):
+    """
+        node_grp: optional group of the node's own options. items are prefixed with ``node.``
+    """
     agrp = HGroup(Item('selected', show_label=False,
                        editor=EnumEditor(name='names'),
                        tooltip='List of available plot options'),
@@ -65,7 +68,11 @@ def view(title):
                  style='custom')
     bgrp = HGroup(sgrp, ogrp)
 
-    v = okcancel_view(VGroup(agrp, bgrp),
+    grps = (agrp, bgrp)
+    if node_grp is not None:
+        grps += (node_grp,)
+
+    v = okcancel_view(VGroup(*grps),
                       width=800,
                       height=750,
                       resizable=True,
@@ -0,0 +1,184 @@
+# ===============================================================================
+# Copyright 2026 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+# ============= enthought library imports =======================
+from traits.api import HasTraits
+
+# ============= standard library imports ========================
+from datetime import date
+
+import six
+
+# ============= local library imports  ==========================
+KEY_TYPES = six.string_types + six.integer_types + (float, bool, type(None), date, bytes)
+
+# attributes nodes set on analyses in place. a cached node replays the changes it made to these
+REPLAY_ATTRS = ('temp_status', 'group_id', 'graph_id', 'tab_id', 'aux_id', 'subgroup')
+
+# attributes identifying the analyses a node works on
+IDENTITY_ATTRS = ('uuid', 'tag')
+
+# everything a figure depends on
+DISPLAY_ATTRS = IDENTITY_ATTRS + REPLAY_ATTRS
+
+
+def freeze(v, seen=None):
+    """
+        convert ``v`` to a hashable value that compares equal when ``v`` is unchanged. HasTraits objects, e.g.
+        plotter options, are frozen by their persisted traits. objects that can not be compared by value are
+        frozen by identity
+    """
+    if isinstance(v, KEY_TYPES):
+        return v
+
+    if seen is None:
+        seen = set()
+
+    oid = id(v)
+    if oid in seen:
+        return 'cycle', oid
+
+    seen.add(oid)
+    try:
+        if isinstance(v, (list, tuple)):
+            return tuple(freeze(vi, seen) for vi in v)
+        elif isinstance(v, (set, frozenset)):
+            return frozenset(freeze(vi, seen) for vi in v)
+        elif isinstance(v, dict):
+            return tuple(sorted(((six.text_type(k), freeze(vi, seen)) for k, vi in v.items()),
+                                key=lambda x: x[0]))
+        elif isinstance(v, HasTraits):
+            state = v.__getstate__()
+            return (v.__class__.__name__,) + tuple((k, freeze(state[k], seen))
+                                                    for k in sorted(state) if not k.startswith('__'))
+        elif hasattr(v, 'rgba'):
+            # QColor
+            return 'color', v.rgba()
+    finally:
+        seen.discard(oid)
+
+    return v.__class__.__name__, oid
+
+
+def analyses_key(ans, attrs=IDENTITY_ATTRS):
+    """
+        key for a list of analyses. includes the identity of each analysis so reloaded analyses do not match
+        analyses modified in place by an earlier run
+    """
+    return tuple((id(a),) + tuple(freeze(getattr(a, k, None)) for k in attrs) for a in ans or ())
+
+
+def options_key(obj):
+    return freeze(obj)
+
+
+def _copy(v):
+    if isinstance(v, list):
+        v = list(v)
+    elif isinstance(v, set):
+        v = set(v)
+    elif isinstance(v, dict):
+        v = dict(v)
+    return v
+
+
+def _analyses(state):
+    return list(state.unknowns) + list(state.references)
+
+
+def get_replay_values(state):
+    """
+        analysis attributes a node may change in place, taken before the node runs
+    """
+    return {id(a): (a, tuple(getattr(a, k, None) for k in REPLAY_ATTRS)) for a in _analyses(state)}
+
+
+class CacheEntry(object):
+    def __init__(self, upstream, key, state, changes, runtime):
+        self.upstream = upstream
+        self.key = key
+        self.state = state
+        self.changes = changes
+        self.runtime = runtime
+
+
+class NodeCache(object):
+    """
+        outputs of the nodes of a pipeline from the last run.
+
+        an entry holds a shallow copy of the engine state after the node ran and the analysis attributes the node
+        changed. an entry is used when the node's inputs, see ``BaseNode.cache_inputs``, and the enabled nodes
+        upstream of it are unchanged and no node upstream had to run
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, node):
+        return node in self._entries
+
+    def get(self, node, upstream, key):
+        entry = self._entries.get(node)
+        if entry is not None and entry.upstream == upstream and entry.key == key:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+
+    def put(self, node, upstream, key, state, before, runtime):
+        """
+            :param before: analysis attributes before the node ran, see ``get_replay_values``
+        """
+        changes = []
+        for a in _analyses(state):
+            prev = before.get(id(a))
+            # analyses added by the node are not replayed, only changes it made to existing analyses
+            if prev is not None:
+                cur = tuple(getattr(a, k, None) for k in REPLAY_ATTRS)
+                d = {k: c for k, c, p in zip(REPLAY_ATTRS, cur, prev[1]) if c != p}
+                if d:
+                    changes.append((a, d))
+
+        snapshot = {k: _copy(v) for k, v in state.__dict__.items() if not k.startswith('_')}
+        self._entries[node] = CacheEntry(upstream, key, snapshot, changes, runtime)
+
+    def restore(self, entry, state):
+        for k, v in entry.state.items():
+            setattr(state, k, _copy(v))
+
+        for a, d in entry.changes:
+            for k, v in d.items():
+                setattr(a, k, v)
+
+    def invalidate(self, node):
+        self._entries.pop(node, None)
+
+    def prune(self, nodes):
+        """
+            remove entries for nodes not in ``nodes``
+        """
+        nodes = set(nodes)
+        for n in [n for n in self._entries if n not in nodes]:
+            del self._entries[n]
+
+    def clear(self):
+        self._entries.clear()
+
+# ============= EOF =============================================
@@ -34,6 +34,7 @@ from pychron.envisage.view_util import open_view
 from pychron.globals import globalv
 from pychron.loggable import Loggable
 from pychron.paths import paths
+from pychron.pipeline.cache import NodeCache, get_replay_values
 from pychron.pipeline.grouping import group_analyses_by_key
 from pychron.pipeline.nodes import FindReferencesNode, AuditNode
 from pychron.pipeline.nodes import PushNode
@@ -80,6 +81,7 @@ class NodeGroup(BaseNode):
     nodes = List
     name = Str
     skip_configure = True
+    cacheable = True
 
     def add_node(self, node):
         self.nodes.append(node)
@@ -96,6 +98,7 @@ class Pipeline(HasTraits):
     name = Str('Pipeline 1')
     nodes = List
     active = Bool(False)
+    node_cache = Instance(NodeCache, ())
 
     def resume(self, state):
         start_node = state.veto
@@ -126,6 +129,19 @@ class Pipeline(HasTraits):
 
             ni.reset()
         self.active = False
+        self.node_cache.clear()
+
+    def get_upstream(self):
+        """
+            map of each node to the enabled nodes preceding it
+        """
+        ups = {}
+        prev = ()
+        for n in self.iternodes():
+            ups[n] = prev
+            if n.enabled:
+                prev += (n,)
+        return ups
 
     def get_experiment_ids(self):
         ps = set()
@@ -181,6 +197,10 @@ class Pipeline(HasTraits):
             except IndexError:
                 return []
 
+    @on_trait_change('nodes[]')
+    def _prune_node_cache(self):
+        self.node_cache.prune(self.iternodes())
+
 
 class PipelineGroup(HasTraits):
     pipelines = List
@@ -248,11 +268,13 @@ class PipelineEngine(Loggable):
 
     pipeline_template_root = Instance(PipelineTemplateRoot)
     use_arar_calculations = Bool
+    use_node_cache = Bool(True)
 
     def __init__(self, *args, **kw):
         super(PipelineEngine, self).__init__(*args, **kw)
         self._confirmation_cache = {}
         bind_preference(self, 'use_arar_calculations', 'pychron.pipeline.use_arar_calculations')
+        bind_preference(self, 'use_node_cache', 'pychron.pipeline.use_node_cache')
 
     def drop_factory(self, items):
         return self.dvc.make_analyses(items)
@@ -650,6 +672,8 @@ class PipelineEngine(Loggable):
         state.canceled = False
 
         ost = time.time()
+        dirty = False
+        upstream = self.pipeline.get_upstream()
         for idx, node in enumerate(self.pipeline.iternodes(None)):
             if node.enabled:
                 with ActiveCTX(node):
@@ -658,16 +682,12 @@ class PipelineEngine(Loggable):
                         self.debug('Pre run failed {}'.format(node))
                         return True
 
-                    st = time.time()
                     try:
-                        node.run(state)
-                        node.visited = True
-                        self.selected = node
+                        dirty = self._run_node(self.pipeline, idx, node, state, upstream[node], dirty)
                     except NoAnalysesError:
                         self.information_dialog('No Analyses in Pipeline!')
                         self.pipeline.reset()
                         return True
-                    self.debug('{:02n}: {} Runtime: {:0.4f}'.format(idx, node, time.time() - st))
 
                     if state.veto:
                         self.debug('pipeline vetoed by {}'.format(node))
@@ -715,11 +735,14 @@ class PipelineEngine(Loggable):
 
         for idx, node in enumerate(pipeline.iternodes(start_node)):
             node.visited = False
+            node.cache_hit = False
             node.index = idx
 
         if globalv.skip_configure:
             configure = False
 
+        dirty = False
+        upstream = pipeline.get_upstream()
         for idx, node in enumerate(pipeline.iternodes(start_node)):
 
             if node.enabled:
@@ -730,17 +753,13 @@ class PipelineEngine(Loggable):
                         self.debug('Pre run failed {}'.format(node))
                         return True
 
-                    st = time.time()
                     try:
-                        node.run(state)
-                        node.visited = True
-                        self.selected = node
+                        dirty = self._run_node(pipeline, idx, node, state, upstream[node], dirty)
                         # self.update_detectors()
                     except NoAnalysesError:
                         self.information_dialog('No Analyses in Pipeline!')
                         pipeline.reset()
                         return True
-                    self.debug('{:02n}: {} Runtime: {:0.4f}'.format(idx, node, time.time() - st))
 
                     if state.veto:
                         if state.veto_message:
@@ -765,6 +784,40 @@ class PipelineEngine(Loggable):
 
     run = run_pipeline
 
+    def _run_node(self, pipeline, idx, node, state, upstream, dirty):
+        """
+            run ``node`` or, if its inputs are unchanged and no node upstream of it ran, restore its output from the
+            last run. returns True if the node ran, i.e. the nodes downstream of it are dirty
+        """
+        cache = pipeline.node_cache
+        key = node.cache_inputs(state) if self.use_node_cache else None
+        if key is not None and not dirty:
+            entry = cache.get(node, upstream, key)
+            if entry is not None:
+                cache.restore(entry, state)
+                node.runtime = entry.runtime
+                node.cache_hit = True
+                node.visited = True
+                self.selected = node
+                self.debug('{:02n}: {} Cached'.format(idx, node))
+                return False
+
+        before = get_replay_values(state) if key is not None else None
+
+        node.cache_hit = False
+        st = time.time()
+        node.run(state)
+        node.runtime = rt = time.time() - st
+        node.visited = True
+        self.selected = node
+        self.debug('{:02n}: {} Runtime: {:0.4f}'.format(idx, node, rt))
+
+        if key is None or state.veto or state.canceled:
+            cache.invalidate(node)
+        else:
+            cache.put(node, upstream, key, state, before, rt)
+        return True
+
     def post_run(self, state):
         self.debug('pipeline post run started')
         for idx, node in enumerate(self.pipeline.nodes):
@@ -17,12 +17,13 @@
 # ============= enthought library imports =======================
 from __future__ import absolute_import
 
-from traits.api import Bool, Any, List, Str
+from traits.api import Bool, Any, List, Str, Float
 
 # ============= standard library imports ========================
 # ============= local library imports  ==========================
 from pychron.column_sorter_mixin import ColumnSorterMixin
 from pychron.core.helpers.traitsui_shortcuts import okcancel_view
+from pychron.pipeline.cache import analyses_key
 
 
 class BaseNode(ColumnSorterMixin):
@@ -49,6 +50,10 @@ class BaseNode(ColumnSorterMixin):
     use_state_unknowns = True
     use_state_references = True
 
+    runtime = Float
+    cache_hit = Bool(False)
+    cacheable = False
+
     def __init__(self, *args, **kw):
         super(BaseNode, self).__init__(*args, **kw)
         self.bind_preferences()
@@ -67,6 +72,8 @@ class BaseNode(ColumnSorterMixin):
         self.visited = False
         self._manual_configured = False
         self.active = False
+        self.cache_hit = False
+        self.runtime = 0
 
     def pre_load(self, nodedict):
         for k, v in nodedict.items():
@@ -116,6 +123,18 @@ class BaseNode(ColumnSorterMixin):
     def run(self, state):
         raise NotImplementedError(self.__class__.__name__)
 
+    def cache_inputs(self, state):
+        """
+            everything the output of ``run`` depends on, called after ``pre_run``. the engine reuses the output of the
+            last run if the inputs are unchanged. return None to always run the node, e.g. if it prompts the user or
+            writes to disk
+        """
+        if self.cacheable:
+            return analyses_key(state.unknowns), analyses_key(state.references), self._cache_inputs()
+
+    def _cache_inputs(self):
+        pass
+
     def post_run(self, engine, state):
         pass
 
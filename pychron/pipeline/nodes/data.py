@@ -28,6 +28,7 @@ from traitsui.api import Item, EnumEditor, CheckListEditor
 from pychron.core.helpers.strtools import to_bool, get_case_insensitive, to_int
 from pychron.core.helpers.traitsui_shortcuts import okcancel_view
 from pychron.globals import globalv
+from pychron.pipeline.cache import analyses_key
 from pychron.pipeline.csv_dataset_factory import CSVDataSetFactory, CSVSpectrumDataSetFactory
 from pychron.pipeline.nodes.base import BaseNode
 from pychron.pychron_constants import ANALYSIS_TYPES
@@ -230,6 +231,7 @@ class CSVSpectrumNode(CSVNode):
 class UnknownNode(DataNode):
     name = 'Unknowns'
     analysis_kind = 'unknowns'
+    cacheable = True
 
     def set_last_n_analyses(self, n):
         db = self.dvc.db
@@ -253,10 +255,14 @@ class UnknownNode(DataNode):
 
         state.projects = {ai.project for ai in state.unknowns if hasattr(ai, 'project')}
 
+    def _cache_inputs(self):
+        return analyses_key(self.unknowns)
+
 
 class ReferenceNode(DataNode):
     name = 'References'
     analysis_kind = 'references'
+    cacheable = True
 
     def pre_run(self, state, configure=True):
         self.unknowns = state.unknowns
@@ -273,6 +279,9 @@ class ReferenceNode(DataNode):
     def run(self, state):
         pass
 
+    def _cache_inputs(self):
+        return analyses_key(self.references)
+
 
 class FluxMonitorsNode(DataNode):
     name = 'Flux Monitors'
@@ -294,6 +303,7 @@ class BaseAutoUnknownNode(UnknownNode):
     engine = None
     single_shot = False
     verbose = Bool
+    cacheable = False
 
     _cached_unknowns = None
     _unks_ids = None
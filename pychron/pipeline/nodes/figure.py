@@ -29,6 +29,7 @@ from pychron.options.options_manager import IdeogramOptionsManager, OptionsContr
     RadialOptionsManager, RegressionSeriesOptionsManager, FluxVisualizationOptionsManager, CompositeOptionsManager, \
     RatioSeriesOptionsManager
 from pychron.options.views.views import view
+from pychron.pipeline.cache import analyses_key, options_key, DISPLAY_ATTRS
 from pychron.pipeline.editors.flux_visualization_editor import FluxVisualizationEditor
 from pychron.pipeline.nodes.base import SortableNode
 from pychron.pipeline.plot.plotter.series import RADIOGENIC_YIELD, PEAK_CENTER, \
@@ -53,6 +54,7 @@ class FigureNode(SortableNode):
     auto_set_items = True
     use_plotting = True
     editors = Dict
+    cacheable = True
 
     def bind_preferences(self):
         bind_preference(self, 'skip_meaning', 'pychron.pipeline.skip_meaning')
@@ -104,6 +106,11 @@ class FigureNode(SortableNode):
                 ei.name = ' '.join(ei.name.split(' ')[:-1])
                 ei.name = '{} {:02n}'.format(ei.name, i + 1)
 
+    def cache_inputs(self, state):
+        if self.cacheable:
+            return (analyses_key(state.unknowns, DISPLAY_ATTRS), analyses_key(state.references, DISPLAY_ATTRS),
+                    options_key(self.plotter_options_manager.selected_options), self.skip_meaning)
+
     def _pre_run_hook(self, state):
         # copy arar options from state if they exist
         arar_calc_options = state.arar_calculation_options
@@ -119,8 +126,12 @@ class FigureNode(SortableNode):
             pom.set_selected(self.editor.plotter_options)
 
         self._configure_hook()
-        info = OptionsController(model=pom).edit_traits(view=self.options_view,
-                                                        kind='livemodal')
+        oc = OptionsController(model=pom)
+
+        # the view may also edit the node's options
+        context = oc.trait_context()
+        context['node'] = self
+        info = oc.edit_traits(view=self.options_view, kind='livemodal', context=context)
         if info.result:
             self.plotter_options = pom.selected_options
             for e in self.editors.values():
@@ -169,6 +180,7 @@ class VerticalFluxNode(FigureNode):
     name = 'Vertical Flux'
     editor_klass = 'pychron.pipeline.plot.editors.vertical_flux_editor,VerticalFluxEditor'
     plotter_options_manager_klass = VerticalFluxOptionsManager
+    cacheable = False
 
     def run(self, state):
         editor = self._editor_factory()
@@ -192,6 +204,7 @@ class FluxVisualizationNode(FigureNode):
     editor_klass = FluxVisualizationEditor
     plotter_options_manager_klass = FluxVisualizationOptionsManager
     no_analyses_warning = False
+    cacheable = False
 
     def _options_view_default(self):
         return view('Flux Options')
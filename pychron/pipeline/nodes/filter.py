@@ -174,6 +174,7 @@ class FilterNode(BaseNode):
     filters = List
     add_filter_button = Button
     remove = Bool(False)
+    cacheable = True
 
     help_str = '''The behavior is filter-in NOT filter-out. Analyses that match the filter are kept'''
 
@@ -248,6 +249,9 @@ class FilterNode(BaseNode):
                 if not filterfunc(a):
                     a.temp_status = 'omit'
 
+    def _cache_inputs(self):
+        return tuple((fi.to_string(), fi.chain_operator) for fi in self.filters), self.remove, self.analysis_kind
+
     def add_filter(self, attr, comp, crit):
         self.filters.append(PipelineFilter(attribute=attr, comparator=comp, criterion=crit))
 
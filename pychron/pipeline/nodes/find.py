@@ -24,6 +24,7 @@ from pychron.core.helpers.iterfuncs import partition, groupby_group_id
 from pychron.core.pychron_traits import BorderHGroup, BorderVGroup
 from pychron.core.ui.check_list_editor import CheckListEditor
 from pychron.pipeline.editors.flux_results_editor import FluxPosition
+from pychron.pipeline.cache import analyses_key
 from pychron.pipeline.graphical_filter import GraphicalFilterModel, GraphicalFilterView
 from pychron.pipeline.nodes.data import DVCNode
 from pychron.pychron_constants import DEFAULT_MONITOR_NAME, NULL_STR, REFERENCE_ANALYSIS_TYPES, BLANKS
@@ -408,6 +409,15 @@ class FindReferencesNode(FindNode):
             compress_groups(state.unknowns)
             compress_groups(state.references)
 
+    def cache_inputs(self, state):
+        # references are found for each group of unknowns
+        if not self.use_browser:
+            return (analyses_key(state.unknowns, ('uuid', 'tag', 'group_id')),
+                    self.threshold, tuple(self.analysis_types), self.load_name,
+                    self.use_extract_device, self.extract_device,
+                    self.use_mass_spectrometer, self.mass_spectrometer,
+                    self.use_graphical_filter)
+
     def _run_browser(self, state):
         is_append, analyses = self.get_browser_analyses()
         if analyses:
@@ -19,6 +19,7 @@ from pyface.confirmation_dialog import confirm
 from pyface.constant import YES
 # ============= enthought library imports =======================
 from traits.api import Bool, List
+from traitsui.api import HGroup, Item
 
 from pychron.core.helpers.iterfuncs import groupby_group_id
 from pychron.core.progress import progress_loader
@@ -33,6 +34,7 @@ from pychron.pipeline.nodes.figure import FigureNode
 from pychron.pipeline.results.define_equilibration import DefineEquilibrationResult
 from pychron.pipeline.results.iso_evo import IsoEvoResult
 from pychron.pipeline.state import get_detector_set
+from pychron.processing.isotope_group import batch_fit_measurements
 from pychron.pychron_constants import NULL_STR
 
 
@@ -44,6 +46,7 @@ class FitNode(FigureNode):
     use_save_node = Bool(True)
     _fits = List
     _keys = List
+    cacheable = False
 
     # has_save_node = False
     def _set_additional_options(self, state):
@@ -79,6 +82,7 @@ class FitNode(FigureNode):
 class FitReferencesNode(FitNode):
     basename = None
     auto_set_items = False
+    cacheable = True
 
     def run(self, state):
         po = self.plotter_options
@@ -232,6 +236,8 @@ class FitIsotopeEvolutionNode(FitNode):
     plotter_options_manager_klass = IsotopeEvolutionOptionsManager
     name = 'Fit IsoEvo'
     use_plotting = False
+    use_batch_regression = Bool(False)
+    cacheable = True
     _refit_message = 'The selected Isotope Evolutions have already been fit. Would you like to skip refitting?'
 
     def _check_refit(self, analysis):
@@ -249,7 +255,17 @@ class FitIsotopeEvolutionNode(FitNode):
                 return True
 
     def _options_view_default(self):
-        return view('Iso Evo Options')
+        return view('Iso Evo Options',
+                    node_grp=HGroup(Item('node.use_batch_regression', label='Batch Regression',
+                                         tooltip='Fit the isotopes of all the analyses with one regression')))
+
+    def _to_template(self, d):
+        d['use_batch_regression'] = self.use_batch_regression
+
+    def cache_inputs(self, state):
+        key = super(FitIsotopeEvolutionNode, self).cache_inputs(state)
+        if key is not None:
+            return key + (self.use_batch_regression,)
 
     def _configure_hook(self):
         pom = self.plotter_options_manager
@@ -280,6 +296,11 @@ class FitIsotopeEvolutionNode(FitNode):
             if self.check_refit(unks):
                 return
 
+            progress_loader(unks, self._load_raw_data, threshold=1, step=10)
+            if self.use_batch_regression:
+                # one regression for all the analyses
+                batch_fit_measurements(unks, self._keys)
+
             fs = progress_loader(unks, self._assemble_result, threshold=1, step=10)
 
             if self.editor:
@@ -291,14 +312,15 @@ class FitIsotopeEvolutionNode(FitNode):
                 # e.plotter_options = po
                 state.editors.append(e)
 
-    def _assemble_result(self, xi, prog, i, n):
+    def _load_raw_data(self, xi, prog, i, n):
         if prog:
             prog.change_message('Load raw data {}'.format(xi.record_id))
 
-        fits = self._fits
         xi.load_raw_data(self._keys)
+        xi.set_fits(self._fits)
 
-        xi.set_fits(fits)
+    def _assemble_result(self, xi, prog, i, n):
+        fits = self._fits
         isotopes = xi.isotopes
         for f in fits:
             k = f.name
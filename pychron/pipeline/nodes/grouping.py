@@ -41,6 +41,7 @@ class GroupingNode(BaseNode):
     analysis_kind = 'unknowns'
     name = 'Grouping'
     title = 'Edit Grouping'
+    cacheable = True
 
     attribute = Enum('Group', 'Graph', 'Tab', 'Aux')
     # _attr = 'group_id'
@@ -98,6 +99,9 @@ class GroupingNode(BaseNode):
     def _clear_grouping(self, unk):
         setattr(unk, self._attr, 0)
 
+    def _cache_inputs(self):
+        return self.by_key, self._attr
+
     @property
     def _attr(self):
         return '{}_id'.format(self.attribute.lower())
@@ -137,6 +141,8 @@ class SubGroupingNode(GroupingNode, Preferred):
 
     _sorting_enabled = False
     _parent_group = 'group_id'
+    # subgrouping sets the preferred values of the analyses
+    cacheable = False
 
     def load(self, nodedict):
         self.by_key = nodedict.get('key', 'Aliquot')
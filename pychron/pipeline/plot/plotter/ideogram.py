@@ -548,7 +548,8 @@ class Ideogram(BaseArArFigure):
             plot.overlays.append(o)
 
             def cfunc(x1, x2):
-                return cumulative_probability(self.xs, self.xes, x1, x2, n=N)
+                return cumulative_probability(self.xs, self.xes, x1, x2, n=N,
+                                              adaptive=self.options.use_adaptive_grid)
 
             xs, ys, xmi, xma = self._calculate_asymptotic_limits(cfunc,
                                                                  tol=self.options.asymptotic_height_percent)
@@ -860,7 +861,7 @@ class Ideogram(BaseArArFigure):
         else:
             if opt.use_asymptotic_limits and calculate_limits:
                 def cfunc(x1, x2):
-                    return cumulative_probability(ages, errors, x1, x2, n=N)
+                    return cumulative_probability(ages, errors, x1, x2, n=N, adaptive=opt.use_adaptive_grid)
 
                 bins, probs, x1, x2 = self._calculate_asymptotic_limits(cfunc,
                                                                         tol=(opt.asymptotic_height_percent or 10))
@@ -868,7 +869,7 @@ class Ideogram(BaseArArFigure):
 
                 return bins, probs
             else:
-                return cumulative_probability(ages, errors, xmi, xma, n=N)
+                return cumulative_probability(ages, errors, xmi, xma, n=N, adaptive=opt.use_adaptive_grid)
 
     def _calculate_nominal_xlimits(self):
         return self.min_x(self.options.index_attr), self.max_x(self.options.index_attr)
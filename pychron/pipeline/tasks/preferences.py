@@ -30,6 +30,7 @@ class PipelinePreferences(BasePreferencesHelper):
     preferences_path = 'pychron.pipeline'
     skip_meaning = Str
     use_arar_calculations = Bool
+    use_node_cache = Bool(True)
 
     _skip_meaning = List
     _initialized = False
@@ -59,7 +60,11 @@ class PipelinePreferencesPane(PreferencesPane):
                                                                     'Spectrum', 'Series', 'Isochron'])),
                                label='Skip Tag Associations')
         calcgrp = BorderVGroup(Item('use_arar_calculations', label='ArAr Calculations Node'))
-        v = View(VGroup(skipgrp, calcgrp))
+        cachegrp = BorderVGroup(Item('use_node_cache', label='Cache Node Outputs',
+                                     tooltip='Reuse the output of nodes whose inputs have not changed since the '
+                                             'last run instead of running them again'),
+                                label='Execution')
+        v = View(VGroup(skipgrp, calcgrp, cachegrp))
         return v
 
 # ============= EOF =============================================
@@ -37,6 +37,15 @@ class PipelineTreeNode(TreeNode):
     icon_name = ''
     label = 'name'
 
+    def get_label(self, obj):
+        label = super(PipelineTreeNode, self).get_label(obj)
+        if not isinstance(obj, Pipeline) and obj.visited:
+            if obj.cache_hit:
+                label = '{} (cached)'.format(label)
+            elif obj.runtime:
+                label = '{} ({:0.2f}s)'.format(label, obj.runtime)
+        return label
+
     def get_background(self, obj):
         if isinstance(obj, Pipeline):
             c = QColor(Qt.white)
@@ -61,7 +70,7 @@ class PipelineTreeNode(TreeNode):
             if not obj.enabled:
                 c = QColor('lightblue')
             elif obj.visited:
-                c = QColor(Qt.green)
+                c = QColor('#40c0a0') if obj.cache_hit else QColor(Qt.green)
             elif obj.active:
                 c = QColor('orange')
 
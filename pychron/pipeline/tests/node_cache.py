@@ -0,0 +1,121 @@
+import unittest
+
+from traits.api import HasTraits, Float, List, Str, Any
+
+from pychron.pipeline.cache import NodeCache, analyses_key, options_key, get_replay_values, DISPLAY_ATTRS
+from pychron.pipeline.state import EngineState
+
+
+class Analysis(object):
+    tag = 'ok'
+    temp_status = 'ok'
+    group_id = 0
+    graph_id = 0
+    tab_id = 0
+    aux_id = 0
+    subgroup = None
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+
+class AuxPlot(HasTraits):
+    name = Str
+    fit = Str('linear')
+
+
+class Options(HasTraits):
+    nsigma = Float(2)
+    aux_plots = List
+    calculated_ymax = Any(transient=True)
+
+
+class NodeCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = NodeCache()
+        self.node = object()
+        self.unknowns = [Analysis('a'), Analysis('b')]
+
+    def _run(self, key=('by_key',), upstream=()):
+        state = EngineState(unknowns=list(self.unknowns))
+        before = get_replay_values(state)
+
+        # a grouping node
+        for i, a in enumerate(state.unknowns):
+            a.group_id = i + 1
+        state.editors.append('editor')
+
+        self.cache.put(self.node, upstream, key, state, before, 0.5)
+        return state
+
+    def test_hit(self):
+        self._run()
+        state = EngineState(unknowns=list(self.unknowns))
+        entry = self.cache.get(self.node, (), ('by_key',))
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.runtime, 0.5)
+
+        self.cache.restore(entry, state)
+        self.assertListEqual(state.editors, ['editor'])
+
+        # the restored state is a copy
+        state.editors.append('other')
+        self.assertListEqual(entry.state['editors'], ['editor'])
+
+    def test_replay(self):
+        self._run()
+        self.unknowns[1].group_id = 5
+        self.unknowns[1].temp_status = 'omit'
+
+        entry = self.cache.get(self.node, (), ('by_key',))
+        self.cache.restore(entry, EngineState())
+
+        # changes made by the node are replayed, other changes are kept
+        self.assertEqual(self.unknowns[1].group_id, 2)
+        self.assertEqual(self.unknowns[1].temp_status, 'omit')
+
+    def test_miss(self):
+        self._run(upstream=('unknowns',))
+        self.assertIsNone(self.cache.get(self.node, ('unknowns',), ('other',)))
+        self.assertIsNone(self.cache.get(self.node, (), ('by_key',)))
+        self.assertIsNotNone(self.cache.get(self.node, ('unknowns',), ('by_key',)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_prune(self):
+        self._run()
+        self.assertIn(self.node, self.cache)
+        self.cache.prune([object()])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_analyses_key(self):
+        a = self.unknowns
+        k = analyses_key(a)
+        dk = analyses_key(a, DISPLAY_ATTRS)
+        self.assertEqual(k, analyses_key(list(a)))
+
+        # reloaded analyses are not the same analyses
+        self.assertNotEqual(k, analyses_key([Analysis('a'), Analysis('b')]))
+
+        a[0].group_id = 3
+        self.assertEqual(k, analyses_key(a))
+        self.assertNotEqual(dk, analyses_key(a, DISPLAY_ATTRS))
+
+        a[0].tag = 'invalid'
+        self.assertNotEqual(k, analyses_key(a))
+
+    def test_options_key(self):
+        opt = Options(aux_plots=[AuxPlot(name='Ar40')])
+        k = options_key(opt)
+
+        opt.calculated_ymax = 10
+        self.assertEqual(k, options_key(opt))
+
+        opt.aux_plots[0].fit = 'parabolic'
+        self.assertNotEqual(k, options_key(opt))
+
+        opt.aux_plots.append(opt)
+        self.assertIsNotNone(options_key(opt))
+
+
+if __name__ == '__main__':
+    unittest.main()
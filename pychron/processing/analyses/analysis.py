@@ -592,6 +592,10 @@ class Analysis(ArArAge, IdeogramPlotable):
         self._sync_view(**kw)
 
     def _sync_view(self, av=None, **kw):
+        if self._batch_age:
+            # error components are not available for batch calculated ages
+            self.calculate_age(force=True)
+
         if av is None:
             av = self.analysis_view
         try:
@@ -21,16 +21,18 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
+from collections import defaultdict
 from copy import copy
 from operator import itemgetter, attrgetter
 
+from numpy import zeros, where as npwhere
 from uncertainties import ufloat, std_dev, nominal_value
 
 from pychron.core.helpers.isotope_utils import sort_detectors
 from pychron.core.helpers.iterfuncs import groupby_key
 from pychron.processing.arar_constants import ArArConstants
 from pychron.processing.argon_calculations import calculate_f, abundance_sensitivity_correction, age_equation, \
-    calculate_flux, calculate_arar_decay_factors
+    calculate_flux, calculate_arar_decay_factors, calculate_f_batch, age_equation_batch, BATCH_PRODUCTION_KEYS
 from pychron.processing.isotope import Blank
 from pychron.processing.isotope_group import IsotopeGroup
 from pychron.pychron_constants import ARGON_KEYS, ARAR_MAPPING
@@ -41,6 +43,158 @@ def value_error(uv):
             'error': float(std_dev(uv))}
 
 
+def _batch_constants_key(arc):
+    return (arc.k3739_mode.lower(), arc.allow_negative_ca_correction, arc.age_units,
+            nominal_value(arc.atm4036), std_dev(arc.atm4036), arc.atm4038_v, arc.lambda_Cl36_v,
+            arc.k3739_v, arc.k3739_e, nominal_value(arc.lambda_k))
+
+
+def calculate_ages(analyses, include_decay_error=False):
+    """
+        calculate F and the ages of many analyses at once with ``calculate_f_batch`` and ``age_equation_batch``.
+
+        analyses are grouped by their ArAr constants. the errors include the correlations between the isotopes,
+        production ratios and constants of each analysis, and the isotope age error components are set. F, ages
+        and the computed values are stored as independent ufloats so other error components are not available
+        until ``calculate_age(force=True)`` is called. ``get_error_component`` and ``Analysis.sync_view`` do this
+        automatically.
+
+        analyses that already have an age are skipped. analyses missing isotopes or J use ``calculate_age``
+    """
+    groups = defaultdict(list)
+    for a in analyses:
+        if a.age:
+            continue
+
+        a.calculate_decay_factors()
+        iso_intensities = a._assemble_isotope_intensities()
+        if not iso_intensities or a.j is None:
+            a.calculate_age()
+            continue
+
+        groups[_batch_constants_key(a.arar_constants)].append((a, iso_intensities))
+
+    for items in groups.values():
+        _calculate_ages(items, include_decay_error)
+
+
+def _batch_error_components(inputs):
+    """
+        inputs: n lists of the BATCH_VARIABLES of each analysis as ufloats or floats
+
+        returns the (n, m, k) error components of the inputs on the k independent variables they depend on, and
+        the tags of the variables of each analysis
+    """
+    cs = []
+    for vs in inputs:
+        c = {}
+        for i, v in enumerate(vs):
+            for var, d in getattr(v, 'derivatives', {}).items():
+                c.setdefault(var, {})[i] = d * var.std_dev
+        cs.append(c)
+
+    comps = zeros((len(inputs), len(inputs[0]), max(len(c) for c in cs) or 1))
+    tags = []
+    for ai, c in enumerate(cs):
+        tags.append([var.tag for var in c])
+        for vi, d in enumerate(c.values()):
+            for i, e in d.items():
+                comps[ai, i, vi] = e
+
+    return comps, tags
+
+
+def _calculate_ages(items, include_decay_error):
+    ans = [a for a, _ in items]
+    n = len(ans)
+    arc = ans[0].arar_constants
+
+    ints = [[nominal_value(v) for v in ii] for _, ii in items]
+    errs = [[std_dev(v) for v in ii] for _, ii in items]
+
+    prs = {}
+    for k in BATCH_PRODUCTION_KEYS:
+        vs = [a.interference_corrections.get(k, 0) for a in ans]
+        prs[k] = ([nominal_value(v) for v in vs], [std_dev(v) for v in vs])
+
+    fixed = [a.fixed_k3739 or 0 for a in ans]
+
+    # the isotopes share variables, e.g. an ic factor, so propagate the full covariance of the inputs
+    inputs = [list(ii) + [a.interference_corrections.get(k, 0) for k in BATCH_PRODUCTION_KEYS] +
+              [arc.atm4036, fk or arc.fixed_k3739]
+              for (a, ii), fk in zip(items, fixed)]
+    comps, tags = _batch_error_components(inputs)
+
+    results = calculate_f_batch(ints, errs, [a.decay_days for a in ans], prs, arc,
+                                fixed_k3739=[nominal_value(v) for v in fixed],
+                                fixed_k3739_err=[std_dev(v) for v in fixed],
+                                error_components=comps)
+
+    f, fe = results['F']
+    _, fe_wo_irrad = results['F_wo_irrad']
+
+    lambda_k = arc.lambda_k
+    lambda_k_err = std_dev(lambda_k) if include_decay_error else 0
+    lambda_k = nominal_value(lambda_k)
+
+    js = [nominal_value(a.j) for a in ans]
+    jes = [std_dev(a.j) for a in ans]
+    pes = [a.position_jerr or 0 for a in ans]
+
+    ages = {}
+    for attr, je in (('uage_w_position_err', pes), ('uage_w_j_err', jes), ('uage', [0] * n)):
+        ages[attr] = age_equation_batch(js, je, f, fe, lambda_k, lambda_k_err, arar_constants=arc)
+
+    # age error components of the isotopes. same as ``get_error_component``, the first variable tagged with the
+    # isotope's name
+    fcs = results['F_error_components']
+    ae = ages['uage_w_j_err'][1]
+    components = {}
+    for k in {iso.name for a in ans for iso in a.itervalues()}:
+        fc = [fcs[i, ts.index(k)] if k in ts else 0 for i, ts in enumerate(tags)]
+        _, v = age_equation_batch(js, [0] * n, f, fc, lambda_k, 0, arar_constants=arc)
+        components[k] = ((v / npwhere(ae > 0, ae, 1)) ** 2) * 100
+
+    def unpack(d, i):
+        return {k: ufloat(v[i], e[i], tag=k) for k, (v, e) in d.items()}
+
+    for i, (a, iso_intensities) in enumerate(items):
+        isotopes = a.isotopes
+        a.Ar39_decay_corrected = iso_intensities[1]
+        a.Ar37_decay_corrected = iso_intensities[3]
+        isotopes[a.arar_mapping['Ar37']].decay_corrected = a.Ar37_decay_corrected
+        isotopes[a.arar_mapping['Ar39']].decay_corrected = a.Ar39_decay_corrected
+        a.corrected_intensities = {k: v for k, v in zip(ARGON_KEYS, iso_intensities)}
+
+        a.uF = ufloat(f[i], fe[i])
+        a.F = f[i]
+        a.F_err = fe[i]
+        a.F_err_wo_irrad = fe_wo_irrad[i]
+
+        a.non_ar_isotopes = unpack(results['non_ar_isotopes'], i)
+        a.computed = computed = unpack(results['computed'], i)
+        a.radiogenic_yield = computed['radiogenic_yield']
+        a.rad40 = computed['rad40']
+        a.total40 = computed['a40']
+        a.k39 = computed['k39']
+
+        for k, v in unpack(results['interference_corrected'], i).items():
+            isotopes[k].interference_corrected_value = v
+
+        for attr, (vs, es) in ages.items():
+            setattr(a, attr, ufloat(vs[i], es[i]))
+
+        a.age = ages['uage'][0][i]
+        a.age_err = a.age_err_wo_j = ages['uage'][1][i]
+
+        for iso in a.itervalues():
+            iso.age_error_component = components[iso.name][i]
+
+        a._calculate_kca()
+        a._calculate_kcl()
+        a._batch_age = True
+
+
 class ArArAge(IsotopeGroup):
     """
     High level representation of the ArAr attributes of an analysis.
@@ -102,6 +256,7 @@ class ArArAge(IsotopeGroup):
     _kca_warning = False
     _kcl_warning = False
     _lambda_k = None
+    _batch_age = False
 
     discrimination = None
     weight = 0  # in milligrams
@@ -204,6 +359,8 @@ class ArArAge(IsotopeGroup):
 
     def get_error_component(self, key, uage=None):
         if uage is None:
+            if self._batch_age:
+                self.calculate_age(force=True)
             uage = self.uage_w_j_err
 
         ae = 0
@@ -345,6 +502,7 @@ class ArArAge(IsotopeGroup):
         """
 
         if not self.age or force:
+            self._batch_age = False
             self.calculate_decay_factors()
 
             self._calculate_age(**kw)
@@ -19,7 +19,8 @@
 # ============= standard library imports ========================
 import math
 
-from numpy import asarray, average, array
+from numpy import asarray, average, array, zeros, ones, ones_like, zeros_like, full, log, errstate, einsum, \
+    where as npwhere
 from uncertainties import ufloat, umath, nominal_value, std_dev
 
 from pychron.core.stats.core import calculate_weighted_mean
@@ -477,6 +478,262 @@ def age_equation(j, f, include_decay_error=False, lambda_k=None, arar_constants=
         return ufloat(0, 0)
 
 
+# ===============================================================================
+# batch
+# ===============================================================================
+BATCH_ISOTOPE_KEYS = ('Ar40', 'Ar39', 'Ar38', 'Ar37', 'Ar36')
+BATCH_PRODUCTION_KEYS = ('K4039', 'K3839', 'K3739', 'Ca3937', 'Ca3837', 'Ca3637', 'Cl3638')
+# variables the F value is linearized against. isotopes, production ratios, trapped 40/36, fixed K37/39
+BATCH_VARIABLES = BATCH_ISOTOPE_KEYS + BATCH_PRODUCTION_KEYS + ('trapped_4036', 'fixed_k3739')
+
+
+class LinearArray(object):
+    """
+        first order error propagation for arrays.
+
+        value is (n,). jac is (n, m), the derivatives with respect to m independent variables. Equivalent to
+        what ``uncertainties`` does for each ufloat but for n values at once
+    """
+    __slots__ = ('value', 'jac')
+
+    def __init__(self, value, jac):
+        self.value = value
+        self.jac = jac
+
+    @classmethod
+    def variable(cls, value, idx, m):
+        value = asarray(value, dtype=float)
+        jac = zeros((value.shape[0], m))
+        jac[:, idx] = 1
+        return cls(value, jac)
+
+    def std_dev(self, sigma):
+        """
+            sigma: (n, m) or (m,) standard deviations of the variables. or (n, m, k) error components of
+            correlated variables, see ``error_components``
+        """
+        return (self.error_components(sigma) ** 2).sum(axis=1) ** 0.5
+
+    def error_components(self, sigma):
+        """
+            sigma: (n, m) or (m,) standard deviations of the variables. returns (n, m)
+
+            or (n, m, k), the derivatives of the variables with respect to k independent variables times their
+            standard deviations. returns (n, k). the sum of squares is J cov J.T with cov = sigma sigma.T
+        """
+        sigma = asarray(sigma, dtype=float)
+        if sigma.ndim == 3:
+            return einsum('nm,nmk->nk', self.jac, sigma)
+        return self.jac * sigma
+
+    def where(self, mask, other):
+        """
+            return a copy using ``other`` where mask is True
+        """
+        other = self._coerce(other)
+        return LinearArray(npwhere(mask, other.value, self.value), npwhere(mask[:, None], other.jac, self.jac))
+
+    def _coerce(self, o):
+        if isinstance(o, LinearArray):
+            return o
+        o = asarray(o, dtype=float)
+        return LinearArray(o * ones_like(self.value), zeros_like(self.jac))
+
+    def __neg__(self):
+        return LinearArray(-self.value, -self.jac)
+
+    def __add__(self, o):
+        o = self._coerce(o)
+        return LinearArray(self.value + o.value, self.jac + o.jac)
+
+    __radd__ = __add__
+
+    def __sub__(self, o):
+        return self + -self._coerce(o)
+
+    def __rsub__(self, o):
+        return self._coerce(o) - self
+
+    def __mul__(self, o):
+        o = self._coerce(o)
+        return LinearArray(self.value * o.value, self.jac * o.value[:, None] + o.jac * self.value[:, None])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, o):
+        o = self._coerce(o)
+        with errstate(divide='ignore', invalid='ignore'):
+            v = self.value / o.value
+            jac = (self.jac - o.jac * v[:, None]) / o.value[:, None]
+        return LinearArray(v, jac)
+
+    def __rtruediv__(self, o):
+        return self._coerce(o) / self
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+
+def _batch_interference_corrections(a39, a37, pr, use_fixed, fixed_k3739, arar_constants):
+    ca3937 = pr['Ca3937']
+
+    # normal
+    k39 = (a39 - ca3937 * a37) / (1 - pr['K3739'] * ca3937)
+    k37 = pr['K3739'] * k39
+    ca37 = a37 - k37
+
+    if use_fixed.any():
+        # apply_fixed_k3739. ca39/ca37=0 or missing is treated as y=1
+        x = fixed_k3739
+        y = (1 / ca3937).where(ca3937.value == 0, 1)
+        fca37 = (a39 * x * y) / (x + y)
+        fk39 = a39 - ca3937 * fca37
+
+        ca37 = ca37.where(use_fixed, fca37)
+        k39 = k39.where(use_fixed, fk39)
+        k37 = k37.where(use_fixed, x * fk39)
+
+    ca39 = ca3937 * ca37
+    k38 = pr['K3839'] * k39
+
+    if not arar_constants.allow_negative_ca_correction:
+        ca37 = ca37.where(ca37.value <= 0, 0)
+
+    ca36 = pr['Ca3637'] * ca37
+    ca38 = pr['Ca3837'] * ca37
+
+    return k37, k38, k39, ca36, ca37, ca38, ca39
+
+
+def calculate_f_batch(intensities, errors, decay_times, production_ratios=None, arar_constants=None,
+                      fixed_k3739=None, fixed_k3739_err=None, error_components=None):
+    """
+        calculate F for n analyses at once. mirrors ``calculate_f``
+
+        intensities, errors: (n, 5) corrected intensities in the order Ar40, Ar39, Ar38, Ar37, Ar36
+        decay_times: (n,) days since irradiation
+        production_ratios: dict of key: ((n,) values, (n,) errors). missing keys are 0
+        fixed_k3739, fixed_k3739_err: (n,) per analysis K37/K39. 0 to use the k3739_mode of arar_constants
+        error_components: (n, m, k) error components of the BATCH_VARIABLES on k independent variables, see
+            ``LinearArray.error_components``. use when the variables are correlated, e.g. isotopes sharing an
+            ic factor. replaces the errors of all the variables
+
+        without error_components the variables are treated as independent. errors are linearized the same as
+        ``uncertainties`` does
+
+        returns a dict with the same pieces as ``calculate_f``. F and F_wo_irrad are (values, errors).
+        non_ar_isotopes, computed and interference_corrected are dicts of key: (values, errors).
+        F_error_components is (n, k), or (n, m) without error_components
+    """
+    if arar_constants is None:
+        arar_constants = ArArConstants()
+    if production_ratios is None:
+        production_ratios = {}
+
+    intensities = asarray(intensities, dtype=float)
+    errors = asarray(errors, dtype=float)
+    n = intensities.shape[0]
+    m = len(BATCH_VARIABLES)
+
+    sigma = zeros((n, m))
+    sigma[:, :5] = errors
+
+    a40, a39, a38, a37, a36 = (LinearArray.variable(intensities[:, i], i, m) for i in range(5))
+
+    pr = {}
+    for i, k in enumerate(BATCH_PRODUCTION_KEYS):
+        idx = 5 + i
+        v, e = production_ratios.get(k, (zeros(n), zeros(n)))
+        pr[k] = LinearArray.variable(v * ones(n), idx, m)
+        sigma[:, idx] = e
+
+    trapped = arar_constants.atm4036
+    trapped_4036 = LinearArray.variable(full(n, nominal_value(trapped)), 12, m)
+    sigma[:, 12] = std_dev(trapped)
+
+    if fixed_k3739 is None:
+        fixed_k3739 = zeros(n)
+    fixed_k3739 = asarray(fixed_k3739, dtype=float)
+    use_fixed = fixed_k3739 != 0
+    if arar_constants.k3739_mode.lower() != 'normal':
+        use_fixed[:] = True
+
+    dk = arar_constants.fixed_k3739
+    x = LinearArray.variable(npwhere(fixed_k3739 != 0, fixed_k3739, nominal_value(dk)), 13, m)
+    if fixed_k3739_err is None:
+        fixed_k3739_err = zeros(n)
+    sigma[:, 13] = npwhere(fixed_k3739 != 0, fixed_k3739_err, std_dev(dk))
+
+    if error_components is not None:
+        sigma = asarray(error_components, dtype=float)
+
+    k37, k38, k39, ca36, ca37, ca38, ca39 = _batch_interference_corrections(a39, a37, pr, use_fixed, x,
+                                                                             arar_constants)
+
+    # calculate_atmospheric
+    m36 = pr['Cl3638'] * nominal_value(arar_constants.lambda_Cl36) * asarray(decay_times, dtype=float)
+    atm3836 = nominal_value(arar_constants.atm3836)
+    atm36 = (a36 - ca36 - m36 * (a38 - k38 - ca38)) / (1 - m36 * atm3836)
+    cl38 = a38 - atm3836 * atm36 - k38 - ca38
+    cl36 = cl38 * m36
+
+    atm40 = atm36 * trapped_4036
+    k40 = k39 * pr['K4039']
+    rad40 = a40 - atm40 - k40
+
+    f = (rad40 / k39).where(k39.value == 0, 1)
+    rp = (rad40 / a40 * 100).where(a40.value == 0, 0)
+
+    sigma_wo_irrad = sigma.copy()
+    sigma_wo_irrad[:, 5:12] = 0
+
+    def ve(v, s=sigma):
+        return v.value, v.std_dev(s)
+
+    non_ar = {'k40': k40, 'ca39': ca39, 'k38': k38, 'ca38': ca38, 'cl38': cl38, 'k37': k37, 'ca37': ca37,
+              'ca36': ca36, 'cl36': cl36}
+    computed = {'rad40': rad40, 'a40': a40, 'radiogenic_yield': rp, 'ca37': ca37, 'ca39': ca39, 'ca36': ca36,
+                'k39': k39, 'atm40': atm40}
+    ifc = {'Ar40': a40 - k40, 'Ar39': k39, 'Ar38': a38, 'Ar37': a37, 'Ar36': atm36}
+
+    return {'F': ve(f), 'F_wo_irrad': ve(f, sigma_wo_irrad), 'F_error_components': f.error_components(sigma),
+            'non_ar_isotopes': {k: ve(v) for k, v in non_ar.items()},
+            'computed': {k: ve(v) for k, v in computed.items()},
+            'interference_corrected': {k: ve(v) for k, v in ifc.items()}}
+
+
+def age_equation_batch(j, j_err, f, f_err, lambda_k, lambda_k_err=0, arar_constants=None):
+    """
+        ages of n analyses. mirrors ``age_equation``.
+
+        j, f and lambda_k are independent so the error is the quadrature sum of their terms.
+        pass lambda_k_err=0 to exclude the decay constant error.
+        ages where 1+jf <= 0 are 0 +/- 0 same as ``age_equation``
+
+        returns ages, errors in the age units of arar_constants
+    """
+    if arar_constants is None:
+        arar_constants = ArArConstants()
+
+    j, j_err, f, f_err = (asarray(v, dtype=float) for v in (j, j_err, f, f_err))
+    lambda_k = asarray(lambda_k, dtype=float)
+
+    x = 1 + j * f
+    valid = x > 0
+    x = npwhere(valid, x, 1)
+
+    age = log(x) / lambda_k
+    dadf = j / (lambda_k * x)
+    dadj = f / (lambda_k * x)
+    dadl = -age / lambda_k
+
+    err = ((dadf * f_err) ** 2 + (dadj * j_err) ** 2 + (dadl * lambda_k_err) ** 2) ** 0.5
+
+    age = npwhere(valid, age, 0)
+    err = npwhere(valid, err, 0)
+    return arar_constants.scale_age(age, current='a'), arar_constants.scale_age(err, current='a')
+
+
 # ===============================================================================
 # non-recursive
 # ===============================================================================
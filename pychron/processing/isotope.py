@@ -21,20 +21,27 @@
 import re
 import struct
 from binascii import hexlify
+from itertools import count
 from math import isnan, isinf
 
 import six
-from numpy import array, Inf, polyfit, gradient, array_split, mean
+from numpy import array, Inf, polyfit, gradient, array_split, mean, ndarray, column_stack, float64
 from uncertainties import ufloat, nominal_value, std_dev
 
 from pychron.core.geometry.geometry import curvature_at
-from pychron.core.helpers.binpack import unpack
+from pychron.core.helpers.binpack import unpack, pack
 from pychron.core.helpers.fits import natural_name_fit, fit_to_degree
+from pychron.core.helpers.growable_array import GrowableArray
+from pychron.core.regression.batch_regressor import is_batchable
 from pychron.core.regression.least_squares_regressor import ExponentialRegressor
 from pychron.core.regression.mean_regressor import MeanRegressor
 from pychron.core.regression.ols_regressor import PolynomialRegressor
 
 
+# never reused, unlike id(). identifies the data of a measurement for cached batch fit results
+_data_ids = count()
+
+
 def fit_abbreviation(fit, ):
     f = ''
     if fit:
@@ -54,6 +61,7 @@ class BaseMeasurement(object):
     detector_serial_id = None
     group_data = 0
     _regressor = None
+    _data_id = None
 
     @property
     def n(self):
@@ -68,15 +76,66 @@ class BaseMeasurement(object):
 
     @property
     def offset_xs(self):
+        if not self.time_zero_offset:
+            return self.xs
         return self.xs - self.time_zero_offset
 
+    @property
+    def xs(self):
+        return self._xs.view
+
+    @xs.setter
+    def xs(self, v):
+        self._xs = GrowableArray(v, dtype=float64)
+        self._data_id = next(_data_ids)
+
+    @property
+    def ys(self):
+        return self._ys.view
+
+    @ys.setter
+    def ys(self, v):
+        self._ys = GrowableArray(v, dtype=float64)
+        self._data_id = next(_data_ids)
+
+    @property
+    def ymin(self):
+        return self._ys.min
+
+    @property
+    def ymax(self):
+        return self._ys.max
+
     def __init__(self, name, detector):
         self.name = name
         self.detector = detector
-        self.xs, self.ys = array([]), array([])
+        self._xs, self._ys = GrowableArray(), GrowableArray()
+        self._data_id = next(_data_ids)
         self.mass = 0
         self.time_zero_offset = 0
 
+    def __setstate__(self, state):
+        # measurements pickled before xs/ys were buffered
+        for k in ('xs', 'ys'):
+            if k in state:
+                state['_{}'.format(k)] = GrowableArray(state.pop(k), dtype=float64)
+
+        # data ids are only unique within a process
+        state.pop('_batch_result', None)
+        state['_data_id'] = next(_data_ids)
+        self.__dict__.update(state)
+
+    def append(self, x, y):
+        self._xs.append(x)
+        self._ys.append(y)
+
+    def reserve(self, n):
+        """
+            preallocate room for n more points. e.g. the number of counts in a measurement
+        """
+        self._xs.reserve(len(self._xs) + n)
+        self._ys.reserve(len(self._ys) + n)
+
     def set_grouping(self, n):
         self.group_data = n
         self._regressor = None
@@ -97,18 +156,24 @@ class BaseMeasurement(object):
         if endianness is None:
             endianness = self.endianness
 
-        fmt = '{}ff'.format(endianness)
-        txt = b''.join((struct.pack(fmt, x, y) for x, y in zip(self.xs, self.ys)))
+        n = min(len(self.xs), len(self.ys))
+        txt = pack('{}ff'.format(endianness), column_stack((self.xs[:n], self.ys[:n])))
         if as_hex:
             txt = hexlify(txt)
         return txt
 
     def unpack_data(self, blob, n_only=False):
-        if not blob:
+        """
+            blob: packed (x,y) pairs or a (n,2) array read from a data sidecar
+        """
+        if blob is None or not len(blob):
             return
 
         try:
-            xs, ys = self._unpack_blob(blob)
+            if isinstance(blob, ndarray):
+                xs, ys = self._unpack_array(blob)
+            else:
+                xs, ys = self._unpack_blob(blob)
         except (ValueError, TypeError, IndexError, AttributeError) as e:
             self.unpack_error = e
             return
@@ -122,12 +187,19 @@ class BaseMeasurement(object):
             # print self.name, self.xs.shape, self.ys.shape
             # print self.name, self.ys
 
+    def _unpack_array(self, a):
+        x, y = a[:, 0], a[:, 1]
+        if self.reverse_unpack:
+            return y, x
+        else:
+            return x, y
+
     def _unpack_blob(self, blob, endianness=None):
         if endianness is None:
             endianness = self.endianness
 
         try:
-            x, y = unpack(blob, fmt='{}ff'.format(endianness))
+            x, y = unpack(blob, fmt='{}ff'.format(endianness), as_array=True)
             # x, y = zip(*[struct.unpack('{}ff'.format(endianness), blob[i:i + 8]) for i in range(0, len(blob), 8)])
             if self.reverse_unpack:
                 return y, x
@@ -185,6 +257,7 @@ class IsotopicMeasurement(BaseMeasurement):
     _ovalue = None
 
     _fn = None
+    _batch_result = None
 
     def __init__(self, *args, **kw):
         super(IsotopicMeasurement, self).__init__(*args, **kw)
@@ -225,8 +298,11 @@ class IsotopicMeasurement(BaseMeasurement):
 
     @property
     def fn(self):
+        r = self._get_batch_result()
         if self._fn is not None:
             n = self._fn
+        elif r is not None:
+            n = r.n
         elif self._regressor:
             n = self._regressor.clean_xs.shape[0]
         else:
@@ -386,7 +462,11 @@ class IsotopicMeasurement(BaseMeasurement):
         #     return self._value
 
         if not self.use_stored_value and not self.user_defined_value and self.xs.shape[0] > 1:
-            v = self.regressor.predict(0)
+            r = self._get_batch_result()
+            if r is not None:
+                v = r.value
+            else:
+                v = self.regressor.predict(0)
 
             if isnan(v) or isinf(v):
                 v = 0
@@ -402,7 +482,11 @@ class IsotopicMeasurement(BaseMeasurement):
         #     return self._error
 
         if not self.use_stored_value and not self.user_defined_error and self.xs.shape[0] > 1:
-            v = self.regressor.predict_error(0)
+            r = self._get_batch_result()
+            if r is not None:
+                v = r.error
+            else:
+                v = self.regressor.predict_error(0)
             if isnan(v) or isinf(v):
                 v = 0
             return v
@@ -503,8 +587,65 @@ class IsotopicMeasurement(BaseMeasurement):
         return self.regressor.calculate_standard_error_fit()
 
     def noutliers(self):
+        r = self._get_batch_result()
+        if r is not None:
+            return r.npoints - r.n
+
         return self.regressor.xs.shape[0] - self.regressor.clean_xs.shape[0]
 
+    def add_batch_fit(self, batch):
+        """
+            add this measurement to a BatchOLSRegressor.
+
+            returns the index of the fit or None if the fit has to be calculated by this measurement's own regressor
+        """
+        fit = self.fit or 'linear'
+        if self.truncate or self.xs.shape[0] < 2:
+            return
+
+        try:
+            degree = fit_to_degree(fit)
+        except ValueError:
+            return
+
+        if not is_batchable(degree, self.error_type, self.filter_outliers_dict):
+            return
+
+        xs, ys = self.get_data()
+        return batch.add(xs, ys, degree,
+                         excluded=self._get_batch_excluded(),
+                         filter_outliers_dict=self.filter_outliers_dict,
+                         error_calc_type=self.error_type)
+
+    def set_batch_result(self, result):
+        """
+            use ``result`` for value and error until the fit, filtering or data change
+        """
+        if result is not None and result.valid:
+            self._batch_result = (self._get_batch_key(), result)
+        else:
+            self._batch_result = None
+
+    def _get_batch_result(self):
+        if self._batch_result is not None:
+            key, result = self._batch_result
+            if key == self._get_batch_key():
+                return result
+
+            self._batch_result = None
+
+    def _get_batch_excluded(self):
+        reg = self._regressor
+        if reg:
+            return sorted(set(reg.user_excluded + reg.ouser_excluded))
+        return []
+
+    def _get_batch_key(self):
+        fod = self.filter_outliers_dict or {}
+        return (self.name, self.detector, self.fit, self.error_type, tuple(sorted(fod.items())), self.truncate,
+                self.time_zero_offset, self.group_data, self._data_id, self.xs.shape[0],
+                tuple(self._get_batch_excluded()))
+
     def _get_curvature_ys(self):
         return self.regressor.predict(self.offset_xs)
 
@@ -18,18 +18,43 @@
 import logging
 import os
 
-from numpy import append as npappend
 from traits.api import Property, Dict, Str
 from traits.has_traits import HasTraits
 from uncertainties import ufloat
 
 from pychron.core.helpers.isotope_utils import sort_isotopes, convert_detector
+from pychron.core.regression.batch_regressor import BatchOLSRegressor
 from pychron.paths import paths
 from pychron.processing.isotope import Isotope, Baseline
 
 logger = logging.getLogger('ISO')
 
 
+def batch_fit_measurements(groups, keys=None):
+    """
+        fit the isotopes and baselines of many IsotopeGroups at once
+    """
+    batch = BatchOLSRegressor()
+    added = []
+    for g in groups:
+        for k, iso in g.isotopes.items():
+            ms = (iso, iso.baseline)
+            if keys:
+                ms = [m for m, key in ((iso, k), (iso.baseline, iso.detector)) if key in keys]
+
+            for m in ms:
+                idx = m.add_batch_fit(batch)
+                if idx is None:
+                    m.set_batch_result(None)
+                else:
+                    added.append((m, idx))
+
+    if added:
+        results = batch.calculate()
+        for m, idx in added:
+            m.set_batch_result(results[idx])
+
+
 class IsotopeGroup(HasTraits):
     isotopes = Dict
     isotope_keys = Property
@@ -97,6 +122,14 @@ class IsotopeGroup(HasTraits):
     def iter_isotopes(self):
         return (self.isotopes[k] for k in self.isotope_keys)
 
+    def batch_fit(self, keys=None):
+        """
+            fit the isotopes and baselines with a single BatchOLSRegressor.
+
+            measurements the batch engine cannot handle are left to their own regressors
+        """
+        batch_fit_measurements([self], keys)
+
     def clear_isotopes(self):
         for iso in self.iter_isotopes():
             self.isotopes[iso.name] = Isotope(iso.name, iso.detector)
@@ -244,10 +277,7 @@ class IsotopeGroup(HasTraits):
             if kind == 'sniff':
                 isotope._value = signal
 
-            xs = npappend(isotope.xs, x)
-            ys = npappend(isotope.ys, signal)
-            isotope.xs = xs
-            isotope.ys = ys
+            isotope.append(x, signal)
             # isotope.dirty = True
 
         isotopes = self.isotopes
@@ -266,6 +296,15 @@ class IsotopeGroup(HasTraits):
                     _append(isotopes[i])
                     return True
 
+    def reserve_data(self, n, kind='signal'):
+        """
+            preallocate room for n more points in every isotope so appending counts does not reallocate
+        """
+        for iso in self.itervalues():
+            if kind in ('sniff', 'baseline', 'whiff'):
+                iso = getattr(iso, kind)
+            iso.reserve(n)
+
     def clear_baselines(self):
         for k in self.isotopes:
             self.set_baseline(k, None, (0, 0))
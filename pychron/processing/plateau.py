@@ -17,35 +17,25 @@
 # ============= enthought library imports =======================
 from __future__ import absolute_import
 
-from numpy import argmax, array
+from collections import deque
+
+from numpy import array, asarray, zeros, cumsum, median, isfinite
 from six.moves import range
 from traits.api import HasTraits, List, Array
 
-from pychron.core.stats.core import validate_mswd, calculate_mswd
+from pychron.core.stats.core import get_mswd_limits
 from pychron.pychron_constants import MAHON
 
 
-def memoize(function):
-    cache = {}
-
-    def closure(*args):
-        # return function(*args)
-        if args not in cache:
-            cache[args] = function(*args)
-        return cache[args]
-
-    return closure
-
-
-class Log():
-    def debug(self, txt):
-        pass
-        # print 'debug --- {}'.format(txt)
-
-log = Log()
-
-
 class Plateau(HasTraits):
+    """
+        find the longest run of steps that satisfies the plateau criteria.
+
+        the signal sums and the mswd sums are prefix sums so each start/end pair is checked in constant time.
+        for the fleck criterion the last end that overlaps each start is found with a sliding window over the
+        error envelopes (a run overlaps pairwise iff every new step overlaps the max lower and min upper bound
+        of the run)
+    """
     ages = Array
     errors = Array
     signals = Array
@@ -59,11 +49,15 @@ class Plateau(HasTraits):
     use_mswd = False  # mahon criterion
     total_signal = None
 
+    _signal_sums = None
+    _mswd_sums = None
+    _mswd_limits = None
+
     def find_plateaus(self, method=''):
         """
             method: str either fleck 1977 or mahon 1996
         """
-        if method.lower() == MAHON:
+        if method.lower() == MAHON.lower():
             self.use_mswd = True
             self.use_overlap = False
         else:
@@ -71,107 +65,161 @@ class Plateau(HasTraits):
             self.use_overlap = True
 
         n = len(self.ages)
-        excludes = self.excludes
-        ss = [s for i, s in enumerate(self.signals) if i not in excludes]
+        excludes = set(self.excludes)
+        self._prepare(excludes)
 
-        self.total_signal = float(sum(ss))
-        # log.info(self.total_signal)
+        if self.use_overlap:
+            overlap_ends = self._find_overlap_ends()
 
-        idxs = []
-        spans = []
-
-        overlap_func = memoize(self._overlap)
+        best = []
+        span = -1
         for i in range(n):
             if i in excludes:
                 continue
-            idx = self._find_plateaus(n, i, excludes, overlap_func)
-            if idx:
-                # log.debug('found {} {}'.format(*idx))
-                idxs.append(idx)
-                spans.append(idx[1] - idx[0])
 
-        if spans:
-            return idxs[argmax(array(spans))]
+            if self.use_overlap:
+                end = self._find_end(i, overlap_ends[i], excludes)
+            else:
+                end = self._find_end(i, n - 1, excludes, check_mswd=True)
 
-        return idxs
+            # an end of 0 is not a plateau. kept from the original scan
+            if end and end - i > span:
+                best = (i, end)
+                span = end - i
 
-    def _find_plateaus(self, n, start, excludes, overlap_func):
-        potential_end = None
-        for i in range(start, n, 1):
-            if i in excludes:
-                continue
+        return best
 
-            if not self.check_nsteps(start, i):
-                log.debug('{} {} nsteps failed'.format(start, i))
-                continue
+    def check_percent_released(self, start, end):
+        ss = self._signal_sums[end + 1] - self._signal_sums[start]
+        return ss / self.total_signal >= self.gas_fraction / 100.
 
-            if self.use_overlap and not self.check_overlap(start, i, overlap_func):
-                log.debug('{} {} overlap failed'.format(start, i))
-                # potential_end=None
-                break
+    def check_mswd(self, start, end):
+        """
+            return False if not valid
+        """
+        n = end - start + 1
+        if n <= 1:
+            return False
 
-            if self.use_mswd and not self.check_mswd(start, i):
-                continue
+        sw, swa, swa2, nzero = (a[end + 1] - a[start] for a in self._mswd_sums)
+        if nzero:
+            return False
 
-            if not self.check_percent_released(start, i):
-                log.debug('{} {} percent failed'.format(start, i))
-                continue
+        ssw = swa2 - swa * swa / sw
+        mswd = max(ssw, 0) / float(n - 1)
 
-            potential_end = i
+        limits = self._mswd_limits.get(n)
+        if limits is None:
+            limits = self._mswd_limits[n] = get_mswd_limits(n)
 
-        if potential_end:
-            return start, potential_end
+        low, high = limits
+        return bool(low <= mswd <= high)
 
-    def check_percent_released(self, start, end):
-        ss = sum([(s if not i in self.excludes else 0)
-                  for i, s in enumerate(self.signals)][start:end + 1])
+    def check_overlap(self, start, end):
+        lo, hi = self._get_envelopes()
+        ends = self._find_overlap_ends(lo[start:end + 1], hi[start:end + 1])
+        return ends[0] == end - start
 
-        log.debug('percent {} {} {}'.format(start, end, ss / self.total_signal))
+    def check_nsteps(self, start, end):
+        return (end - start) + 1 >= self.nsteps
 
-        return ss / self.total_signal >= self.gas_fraction/100.
+    # private
+    def _prepare(self, excludes):
+        signals = array([(s if i not in excludes else 0) for i, s in enumerate(self.signals)], dtype=float)
+        self.total_signal = float(signals.sum())
 
-    def check_mswd(self, start, end):
-        """
-            return False if not valid
-        """
-        ages = self.ages[start, end + 1]
-        errors = self.errors[start, end + 1]
-        mswd = calculate_mswd(ages, errors)
-        return validate_mswd(mswd, len(ages))
-
-    def check_overlap(self, start, end, overlap_func):
-        overlap_sigma = self.overlap_sigma
-        for c, i in enumerate(range(start, end, 1)):
-            for j in range(start + c, end + 1, 1):
-                if i == j:
-                    continue
-
-                try:
-                    if not overlap_func(i, j, overlap_sigma):
-                        return
-                except BaseException as e:
-                    import traceback
-                    log.debug('Overlap exception: {}'.format(e, traceback.format_exc()))
-                    continue
-        else:
-            return True
+        self._signal_sums = zeros(len(signals) + 1)
+        self._signal_sums[1:] = cumsum(signals)
 
-    def _overlap(self, start, end, overlap_sigma):
-        # log.debug('checking overlap {} {} '.format(start, end))
+        if self.use_mswd:
+            ages = asarray(self.ages, dtype=float)
+            errors = asarray(self.errors, dtype=float)
 
-        a1 = self.ages[start]
-        a2 = self.ages[end]
-        e1 = self.errors[start]
-        e2 = self.errors[end]
+            # the mswd is shift invariant. center the ages to limit cancellation in the sums
+            finite = isfinite(ages)
+            if finite.any():
+                ages = ages - median(ages[finite])
 
-        e1 *= overlap_sigma
-        e2 *= overlap_sigma
+            zero = errors == 0
+            ws = zeros(len(errors))
+            ws[~zero] = errors[~zero] ** -2
 
-        # log.debug('{}<{} {}>{}'.format(a1 - e1 , a2 + e2, a1 + e1 , a2 - e2))
-        return a1 - e1 < a2 + e2 and a1 + e1 > a2 - e2
+            sums = []
+            for v in (ws, ws * ages, ws * ages * ages, zero.astype(float)):
+                a = zeros(len(v) + 1)
+                a[1:] = cumsum(v)
+                sums.append(a)
 
-    def check_nsteps(self, start, end):
-        return (end - start) + 1 >= self.nsteps
+            self._mswd_sums = sums
+            self._mswd_limits = {}
+
+    def _get_envelopes(self):
+        ages = asarray(self.ages, dtype=float)
+        errors = asarray(self.errors, dtype=float) * self.overlap_sigma
+        return (ages - errors).tolist(), (ages + errors).tolist()
+
+    def _find_overlap_ends(self, lo=None, hi=None):
+        """
+            for each start return the last end such that every pair of steps in [start, end] overlaps.
+            excluded steps are included in the overlap test, same as the original pairwise scan.
+
+            two steps overlap if lo1 < hi2 and hi1 > lo2. a run overlaps pairwise iff each step added overlaps
+            every step already in the run, i.e. lo_new < min(hi) and hi_new > max(lo).
+            the window minimum and maximum are kept in monotonic deques so this is linear in the number of steps
+        """
+        if lo is None:
+            lo, hi = self._get_envelopes()
+
+        n = len(lo)
+        ends = [0] * n
+        maxlo, minhi = deque(), deque()
+
+        def push(k):
+            while maxlo and lo[maxlo[-1]] <= lo[k]:
+                maxlo.pop()
+            maxlo.append(k)
+            while minhi and hi[minhi[-1]] >= hi[k]:
+                minhi.pop()
+            minhi.append(k)
+
+        e = -1
+        for s in range(n):
+            if e < s:
+                e = s
+                push(s)
+
+            while e + 1 < n:
+                k = e + 1
+                if lo[k] < hi[minhi[0]] and hi[k] > lo[maxlo[0]]:
+                    e = k
+                    push(k)
+                else:
+                    break
+
+            ends[s] = e
+            if maxlo[0] == s:
+                maxlo.popleft()
+            if minhi[0] == s:
+                minhi.popleft()
+
+        return ends
+
+    def _find_end(self, start, last, excludes, check_mswd=False):
+        """
+            return the last end <= ``last`` that passes the nsteps, mswd and percent released checks
+        """
+        first = start + self.nsteps - 1
+        for end in range(last, first - 1, -1):
+            if end in excludes or end < start:
+                continue
+
+            if check_mswd and not self.check_mswd(start, end):
+                continue
+
+            if not self.check_percent_released(start, end):
+                continue
+
+            return end
 
 # ============= EOF =============================================
 
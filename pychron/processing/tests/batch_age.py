@@ -0,0 +1,187 @@
+import unittest
+
+from numpy import random, allclose, asarray
+from uncertainties import ufloat, nominal_value, std_dev
+
+from pychron.processing.arar_age import ArArAge, calculate_ages
+from pychron.processing.arar_constants import ArArConstants
+from pychron.processing.argon_calculations import calculate_f, calculate_f_batch, age_equation, \
+    age_equation_batch
+from pychron.processing.isotope import Isotope
+
+PRODUCTION_RATIOS = {'K4039': (0.01, 0.001), 'K3839': (0.012, 0.0002), 'K3739': (0.0002, 0.00001),
+                     'Ca3937': (0.0007, 0.00001), 'Ca3837': (0.00003, 0.000001), 'Ca3637': (0.00027, 0.00001),
+                     'Cl3638': (250, 10)}
+
+
+def make_intensities(n, seed=0):
+    rng = random.RandomState(seed)
+    a39 = rng.uniform(1, 100, n)
+    a37 = rng.uniform(0.1, 50, n)
+    a36 = rng.uniform(0.001, 0.5, n)
+    a38 = a39 * 0.013 + a36 * 0.19 + rng.uniform(0, 0.05, n)
+    a40 = a39 * rng.uniform(5, 20, n) + a36 * 295.5
+    ints = asarray([a40, a39, a38, a37, a36]).T
+    return ints, ints * rng.uniform(0.001, 0.02, ints.shape), rng.uniform(1, 300, n)
+
+
+def make_interferences():
+    return {k: ufloat(v, e, tag=k) for k, (v, e) in PRODUCTION_RATIOS.items()}
+
+
+class BatchAgeTestCase(unittest.TestCase):
+    def _compare(self, arc, ints, errs, dts, fixed=None):
+        n = ints.shape[0]
+        prs = {k: ([v] * n, [e] * n) for k, (v, e) in PRODUCTION_RATIOS.items()}
+        fvs = [nominal_value(f) for f in fixed] if fixed else None
+        fes = [std_dev(f) for f in fixed] if fixed else None
+        results = calculate_f_batch(ints, errs, dts, prs, arc, fixed_k3739=fvs, fixed_k3739_err=fes)
+
+        for i in range(n):
+            isos = [ufloat(v, e, tag=k) for k, v, e in zip(('Ar40', 'Ar39', 'Ar38', 'Ar37', 'Ar36'), ints[i],
+                                                             errs[i])]
+            fk = fixed[i] if fixed else False
+            f, f_wo_irrad, non_ar, computed, ifc = calculate_f(isos, dts[i], make_interferences(), arc,
+                                                               fixed_k3739=fk)
+            self.assertAlmostEqual(results['F'][0][i], nominal_value(f), places=9)
+            self.assertAlmostEqual(results['F'][1][i], std_dev(f), places=9)
+            self.assertAlmostEqual(results['F_wo_irrad'][1][i], std_dev(f_wo_irrad), places=9)
+
+            for name, d in (('non_ar_isotopes', non_ar), ('computed', computed), ('interference_corrected', ifc)):
+                for k, v in d.items():
+                    bv, be = results[name][k]
+                    self.assertTrue(allclose(bv[i], nominal_value(v), rtol=1e-9, atol=1e-12), (k, bv[i], v))
+                    self.assertTrue(allclose(be[i], std_dev(v), rtol=1e-9, atol=1e-12), (k, be[i], v))
+
+        return results
+
+    def test_normal(self):
+        self._compare(ArArConstants(), *make_intensities(50))
+
+    def test_fixed_mode(self):
+        arc = ArArConstants()
+        arc.k3739_mode = 'Fixed'
+        self._compare(arc, *make_intensities(50, 1))
+
+    def test_fixed_per_analysis(self):
+        ints, errs, dts = make_intensities(10, 2)
+        fixed = [0 if i % 2 else ufloat(0.012, 0.0003) for i in range(10)]
+        self._compare(ArArConstants(), ints, errs, dts, fixed=fixed)
+
+    def test_negative_ca(self):
+        arc = ArArConstants()
+        arc.allow_negative_ca_correction = False
+        ints, errs, dts = make_intensities(20, 3)
+        ints[::2, 3] = 0
+        results = self._compare(arc, ints, errs, dts)
+        self.assertTrue((results['non_ar_isotopes']['ca37'][0] >= 0).all())
+
+    def test_zero_k39(self):
+        ints, errs, dts = make_intensities(3, 4)
+        ints[1, 1] = 0
+        ints[1, 3] = 0
+        results = calculate_f_batch(ints, errs, dts, arar_constants=ArArConstants())
+        self.assertEqual(results['F'][0][1], 1)
+        self.assertEqual(results['F'][1][1], 0)
+
+    def test_age_equation(self):
+        arc = ArArConstants()
+        rng = random.RandomState(5)
+        fs = rng.uniform(1, 20, 20)
+        fes = fs * 0.01
+        fs[3] = -1e6
+        j, je = 0.004, 0.00001
+        for include_decay_error in (False, True):
+            lk = arc.lambda_k
+            lke = std_dev(lk) if include_decay_error else 0
+            ages, errs = age_equation_batch([j] * 20, [je] * 20, fs, fes, nominal_value(lk), lke, arc)
+            for i, (f, fe) in enumerate(zip(fs, fes)):
+                age = age_equation(ufloat(j, je), ufloat(f, fe), include_decay_error=include_decay_error,
+                                   arar_constants=arc)
+                self.assertAlmostEqual(ages[i] / nominal_value(age) if ages[i] else 0,
+                                       1 if ages[i] else 0, places=12)
+                self.assertAlmostEqual(errs[i], std_dev(age), delta=std_dev(age) * 1e-9)
+
+    def _make_analyses(self, n, seed, ic_factor=None):
+        ints, errs, dts = make_intensities(n, seed)
+
+        def make(i):
+            a = ArArAge()
+            for k, v, e in zip(('Ar40', 'Ar39', 'Ar38', 'Ar37', 'Ar36'), ints[i], errs[i]):
+                iso = Isotope(k, 'H1')
+                iso.value = v
+                iso.error = e
+                a.isotopes[k] = iso
+
+            if ic_factor is not None:
+                # Ar40 and Ar36 measured on the same detector share its ic factor
+                icf = ufloat(*ic_factor, tag='CDD')
+                a.isotopes['Ar40'].ic_factor = icf
+                a.isotopes['Ar36'].ic_factor = icf
+
+            a.ar39decayfactor = 1
+            a.ar37decayfactor = 1
+            a.timestamp = dts[i] * 86400
+            a.irradiation_time = 0
+            a.interference_corrections = make_interferences()
+            a.production_ratios = {'Ca_K': 1.3, 'Cl_K': 0.2}
+            a.j = ufloat(0.004, 0.00001, tag='J')
+            a.position_jerr = 0.000005
+            return a
+
+        expected = [make(i) for i in range(n)]
+        for a in expected:
+            a.calculate_age()
+
+        ans = [make(i) for i in range(n)]
+        calculate_ages(ans)
+        return ans, expected
+
+    def test_calculate_ages(self):
+        ans, expected = self._make_analyses(10, 6)
+
+        for a, e in zip(ans, expected):
+            self.assertTrue(a._batch_age)
+            for attr in ('age', 'age_err', 'age_err_wo_j', 'F', 'F_err', 'F_err_wo_irrad'):
+                self.assertAlmostEqual(getattr(a, attr) / getattr(e, attr), 1, places=9)
+            for attr in ('uage_w_j_err', 'uage_w_position_err', 'k39', 'rad40'):
+                self.assertAlmostEqual(std_dev(getattr(a, attr)) / std_dev(getattr(e, attr)), 1, places=9)
+
+            # k39 and ca37 are independent in the batch results so only the values of k/ca and k/cl match
+            for attr in ('kca', 'kcl'):
+                self.assertAlmostEqual(nominal_value(getattr(a, attr)) / nominal_value(getattr(e, attr)), 1,
+                                       places=9)
+
+        # error components trigger a full calculation
+        a, e = ans[0], expected[0]
+        self.assertAlmostEqual(a.get_error_component('Ar40'), e.get_error_component('Ar40'), places=9)
+        self.assertFalse(a._batch_age)
+
+    def test_calculate_ages_correlated(self):
+        ans, expected = self._make_analyses(10, 7, ic_factor=(1.02, 0.01))
+
+        for a, e in zip(ans, expected):
+            for attr in ('age', 'age_err', 'F', 'F_err', 'F_err_wo_irrad'):
+                self.assertAlmostEqual(getattr(a, attr) / getattr(e, attr), 1, places=9)
+            for attr in ('uage_w_j_err', 'uage_w_position_err', 'rad40'):
+                self.assertAlmostEqual(std_dev(getattr(a, attr)) / std_dev(getattr(e, attr)), 1, places=9)
+
+            # set without a full calculation
+            for k, iso in a.isotopes.items():
+                self.assertAlmostEqual(iso.age_error_component, e.isotopes[k].age_error_component, places=9)
+            self.assertTrue(a._batch_age)
+
+        # the shared ic factor is not independent of the isotopes
+        a = ans[0]
+        ints = [a.isotopes[k].get_intensity() for k in ('Ar40', 'Ar39', 'Ar38', 'Ar37', 'Ar36')]
+        ints[1] *= a.ar39decayfactor
+        ints[3] *= a.ar37decayfactor
+        results = calculate_f_batch([[nominal_value(v) for v in ints]], [[std_dev(v) for v in ints]],
+                                    [a.decay_days], {k: ([nominal_value(v)], [std_dev(v)])
+                                                     for k, v in make_interferences().items()},
+                                    a.arar_constants)
+        self.assertNotAlmostEqual(results['F'][1][0] / a.F_err, 1, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
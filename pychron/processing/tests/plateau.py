@@ -2,7 +2,51 @@ from __future__ import absolute_import
 __author__ = 'ross'
 import unittest
 
+from numpy import random, argmax, array
+
+from pychron.core.stats.core import calculate_mswd, validate_mswd
 from pychron.processing.plateau import Plateau
+from pychron.pychron_constants import MAHON, FLECK
+
+
+def scan_plateaus(ages, errors, signals, excludes=None, method='', nsteps=3, overlap_sigma=2, gas_fraction=50):
+    """
+        the pairwise scan Plateau replaced. used as the reference
+    """
+    excludes = excludes or []
+    use_mswd = method.lower() == MAHON.lower()
+    n = len(ages)
+    total = float(sum(s for i, s in enumerate(signals) if i not in excludes))
+
+    def overlap(i, j):
+        a1, a2 = ages[i], ages[j]
+        e1, e2 = errors[i] * overlap_sigma, errors[j] * overlap_sigma
+        return a1 - e1 < a2 + e2 and a1 + e1 > a2 - e2
+
+    def find(start):
+        potential_end = None
+        for i in range(start, n):
+            if i in excludes:
+                continue
+            if (i - start) + 1 < nsteps:
+                continue
+            if not use_mswd and not all(overlap(a, b) for a in range(start, i + 1) for b in range(a + 1, i + 1)):
+                break
+            if use_mswd:
+                sa, se = ages[start:i + 1], errors[start:i + 1]
+                if not validate_mswd(calculate_mswd(sa, se), len(sa)):
+                    continue
+            ss = sum(s for j, s in enumerate(signals) if j not in excludes and start <= j <= i)
+            if ss / total < gas_fraction / 100.:
+                continue
+            potential_end = i
+        if potential_end:
+            return start, potential_end
+
+    idxs = [r for r in (find(i) for i in range(n) if i not in excludes) if r]
+    if idxs:
+        return idxs[argmax(array([e - s for s, e in idxs]))]
+    return idxs
 
 
 class PlateauTestCase(unittest.TestCase):
@@ -117,5 +161,61 @@ class PlateauTestCase(unittest.TestCase):
         return ages, errors, signals, exclude, idx
 
 
+class PlateauScanTestCase(unittest.TestCase):
+    def _compare(self, method, seeds=range(200)):
+        for seed in seeds:
+            rng = random.RandomState(seed)
+            n = rng.randint(3, 25)
+            ages = 10 + rng.normal(0, 0.3, n) + (rng.rand(n) < 0.2) * rng.normal(0, 3, n)
+            errors = rng.uniform(0.05, 0.5, n)
+            signals = rng.uniform(0, 1, n)
+            excludes = [int(i) for i in rng.choice(n, rng.randint(0, 3), replace=False)]
+            nsteps = int(rng.randint(2, 5))
+            gas_fraction = float(rng.choice((20, 50)))
+
+            p = Plateau(ages=ages, errors=errors, signals=signals, excludes=excludes, nsteps=nsteps,
+                        gas_fraction=gas_fraction)
+            expected = scan_plateaus(ages, errors, signals, excludes, method, nsteps=nsteps,
+                                     gas_fraction=gas_fraction)
+            self.assertEqual(p.find_plateaus(method), expected, 'seed={}'.format(seed))
+
+    def test_fleck(self):
+        self._compare('fleck 1977')
+
+    def test_mahon(self):
+        self._compare(MAHON)
+
+    def test_mahon_method(self):
+        # the steps overlap at 2 sigma but are too scattered for the mswd criterion
+        ages = array([10, 10.9, 9.1, 10.9, 9.1, 10])
+        errors = array([0.5] * 6)
+        signals = array([1] * 6)
+
+        p = Plateau(ages=ages, errors=errors, signals=signals)
+        self.assertEqual(p.find_plateaus(FLECK), (0, 5))
+        for method in (MAHON, MAHON.lower()):
+            self.assertNotEqual(p.find_plateaus(method), (0, 5))
+            self.assertTrue(p.use_mswd)
+
+    def test_check_mswd(self):
+        ages = array([10, 10.1, 9.9, 15, 10])
+        errors = array([0.1] * 5)
+        p = Plateau(ages=ages, errors=errors, signals=array([1] * 5))
+        p.find_plateaus(MAHON)
+
+        for start, end in ((0, 2), (0, 3), (1, 4), (0, 0)):
+            sa, se = ages[start:end + 1], errors[start:end + 1]
+            expected = len(sa) > 1 and validate_mswd(calculate_mswd(sa, se), len(sa))
+            self.assertEqual(p.check_mswd(start, end), expected, '{}-{}'.format(start, end))
+
+    def test_zero_error(self):
+        ages = array([0, 1, 1, 1, 1])
+        errors = array([0, 0.1, 0.1, 0.1, 0.1])
+        signals = array([1, 1, 1, 1, 1])
+        for method in ('', MAHON):
+            p = Plateau(ages=ages, errors=errors, signals=signals)
+            self.assertEqual(p.find_plateaus(method), scan_plateaus(ages, errors, signals, method=method))
+
+
 if __name__ == '__main__':
     unittest.main()
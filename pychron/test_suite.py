@@ -26,12 +26,31 @@ def suite():
     from pychron.core.tests.spell_correct import SpellCorrectTestCase
     from pychron.core.tests.filtering_tests import FilteringTestCase
     from pychron.core.stats.tests.peak_detection_test import MultiPeakDetectionTestCase
+    from pychron.core.stats.tests.monte_carlo import MonteCarloTestCase
+    from pychron.core.stats.tests.probability_curves import CumulativeProbabilityTestCase
     from pychron.core.helpers.tests.floatfmt import FloatfmtTestCase
     from pychron.core.helpers.tests.strtools import CamelCaseTestCase
+    from pychron.core.helpers.tests.binpack import BinpackTestCase
+    from pychron.core.helpers.tests.growable_array import GrowableArrayTestCase, MeasurementBufferTestCase
     from pychron.core.xml.tests.xml_parser import XMLParserTestCase
     from pychron.core.regression.tests.regression import OLSRegressionTest, MeanRegressionTest, \
         FilterOLSRegressionTest, OLSRegressionTest2, TruncateRegressionTest
+    from pychron.core.regression.tests.batch_regressor import BatchRegressionTestCase
     from pychron.core.tests.alpha_tests import AlphaTestCase
+    from pychron.core.tests.fuzzy_index import FuzzyIndexTestCase
+
+    # Database
+    from pychron.database.core.tests.query_cache import QueryCacheTestCase, DatabaseQueryCacheTestCase
+
+    # DVC
+    from pychron.dvc.tests.data_sidecar import DataSidecarTestCase
+    from pychron.dvc.tests.cache import DVCCacheTestCase, DVCAnalysisCacheTestCase
+    from pychron.dvc.tests.sync_manager import RepositorySyncManagerTestCase
+    from pychron.dvc.tests.commit_pipeline import CommitPipelineTestCase
+    from pychron.dvc.tests.offline_index import OfflineIndexTestCase
+    from pychron.dvc.tests.paging import AnalysisPagingTestCase, BrowserPagingTestCase
+    from pychron.dvc.tests.fuzzy_search import FuzzySearchTestCase
+    from pychron.dvc.tests.parallel_loader import ParallelLoaderTestCase, ParallelLoaderPoolTestCase
 
     # DataMapper
     from pychron.data_mapper.tests.usgs_vsc_file_source import USGSVSCFileSourceUnittest, \
@@ -51,14 +70,32 @@ def suite():
     from pychron.experiment.tests.conditionals import ConditionalsTestCase, ParseConditionalsTestCase
     from pychron.experiment.tests.identifier import IdentifierTestCase
     from pychron.experiment.tests.comment_template import CommentTemplaterTestCase
+    from pychron.experiment.tests.async_writer import AsyncDataWriterTestCase, H5DataWriterTestCase, \
+        CollectorWriteTestCase
+    from pychron.experiment.tests.measurement_scheduler import DeadlineSchedulerTestCase, MeasurementWorkerTestCase, \
+        CollectorPlotTestCase
+
+    # ExtractionLine
+    from pychron.extraction_line.tests.switch_manager import SwitchManagerSweepTestCase, SwitchManagerIndexTestCase
 
     # ExternalPipette
     from pychron.external_pipette.tests.external_pipette import ExternalPipetteTestCase
 
+    # Hardware
+    from pychron.hardware.core.tests.serial_communicator import LatencyHistogramTestCase, SerialCommunicatorTestCase
+    from pychron.hardware.core.tests.scheduler import CommunicationSchedulerTestCase
+    from pychron.hardware.core.tests.ethernet_communicator import ConnectionPoolTestCase, \
+        EthernetCommunicatorTestCase
+    from pychron.hardware.core.tests.polling_engine import PollTaskTestCase, PollingEngineTestCase
+
+    # Pipeline
+    from pychron.pipeline.tests.node_cache import NodeCacheTestCase
+
     # Processing
-    from pychron.processing.tests.plateau import PlateauTestCase
+    from pychron.processing.tests.plateau import PlateauTestCase, PlateauScanTestCase
     from pychron.processing.tests.ratio import RatioTestCase
     from pychron.processing.tests.age_converter import AgeConverterTestCase
+    from pychron.processing.tests.batch_age import BatchAgeTestCase
 
     # Pyscripts
     # from pychron.pyscripts.tests.extraction_script import WaitForTestCase
@@ -85,6 +122,9 @@ def suite():
         FloatfmtTestCase,
         SigFigStdFmtTestCase,
         CamelCaseTestCase,
+        BinpackTestCase,
+        GrowableArrayTestCase,
+        MeasurementBufferTestCase,
         RatioTestCase,
         XMLParserTestCase,
         OLSRegressionTest,
@@ -94,7 +134,28 @@ def suite():
         FilterOLSRegressionTest,
         OLSRegressionTest2,
         TruncateRegressionTest,
+        BatchRegressionTestCase,
+        MonteCarloTestCase,
+        CumulativeProbabilityTestCase,
         MSWDTestCase,
+        FuzzyIndexTestCase,
+
+        # Database
+        QueryCacheTestCase,
+        DatabaseQueryCacheTestCase,
+
+        # DVC
+        DataSidecarTestCase,
+        DVCCacheTestCase,
+        DVCAnalysisCacheTestCase,
+        RepositorySyncManagerTestCase,
+        CommitPipelineTestCase,
+        OfflineIndexTestCase,
+        AnalysisPagingTestCase,
+        BrowserPagingTestCase,
+        FuzzySearchTestCase,
+        ParallelLoaderTestCase,
+        ParallelLoaderPoolTestCase,
 
         # DataMapper
         USGSVSCFileSourceUnittest,
@@ -117,12 +178,36 @@ def suite():
         ParseConditionalsTestCase,
         IdentifierTestCase,
         CommentTemplaterTestCase,
+        AsyncDataWriterTestCase,
+        H5DataWriterTestCase,
+        CollectorWriteTestCase,
+        DeadlineSchedulerTestCase,
+        MeasurementWorkerTestCase,
+        CollectorPlotTestCase,
+
+        # ExtractionLine
+        SwitchManagerSweepTestCase,
+        SwitchManagerIndexTestCase,
 
         # ExternalPipette
         ExternalPipetteTestCase,
 
+        # Hardware
+        LatencyHistogramTestCase,
+        SerialCommunicatorTestCase,
+        CommunicationSchedulerTestCase,
+        ConnectionPoolTestCase,
+        EthernetCommunicatorTestCase,
+        PollTaskTestCase,
+        PollingEngineTestCase,
+
+        # Pipeline
+        NodeCacheTestCase,
+
         # Processing
         PlateauTestCase,
+        PlateauScanTestCase,
+        BatchAgeTestCase,
         RatioTestCase,
         AgeConverterTestCase,
 